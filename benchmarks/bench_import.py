@@ -0,0 +1,109 @@
+"""
+启动导入耗时基准测试
+
+stdio 模式下客户端每次启动都会拉起新的服务进程，冷启动耗时直接影响首次调用的延迟。
+此脚本在全新的解释器中以 -X importtime 导入 smartdb 入口模块（core.server），统计多次运行的导入耗时，
+列出自身耗时最高的模块，并检查启动阶段没有导入任何方言包或数据库驱动（它们应在配置了对应类型的连接池后才导入）。
+导入耗时超过 --budget-ms 或导入了不应导入的模块时以非0状态退出。
+
+Usage:
+    python benchmarks/bench_import.py --runs 5 --budget-ms 1500
+    python benchmarks/bench_import.py --output import_report.json
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+# 启动时不应导入的模块：方言包只在使用对应类型的连接池时导入，驱动由 SQLAlchemy 创建引擎时导入
+FORBIDDEN_PREFIXES = (
+    "databases.mysql", "databases.postgresql", "databases.oracle", "databases.mssqlserver",
+    "databases.dameng", "databases.sqlite",
+    "pymysql", "psycopg2", "oracledb", "pymssql", "dmPython",
+)
+
+_IMPORTTIME_PATTERN = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$')
+
+
+def parse_importtime(stderr: str):
+    """解析 -X importtime 输出，返回 [(模块名, 自身耗时us, 累计耗时us, 层级)]"""
+    entries = []
+    for line in stderr.splitlines():
+        match = _IMPORTTIME_PATTERN.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append((name, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return entries
+
+
+def run_once(module: str):
+    env = dict(os.environ, PYTHONPATH=SRC_DIR + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    start = time.perf_counter()
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                               env=env, capture_output=True, text=True)
+    wall_ms = (time.perf_counter() - start) * 1000
+    if completed.returncode != 0:
+        raise RuntimeError(f"importing {module} failed:\n{completed.stderr[-2000:]}")
+    entries = parse_importtime(completed.stderr)
+    module_us = next((cumulative for name, _, cumulative, level in entries if name == module and level == 0), None)
+    if module_us is None:
+        raise RuntimeError(f"{module} not found in -X importtime output")
+    return module_us / 1000, wall_ms, entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="core.server", help="入口模块，默认为 smartdb 命令对应的 core.server")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=1500, help="入口模块导入耗时中位数的上限(毫秒)")
+    parser.add_argument("--top", type=int, default=15, help="列出自身耗时最高的模块数")
+    parser.add_argument("--output", default=None, help="JSON报告输出路径，默认输出到标准输出")
+    args = parser.parse_args()
+
+    import_ms, wall_ms = [], []
+    entries = []
+    for _ in range(max(1, args.runs)):
+        module_ms, process_ms, entries = run_once(args.module)
+        import_ms.append(module_ms)
+        wall_ms.append(process_ms)
+
+    # 模块列表取最后一次运行，此时磁盘缓存和字节码缓存都已就绪
+    forbidden = sorted({name for name, _, _, _ in entries
+                        if any(name == prefix or name.startswith(prefix + ".") for prefix in FORBIDDEN_PREFIXES)})
+    slowest = sorted(entries, key=lambda entry: entry[1], reverse=True)[:args.top]
+    median_ms = statistics.median(import_ms)
+
+    report = {
+        "module": args.module,
+        "python": sys.version.split()[0],
+        "runs": len(import_ms),
+        "import_ms": {"median": round(median_ms, 3), "min": round(min(import_ms), 3),
+                      "max": round(max(import_ms), 3)},
+        "process_wall_ms": {"median": round(statistics.median(wall_ms), 3), "min": round(min(wall_ms), 3)},
+        "budget_ms": args.budget_ms,
+        "within_budget": median_ms <= args.budget_ms,
+        "modules_imported": len(entries),
+        "forbidden_imports": forbidden,
+        "slowest_self_ms": [{"module": name, "self_ms": round(self_us / 1000, 3),
+                             "cumulative_ms": round(cumulative_us / 1000, 3)}
+                            for name, self_us, cumulative_us, _ in slowest],
+    }
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    else:
+        print(output)
+    sys.exit(0 if report["within_budget"] and not forbidden else 1)
+
+
+if __name__ == "__main__":
+    main()
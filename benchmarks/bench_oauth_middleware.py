@@ -0,0 +1,131 @@
+"""
+OAuth 中间件认证开销基准测试
+
+在进程内直接调用 ASGI 应用（不经过网络），对比 /mcp 路由在以下情况下的单次请求耗时：
+  - none:          不启用认证
+  - legacy:        旧的 BaseHTTPMiddleware 实现，每次请求解码JWT并读取环境变量
+  - asgi_nocache:  纯 ASGI 中间件，关闭令牌验证缓存
+  - asgi_cached:   纯 ASGI 中间件，启用令牌验证缓存（默认配置）
+
+Usage:
+    python benchmarks/bench_oauth_middleware.py --requests 20000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+import jwt
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import JSONResponse
+from starlette.routing import Mount
+
+from oauth.middleware import OAuthMiddleware
+from oauth.oauth_config import OAuthConfig
+from oauth.token_handler import TokenHandler
+
+
+class LegacyOAuthMiddleware(BaseHTTPMiddleware):
+    """旧版中间件的等价实现，仅用于对比"""
+
+    async def dispatch(self, request, call_next):
+        auth_header = request.headers.get("Authorization")
+        parts = auth_header.split() if auth_header else []
+        if len(parts) != 2 or parts[0].lower() != "bearer":
+            return JSONResponse({"error": "invalid_request"}, status_code=401)
+        try:
+            payload = jwt.decode(parts[1], os.getenv("TOKEN_SECRET_KEY"),
+                                 algorithms=[OAuthConfig.TOKEN_ALGORITHM])
+        except jwt.InvalidTokenError:
+            return JSONResponse({"error": "invalid_token"}, status_code=401)
+        request.state.user = {"id": payload["sub"], "username": payload["username"]}
+        return await call_next(request)
+
+
+async def mcp_endpoint(scope, receive, send):
+    """模拟 /mcp 路由的最小 ASGI 应用"""
+    await send({"type": "http.response.start", "status": 200,
+                "headers": [(b"content-type", b"application/json")]})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+def build_app(middleware):
+    return Starlette(routes=[Mount("/mcp", app=mcp_endpoint)], middleware=middleware)
+
+
+async def run_requests(app, token: str, count: int) -> list:
+    headers = [(b"authorization", f"Bearer {token}".encode()), (b"content-type", b"application/json")]
+
+    async def receive():
+        return {"type": "http.request", "body": b"{}", "more_body": False}
+
+    statuses = []
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            statuses.append(message["status"])
+
+    durations = []
+    for _ in range(count):
+        scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+                 "scheme": "http", "path": "/mcp/", "raw_path": b"/mcp/", "root_path": "",
+                 "query_string": b"", "headers": headers, "client": ("127.0.0.1", 1), "server": ("127.0.0.1", 3000),
+                 "state": {}}
+        start = time.perf_counter_ns()
+        await app(scope, receive, send)
+        durations.append(time.perf_counter_ns() - start)
+
+    if any(status != 200 for status in statuses):
+        raise RuntimeError(f"unexpected response status: {set(statuses)}")
+    return durations
+
+
+def summarize(durations: list) -> dict:
+    ordered = sorted(durations)
+    return {
+        "mean_us": round(statistics.fmean(ordered) / 1000, 2),
+        "p50_us": round(ordered[len(ordered) // 2] / 1000, 2),
+        "p99_us": round(ordered[int(len(ordered) * 0.99) - 1] / 1000, 2),
+    }
+
+
+async def main(count: int) -> dict:
+    os.environ.setdefault("TOKEN_SECRET_KEY", "smartdb_benchmark_token_secret_key_32b")
+    TokenHandler.reload_secrets()
+    token, _, _, _ = TokenHandler.create_tokens(user_id="1", username="bench")
+
+    scenarios = {
+        "none": build_app([]),
+        "legacy": build_app([Middleware(LegacyOAuthMiddleware)]),
+        "asgi_nocache": build_app([Middleware(OAuthMiddleware)]),
+        "asgi_cached": build_app([Middleware(OAuthMiddleware)]),
+    }
+
+    report = {}
+    for name, app in scenarios.items():
+        TokenHandler.reload_secrets()
+        if name == "asgi_nocache":
+            TokenHandler._cache_size = 0
+        # 预热
+        await run_requests(app, token, min(200, count))
+        report[name] = summarize(await run_requests(app, token, count))
+
+    baseline = report["none"]["mean_us"]
+    for name, stats in report.items():
+        stats["auth_overhead_us"] = round(stats["mean_us"] - baseline, 2)
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="OAuth middleware per-request overhead benchmark")
+    parser.add_argument("--requests", type=int, default=20000, help="requests per scenario")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(main(args.requests)), indent=2))
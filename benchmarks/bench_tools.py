@@ -0,0 +1,203 @@
+"""
+工具端到端基准测试
+
+使用 SQLite 数据库生成合成数据集（大量表、宽表、百万行大表），通过 ToolRegistry
+调用每个已注册工具，统计耗时分布和单次调用的内存分配峰值，输出 JSON 报告。
+指定 --compare 时与之前的报告对比，p50 耗时超过容忍度的用例视为性能回退并以非0状态退出。
+
+Usage:
+    python benchmarks/bench_tools.py --scale small --output report.json
+    python benchmarks/bench_tools.py --scale large --compare report.json --tolerance 0.2
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from sqlite_standin import DB_TYPE, SCALES, populate
+
+import sqlalchemy
+
+from connection.pool_manager import MultiDBPoolManager
+
+POOL_NAME = "default"
+
+# (用例名称, 工具名称, 参数)
+CASES = [
+    ("execute_sql.count_big", "execute_sql", {"query": "SELECT COUNT(*) FROM big_table"}),
+    ("execute_sql.fetch_1000", "execute_sql", {"query": "SELECT * FROM big_table WHERE user_id < 100 LIMIT 1000"}),
+    ("execute_sql.fetch_10000", "execute_sql", {"query": "SELECT * FROM big_table LIMIT 10000"}),
+    ("execute_sql.wide_100", "execute_sql", {"query": "SELECT * FROM wide_table LIMIT 100"}),
+    ("get_table_name.all", "get_table_name", {"text": "SEARCH_ALL_TABLES"}),
+    ("get_table_name.keyword", "get_table_name", {"text": "big"}),
+    ("get_table_desc.wide", "get_table_desc", {"tables": "wide_table"}),
+    ("get_table_desc.multi", "get_table_desc", {"tables": "t_00000,t_00001,t_00002,big_table"}),
+    ("get_table_index.big", "get_table_index", {"tables": "big_table"}),
+    ("get_db_version", "get_db_version", {}),
+    ("get_db_health.all", "get_db_health", {"health_type": "all"}),
+    ("get_top_sql", "get_top_sql", {}),
+    ("sql_creator", "sql_creator", {"text": "统计每个分类的金额"}),
+    ("sql_optimize.big", "sql_optimize", {
+        "text": "SELECT category, SUM(amount) FROM big_table WHERE user_id = 42 GROUP BY category",
+        "tables": "big_table",
+    }),
+]
+
+
+def _percentile(sorted_values, pct):
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def _git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL,
+                                       cwd=os.path.dirname(os.path.abspath(__file__))).decode().strip()
+    except Exception:
+        return None
+
+
+def _response_size(result) -> int:
+    return sum(len(item.text.encode("utf-8")) for item in result if hasattr(item, "text"))
+
+
+def run_case(loop, tool, arguments, iterations, warmup):
+    for _ in range(warmup):
+        loop.run_until_complete(tool.run_tool(dict(arguments)))
+
+    latencies = []
+    result = None
+    for _ in range(iterations):
+        start = time.perf_counter()
+        result = loop.run_until_complete(tool.run_tool(dict(arguments)))
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    # 内存单独测量，避免 tracemalloc 的开销影响耗时
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    loop.run_until_complete(tool.run_tool(dict(arguments)))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        "iterations": iterations,
+        "latency_ms": {
+            "min": round(latencies[0], 3),
+            "p50": round(_percentile(latencies, 50), 3),
+            "p95": round(_percentile(latencies, 95), 3),
+            "p99": round(_percentile(latencies, 99), 3),
+            "mean": round(statistics.fmean(latencies), 3),
+            "max": round(latencies[-1], 3),
+        },
+        "peak_alloc_kb": round(peak / 1024, 1),
+        "response_bytes": _response_size(result),
+    }
+
+
+def compare(report, baseline, tolerance):
+    """返回 p50 耗时相对基线增长超过容忍度的用例"""
+    baseline_results = {item["case"]: item for item in baseline.get("results", [])}
+    regressions = []
+    for item in report["results"]:
+        base = baseline_results.get(item["case"])
+        if not base:
+            continue
+        before = base["latency_ms"]["p50"]
+        after = item["latency_ms"]["p50"]
+        if before > 0 and (after - before) / before > tolerance:
+            regressions.append({"case": item["case"], "baseline_p50_ms": before, "p50_ms": after,
+                                "change": round((after - before) / before, 3)})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--db-path", default=None, help="SQLite数据库文件路径，默认在临时目录中按规模缓存")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--cases", default=None, help="只运行指定用例，以,分隔")
+    parser.add_argument("--output", default=None, help="JSON报告输出路径，默认输出到标准输出")
+    parser.add_argument("--compare", default=None, help="用于对比的基线报告")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="允许的p50耗时增长比例")
+    args = parser.parse_args()
+
+    db_path = args.db_path or os.path.join(tempfile.gettempdir(), f"smartdb_bench_{args.scale}.db")
+    populate_start = time.perf_counter()
+    populate(db_path, args.scale)
+    populate_seconds = time.perf_counter() - populate_start
+
+    config_path = os.path.join(tempfile.gettempdir(), "smartdb_bench_config.json")
+    with open(config_path, "w", encoding="utf-8") as f:
+        json.dump({POOL_NAME: {"type": DB_TYPE, "database": db_path, "role": "readonly",
+                               "pool_size": 4, "max_overflow": 4}}, f)
+    os.environ["DATABASE_CONFIG_FILE"] = config_path
+
+    import tools  # noqa: F401  导入时注册所有工具
+    from tools.base import ToolRegistry
+
+    MultiDBPoolManager.init_from_config()
+
+    selected = set(args.cases.split(",")) if args.cases else None
+    covered_tools = {tool_name for _, tool_name, _ in CASES}
+    uncovered = sorted(tool.name for tool in ToolRegistry.get_all_tools() if tool.name not in covered_tools)
+    if uncovered:
+        print(f"Warning: registered tools without benchmark cases: {', '.join(uncovered)}", file=sys.stderr)
+
+    loop = asyncio.new_event_loop()
+    results = []
+    try:
+        for case_name, tool_name, arguments in CASES:
+            if selected and case_name not in selected:
+                continue
+            tool = ToolRegistry.get_tool(tool_name)
+            print(f"running {case_name} ...", file=sys.stderr)
+            # 部分工具会向标准输出打印调试信息，避免混入JSON报告
+            with contextlib.redirect_stdout(sys.stderr):
+                result = run_case(loop, tool, {"pool_name": POOL_NAME, **arguments}, args.iterations, args.warmup)
+            results.append({"case": case_name, "tool": tool_name, **result})
+    finally:
+        loop.close()
+        MultiDBPoolManager.get_instance().close_all()
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "sqlalchemy": sqlalchemy.__version__,
+            "platform": platform.platform(),
+            "scale": args.scale,
+            "dataset": SCALES[args.scale],
+            "populate_seconds": round(populate_seconds, 3),
+        },
+        "results": results,
+    }
+
+    exit_code = 0
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            report["regressions"] = compare(report, json.load(f), args.tolerance)
+        exit_code = 1 if report["regressions"] else 0
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    else:
+        print(output)
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+"""
+streamable HTTP 服务的负载生成与流量回放工具
+
+打开 N 个 MCP 会话并发调用工具，统计吞吐量、p50/p95/p99 耗时、错误率，
+同时定期抓取服务端 /metrics 获取连接池饱和度、准入排队和连接等待时间。
+
+工作负载:
+  - 默认: 按 bench_tools.py 中的用例混合调用（需配合 SQLite 基准数据集）
+  - --replay: 回放服务端 --record-requests 记录的 tools/call 序列，按原会话分组，
+    --speed 大于0时按原始调用间隔（除以speed）回放，否则尽可能快地发送
+
+Usage:
+    # 启动本地 SQLite 服务并压测
+    python benchmarks/load_generator.py --spawn-server --sessions 20 --duration 30
+    # 回放录制的流量
+    python benchmarks/load_generator.py --replay traffic.jsonl --sessions 10 --speed 1
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+from mcp import ClientSession
+from mcp.client.streamable_http import streamablehttp_client
+
+from bench_tools import CASES
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_SAMPLE_PATTERN = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{[^}]*\})?\s+(\S+)$')
+_LABEL_PATTERN = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+
+def parse_metrics(text: str) -> List[Tuple[str, Dict[str, str], float]]:
+    """解析 Prometheus 文本格式"""
+    samples = []
+    for line in text.splitlines():
+        if not line or line.startswith("#"):
+            continue
+        match = _SAMPLE_PATTERN.match(line)
+        if not match:
+            continue
+        name, labels, value = match.groups()
+        samples.append((name, dict(_LABEL_PATTERN.findall(labels or "")), float(value.replace("+Inf", "inf"))))
+    return samples
+
+
+def _sum_metric(samples, name, **labels) -> float:
+    return sum(value for sample_name, sample_labels, value in samples
+               if sample_name == name and all(sample_labels.get(k) == v for k, v in labels.items()))
+
+
+class ServerSampler:
+    """定期抓取服务端指标"""
+
+    def __init__(self, metrics_url: str, interval: float):
+        self.metrics_url = metrics_url
+        self.interval = interval
+        self.saturation: List[float] = []
+        self.checked_out: List[float] = []
+        self.queued: List[float] = []
+        self.first: Optional[list] = None
+        self.last: Optional[list] = None
+        self.errors = 0
+
+    async def scrape(self, client: httpx.AsyncClient) -> Optional[list]:
+        try:
+            response = await client.get(self.metrics_url)
+            response.raise_for_status()
+        except httpx.HTTPError:
+            self.errors += 1
+            return None
+        return parse_metrics(response.text)
+
+    async def run(self, stop: asyncio.Event) -> None:
+        async with httpx.AsyncClient(timeout=5) as client:
+            while True:
+                samples = await self.scrape(client)
+                if samples is not None:
+                    if self.first is None:
+                        self.first = samples
+                    self.last = samples
+                    ratios = [v for n, _, v in samples if n == "smartdb_pool_saturation_ratio"]
+                    if ratios:
+                        self.saturation.append(max(ratios))
+                    self.checked_out.append(_sum_metric(samples, "smartdb_pool_checked_out_connections"))
+                    self.queued.append(_sum_metric(samples, "smartdb_admission_queued_requests"))
+                if stop.is_set():
+                    return
+                try:
+                    await asyncio.wait_for(stop.wait(), self.interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    def summary(self) -> Dict:
+        if self.first is None or self.last is None:
+            return {"available": False, "scrape_errors": self.errors}
+
+        def delta(name, **labels):
+            return _sum_metric(self.last, name, **labels) - _sum_metric(self.first, name, **labels)
+
+        checkout_count = delta("smartdb_pool_checkout_wait_seconds_count")
+        checkout_sum = delta("smartdb_pool_checkout_wait_seconds_sum")
+        queue_count = delta("smartdb_admission_queue_wait_seconds_count")
+        queue_sum = delta("smartdb_admission_queue_wait_seconds_sum")
+        return {
+            "available": True,
+            "scrape_errors": self.errors,
+            "pool_saturation_max": round(max(self.saturation), 3) if self.saturation else None,
+            "pool_saturation_mean": round(statistics.fmean(self.saturation), 3) if self.saturation else None,
+            "checked_out_max": max(self.checked_out) if self.checked_out else None,
+            "admission_queued_max": max(self.queued) if self.queued else None,
+            "admission_rejected": delta("smartdb_admission_rejected_total"),
+            "admission_timeouts": delta("smartdb_admission_timeout_total"),
+            "admission_queue_wait_mean_ms": round(queue_sum / queue_count * 1000, 3) if queue_count else 0.0,
+            "pool_checkout_wait_mean_ms": round(checkout_sum / checkout_count * 1000, 3) if checkout_count else 0.0,
+        }
+
+
+def load_replay(path: str) -> List[List[dict]]:
+    """读取录制文件并按会话分组，保持每个会话内的调用顺序"""
+    sessions: Dict[str, List[dict]] = defaultdict(list)
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                entry = json.loads(line)
+                sessions[entry["session_id"]].append(entry)
+    sequences = [sorted(calls, key=lambda c: c["timestamp"]) for calls in sessions.values()]
+    if not sequences:
+        raise ValueError(f"no recorded calls in {path}")
+    return sequences
+
+
+def mix_sequence(pool_name: str) -> List[dict]:
+    return [{"tool": tool, "arguments": {"pool_name": pool_name, **arguments}, "timestamp": None}
+            for _, tool, arguments in CASES]
+
+
+async def run_session(index: int, url: str, sequence: List[dict], deadline: float, loop_sequence: bool,
+                      speed: float, think_time: float, shuffle: bool, records: list, stop: asyncio.Event) -> None:
+    rng = random.Random(index)
+    async with streamablehttp_client(url) as (read_stream, write_stream, _):
+        async with ClientSession(read_stream, write_stream) as session:
+            await session.initialize()
+            while not stop.is_set():
+                calls = list(sequence)
+                if shuffle:
+                    rng.shuffle(calls)
+                previous_ts = None
+                for call in calls:
+                    if time.monotonic() >= deadline or stop.is_set():
+                        return
+                    if speed > 0 and previous_ts is not None and call.get("timestamp") is not None:
+                        await asyncio.sleep(max(0.0, (call["timestamp"] - previous_ts) / speed))
+                    elif think_time > 0:
+                        await asyncio.sleep(think_time)
+                    previous_ts = call.get("timestamp")
+
+                    start = time.perf_counter()
+                    error = None
+                    try:
+                        result = await session.call_tool(call["tool"], call["arguments"])
+                        if result.isError:
+                            error = "tool_error"
+                    except Exception as e:
+                        error = type(e).__name__
+                    records.append((call["tool"], (time.perf_counter() - start) * 1000, error))
+                if not loop_sequence:
+                    return
+
+
+def _latency_summary(latencies: List[float]) -> Dict:
+    if not latencies:
+        return {}
+    values = sorted(latencies)
+
+    def pct(p):
+        return round(values[min(len(values) - 1, max(0, int(round(p / 100 * len(values))) - 1))], 3)
+
+    return {"p50": pct(50), "p95": pct(95), "p99": pct(99),
+            "mean": round(statistics.fmean(values), 3), "max": round(values[-1], 3)}
+
+
+def build_report(records, elapsed, args, server_summary) -> Dict:
+    per_tool = defaultdict(list)
+    per_tool_errors = defaultdict(int)
+    errors = defaultdict(int)
+    for tool, latency, error in records:
+        per_tool[tool].append(latency)
+        if error:
+            per_tool_errors[tool] += 1
+            errors[error] += 1
+    total = len(records)
+    return {
+        "config": {
+            "url": args.url,
+            "sessions": args.sessions,
+            "duration_s": args.duration,
+            "workload": f"replay:{args.replay}" if args.replay else "mix",
+            "speed": args.speed,
+        },
+        "calls": total,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(total / elapsed, 2) if elapsed > 0 else 0.0,
+        "error_rate": round(sum(errors.values()) / total, 4) if total else 0.0,
+        "errors": dict(errors),
+        "latency_ms": _latency_summary([latency for _, latency, _ in records]),
+        "tools": {
+            tool: {"calls": len(latencies), "errors": per_tool_errors[tool], "latency_ms": _latency_summary(latencies)}
+            for tool, latencies in sorted(per_tool.items())
+        },
+        "server": server_summary,
+    }
+
+
+async def wait_for_server(metrics_url: str, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(timeout=2) as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get(metrics_url)).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.5)
+    raise TimeoutError(f"server did not become ready at {metrics_url}")
+
+
+async def run(args) -> Dict:
+    metrics_url = args.metrics_url or re.sub(r"/mcp/?$", "/metrics", args.url)
+    if args.spawn_server:
+        await wait_for_server(metrics_url, 120)
+
+    sequences = load_replay(args.replay) if args.replay else [mix_sequence(args.pool_name)]
+    records: list = []
+    stop = asyncio.Event()
+    sampler = ServerSampler(metrics_url, args.sample_interval)
+    sampler_task = asyncio.create_task(sampler.run(stop))
+
+    start = time.monotonic()
+    deadline = start + args.duration
+    # 回放时默认每个会话完整回放一次录制序列；混合负载在持续时间内循环
+    loop_sequence = args.loop or not args.replay
+    tasks = [
+        asyncio.create_task(run_session(i, args.url, sequences[i % len(sequences)], deadline, loop_sequence,
+                                        args.speed, args.think_time / 1000, not args.replay, records, stop))
+        for i in range(args.sessions)
+    ]
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    elapsed = time.monotonic() - start
+    stop.set()
+    await sampler_task
+
+    session_failures = [repr(r) for r in results if isinstance(r, BaseException)]
+    report = build_report(records, elapsed, args, sampler.summary())
+    if session_failures:
+        report["session_failures"] = session_failures
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:3000/mcp/")
+    parser.add_argument("--metrics-url", default=None, help="默认根据 --url 推导 /metrics 地址")
+    parser.add_argument("--sessions", type=int, default=10, help="并发MCP会话数")
+    parser.add_argument("--duration", type=float, default=30, help="最长运行时间(秒)")
+    parser.add_argument("--replay", default=None, help="服务端 --record-requests 录制的文件")
+    parser.add_argument("--loop", action="store_true", help="回放时循环录制序列直到持续时间结束")
+    parser.add_argument("--speed", type=float, default=0, help="按录制间隔回放的速度倍数，0表示不等待")
+    parser.add_argument("--think-time", type=float, default=0, help="混合负载两次调用之间的等待(毫秒)")
+    parser.add_argument("--pool-name", default="default")
+    parser.add_argument("--sample-interval", type=float, default=1.0, help="抓取服务端指标的间隔(秒)")
+    parser.add_argument("--spawn-server", action="store_true", help="启动本地 SQLite 基准服务")
+    parser.add_argument("--scale", default="small", help="--spawn-server 使用的数据集规模")
+    parser.add_argument("--output", default=None, help="JSON报告输出路径，默认输出到标准输出")
+    args = parser.parse_args()
+
+    server = None
+    if args.spawn_server:
+        server = subprocess.Popen([sys.executable, os.path.join(BENCH_DIR, "serve_standin.py"), "--scale", args.scale],
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        report = asyncio.run(run(args))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=10)
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+以 SQLite 数据库启动 streamable HTTP 服务，供负载测试在本地运行
+
+Usage:
+    python benchmarks/serve_standin.py --scale small
+    python benchmarks/serve_standin.py --scale small --record-requests traffic.jsonl
+"""
+
+import argparse
+import json
+import os
+import tempfile
+
+from sqlite_standin import DB_TYPE, SCALES, populate
+
+from connection.pool_manager import MultiDBPoolManager
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--db-path", default=None, help="SQLite数据库文件路径，默认在临时目录中按规模缓存")
+    parser.add_argument("--pool-size", type=int, default=5)
+    parser.add_argument("--max-overflow", type=int, default=5)
+    parser.add_argument("--record-requests", default=None, help="记录工具调用用于回放的文件")
+    args = parser.parse_args()
+
+    db_path = args.db_path or os.path.join(tempfile.gettempdir(), f"smartdb_bench_{args.scale}.db")
+    populate(db_path, args.scale)
+
+    config_path = os.path.join(tempfile.gettempdir(), "smartdb_load_config.json")
+    with open(config_path, "w", encoding="utf-8") as f:
+        json.dump({"default": {"type": DB_TYPE, "database": db_path, "role": "readonly",
+                               "pool_size": args.pool_size, "max_overflow": args.max_overflow}}, f)
+    os.environ["DATABASE_CONFIG_FILE"] = config_path
+
+    from core.server import run_streamable_http
+    from utils.request_recorder import RequestRecorder
+
+    RequestRecorder.configure(args.record_requests)
+    MultiDBPoolManager.init_from_config()
+    run_streamable_http(False, False)
+
+
+if __name__ == "__main__":
+    main()
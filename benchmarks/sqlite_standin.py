@@ -0,0 +1,77 @@
+"""
+基准测试使用的 SQLite 数据集
+
+各个工具通过内置的 sqlite 数据库类型在没有真实数据库服务的情况下端到端运行，
+此模块提供合成数据集的生成方法。
+"""
+
+import os
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+DB_TYPE = "sqlite"
+
+# 数据集规模: 普通表数量, 宽表列数, 大表行数
+SCALES = {
+    "small": {"tables": 200, "wide_columns": 100, "big_rows": 100_000},
+    "medium": {"tables": 1000, "wide_columns": 500, "big_rows": 500_000},
+    "large": {"tables": 5000, "wide_columns": 1000, "big_rows": 1_000_000},
+}
+
+
+def populate(path: str, scale: str) -> None:
+    """
+    生成合成数据集，数据库文件已存在且规模相同时直接复用
+
+    包含:
+      - t_00000 ... 大量普通表（每张表5列、1个索引）
+      - wide_table: 宽表
+      - big_table: 大表（带二级索引）
+    """
+    spec = SCALES[scale]
+    if os.path.exists(path):
+        conn = sqlite3.connect(path)
+        try:
+            row = conn.execute("SELECT value FROM bench_meta WHERE key = 'scale'").fetchone()
+            if row and row[0] == scale:
+                return
+        except sqlite3.DatabaseError:
+            pass
+        finally:
+            conn.close()
+        os.remove(path)
+
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        with conn:
+            for i in range(spec["tables"]):
+                conn.execute(f"CREATE TABLE t_{i:05d} (id INTEGER PRIMARY KEY, name TEXT NOT NULL, "
+                             f"amount REAL, created_at TEXT, status INTEGER DEFAULT 0)")
+                conn.execute(f"CREATE INDEX idx_t_{i:05d}_status ON t_{i:05d} (status, created_at)")
+
+            columns = ", ".join(f"c_{i:04d} TEXT" for i in range(spec["wide_columns"]))
+            conn.execute(f"CREATE TABLE wide_table (id INTEGER PRIMARY KEY, {columns})")
+            placeholders = ", ".join("?" for _ in range(spec["wide_columns"] + 1))
+            conn.executemany(
+                f"INSERT INTO wide_table VALUES ({placeholders})",
+                ([row] + [f"v{row}_{i}" for i in range(spec["wide_columns"])] for row in range(1000))
+            )
+
+            conn.execute("CREATE TABLE big_table (id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL, "
+                         "category TEXT, amount REAL, created_at TEXT)")
+            conn.executemany(
+                "INSERT INTO big_table VALUES (?, ?, ?, ?, ?)",
+                ((i, i % 10_000, f"cat_{i % 50}", (i % 1000) / 10, f"2024-01-{i % 28 + 1:02d}")
+                 for i in range(spec["big_rows"]))
+            )
+            conn.execute("CREATE INDEX idx_big_user ON big_table (user_id)")
+            conn.execute("CREATE INDEX idx_big_category_created ON big_table (category, created_at)")
+
+            conn.execute("CREATE TABLE bench_meta (key TEXT PRIMARY KEY, value TEXT)")
+            conn.execute("INSERT INTO bench_meta VALUES ('scale', ?)", (scale,))
+    finally:
+        conn.close()
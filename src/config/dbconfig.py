@@ -18,7 +18,11 @@ def get_db_configs() -> Dict[str, Dict[str, Any]]:
                 "pool_size": 10,
                 "max_overflow": 20,
                 "pool_recycle": 3600,
-                "pool_timeout": 30
+                "pool_timeout": 30,
+                "session_max_concurrency": 5,
+                "max_queue_size": 60,
+                "user_weights": {"admin": 2},
+                "reserved_metadata_connections": 2
             },
             "db2": { ... }
         }
@@ -70,13 +74,44 @@ def _validate_db_configs(db_configs: Dict[str, Dict[str, Any]]) -> Dict[str, Dic
             "max_overflow": int(config.get("max_overflow", "20")),
             "pool_recycle": int(config.get("pool_recycle", "3600")),
             "pool_timeout": int(config.get("pool_timeout", "30")),
+            # 重新加载配置时等待旧连接池已借出连接归还的最长时间(秒)
+            "drain_timeout": float(config.get("drain_timeout", "300")),
+            # 建立数据库连接的超时时间(秒)
+            "connect_timeout": int(config.get("connect_timeout", "10")),
+            # sql_optimize 获取实际执行计划时语句的最长执行时间(秒)，超时后终止并回滚
+            "explain_analyze_timeout": float(config.get("explain_analyze_timeout", "10")),
+            # 空闲超过该时长(秒)的连接借出前才校验，小于0表示从不校验
+            "validation_idle_seconds": float(config.get("validation_idle_seconds", "30")),
             "type": config.get("type"),
             "schema": config.get("schema"),
-            "service_name": config.get("service_name")
+            "service_name": config.get("service_name"),
+            # 准入控制：单会话并发上限、排队上限、用户权重
+            "session_max_concurrency": config.get("session_max_concurrency"),
+            "max_queue_size": config.get("max_queue_size"),
+            "user_weights": config.get("user_weights", {}),
+            # 为元数据/健康检查查询预留的连接数
+            "reserved_metadata_connections": config.get("reserved_metadata_connections"),
+            # 自适应连接池容量
+            "autoscale": bool(config.get("autoscale", False)),
+            "autoscale_max_connections": config.get("autoscale_max_connections"),
+            "autoscale_target_wait_ms": config.get("autoscale_target_wait_ms"),
+            "autoscale_interval": config.get("autoscale_interval"),
+            "autoscale_server_ratio": config.get("autoscale_server_ratio"),
+            # 熔断器
+            "circuit_failure_threshold": config.get("circuit_failure_threshold"),
+            "circuit_reset_timeout": config.get("circuit_reset_timeout"),
+            "circuit_max_reset_timeout": config.get("circuit_max_reset_timeout"),
+            # 只读副本
+            "replicas": config.get("replicas") or [],
+            "replica_max_lag_seconds": config.get("replica_max_lag_seconds"),
+            "replica_check_interval": config.get("replica_check_interval")
         }
         
-        # 验证必需字段
-        if not all([validated_config["user"], validated_config["password"]]):
+        # 验证必需字段，SQLite 为本地文件数据库，只需要数据库文件路径
+        if validated_config["type"] == "sqlite":
+            if not validated_config["database"]:
+                raise ValueError(f"数据库 '{db_name}' 缺少必需的配置信息")
+        elif not all([validated_config["user"], validated_config["password"]]):
             raise ValueError(f"数据库 '{db_name}' 缺少必需的配置信息")
         
         validated_configs[db_name] = validated_config
@@ -103,3 +103,18 @@ class InMemoryEventStore(EventStore):
                 found_last = True
 
         return stream_id
+
+    def get_stats(self) -> dict[str, int]:
+        """Returns the number of streams and events held, and their approximate size in bytes.
+
+        The size is computed on demand by serializing the stored messages, so this
+        should only be called from infrequent paths such as metrics scrapes.
+        """
+        approx_bytes = 0
+        for entry in list(self.event_index.values()):
+            approx_bytes += len(entry.message.model_dump_json(by_alias=True, exclude_none=True))
+        return {
+            "streams": len(self.streams),
+            "events": len(self.event_index),
+            "bytes": approx_bytes,
+        }
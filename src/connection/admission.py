@@ -0,0 +1,386 @@
+"""
+连接池准入控制
+在从连接池获取连接之前对请求进行排队，限制单个会话的并发数，
+并在不同会话/用户之间按权重公平调度，避免单个繁忙的客户端耗尽整个连接池。
+元数据/健康检查查询走独立的优先通道，并拥有预留连接，用户查询占满连接池时诊断依然可用
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from enum import Enum
+from typing import Dict, Any, Optional, List
+
+from core.exceptions import AdmissionRejectedError
+from utils.metrics import ADMISSION_QUEUE_WAIT
+
+logger = logging.getLogger(__name__)
+
+# 等待排队时检查取消状态的间隔(秒)
+_WAIT_SLICE = 0.1
+
+
+class PoolLane(str, Enum):
+    """连接池通道类型"""
+    # 用户SQL（execute_sql、sql_optimize 等）
+    USER = 'user'
+    # 元数据与健康检查查询（表名、表结构、索引、版本、健康状态等）
+    METADATA = 'metadata'
+
+
+@dataclass(frozen=True)
+class CallerIdentity:
+    """发起工具调用的会话与用户标识"""
+    session_id: str
+    user: Optional[str] = None
+
+    @property
+    def flow_key(self) -> str:
+        """公平调度的流标识：已认证用户按用户调度，否则按会话调度"""
+        return f"user:{self.user}" if self.user else f"session:{self.session_id}"
+
+    @contextmanager
+    def activate(self):
+        """将调用方标识设置为当前上下文的调用方"""
+        reset_token = _current_caller.set(self)
+        try:
+            yield self
+        finally:
+            _current_caller.reset(reset_token)
+
+
+# 未处于 MCP 工具调用中（如启动时的内部查询）时使用的调用方
+ANONYMOUS_CALLER = CallerIdentity(session_id="anonymous")
+
+_current_caller: ContextVar[CallerIdentity] = ContextVar("admission_caller", default=ANONYMOUS_CALLER)
+
+# 工具调用之外的内部查询（启动探测等）均为元数据类查询
+_current_lane: ContextVar[PoolLane] = ContextVar("admission_lane", default=PoolLane.METADATA)
+
+
+def current_caller() -> CallerIdentity:
+    """获取当前上下文的调用方标识"""
+    return _current_caller.get()
+
+
+def current_lane() -> PoolLane:
+    """获取当前上下文的连接池通道"""
+    return _current_lane.get()
+
+
+@contextmanager
+def use_lane(lane: PoolLane):
+    """
+    在上下文中使用指定的连接池通道
+
+    Usage:
+        with use_lane(PoolLane.USER):
+            ExecuteSqlUtil.execute_single_statement(pool_name, sql)
+    """
+    reset_token = _current_lane.set(lane)
+    try:
+        yield
+    finally:
+        _current_lane.reset(reset_token)
+
+
+class _Waiter:
+    """排队中的连接请求"""
+    __slots__ = ("caller", "lane", "start_tag", "event", "granted", "enqueued_at")
+
+    def __init__(self, caller: CallerIdentity, lane: PoolLane, start_tag: float):
+        self.caller = caller
+        self.lane = lane
+        self.start_tag = start_tag
+        self.event = threading.Event()
+        self.granted = False
+        self.enqueued_at = time.monotonic()
+
+
+class AdmissionController:
+    """
+    连接池准入控制器
+
+    采用开始时间公平排队(SFQ)：每个流(用户或会话)维护虚拟完成时间，
+    请求的开始标签为 max(全局虚拟时间, 该流上次完成时间)，完成标签增加 1/权重，
+    空闲槽位总是分配给开始标签最小且未超出会话并发上限的排队请求。
+
+    元数据通道优先于用户通道调度，且用户通道最多只能使用
+    max_concurrency - reserved_connections 个连接，剩余连接只留给元数据通道。
+    """
+
+    def __init__(self, pool_name: str,
+                 max_concurrency: int,
+                 session_max_concurrency: int,
+                 max_queue_size: int,
+                 queue_timeout: float,
+                 user_weights: Optional[Dict[str, float]] = None,
+                 reserved_connections: int = 0):
+        """
+        初始化准入控制器
+
+        Args:
+            pool_name: 连接池名称
+            max_concurrency: 允许同时持有连接的请求数（通常为 pool_size + max_overflow）
+            session_max_concurrency: 单个会话允许同时持有的连接数
+            max_queue_size: 排队请求上限，超出后立即拒绝
+            queue_timeout: 排队等待超时时间(秒)
+            user_weights: 用户权重，未配置的用户权重为1
+            reserved_connections: 为元数据通道预留的连接数
+        """
+        self.pool_name = pool_name
+        self.max_concurrency = max(1, max_concurrency)
+        self.session_max_concurrency = max(1, session_max_concurrency)
+        self.max_queue_size = max(0, max_queue_size)
+        self.queue_timeout = queue_timeout
+        self.user_weights = user_weights or {}
+        self._configured_reserved = max(0, reserved_connections)
+        self.reserved_connections = min(self._configured_reserved, self.max_concurrency - 1)
+
+        self._lock = threading.Lock()
+        self._active = 0
+        self._lane_active: Dict[PoolLane, int] = {lane: 0 for lane in PoolLane}
+        # (会话ID, 通道) -> 持有的连接数，会话并发上限按通道分别计算
+        self._session_active: Dict[tuple, int] = {}
+        self._waiters: Dict[PoolLane, List[_Waiter]] = {lane: [] for lane in PoolLane}
+        self._virtual_time = 0.0
+        self._flow_finish: Dict[str, float] = {}
+
+        # 统计信息
+        self._admitted = 0
+        self._queued = 0
+        self._rejected = 0
+        self._timed_out = 0
+        self._waited: Dict[PoolLane, int] = {lane: 0 for lane in PoolLane}
+        self._total_wait: Dict[PoolLane, float] = {lane: 0.0 for lane in PoolLane}
+        self._max_wait: Dict[PoolLane, float] = {lane: 0.0 for lane in PoolLane}
+        # 预分配各通道的排队等待直方图，出队时不再查找或创建子指标
+        self._queue_wait_histograms = {lane: ADMISSION_QUEUE_WAIT.labels(pool_name, lane.value) for lane in PoolLane}
+
+    @classmethod
+    def from_config(cls, pool_name: str, config: Dict[str, Any]) -> "AdmissionController":
+        """根据连接池配置创建准入控制器"""
+        pool_size = config.get("pool_size", 10)
+        max_concurrency = pool_size + config.get("max_overflow", 20)
+        session_max_concurrency = config.get("session_max_concurrency") or max(1, pool_size // 2)
+        max_queue_size = config.get("max_queue_size")
+        if max_queue_size is None:
+            max_queue_size = max_concurrency * 2
+        reserved_connections = config.get("reserved_metadata_connections")
+        if reserved_connections is None:
+            reserved_connections = min(2, max_concurrency - 1)
+        return cls(
+            pool_name=pool_name,
+            max_concurrency=max_concurrency,
+            session_max_concurrency=session_max_concurrency,
+            max_queue_size=max_queue_size,
+            queue_timeout=config.get("pool_timeout", 30),
+            user_weights=config.get("user_weights"),
+            reserved_connections=reserved_connections
+        )
+
+    def resize(self, max_concurrency: int) -> None:
+        """
+        调整允许同时持有连接的请求数，扩容后立即调度排队中的请求
+
+        Args:
+            max_concurrency: 新的并发上限（通常为 pool_size + max_overflow）
+        """
+        with self._lock:
+            # 预留连接数按原始配置保留，但不能占满整个连接池
+            self.reserved_connections = min(self._configured_reserved, max(1, max_concurrency) - 1)
+            self.max_concurrency = max(1, max_concurrency)
+            self._dispatch()
+
+    def reconfigure(self, config: Dict[str, Any]) -> None:
+        """
+        按新的连接池配置更新并发上限、排队上限和用户权重，排队中和已准入的请求不受影响
+
+        Args:
+            config: 连接池配置
+        """
+        updated = AdmissionController.from_config(self.pool_name, config)
+        with self._lock:
+            self.session_max_concurrency = updated.session_max_concurrency
+            self.max_queue_size = updated.max_queue_size
+            self.queue_timeout = updated.queue_timeout
+            self.user_weights = updated.user_weights
+            self._configured_reserved = updated._configured_reserved
+        self.resize(updated.max_concurrency)
+
+    @contextmanager
+    def admit(self, caller: Optional[CallerIdentity] = None, lane: Optional[PoolLane] = None,
+              cancel_token=None):
+        """
+        获取准入许可（上下文管理器），退出时释放许可并调度下一个排队请求
+
+        Args:
+            caller: 调用方标识，默认取当前上下文的调用方
+            lane: 连接池通道，默认取当前上下文的通道
+            cancel_token: 查询取消令牌，请求被取消时停止排队
+
+        Raises:
+            AdmissionRejectedError: 排队已满、等待超时或请求被取消时抛出
+        """
+        caller = caller or current_caller()
+        lane = lane or current_lane()
+        self._acquire(caller, lane, cancel_token)
+        try:
+            yield
+        finally:
+            self._release(caller, lane)
+
+    def _weight(self, caller: CallerIdentity) -> float:
+        weight = self.user_weights.get(caller.user, 1.0) if caller.user else 1.0
+        return weight if weight > 0 else 1.0
+
+    def _next_start_tag(self, caller: CallerIdentity) -> float:
+        flow_key = caller.flow_key
+        start_tag = max(self._virtual_time, self._flow_finish.get(flow_key, 0.0))
+        self._flow_finish[flow_key] = start_tag + 1.0 / self._weight(caller)
+        return start_tag
+
+    def _withdraw_start_tag(self, waiter: _Waiter) -> None:
+        """撤销未获准入即离开队列的请求所占用的虚拟时间（需持有锁）"""
+        flow_key = waiter.caller.flow_key
+        if self._flow_finish.get(flow_key) == waiter.start_tag + 1.0 / self._weight(waiter.caller):
+            self._flow_finish[flow_key] = waiter.start_tag
+
+    def _lane_capacity(self, lane: PoolLane) -> int:
+        if lane == PoolLane.METADATA:
+            return self.max_concurrency
+        return self.max_concurrency - self.reserved_connections
+
+    def _grant(self, caller: CallerIdentity, lane: PoolLane, start_tag: float) -> None:
+        self._active += 1
+        self._lane_active[lane] += 1
+        key = (caller.session_id, lane)
+        self._session_active[key] = self._session_active.get(key, 0) + 1
+        self._virtual_time = max(self._virtual_time, start_tag)
+        self._admitted += 1
+
+    def _can_run(self, caller: CallerIdentity, lane: PoolLane) -> bool:
+        return (self._active < self._lane_capacity(lane) and
+                self._session_active.get((caller.session_id, lane), 0) < self.session_max_concurrency)
+
+    def _has_priority_waiters(self, lane: PoolLane) -> bool:
+        """是否存在同通道或更高优先级通道的排队请求"""
+        if lane == PoolLane.METADATA:
+            return bool(self._waiters[PoolLane.METADATA])
+        return any(self._waiters.values())
+
+    def _acquire(self, caller: CallerIdentity, lane: PoolLane, cancel_token) -> None:
+        with self._lock:
+            runnable = not self._has_priority_waiters(lane) and self._can_run(caller, lane)
+            lane_waiters = self._waiters[lane]
+            if not runnable and len(lane_waiters) >= self.max_queue_size:
+                self._rejected += 1
+                raise AdmissionRejectedError(
+                    f"连接池 '{self.pool_name}' 繁忙: 排队请求已达上限 {self.max_queue_size}，请稍后重试"
+                )
+
+            # 被拒绝的请求不占用虚拟时间，确认准入或入队后才推进流的完成时间
+            start_tag = self._next_start_tag(caller)
+            if runnable:
+                self._grant(caller, lane, start_tag)
+                return
+
+            waiter = _Waiter(caller, lane, start_tag)
+            lane_waiters.append(waiter)
+            self._queued += 1
+
+        deadline = waiter.enqueued_at + self.queue_timeout
+        while not waiter.event.wait(_WAIT_SLICE):
+            cancelled = cancel_token is not None and cancel_token.cancelled
+            if cancelled or time.monotonic() >= deadline:
+                with self._lock:
+                    if waiter.granted:
+                        break
+                    lane_waiters.remove(waiter)
+                    self._withdraw_start_tag(waiter)
+                    if not cancelled:
+                        self._timed_out += 1
+                if cancelled:
+                    raise AdmissionRejectedError(f"请求已取消，停止等待连接池 '{self.pool_name}'")
+                raise AdmissionRejectedError(
+                    f"连接池 '{self.pool_name}' 繁忙: 排队等待超过 {self.queue_timeout} 秒"
+                )
+
+        wait = time.monotonic() - waiter.enqueued_at
+        self._queue_wait_histograms[lane].observe(wait)
+        with self._lock:
+            self._waited[lane] += 1
+            self._total_wait[lane] += wait
+            self._max_wait[lane] = max(self._max_wait[lane], wait)
+
+    def _release(self, caller: CallerIdentity, lane: PoolLane) -> None:
+        with self._lock:
+            self._active -= 1
+            self._lane_active[lane] -= 1
+            key = (caller.session_id, lane)
+            remaining = self._session_active.get(key, 1) - 1
+            if remaining > 0:
+                self._session_active[key] = remaining
+            else:
+                self._session_active.pop(key, None)
+            self._dispatch()
+
+    def _dispatch(self) -> None:
+        """按通道优先级将空闲槽位分配给开始标签最小的可运行请求（需持有锁）"""
+        for lane in (PoolLane.METADATA, PoolLane.USER):
+            lane_waiters = self._waiters[lane]
+            while lane_waiters and self._active < self._lane_capacity(lane):
+                candidates = [w for w in lane_waiters if self._can_run(w.caller, lane)]
+                if not candidates:
+                    break
+                waiter = min(candidates, key=lambda w: w.start_tag)
+                lane_waiters.remove(waiter)
+                self._grant(waiter.caller, lane, waiter.start_tag)
+                waiter.granted = True
+                waiter.event.set()
+
+        if not any(self._waiters.values()) and not self._active:
+            # 系统空闲时重置虚拟时间，避免流的完成时间无限增长
+            self._virtual_time = 0.0
+            self._flow_finish.clear()
+            return
+
+        # 完成时间不超过全局虚拟时间的流不再影响开始标签，及时清理避免会话/用户标识持续累积
+        expired = [flow_key for flow_key, finish in self._flow_finish.items() if finish <= self._virtual_time]
+        for flow_key in expired:
+            del self._flow_finish[flow_key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取准入控制统计信息
+
+        Returns:
+            包含并发、排队和等待时间统计的字典
+        """
+        with self._lock:
+            lanes = {}
+            for lane in PoolLane:
+                waited = self._waited[lane]
+                lanes[lane.value] = {
+                    "active_requests": self._lane_active[lane],
+                    "queued_requests": len(self._waiters[lane]),
+                    "queue_wait_avg_ms": round(self._total_wait[lane] / waited * 1000, 3) if waited else 0.0,
+                    "queue_wait_max_ms": round(self._max_wait[lane] * 1000, 3)
+                }
+            return {
+                "max_concurrency": self.max_concurrency,
+                "reserved_metadata_connections": self.reserved_connections,
+                "session_max_concurrency": self.session_max_concurrency,
+                "max_queue_size": self.max_queue_size,
+                "active_requests": self._active,
+                "queued_requests": sum(len(waiters) for waiters in self._waiters.values()),
+                "active_sessions": len({session_id for session_id, _ in self._session_active}),
+                "admitted_total": self._admitted,
+                "queued_total": self._queued,
+                "rejected_total": self._rejected,
+                "timeout_total": self._timed_out,
+                "lanes": lanes
+            }
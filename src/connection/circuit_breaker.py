@@ -0,0 +1,170 @@
+"""
+连接池熔断器
+数据库无法连接时，每个请求都要等待 TCP 连接超时，会长期占用工作线程和 MCP 会话。
+连续获取连接失败达到阈值后熔断器打开，期间的请求立即失败；经过退避时间后进入半开状态，
+放行一个请求作为探测，成功则关闭熔断器，失败则重新打开并将退避时间加倍。
+
+配置（连接池配置项）:
+    circuit_failure_threshold: 连续获取连接失败多少次后打开熔断器，默认 5，0 表示关闭熔断
+    circuit_reset_timeout: 首次打开后到允许探测的时间(秒)，默认 5
+    circuit_max_reset_timeout: 退避时间上限(秒)，默认 300
+"""
+
+import logging
+import threading
+import time
+from enum import Enum
+from typing import Any, Dict, Optional
+
+from core.exceptions import PoolUnavailableError
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitState(str, Enum):
+    """熔断器状态"""
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    """
+    单个连接池的熔断器
+
+    只统计获取连接（建立连接）时的失败，SQL 语法错误等执行错误不会触发熔断
+    """
+
+    def __init__(self, pool_name: str,
+                 failure_threshold: int = 5,
+                 reset_timeout: float = 5.0,
+                 max_reset_timeout: float = 300.0):
+        """
+        初始化熔断器
+
+        Args:
+            pool_name: 连接池名称
+            failure_threshold: 连续失败多少次后打开熔断器
+            reset_timeout: 首次打开后到允许探测的时间(秒)
+            max_reset_timeout: 退避时间上限(秒)
+        """
+        self.pool_name = pool_name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max(reset_timeout, max_reset_timeout)
+
+        self._lock = threading.Lock()
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._current_timeout = reset_timeout
+        self._opened_at = 0.0
+        self._probing = False
+        self._last_error: Optional[str] = None
+
+        # 统计信息
+        self._opened_total = 0
+        self._rejected_total = 0
+
+    @classmethod
+    def from_config(cls, pool_name: str, config: Dict[str, Any]) -> Optional["CircuitBreaker"]:
+        """根据连接池配置创建熔断器，阈值为0时返回None"""
+        threshold = config.get("circuit_failure_threshold")
+        if threshold is None:
+            threshold = 5
+        if int(threshold) <= 0:
+            return None
+        return cls(
+            pool_name=pool_name,
+            failure_threshold=int(threshold),
+            reset_timeout=float(config.get("circuit_reset_timeout") or 5.0),
+            max_reset_timeout=float(config.get("circuit_max_reset_timeout") or 300.0)
+        )
+
+    @property
+    def state(self) -> CircuitState:
+        return self._state
+
+    def before_request(self) -> None:
+        """
+        请求获取连接前调用，熔断器打开或半开状态下已有探测请求时立即失败
+
+        Raises:
+            PoolUnavailableError: 熔断器不允许请求通过时抛出
+        """
+        with self._lock:
+            if self._state == CircuitState.CLOSED:
+                return
+            if self._state == CircuitState.OPEN:
+                retry_in = self._opened_at + self._current_timeout - time.monotonic()
+                if retry_in > 0:
+                    self._rejected_total += 1
+                    raise PoolUnavailableError(
+                        f"数据库连接池 '{self.pool_name}' 暂不可用（熔断中，{retry_in:.0f} 秒后重试）: {self._last_error}"
+                    )
+                self._state = CircuitState.HALF_OPEN
+                self._probing = False
+                logger.info(f"Circuit for pool '{self.pool_name}' is half-open, probing the database")
+            # 半开状态只放行一个探测请求
+            if self._probing:
+                self._rejected_total += 1
+                raise PoolUnavailableError(f"数据库连接池 '{self.pool_name}' 暂不可用（正在探测数据库是否恢复）")
+            self._probing = True
+
+    def record_success(self) -> None:
+        """获取连接成功"""
+        if self._state == CircuitState.CLOSED and not self._failures:
+            return
+        with self._lock:
+            if self._state != CircuitState.CLOSED:
+                logger.info(f"Circuit for pool '{self.pool_name}' closed, database is reachable again")
+            self._state = CircuitState.CLOSED
+            self._failures = 0
+            self._probing = False
+            self._current_timeout = self.reset_timeout
+
+    def record_failure(self, error: BaseException) -> None:
+        """获取连接失败"""
+        with self._lock:
+            self._last_error = str(error).splitlines()[0] if str(error) else type(error).__name__
+            if self._state == CircuitState.HALF_OPEN:
+                # 探测失败，退避时间加倍
+                self._current_timeout = min(self._current_timeout * 2, self.max_reset_timeout)
+                self._open()
+                return
+            self._failures += 1
+            if self._state == CircuitState.CLOSED and self._failures >= self.failure_threshold:
+                self._current_timeout = self.reset_timeout
+                self._open()
+
+    def record_abort(self) -> None:
+        """探测请求在获取连接前被取消或拒绝，允许下一个请求继续探测"""
+        with self._lock:
+            if self._state == CircuitState.HALF_OPEN:
+                self._probing = False
+
+    def _open(self) -> None:
+        self._state = CircuitState.OPEN
+        self._opened_at = time.monotonic()
+        self._probing = False
+        self._opened_total += 1
+        logger.warning(f"Circuit for pool '{self.pool_name}' opened for {self._current_timeout:.0f}s: {self._last_error}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取熔断器统计信息
+
+        Returns:
+            包含状态、连续失败次数和拒绝次数的字典
+        """
+        with self._lock:
+            retry_in = 0.0
+            if self._state == CircuitState.OPEN:
+                retry_in = max(0.0, self._opened_at + self._current_timeout - time.monotonic())
+            return {
+                "state": self._state.value,
+                "consecutive_failures": self._failures,
+                "retry_in_seconds": round(retry_in, 3),
+                "opened_total": self._opened_total,
+                "rejected_total": self._rejected_total,
+                "last_error": self._last_error
+            }
@@ -4,16 +4,81 @@ SQLAlchemy数据库连接池工具类
 """
 
 import logging
+import time
 from contextlib import contextmanager
 from typing import Dict, Any, Optional
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.engine import Engine
 from sqlalchemy.pool import QueuePool, SingletonThreadPool, NullPool
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.exc import DisconnectionError, SQLAlchemyError
 
 # 配置日志
 logger = logging.getLogger(__name__)
 
+# 连接记录中保存最近一次归还时间的键
+_LAST_CHECKIN_KEY = "smartdb_last_checkin"
+
+
+class IdleConnectionValidator:
+    """
+    按空闲时长校验连接
+
+    替代 pool_pre_ping 在每次借出连接时都 ping 一次数据库的做法：只有空闲超过阈值的连接
+    才在借出前 ping，其余连接直接使用，执行时遇到断线再由调用方重试。
+    ping 失败时抛出 DisconnectionError，连接池会丢弃该连接并重新建立连接。
+    """
+
+    def __init__(self, engine: Engine, idle_seconds: float):
+        """
+        Args:
+            engine: SQLAlchemy引擎
+            idle_seconds: 空闲超过该时长(秒)的连接借出前需要ping，小于0表示从不ping
+        """
+        self.idle_seconds = idle_seconds
+        self._dialect = engine.dialect
+
+        # 统计信息，依赖 GIL 保证自增的原子性
+        self.pings = 0
+        self.pings_saved = 0
+        self.ping_failures = 0
+        self.disconnect_retries = 0
+
+        event.listen(engine, "checkin", self._on_checkin)
+        event.listen(engine, "checkout", self._on_checkout)
+
+    def _on_checkin(self, dbapi_connection, connection_record) -> None:
+        connection_record.info[_LAST_CHECKIN_KEY] = time.monotonic()
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy) -> None:
+        last_checkin = connection_record.info.get(_LAST_CHECKIN_KEY)
+        # 新建立的连接无需校验
+        if last_checkin is None:
+            return
+        if self.idle_seconds < 0 or time.monotonic() - last_checkin < self.idle_seconds:
+            self.pings_saved += 1
+            return
+
+        self.pings += 1
+        try:
+            self._dialect.do_ping(dbapi_connection)
+        except Exception as e:
+            self.ping_failures += 1
+            logger.info(f"Idle connection failed validation, reconnecting: {e}")
+            raise DisconnectionError(f"Idle connection failed validation: {e}") from e
+
+    def record_disconnect_retry(self) -> None:
+        """记录一次执行时遇到断线后的重试"""
+        self.disconnect_retries += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "idle_threshold_seconds": self.idle_seconds,
+            "pings": self.pings,
+            "pings_saved": self.pings_saved,
+            "ping_failures": self.ping_failures,
+            "disconnect_retries": self.disconnect_retries
+        }
+
 
 class SQLAlchemyConnectionPool:
     """
@@ -25,8 +90,9 @@ class SQLAlchemyConnectionPool:
                  pool_size: int = 10,
                  max_overflow: int = 20,
                  pool_recycle: int = 3600,
-                 pool_pre_ping: bool = True,
+                 pool_pre_ping: bool = False,
                  pool_timeout: int = 30,
+                 validation_idle_seconds: float = 30,
                  **kwargs):
         """
         初始化连接池
@@ -37,8 +103,9 @@ class SQLAlchemyConnectionPool:
             pool_size: 连接池大小
             max_overflow: 超出pool_size后最多可创建的连接数
             pool_recycle: 连接回收时间(秒)，-1表示不回收
-            pool_pre_ping: 是否在使用前ping数据库以检查连接有效性
+            pool_pre_ping: 是否在每次使用前ping数据库以检查连接有效性，开启后不再按空闲时长校验
             pool_timeout: 获取连接的超时时间(秒)
+            validation_idle_seconds: 空闲超过该时长(秒)的连接借出前才ping，小于0表示从不ping
             **kwargs: 其他传递给create_engine的参数
         """
         self.database_url = database_url
@@ -48,9 +115,15 @@ class SQLAlchemyConnectionPool:
         self.pool_recycle = pool_recycle
         self.pool_pre_ping = pool_pre_ping
         self.pool_timeout = pool_timeout
+        # 控制连接（如取消查询）使用的连接参数
+        self.connect_args = kwargs.get("connect_args", {})
+        self._control_engine: Optional[Engine] = None
         
         # 创建引擎
         self.engine = self._create_engine(**kwargs)
+        self.validator: Optional[IdleConnectionValidator] = None
+        if not pool_pre_ping:
+            self.validator = IdleConnectionValidator(self.engine, validation_idle_seconds)
         
         logger.info(f"SQLAlchemy connection pool initialized for {database_url}")
         logger.info(f"Pool type: {pool_type}, Pool size: {pool_size}, Max overflow: {max_overflow}")
@@ -129,6 +202,86 @@ class SQLAlchemyConnectionPool:
         finally:
             self.return_connection(conn)
 
+    @contextmanager
+    def control_connection(self):
+        """
+        获取不占用连接池的控制连接（上下文管理器）
+
+        用于 KILL QUERY、pg_cancel_backend 等管理操作，连接池耗尽时也能建立连接，
+        使用后立即关闭
+
+        Usage:
+            with pool.control_connection() as conn:
+                conn.execute(text("KILL QUERY 42"))
+        """
+        if self._control_engine is None:
+            self._control_engine = create_engine(
+                self.database_url,
+                poolclass=NullPool,
+                connect_args=self.connect_args
+            )
+        conn = self._control_engine.connect()
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def resize(self, max_overflow: int, pool_size: Optional[int] = None) -> None:
+        """
+        调整连接池容量，连接池总容量为 pool_size + max_overflow
+
+        缩容时已借出的连接不会被中断，归还时超出容量的连接由 QueuePool 关闭
+
+        Args:
+            max_overflow: 新的溢出连接数，不能小于0
+            pool_size: 新的常驻连接数，为None时保持不变
+        """
+        pool = self.engine.pool
+        if not isinstance(pool, QueuePool):
+            raise ValueError(f"Pool type '{self.pool_type}' does not support resizing")
+        max_overflow = max(0, max_overflow)
+        if pool_size is not None and pool_size != self.pool_size:
+            if pool_size < 1 or self.pool_size < 1:
+                raise ValueError("pool_size must stay greater than 0 when resizing")
+            # QueuePool 用 _overflow = 已创建连接数 - pool_size 判断能否新建连接，
+            # 调整常驻连接数时需同步修改空闲队列上限和溢出计数
+            with pool._overflow_lock:
+                pool._overflow -= pool_size - self.pool_size
+                pool._pool.maxsize = pool_size
+            self.pool_size = pool_size
+        # QueuePool 在获取连接时读取 _max_overflow，单次赋值无需加锁
+        pool._max_overflow = max_overflow
+        self.max_overflow = max_overflow
+
+    def trim_idle(self, keep: int) -> int:
+        """
+        关闭空闲连接，最多保留 keep 个，需要时连接池会重新创建连接
+
+        Args:
+            keep: 保留的空闲连接数
+
+        Returns:
+            关闭的连接数
+        """
+        pool = self.engine.pool
+        if not isinstance(pool, QueuePool):
+            return 0
+        closed = 0
+        while pool.checkedin() > keep:
+            try:
+                record = pool._pool.get(False)
+            except Exception:
+                # 空闲连接已被其他线程借出
+                break
+            try:
+                record.close()
+            finally:
+                pool._dec_overflow()
+            closed += 1
+        if closed:
+            logger.info(f"Closed {closed} idle connections, kept {keep}")
+        return closed
+
     def get_stats(self) -> Dict[str, Any]:
         """
         获取连接池统计信息
@@ -143,8 +296,9 @@ class SQLAlchemyConnectionPool:
             "max_overflow": self.max_overflow,
             "checked_out_connections": pool.checkedout(),
             "available_connections": pool.checkedin(),
-            "overflow_connections": getattr(pool, 'overflow', 0),
-            "recycle_time": self.pool_recycle
+            "overflow_connections": pool.overflow() if hasattr(pool, 'overflow') else 0,
+            "recycle_time": self.pool_recycle,
+            "validation": self.validator.get_stats() if self.validator is not None else {"pre_ping": True}
         }
 
     def close_all_connections(self):
@@ -153,6 +307,8 @@ class SQLAlchemyConnectionPool:
         """
         try:
             self.engine.dispose()
+            if self._control_engine is not None:
+                self._control_engine.dispose()
             logger.info("All database connections closed")
         except Exception as e:
             logger.error(f"Error closing all connections: {e}")
@@ -0,0 +1,334 @@
+"""
+连接池自适应容量控制
+根据获取连接的排队等待时间和峰值需求调整连接池容量(pool_size + max_overflow)：
+等待时间超过目标且连接池已占满时扩容，需求持续偏低时缩容并关闭多余的空闲连接。
+扩容受硬上限和数据库服务端信号（MySQL Threads_connected/Threads_running 与 max_connections、
+PostgreSQL pg_stat_activity 与 max_connections）约束，避免单个网关实例压垮数据库。
+
+配置（连接池配置项）:
+    autoscale: 是否开启，默认 false
+    autoscale_max_connections: 连接池容量硬上限，默认为配置容量的2倍
+    autoscale_target_wait_ms: 平均排队等待时间目标(毫秒)，默认 50
+    autoscale_interval: 调整间隔(秒)，默认 10
+    autoscale_server_ratio: 允许占用的服务端 max_connections 比例，默认 0.8
+"""
+
+import logging
+import math
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy import text
+
+from connection.admission import AdmissionController, PoolLane
+from connection.connection_pool import SQLAlchemyConnectionPool
+from utils.metrics import ADMISSION_QUEUE_WAIT, POOL_CHECKOUT_WAIT, POOL_EVENTS
+
+logger = logging.getLogger(__name__)
+
+# 需求连续低于容量一半的调整周期数达到该值时缩容
+_SHRINK_AFTER_INTERVALS = 3
+
+
+@dataclass(frozen=True)
+class ServerLoad:
+    """数据库服务端的连接负载"""
+    max_connections: int
+    # 服务端当前连接数（包含其他客户端）
+    connections: int
+    # 正在执行语句的连接数
+    running: Optional[int] = None
+
+    def headroom(self, ratio: float) -> int:
+        """在不超过 max_connections * ratio 的前提下还能新建的连接数"""
+        return int(self.max_connections * ratio) - self.connections
+
+    def busy(self, ratio: float) -> bool:
+        """正在执行的语句数超过 max_connections * ratio 时视为服务端繁忙"""
+        return self.running is not None and self.running >= self.max_connections * ratio
+
+
+def _mysql_server_load(conn) -> ServerLoad:
+    from databases.mysql.mysql_queries import MySQLQueries
+
+    max_connections = int(conn.execute(text(MySQLQueries.get_max_connections())).scalar())
+    status = {name.lower(): int(value) for name, value in conn.execute(text(MySQLQueries.get_thread_status()))}
+    return ServerLoad(max_connections=max_connections,
+                      connections=status.get("threads_connected", 0),
+                      running=status.get("threads_running"))
+
+
+def _postgresql_server_load(conn) -> ServerLoad:
+    from databases.postgresql.postgresql_queries import PostgresqlQueries
+
+    max_connections = int(conn.execute(text(PostgresqlQueries.get_max_connections())).scalar())
+    row = conn.execute(text(PostgresqlQueries.get_connection_counts())).one()
+    return ServerLoad(max_connections=max_connections, connections=int(row[0]), running=int(row[1]))
+
+
+# 方言名称 -> 读取服务端连接负载的方法，未列出的方言只受硬上限约束
+_SERVER_LOAD_PROBES: Dict[str, Callable[[Any], ServerLoad]] = {
+    "mysql": _mysql_server_load,
+    "postgresql": _postgresql_server_load,
+}
+
+
+class PoolAutoscaler:
+    """
+    单个连接池的自适应容量控制器
+
+    每秒采样一次需求（已借出连接数 + 排队请求数），每个调整周期根据该周期内
+    新增的排队/获取连接等待时间决定扩容或缩容。容量下限为 pool_size，即不使用溢出连接。
+    """
+
+    def __init__(self, pool_name: str,
+                 pool: SQLAlchemyConnectionPool,
+                 admission: Optional[AdmissionController],
+                 max_connections: int,
+                 target_wait_ms: float = 50.0,
+                 interval: float = 10.0,
+                 server_ratio: float = 0.8):
+        """
+        初始化自适应容量控制器
+
+        Args:
+            pool_name: 连接池名称
+            pool: 连接池
+            admission: 连接池的准入控制器，容量变化时同步调整并发上限
+            max_connections: 连接池容量硬上限
+            target_wait_ms: 平均等待时间目标(毫秒)
+            interval: 调整间隔(秒)
+            server_ratio: 允许占用的服务端 max_connections 比例
+        """
+        self.pool_name = pool_name
+        self.pool = pool
+        self.admission = admission
+        self.min_connections = max(1, pool.pool_size)
+        self.max_connections = max(max_connections, pool.pool_size + pool.max_overflow)
+        self.target_wait_ms = target_wait_ms
+        self.interval = interval
+        self.server_ratio = server_ratio
+
+        self._probe = _SERVER_LOAD_PROBES.get(pool.engine.dialect.name)
+        self._wait_histograms = [POOL_CHECKOUT_WAIT.labels(pool_name)] + [
+            ADMISSION_QUEUE_WAIT.labels(pool_name, lane.value) for lane in PoolLane
+        ]
+        self._last_wait = self._wait_totals()
+        self._last_rejections = self._rejections()
+        self._peak_demand = 0
+        self._peak_in_use = 0
+        self._low_intervals = 0
+        self._next_adjust = time.monotonic() + interval
+
+        # 统计信息
+        self._grown = 0
+        self._shrunk = 0
+        self._trimmed = 0
+        self._last_server_load: Optional[ServerLoad] = None
+        self._last_decision = "init"
+
+    @classmethod
+    def from_config(cls, pool_name: str, pool: SQLAlchemyConnectionPool,
+                    admission: Optional[AdmissionController], config: Dict[str, Any]) -> "PoolAutoscaler":
+        """根据连接池配置创建自适应容量控制器"""
+        capacity = pool.pool_size + pool.max_overflow
+        return cls(
+            pool_name=pool_name,
+            pool=pool,
+            admission=admission,
+            max_connections=config.get("autoscale_max_connections") or capacity * 2,
+            target_wait_ms=config.get("autoscale_target_wait_ms") or 50.0,
+            interval=config.get("autoscale_interval") or 10.0,
+            server_ratio=config.get("autoscale_server_ratio") or 0.8
+        )
+
+    @property
+    def capacity(self) -> int:
+        return self.pool.pool_size + self.pool.max_overflow
+
+    def _wait_totals(self):
+        return (sum(h.count for h in self._wait_histograms), sum(h.sum for h in self._wait_histograms))
+
+    def _rejections(self) -> int:
+        if self.admission is None:
+            return 0
+        stats = self.admission.get_stats()
+        return stats["rejected_total"] + stats["timeout_total"]
+
+    def sample(self) -> None:
+        """采样当前需求，记录调整周期内的峰值"""
+        in_use = self.pool.engine.pool.checkedout()
+        demand = in_use
+        if self.admission is not None:
+            demand += self.admission.get_stats()["queued_requests"]
+        self._peak_in_use = max(self._peak_in_use, in_use)
+        self._peak_demand = max(self._peak_demand, demand)
+
+    def _saturation_level(self, capacity: int) -> int:
+        """连接池视为占满的已借出连接数，用户通道不能使用为元数据预留的连接"""
+        reserved = self.admission.reserved_connections if self.admission is not None else 0
+        return max(1, capacity - reserved)
+
+    def tick(self, now: float) -> None:
+        """由后台线程每秒调用，采样需求并在到达调整时间时调整容量"""
+        self.sample()
+        if now >= self._next_adjust:
+            self._next_adjust = now + self.interval
+            self.adjust()
+
+    def _server_load(self) -> Optional[ServerLoad]:
+        if self._probe is None:
+            return None
+        try:
+            # 使用控制连接，连接池占满时也能读取服务端状态
+            with self.pool.control_connection() as conn:
+                self._last_server_load = self._probe(conn)
+        except Exception as e:
+            logger.warning(f"Failed to read server load for pool '{self.pool_name}': {e}")
+            return None
+        return self._last_server_load
+
+    def adjust(self) -> None:
+        """根据上一个调整周期的等待时间和峰值需求调整容量"""
+        count, total = self._wait_totals()
+        last_count, last_total = self._last_wait
+        self._last_wait = (count, total)
+        waits = count - last_count
+        mean_wait_ms = (total - last_total) / waits * 1000 if waits else 0.0
+        rejections = self._rejections()
+        rejected = rejections - self._last_rejections
+        self._last_rejections = rejections
+
+        peak = self._peak_demand
+        peak_in_use = self._peak_in_use
+        self._peak_demand = 0
+        self._peak_in_use = 0
+        capacity = self.capacity
+        step = max(1, math.ceil(capacity / 4))
+
+        # 只有连接确实被占满时才扩容，会话并发上限导致的排队不能通过扩容解决
+        if (mean_wait_ms >= self.target_wait_ms or rejected > 0) and peak_in_use >= self._saturation_level(capacity):
+            self._low_intervals = 0
+            target = min(self.max_connections, capacity + step)
+            load = self._server_load() if target > capacity else None
+            if load is not None:
+                if load.busy(self.server_ratio):
+                    self._last_decision = "hold: server busy"
+                    return
+                target = min(target, capacity + max(0, load.headroom(self.server_ratio)))
+            if target > capacity:
+                self._resize(target, "grow",
+                             f"mean wait {mean_wait_ms:.1f}ms, rejected {rejected}, peak in use {peak_in_use}")
+            else:
+                self._last_decision = "hold: at limit"
+            return
+
+        if capacity > self.min_connections:
+            # 服务端连接数超过允许比例时主动归还连接
+            load = self._server_load()
+            if load is not None and load.headroom(self.server_ratio) < 0:
+                target = max(self.min_connections, capacity - min(step, -load.headroom(self.server_ratio)))
+                self._resize(target, "shrink", f"server connections {load.connections}/{load.max_connections}")
+                return
+
+        if peak <= capacity // 2:
+            self._low_intervals += 1
+            if self._low_intervals >= _SHRINK_AFTER_INTERVALS:
+                self._low_intervals = 0
+                if capacity > self.min_connections:
+                    self._resize(max(self.min_connections, capacity - step, peak), "shrink",
+                                 f"peak demand {peak}")
+                trimmed = self.pool.trim_idle(max(1, peak))
+                if trimmed:
+                    self._trimmed += trimmed
+                    POOL_EVENTS.labels(self.pool_name, "autoscale_trim").inc(trimmed)
+            self._last_decision = "hold: low demand"
+        else:
+            self._low_intervals = 0
+            self._last_decision = "hold"
+
+    def _resize(self, target: int, direction: str, reason: str) -> None:
+        capacity = self.capacity
+        self.pool.resize(target - self.pool.pool_size)
+        if self.admission is not None:
+            self.admission.resize(target)
+        if direction == "grow":
+            self._grown += 1
+        else:
+            self._shrunk += 1
+        POOL_EVENTS.labels(self.pool_name, f"autoscale_{direction}").inc()
+        self._last_decision = f"{direction}: {reason}"
+        logger.info(f"Autoscale {direction} pool '{self.pool_name}' from {capacity} to {target} connections ({reason})")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取自适应容量控制统计信息
+
+        Returns:
+            包含容量范围、调整次数和最近一次服务端负载的字典
+        """
+        load = self._last_server_load
+        return {
+            "capacity": self.capacity,
+            "min_connections": self.min_connections,
+            "max_connections": self.max_connections,
+            "target_wait_ms": self.target_wait_ms,
+            "grow_total": self._grown,
+            "shrink_total": self._shrunk,
+            "idle_trimmed_total": self._trimmed,
+            "last_decision": self._last_decision,
+            "server_load": None if load is None else {
+                "max_connections": load.max_connections,
+                "connections": load.connections,
+                "running": load.running
+            }
+        }
+
+
+class AutoscaleRunner:
+    """
+    在后台线程中驱动所有连接池的自适应容量控制器
+    """
+
+    def __init__(self, tick_interval: float = 1.0):
+        self.tick_interval = tick_interval
+        self._autoscalers: Dict[str, PoolAutoscaler] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, autoscaler: PoolAutoscaler) -> None:
+        with self._lock:
+            self._autoscalers[autoscaler.pool_name] = autoscaler
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="pool-autoscaler", daemon=True)
+                self._thread.start()
+
+    def remove(self, pool_name: str) -> None:
+        with self._lock:
+            self._autoscalers.pop(pool_name, None)
+
+    def get(self, pool_name: str) -> Optional[PoolAutoscaler]:
+        return self._autoscalers.get(pool_name)
+
+    def stop(self) -> None:
+        with self._lock:
+            self._autoscalers.clear()
+            thread, self._thread = self._thread, None
+        self._stop.set()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=5)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.tick_interval):
+            now = time.monotonic()
+            with self._lock:
+                autoscalers = list(self._autoscalers.values())
+            for autoscaler in autoscalers:
+                try:
+                    autoscaler.tick(now)
+                except Exception as e:
+                    logger.error(f"Autoscale failed for pool '{autoscaler.pool_name}': {e}")
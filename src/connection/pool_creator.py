@@ -23,7 +23,9 @@ class MySQLPoolCreator(DatabasePoolCreator):
             pool_size=config.get("pool_size", 10),
             max_overflow=config.get("max_overflow", 20),
             pool_recycle=config.get("pool_recycle", 3600),
-            pool_timeout=config.get("pool_timeout", 30)
+            pool_timeout=config.get("pool_timeout", 30),
+            validation_idle_seconds=config.get("validation_idle_seconds", 30),
+            connect_args={"connect_timeout": int(config.get("connect_timeout", 10))}
         )
 
 
@@ -42,7 +44,9 @@ class PostgreSQLPoolCreator(DatabasePoolCreator):
             max_overflow=config.get("max_overflow", 20),
             pool_recycle=config.get("pool_recycle", 3600),
             pool_timeout=config.get("pool_timeout", 30),
-            connect_args={"options": f"-csearch_path={schema}"}
+            validation_idle_seconds=config.get("validation_idle_seconds", 30),
+            connect_args={"options": f"-csearch_path={schema}",
+                          "connect_timeout": int(config.get("connect_timeout", 10))}
         )
 
 class OraclePoolCreator(DatabasePoolCreator):
@@ -57,7 +61,9 @@ class OraclePoolCreator(DatabasePoolCreator):
             pool_size=config.get("pool_size", 10),
             max_overflow=config.get("max_overflow", 20),
             pool_recycle=config.get("pool_recycle", 3600),
-            pool_timeout=config.get("pool_timeout", 30)
+            pool_timeout=config.get("pool_timeout", 30),
+            validation_idle_seconds=config.get("validation_idle_seconds", 30),
+            connect_args={"tcp_connect_timeout": float(config.get("connect_timeout", 10))}
         )
 
 class MSSQLServerPoolCreator(DatabasePoolCreator):
@@ -72,7 +78,9 @@ class MSSQLServerPoolCreator(DatabasePoolCreator):
             pool_size=config.get("pool_size", 10),
             max_overflow=config.get("max_overflow", 20),
             pool_recycle=config.get("pool_recycle", 3600),
-            pool_timeout=config.get("pool_timeout", 30)
+            pool_timeout=config.get("pool_timeout", 30),
+            validation_idle_seconds=config.get("validation_idle_seconds", 30),
+            connect_args={"login_timeout": int(config.get("connect_timeout", 10))}
         )
 
 
@@ -95,9 +103,26 @@ class DamengPoolCreator(DatabasePoolCreator):
             max_overflow = config.get("max_overflow", 20),
             pool_recycle = config.get("pool_recycle", 3600),
             pool_timeout = config.get("pool_timeout", 30),
+            validation_idle_seconds = config.get("validation_idle_seconds", 30),
             connect_args=connect_args
         )
 
+class SQLitePoolCreator(DatabasePoolCreator):
+    """SQLite连接池创建器，database 为数据库文件路径"""
+    def create_pool(self, pool_name: str, config: Dict[str, Any]) -> SQLAlchemyConnectionPool:
+        database_url = f"sqlite:///{config['database']}"
+        return SQLAlchemyConnectionPool(
+            database_url=database_url,
+            pool_type=config.get("pool_type", "queue"),
+            pool_size=config.get("pool_size", 10),
+            max_overflow=config.get("max_overflow", 20),
+            pool_recycle=config.get("pool_recycle", 3600),
+            pool_timeout=config.get("pool_timeout", 30),
+            validation_idle_seconds=config.get("validation_idle_seconds", 30),
+            # 连接由连接池在多个工作线程间复用，同一时刻只会被一个线程使用
+            connect_args={"check_same_thread": False}
+        )
+
 class DatabasePoolFactory:
     """数据库连接池工厂类"""
 
@@ -106,7 +131,8 @@ class DatabasePoolFactory:
         "postgresql": PostgreSQLPoolCreator(),
         "oracle": OraclePoolCreator(),
         "mssqlserver": MSSQLServerPoolCreator(),
-        "dameng": DamengPoolCreator()
+        "dameng": DamengPoolCreator(),
+        "sqlite": SQLitePoolCreator()
     }
     @classmethod
     def create_pool(cls, db_type: str, pool_name: str, config: Dict[str, Any]) -> SQLAlchemyConnectionPool:
@@ -4,18 +4,59 @@
 """
 
 import logging
+from dataclasses import dataclass
 from typing import Dict, Any, Optional, List
-from contextlib import contextmanager
+from sqlalchemy.exc import DBAPIError, TimeoutError as PoolTimeoutError
+from contextlib import contextmanager, ExitStack
 import threading
+import time
 
 from .connection_pool import (
     SQLAlchemyConnectionPool
 )
 from config.dbconfig import get_db_configs
+from core.exceptions import AdmissionRejectedError
+from .admission import AdmissionController
+from .circuit_breaker import CircuitBreaker, CircuitState
+from .pool_autoscaler import AutoscaleRunner, PoolAutoscaler
 from .pool_creator import DatabasePoolFactory
+from .query_cancel import current_cancel_token
+from .replica import Replica, ReplicaMonitor, ReplicaSet, primary_pinned
+from .session import PinnedSession
+from utils.metrics import POOL_CHECKOUT_WAIT, REGISTRY, instrument_pool
+from utils.tracing import Tracer, instrument_engine, use_span
 
 logger = logging.getLogger(__name__)
 
+# 熔断器状态在指标中的取值
+_CIRCUIT_STATE_VALUES = {CircuitState.CLOSED.value: 0, CircuitState.HALF_OPEN.value: 1, CircuitState.OPEN.value: 2}
+
+# 重新加载配置时可以在线调整的配置项，其余配置项变化时需要重建连接池
+_CAPACITY_KEYS = ("pool_size", "max_overflow")
+_ADMISSION_KEYS = ("session_max_concurrency", "max_queue_size", "user_weights", "reserved_metadata_connections")
+_AUTOSCALE_KEYS = ("autoscale", "autoscale_max_connections", "autoscale_target_wait_ms", "autoscale_interval",
+                   "autoscale_server_ratio")
+_CIRCUIT_KEYS = ("circuit_failure_threshold", "circuit_reset_timeout", "circuit_max_reset_timeout")
+# 权限检查在每次调用时读取配置，排空超时只在移除连接池时使用，都不影响连接池本身
+_PASSIVE_KEYS = ("role", "drain_timeout", "explain_analyze_timeout")
+_ONLINE_KEYS = frozenset(_CAPACITY_KEYS + _ADMISSION_KEYS + _AUTOSCALE_KEYS + _CIRCUIT_KEYS + _PASSIVE_KEYS)
+
+# 排空连接池时检查已借出连接的间隔(秒)
+_DRAIN_POLL_INTERVAL = 0.1
+
+
+@dataclass
+class _PoolEntry:
+    """创建完成但尚未加入路由的连接池及其配套组件"""
+    pool: SQLAlchemyConnectionPool
+    config: Dict[str, Any]
+    context: Any
+    admission: AdmissionController
+    breaker: Optional[CircuitBreaker] = None
+    autoscaler: Optional[PoolAutoscaler] = None
+    replica_set: Optional[ReplicaSet] = None
+    replica_check_interval: float = 5
+
 
 class MultiDBPoolManager:
     """
@@ -40,12 +81,27 @@ class MultiDBPoolManager:
         instance._init_from_config()
         return instance
 
+    @classmethod
+    def reload_from_config(cls) -> Dict[str, Any]:
+        """类方法：重新读取配置并在线应用到连接池（SIGHUP 或 /admin/reload 触发）"""
+        return cls.get_instance().reload()
+
     @classmethod
     def get_pool(cls, pool_name: str) -> Optional[SQLAlchemyConnectionPool]:
         """类方法：获取指定名称的连接池"""
         instance = cls.get_instance()
         return instance._pools.get(pool_name)
 
+    @classmethod
+    def get_context(cls, pool_name: str):
+        """类方法：获取指定连接池的方言上下文（databases.pool_context.PoolContext）"""
+        return cls.get_instance()._contexts.get(pool_name)
+
+    @classmethod
+    def get_config(cls, pool_name: str) -> Optional[Dict[str, Any]]:
+        """类方法：获取创建指定连接池时使用的配置"""
+        return cls.get_instance()._configs.get(pool_name)
+
     @classmethod
     def get_pool_names(cls):
         instance = cls.get_instance()
@@ -55,6 +111,14 @@ class MultiDBPoolManager:
         if hasattr(self, '_initialized') and self._initialized:
             return
         self._pools: Dict[str, SQLAlchemyConnectionPool] = {}
+        self._configs: Dict[str, Dict[str, Any]] = {}
+        self._contexts: Dict[str, Any] = {}
+        self._admission: Dict[str, AdmissionController] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._autoscale = AutoscaleRunner()
+        self._replicas = ReplicaMonitor()
+        self._reload_lock = threading.Lock()
+        REGISTRY.register_collector("pools", self._collect_metrics)
         logger.info("MultiDBPoolManager initialized")
         self._initialized = True
         if auto_init_from_config:
@@ -76,33 +140,237 @@ class MultiDBPoolManager:
 
     def add_pool_from_config(self, pool_name: str, config: Dict[str, Any]) -> None:
         """ 创建连接池 """
+        self._install(pool_name, self._build_pool(pool_name, config))
+
+    def _build_pool(self, pool_name: str, config: Dict[str, Any]) -> _PoolEntry:
+        """创建连接池、方言上下文、准入控制、熔断器、自适应容量控制器和副本，不加入路由；创建失败时关闭已创建的部分"""
         pool = DatabasePoolFactory.create_pool(db_type=config["type"], pool_name=pool_name, config=config)
-        self._pools[pool_name] = pool
+        try:
+            context = self._create_context(pool_name, config, pool.engine)
+            instrument_pool(pool_name, pool.engine)
+            instrument_engine(pool.engine)
+            admission = AdmissionController.from_config(pool_name, config)
+            entry = _PoolEntry(pool, config, context, admission, CircuitBreaker.from_config(pool_name, config))
+            if config.get("autoscale"):
+                entry.autoscaler = PoolAutoscaler.from_config(pool_name, pool, admission, config)
+            if config.get("replicas"):
+                entry.replica_set = self._create_replicas(pool_name, config)
+                entry.replica_check_interval = float(config.get("replica_check_interval") or 5)
+        except Exception:
+            pool.close_all_connections()
+            raise
+        return entry
+
+    def _install(self, pool_name: str, entry: _PoolEntry) -> None:
+        """
+        将创建好的连接池加入路由，同名的旧连接池的各组件被逐项覆盖而不是先移除，
+        切换期间的请求使用旧组件或新组件，不会找不到连接池；重新加载时在 _reload_lock 内调用
+        """
+        self._configs[pool_name] = entry.config
+        self._contexts[pool_name] = entry.context
+        self._admission[pool_name] = entry.admission
+        if entry.breaker is not None:
+            self._breakers[pool_name] = entry.breaker
+        else:
+            self._breakers.pop(pool_name, None)
+        self._pools[pool_name] = entry.pool
+        if entry.autoscaler is not None:
+            self._autoscale.add(entry.autoscaler)
+        else:
+            self._autoscale.remove(pool_name)
+        if entry.replica_set is not None:
+            self._replicas.add(entry.replica_set, entry.replica_check_interval)
+        else:
+            self._replicas.remove(pool_name)
+
+    @staticmethod
+    def _create_context(pool_name: str, config: Dict[str, Any], engine):
+        """创建连接池的方言上下文，此时才导入该数据库类型的方言包"""
+        # 方言包依赖SQL执行工具和连接池管理器，在使用时导入以避免循环导入
+        from databases.pool_context import PoolContext
 
-    def remove_pool(self, pool_name: str) -> bool:
+        return PoolContext(pool_name, config, engine)
+
+    @staticmethod
+    def _create_replicas(pool_name: str, config: Dict[str, Any]) -> ReplicaSet:
+        """为连接池创建只读副本，副本配置覆盖主库配置中的同名项"""
+        replicas = []
+        try:
+            for index, replica_config in enumerate(config["replicas"], start=1):
+                merged = {**config, **replica_config, "replicas": [], "autoscale": False}
+                merged["port"] = int(merged["port"])
+                name = replica_config.get("name") or f"{pool_name}-replica{index}"
+                pool = DatabasePoolFactory.create_pool(db_type=merged["type"], pool_name=name, config=merged)
+                instrument_pool(name, pool.engine)
+                instrument_engine(pool.engine)
+                replicas.append(Replica(name, merged.get("host"), pool, AdmissionController.from_config(name, merged)))
+                logger.info(f"Added replica '{name}' for pool '{pool_name}'")
+        except Exception:
+            for replica in replicas:
+                replica.pool.close_all_connections()
+            raise
+        return ReplicaSet(pool_name, replicas, float(config.get("replica_max_lag_seconds") or 30))
+
+    def remove_pool(self, pool_name: str, drain: bool = False) -> bool:
         """
         移除连接池
 
         Args:
             pool_name: 连接池名称
+            drain: 是否等待已借出的连接归还后再关闭，为False时立即关闭
 
         Returns:
             bool: 是否成功移除
         """
-        if pool_name in self._pools:
-            pool = self._pools.pop(pool_name)
-            pool.close_all_connections()
-            logger.info(f"Removed pool '{pool_name}'")
-            return True
-        return False
+        if pool_name not in self._pools:
+            return False
+        pool, replica_set = self._detach_pool(pool_name)
+        config = self._configs.pop(pool_name, {})
+        if drain:
+            self._start_drain(pool_name, pool, replica_set, float(config.get("drain_timeout") or 300))
+        else:
+            self._close_detached(pool_name, pool, replica_set)
+        logger.info(f"Removed pool '{pool_name}'")
+        return True
+
+    def _detach_pool(self, pool_name: str):
+        """从路由中摘除连接池，之后的请求不再使用它，返回摘除的连接池和副本集合"""
+        replica_set = self._replicas.remove(pool_name)
+        self._autoscale.remove(pool_name)
+        self._breakers.pop(pool_name, None)
+        self._admission.pop(pool_name, None)
+        self._contexts.pop(pool_name, None)
+        return self._pools.pop(pool_name), replica_set
+
+    @staticmethod
+    def _close_detached(pool_name: str, pool: SQLAlchemyConnectionPool, replica_set: Optional[ReplicaSet]) -> None:
+        if replica_set is not None:
+            replica_set.close()
+        pool.close_all_connections()
+        logger.info(f"Closed detached pool '{pool_name}'")
+
+    def _start_drain(self, pool_name: str, pool: SQLAlchemyConnectionPool, replica_set: Optional[ReplicaSet],
+                     timeout: float) -> None:
+        """在后台线程中等待已借出的连接归还，然后关闭连接池"""
+        threading.Thread(target=self._drain, args=(pool_name, pool, replica_set, timeout),
+                         name=f"pool-drain-{pool_name}", daemon=True).start()
+
+    def _drain(self, pool_name: str, pool: SQLAlchemyConnectionPool, replica_set: Optional[ReplicaSet],
+               timeout: float) -> None:
+        pools = [pool] + ([replica.pool for replica in replica_set.replicas] if replica_set is not None else [])
+        deadline = time.monotonic() + timeout
+        while True:
+            checked_out = sum(p.engine.pool.checkedout() for p in pools)
+            if checked_out == 0:
+                break
+            if time.monotonic() >= deadline:
+                logger.warning(f"Timed out draining pool '{pool_name}' with {checked_out} connections "
+                               f"still checked out, closing anyway")
+                break
+            time.sleep(_DRAIN_POLL_INTERVAL)
+        self._close_detached(pool_name, pool, replica_set)
+
+    def reload(self, db_configs: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """
+        将新的配置与运行中的连接池对比并在线应用
+
+        - 新增的连接池直接创建
+        - 只有容量、准入控制、自适应容量、熔断器等配置变化的连接池在线调整，不中断请求
+        - 连接参数等其他配置变化的连接池重建：新请求立即使用新连接池，旧连接池排空后关闭
+        - 删除的连接池从路由中摘除，已借出的连接归还（或超过 drain_timeout）后关闭
+        - 未变化的连接池不受影响
+
+        Args:
+            db_configs: 新的配置，为None时重新读取配置文件
+
+        Returns:
+            各连接池的处理结果
+        """
+        with self._reload_lock:
+            if db_configs is None:
+                db_configs = get_db_configs()
+            result = {"added": [], "reconfigured": [], "recreated": [], "removed": [], "unchanged": [], "failed": {}}
+
+            for pool_name in [name for name in self._pools if name not in db_configs]:
+                self.remove_pool(pool_name, drain=True)
+                result["removed"].append(pool_name)
+
+            for pool_name, config in db_configs.items():
+                current = self._configs.get(pool_name)
+                try:
+                    if pool_name not in self._pools:
+                        self.add_pool_from_config(pool_name, config)
+                        result["added"].append(pool_name)
+                    elif current == config:
+                        result["unchanged"].append(pool_name)
+                    elif all(current.get(key) == config.get(key)
+                             for key in set(current) | set(config) if key not in _ONLINE_KEYS):
+                        self._reconfigure_pool(pool_name, current, config)
+                        result["reconfigured"].append(pool_name)
+                    else:
+                        self._recreate_pool(pool_name, current, config)
+                        result["recreated"].append(pool_name)
+                except Exception as e:
+                    logger.error(f"Failed to reload pool '{pool_name}': {e}")
+                    result["failed"][pool_name] = str(e)
+
+            logger.info("Reloaded pool configuration: " + ", ".join(
+                f"{action}={names}" for action, names in result.items() if names))
+            return result
+
+    def _reconfigure_pool(self, pool_name: str, current: Dict[str, Any], config: Dict[str, Any]) -> None:
+        """在线调整连接池容量、准入控制、自适应容量和熔断器配置"""
+
+        def changed(keys) -> bool:
+            return any(current.get(key) != config.get(key) for key in keys)
+
+        pool = self._pools[pool_name]
+        if changed(_CAPACITY_KEYS) or changed(_AUTOSCALE_KEYS):
+            # 自适应容量控制器按创建时的容量计算上下限，容量配置变化时一并重建
+            self._autoscale.remove(pool_name)
+            old_pool_size = pool.pool_size
+            pool.resize(config["max_overflow"], pool_size=config["pool_size"])
+            if config["pool_size"] < old_pool_size:
+                pool.trim_idle(config["pool_size"])
+        admission = self._admission.get(pool_name)
+        if admission is not None:
+            admission.reconfigure(config)
+        if config.get("autoscale") and self._autoscale.get(pool_name) is None:
+            self._autoscale.add(PoolAutoscaler.from_config(pool_name, pool, admission, config))
+        if changed(_CIRCUIT_KEYS):
+            breaker = CircuitBreaker.from_config(pool_name, config)
+            if breaker is not None:
+                self._breakers[pool_name] = breaker
+            else:
+                self._breakers.pop(pool_name, None)
+        self._configs[pool_name] = config
+        # 上下文的处理器和缓存的版本与连接信息绑定，原地更新配置即可
+        self._contexts[pool_name].update_config(config)
+        logger.info(f"Reconfigured pool '{pool_name}' in place")
+
+    def _recreate_pool(self, pool_name: str, current: Dict[str, Any], config: Dict[str, Any]) -> None:
+        """
+        用新配置创建连接池替换旧连接池，旧连接池排空后关闭
+
+        新连接池及其上下文、准入控制、熔断器全部创建完成后才切换路由，切换期间请求不会中断；
+        新配置无法创建连接池时抛出异常，旧连接池保持原样继续服务
+        """
+        entry = self._build_pool(pool_name, config)
+        pool = self._pools[pool_name]
+        replica_set = self._replicas.get(pool_name)
+        self._install(pool_name, entry)
+        self._start_drain(pool_name, pool, replica_set, float(current.get("drain_timeout") or 300))
+        logger.info(f"Recreated pool '{pool_name}', draining the previous pool")
 
     @contextmanager
-    def connection(self, pool_name: str):
+    def connection(self, pool_name: str, read_only: bool = False):
         """
         获取指定连接池的数据库连接（上下文管理器）
+        获取连接前先经过准入控制，按会话并发上限和公平调度排队
 
         Args:
             pool_name: 连接池名称
+            read_only: 是否只读请求，只读请求优先路由到健康的只读副本
 
         Usage:
             with manager.connection('my_mysql_db') as conn:
@@ -112,7 +380,92 @@ class MultiDBPoolManager:
         if not pool:
             raise ValueError(f"Pool '{pool_name}' not found")
 
+        replica_set = self._replicas.get(pool_name) if read_only and not primary_pinned() else None
+        with ExitStack() as stack:
+            # 追踪span只覆盖准入排队和获取连接的过程，不包含连接的使用时间
+            with use_span(Tracer.start_span("pool.checkout", {"db.pool": pool_name})) as span:
+                conn = None
+                replica = replica_set.acquire() if replica_set is not None else None
+                if replica is not None:
+                    stack.callback(replica_set.release, replica)
+                    span.set_attribute("db.replica", replica.name)
+                    try:
+                        with ExitStack() as replica_stack:
+                            conn = self._admit_and_checkout(replica_stack, replica.name, replica.pool,
+                                                            replica.admission)
+                            stack.enter_context(replica_stack.pop_all())
+                    except DBAPIError as e:
+                        # 副本无法连接时回退到主库
+                        replica_set.mark_down(replica, e)
+                        conn = None
+                    except (AdmissionRejectedError, PoolTimeoutError) as e:
+                        cancel_token = current_cancel_token()
+                        if cancel_token is not None and cancel_token.cancelled:
+                            raise
+                        # 副本繁忙（准入排队已满、排队超时或连接池耗尽）时回退到主库，副本仍参与后续路由
+                        replica_set.record_busy(replica, e)
+                        conn = None
+                if conn is None:
+                    conn = self._admit_and_checkout(stack, pool_name, pool, self._admission.get(pool_name),
+                                                    self._breakers.get(pool_name))
+            yield conn
+
+    @contextmanager
+    def session(self, pool_name: str):
+        """
+        获取固定在一个主库连接上的会话（上下文管理器），用于需要在同一个连接上依次执行多条语句的操作
+        会话内的语句不自动提交，退出时回滚
+
+        Args:
+            pool_name: 连接池名称
+
+        Usage:
+            with manager.session('my_oracle_db') as session:
+                ExecuteSqlUtil.execute_single_statement('my_oracle_db', "EXPLAIN PLAN FOR ...", session)
+                ExecuteSqlUtil.execute_single_statement('my_oracle_db', "SELECT ... FROM plan_table", session)
+        """
+        with self.connection(pool_name) as conn:
+            try:
+                yield PinnedSession(pool_name, self.get_pool(pool_name), conn)
+            finally:
+                if not conn.invalidated:
+                    conn.rollback()
+
+    def _admit_and_checkout(self, stack: ExitStack, pool_name: str, pool: SQLAlchemyConnectionPool,
+                            admission: Optional[AdmissionController], breaker: Optional[CircuitBreaker] = None):
+        """
+        经过熔断器和准入控制后从连接池获取连接，退出操作登记到 stack 中
+
+        Raises:
+            PoolUnavailableError: 熔断器打开时立即抛出，不再排队等待连接超时
+        """
+        if breaker is None:
+            if admission is not None:
+                stack.enter_context(admission.admit(cancel_token=current_cancel_token()))
+            return stack.enter_context(self._checkout(pool_name, pool))
+
+        breaker.before_request()
+        try:
+            if admission is not None:
+                stack.enter_context(admission.admit(cancel_token=current_cancel_token()))
+            conn = stack.enter_context(self._checkout(pool_name, pool))
+        except DBAPIError as e:
+            # 只有建立连接失败才计入熔断，连接池耗尽等其他错误不代表数据库不可用
+            breaker.record_failure(e)
+            raise
+        except BaseException:
+            breaker.record_abort()
+            raise
+        breaker.record_success()
+        return conn
+
+    @staticmethod
+    @contextmanager
+    def _checkout(pool_name: str, pool: SQLAlchemyConnectionPool):
+        """从连接池获取连接，并记录等待连接的耗时"""
+        start = time.perf_counter()
         with pool.connection() as conn:
+            POOL_CHECKOUT_WAIT.labels(pool_name).observe(time.perf_counter() - start)
             yield conn
 
     def get_stats(self, pool_name: str) -> Optional[Dict[str, Any]]:
@@ -131,8 +484,69 @@ class MultiDBPoolManager:
 
         stats = pool.get_stats()
         stats["pool_name"] = pool_name
+        admission = self._admission.get(pool_name)
+        if admission is not None:
+            stats["admission"] = admission.get_stats()
+        autoscaler = self._autoscale.get(pool_name)
+        if autoscaler is not None:
+            stats["autoscale"] = autoscaler.get_stats()
+        breaker = self._breakers.get(pool_name)
+        if breaker is not None:
+            stats["circuit"] = breaker.get_stats()
+        replica_set = self._replicas.get(pool_name)
+        if replica_set is not None:
+            stats["replication"] = replica_set.get_stats()
         return stats
 
+    def _collect_metrics(self):
+        """
+        抓取指标时采集各连接池的连接占用、饱和度和准入控制状态
+        """
+        for name in list(self._pools.keys()):
+            stats = self.get_stats(name)
+            if stats is None:
+                continue
+            labels = {"pool": name}
+            capacity = stats["pool_size"] + stats["max_overflow"]
+            yield "smartdb_pool_size", labels, stats["pool_size"]
+            yield "smartdb_pool_max_overflow", labels, stats["max_overflow"]
+            yield "smartdb_pool_checked_out_connections", labels, stats["checked_out_connections"]
+            yield "smartdb_pool_available_connections", labels, stats["available_connections"]
+            yield "smartdb_pool_overflow_connections", labels, stats["overflow_connections"]
+            yield "smartdb_pool_saturation_ratio", labels, (
+                stats["checked_out_connections"] / capacity if capacity > 0 else 0.0)
+            validation = stats.get("validation", {})
+            if "pings" in validation:
+                yield "smartdb_pool_validation_pings_total", labels, validation["pings"]
+                yield "smartdb_pool_validation_pings_saved_total", labels, validation["pings_saved"]
+                yield "smartdb_pool_disconnect_retries_total", labels, validation["disconnect_retries"]
+
+            circuit = stats.get("circuit")
+            if circuit:
+                yield "smartdb_pool_circuit_state", labels, _CIRCUIT_STATE_VALUES[circuit["state"]]
+                yield "smartdb_pool_circuit_opened_total", labels, circuit["opened_total"]
+                yield "smartdb_pool_circuit_rejected_total", labels, circuit["rejected_total"]
+
+            replication = stats.get("replication")
+            if replication:
+                for replica in replication["replicas"]:
+                    replica_labels = {"pool": name, "replica": replica["name"]}
+                    yield "smartdb_replica_healthy", replica_labels, 1 if replica["healthy"] else 0
+                    if replica["lag_seconds"] is not None:
+                        yield "smartdb_replica_lag_seconds", replica_labels, replica["lag_seconds"]
+                    yield "smartdb_replica_outstanding_requests", replica_labels, replica["outstanding_requests"]
+                    yield "smartdb_replica_routed_total", replica_labels, replica["routed_total"]
+
+            admission = stats.get("admission")
+            if not admission:
+                continue
+            yield "smartdb_admission_rejected_total", labels, admission["rejected_total"]
+            yield "smartdb_admission_timeout_total", labels, admission["timeout_total"]
+            for lane, lane_stats in admission["lanes"].items():
+                lane_labels = {"pool": name, "lane": lane}
+                yield "smartdb_admission_active_requests", lane_labels, lane_stats["active_requests"]
+                yield "smartdb_admission_queued_requests", lane_labels, lane_stats["queued_requests"]
+
     def get_all_stats(self) -> List[Dict[str, Any]]:
         """
         获取所有连接池的统计信息
@@ -146,6 +560,9 @@ class MultiDBPoolManager:
         """
         关闭所有连接池
         """
+        self._autoscale.stop()
+        for replica_set in self._replicas.stop():
+            replica_set.close()
         for name, pool in self._pools.items():
             try:
                 pool.close_all_connections()
@@ -154,6 +571,10 @@ class MultiDBPoolManager:
                 logger.error(f"Error closing connections for pool '{name}': {e}")
 
         self._pools.clear()
+        self._configs.clear()
+        self._contexts.clear()
+        self._admission.clear()
+        self._breakers.clear()
         logger.info("All pools closed and cleared")
 
 
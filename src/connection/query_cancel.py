@@ -0,0 +1,162 @@
+"""
+数据库查询取消工具
+当 MCP 请求被取消或客户端断开连接时，按数据库方言终止仍在执行的查询，
+避免被放弃的查询继续消耗数据库CPU并长期占用连接池中的连接
+"""
+
+import logging
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from sqlalchemy import text
+
+from connection.connection_pool import SQLAlchemyConnectionPool
+from core.exceptions import SQLCancelledError
+
+logger = logging.getLogger(__name__)
+
+# 当前请求的取消令牌，由 call_tool 在工作线程中设置
+_current_token: ContextVar[Optional["QueryCancelToken"]] = ContextVar("query_cancel_token", default=None)
+
+
+def _mysql_backend_id(dbapi_conn) -> Any:
+    # pymysql 在握手时已获得服务端线程ID，无需额外往返
+    return dbapi_conn.thread_id()
+
+
+def _mysql_cancel(pool: SQLAlchemyConnectionPool, dbapi_conn, backend_id: Any) -> None:
+    with pool.control_connection() as conn:
+        conn.execute(text(f"KILL QUERY {int(backend_id)}"))
+
+
+def _postgresql_backend_id(dbapi_conn) -> Any:
+    return dbapi_conn.get_backend_pid()
+
+
+def _postgresql_cancel(pool: SQLAlchemyConnectionPool, dbapi_conn, backend_id: Any) -> None:
+    with pool.control_connection() as conn:
+        conn.execute(text(f"SELECT pg_cancel_backend({int(backend_id)})"))
+
+
+def _oracle_cancel(pool: SQLAlchemyConnectionPool, dbapi_conn, backend_id: Any) -> None:
+    # oracledb 的 Connection.cancel() 可以在其他线程中安全调用，会中断当前执行的语句
+    dbapi_conn.cancel()
+
+
+def _mssql_cancel(pool: SQLAlchemyConnectionPool, dbapi_conn, backend_id: Any) -> None:
+    # pymssql 通过底层 _mssql 连接发送 TDS attention 信号
+    getattr(dbapi_conn, "_conn", dbapi_conn).cancel()
+
+
+def _dameng_cancel(pool: SQLAlchemyConnectionPool, dbapi_conn, backend_id: Any) -> None:
+    dbapi_conn.cancel()
+
+
+def _sqlite_cancel(pool: SQLAlchemyConnectionPool, dbapi_conn, backend_id: Any) -> None:
+    # sqlite3 的 Connection.interrupt() 可以在其他线程中调用，使正在执行的语句尽快返回
+    dbapi_conn.interrupt()
+
+
+# 方言名称 -> (获取后端会话标识的方法, 取消查询的方法)
+_CANCEL_HANDLERS: Dict[str, Tuple[Optional[Callable[[Any], Any]], Callable[..., None]]] = {
+    "mysql": (_mysql_backend_id, _mysql_cancel),
+    "postgresql": (_postgresql_backend_id, _postgresql_cancel),
+    "oracle": (None, _oracle_cancel),
+    "mssql": (None, _mssql_cancel),
+    "dm": (None, _dameng_cancel),
+    "sqlite": (None, _sqlite_cancel),
+}
+
+
+class QueryCancelToken:
+    """
+    单次工具调用的查询取消令牌
+    记录该调用当前正在使用的数据库连接，取消时逐一终止其上执行的查询
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cancelled = False
+        # id(dbapi连接) -> (连接池, dbapi连接, 后端会话标识)
+        self._active: Dict[int, Tuple[SQLAlchemyConnectionPool, Any, Any]] = {}
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def raise_if_cancelled(self) -> None:
+        """
+        已取消时抛出 SQLCancelledError，用于在执行下一条语句前快速退出
+        """
+        if self._cancelled:
+            raise SQLCancelledError("请求已取消，停止执行SQL")
+
+    @contextmanager
+    def activate(self):
+        """
+        将令牌设置为当前上下文的取消令牌
+        """
+        reset_token = _current_token.set(self)
+        try:
+            yield self
+        finally:
+            _current_token.reset(reset_token)
+
+    @contextmanager
+    def track(self, pool: SQLAlchemyConnectionPool, conn):
+        """
+        在执行期间登记连接，使其可以被 cancel() 终止
+
+        Args:
+            pool: 连接所属的连接池
+            conn: SQLAlchemy 连接对象
+        """
+        self.raise_if_cancelled()
+
+        dbapi_conn = conn.connection.dbapi_connection
+        backend_id_getter, _ = _CANCEL_HANDLERS.get(pool.engine.dialect.name, (None, None))
+        backend_id = None
+        if backend_id_getter is not None:
+            try:
+                backend_id = backend_id_getter(dbapi_conn)
+            except Exception as e:
+                logger.debug(f"Failed to read backend id for cancellation: {e}")
+
+        key = id(dbapi_conn)
+        with self._lock:
+            self._active[key] = (pool, dbapi_conn, backend_id)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._active.pop(key, None)
+
+    def cancel(self) -> None:
+        """
+        取消令牌并终止所有登记连接上正在执行的查询
+        该方法会进行网络调用，应在工作线程中执行
+        """
+        with self._lock:
+            self._cancelled = True
+            active = list(self._active.values())
+
+        for pool, dbapi_conn, backend_id in active:
+            dialect_name = pool.engine.dialect.name
+            _, cancel_handler = _CANCEL_HANDLERS.get(dialect_name, (None, None))
+            if cancel_handler is None:
+                logger.warning(f"Query cancellation is not supported for dialect '{dialect_name}'")
+                continue
+            try:
+                cancel_handler(pool, dbapi_conn, backend_id)
+                logger.info(f"Cancelled in-flight query on {dialect_name} connection (backend id: {backend_id})")
+            except Exception as e:
+                logger.warning(f"Failed to cancel in-flight query on {dialect_name}: {e}")
+
+
+def current_cancel_token() -> Optional[QueryCancelToken]:
+    """
+    获取当前上下文的取消令牌，未处于工具调用中时返回None
+    """
+    return _current_token.get()
@@ -0,0 +1,271 @@
+"""
+只读副本路由
+连接池可以在配置中声明只读副本，只读语句（SELECT/SHOW/DESCRIBE/EXPLAIN）以及元数据、健康检查查询
+按最少未完成请求数分配到健康的副本上，写语句始终在主库执行。
+后台线程定期检查各副本的复制延迟，延迟超过阈值或无法连接的副本暂时不参与路由，全部不可用时回退到主库。
+
+配置（连接池配置项）:
+    replicas: 副本列表，每项覆盖主库的连接配置，如 [{"host": "10.0.0.2"}, {"host": "10.0.0.3", "port": 3307}]
+    replica_max_lag_seconds: 允许的最大复制延迟(秒)，默认 30
+    replica_check_interval: 复制延迟检查间隔(秒)，默认 5
+"""
+
+import logging
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+from connection.admission import AdmissionController
+from connection.connection_pool import SQLAlchemyConnectionPool
+
+logger = logging.getLogger(__name__)
+
+# 当前上下文是否必须使用主库：写入之后的读取需要读到刚写入的数据
+_primary_pinned: ContextVar[bool] = ContextVar("replica_primary_pinned", default=False)
+
+
+def primary_pinned() -> bool:
+    """当前上下文是否固定使用主库"""
+    return _primary_pinned.get()
+
+
+def pin_primary() -> None:
+    """
+    在当前上下文的剩余部分固定使用主库
+
+    工具调用在独立的上下文副本中执行，固定只在本次调用内生效
+    """
+    _primary_pinned.set(True)
+
+
+@contextmanager
+def use_primary():
+    """
+    在上下文中固定使用主库，用于依赖会话状态或刚写入数据的查询
+
+    Usage:
+        with use_primary():
+            ExecuteSqlUtil.execute_single_statement(pool_name, "SELECT * FROM TABLE(DBMS_XPLAN.DISPLAY)")
+    """
+    reset_token = _primary_pinned.set(True)
+    try:
+        yield
+    finally:
+        _primary_pinned.reset(reset_token)
+
+
+def _mysql_replication_lag(conn) -> Optional[float]:
+    from databases.mysql.mysql_queries import MySQLQueries
+
+    try:
+        result = conn.execute(text(MySQLQueries.get_replica_status()))
+    except DBAPIError:
+        result = conn.execute(text(MySQLQueries.get_slave_status()))
+    row = result.mappings().first()
+    if row is None:
+        # 不是副本（如主主复制中的另一个主库），视为没有延迟
+        return 0.0
+    lag = row.get("Seconds_Behind_Source", row.get("Seconds_Behind_Master"))
+    # 复制线程停止时为NULL
+    return None if lag is None else float(lag)
+
+
+def _postgresql_replication_lag(conn) -> Optional[float]:
+    from databases.postgresql.postgresql_queries import PostgresqlQueries
+
+    return float(conn.execute(text(PostgresqlQueries.get_replication_lag())).scalar())
+
+
+# 方言名称 -> 读取复制延迟(秒)的方法，返回None表示复制已中断；未列出的方言只检查能否连接
+_REPLICATION_LAG_PROBES: Dict[str, Callable[[Any], Optional[float]]] = {
+    "mysql": _mysql_replication_lag,
+    "postgresql": _postgresql_replication_lag,
+}
+
+
+class Replica:
+    """单个只读副本"""
+
+    def __init__(self, name: str, host: Optional[str], pool: SQLAlchemyConnectionPool,
+                 admission: Optional[AdmissionController]):
+        self.name = name
+        self.host = host
+        self.pool = pool
+        self.admission = admission
+        self.healthy = True
+        self.lag_seconds: Optional[float] = None
+        self.last_error: Optional[str] = None
+        # 已路由到该副本但尚未完成的请求数
+        self.outstanding = 0
+        self.routed = 0
+
+
+class ReplicaSet:
+    """
+    一个连接池的只读副本集合，按最少未完成请求数选择副本
+    """
+
+    def __init__(self, pool_name: str, replicas: List[Replica], max_lag_seconds: float = 30.0):
+        self.pool_name = pool_name
+        self.replicas = replicas
+        self.max_lag_seconds = max_lag_seconds
+        self._lock = threading.Lock()
+        self.fallbacks = 0
+
+    def acquire(self) -> Optional[Replica]:
+        """
+        选择未完成请求最少的健康副本并登记一个请求，没有可用副本时返回None
+
+        返回的副本使用完成后必须调用 release
+        """
+        with self._lock:
+            candidates = [replica for replica in self.replicas if replica.healthy]
+            if not candidates:
+                self.fallbacks += 1
+                return None
+            # 未完成请求数相同时选择累计路由次数最少的副本，使串行请求也能轮流分配
+            replica = min(candidates, key=lambda r: (r.outstanding, r.routed))
+            replica.outstanding += 1
+            replica.routed += 1
+            return replica
+
+    def release(self, replica: Replica) -> None:
+        with self._lock:
+            replica.outstanding -= 1
+
+    def mark_down(self, replica: Replica, error: Exception) -> None:
+        """获取副本连接失败时将其排除，等待下一次检查恢复"""
+        with self._lock:
+            replica.healthy = False
+            replica.last_error = str(error)
+            self.fallbacks += 1
+        logger.warning(f"Replica '{replica.name}' of pool '{self.pool_name}' is unavailable, "
+                       f"routing reads to other replicas or the primary: {error}")
+
+    def record_busy(self, replica: Replica, error: Exception) -> None:
+        """副本繁忙、本次请求回退到主库时调用，副本不会被排除"""
+        with self._lock:
+            self.fallbacks += 1
+        logger.info(f"Replica '{replica.name}' of pool '{self.pool_name}' is busy, "
+                    f"routing this read to the primary: {error}")
+
+    def check(self) -> None:
+        """检查各副本的连通性和复制延迟，更新是否参与路由"""
+        for replica in self.replicas:
+            probe = _REPLICATION_LAG_PROBES.get(replica.pool.engine.dialect.name)
+            try:
+                # 使用控制连接，副本连接池占满时也能完成检查
+                with replica.pool.control_connection() as conn:
+                    if probe is not None:
+                        lag = probe(conn)
+                    else:
+                        replica.pool.engine.dialect.do_ping(conn.connection.dbapi_connection)
+                        lag = 0.0
+                error = None if lag is not None else "replication is not running"
+            except Exception as e:
+                lag, error = None, str(e)
+
+            healthy = error is None and lag <= self.max_lag_seconds
+            if error is None and not healthy:
+                error = f"replication lag {lag:.1f}s exceeds {self.max_lag_seconds}s"
+            with self._lock:
+                if healthy != replica.healthy:
+                    if healthy:
+                        logger.info(f"Replica '{replica.name}' of pool '{self.pool_name}' is back in rotation")
+                    else:
+                        logger.warning(f"Replica '{replica.name}' of pool '{self.pool_name}' "
+                                       f"removed from rotation: {error}")
+                replica.healthy = healthy
+                replica.lag_seconds = lag
+                replica.last_error = error
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取副本路由统计信息
+
+        Returns:
+            包含各副本健康状态、复制延迟和路由次数的字典
+        """
+        with self._lock:
+            return {
+                "max_lag_seconds": self.max_lag_seconds,
+                "primary_fallbacks_total": self.fallbacks,
+                "replicas": [
+                    {
+                        "name": replica.name,
+                        "host": replica.host,
+                        "healthy": replica.healthy,
+                        "lag_seconds": replica.lag_seconds,
+                        "outstanding_requests": replica.outstanding,
+                        "routed_total": replica.routed,
+                        "last_error": replica.last_error,
+                        "pool": replica.pool.get_stats()
+                    }
+                    for replica in self.replicas
+                ]
+            }
+
+    def close(self) -> None:
+        for replica in self.replicas:
+            replica.pool.close_all_connections()
+
+
+class ReplicaMonitor:
+    """
+    在后台线程中定期检查所有副本集合
+    """
+
+    def __init__(self):
+        self._replica_sets: Dict[str, ReplicaSet] = {}
+        self._intervals: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, replica_set: ReplicaSet, interval: float) -> None:
+        with self._lock:
+            self._replica_sets[replica_set.pool_name] = replica_set
+            self._intervals[replica_set.pool_name] = interval
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="replica-monitor", daemon=True)
+                self._thread.start()
+
+    def remove(self, pool_name: str) -> Optional[ReplicaSet]:
+        with self._lock:
+            self._intervals.pop(pool_name, None)
+            return self._replica_sets.pop(pool_name, None)
+
+    def get(self, pool_name: str) -> Optional[ReplicaSet]:
+        return self._replica_sets.get(pool_name)
+
+    def stop(self) -> List[ReplicaSet]:
+        with self._lock:
+            replica_sets = list(self._replica_sets.values())
+            self._replica_sets.clear()
+            self._intervals.clear()
+            thread, self._thread = self._thread, None
+        self._stop.set()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=5)
+        return replica_sets
+
+    def _run(self) -> None:
+        next_check: Dict[str, float] = {}
+        elapsed = 0.0
+        while not self._stop.wait(1.0):
+            elapsed += 1.0
+            with self._lock:
+                items = [(name, replica_set, self._intervals[name]) for name, replica_set in self._replica_sets.items()]
+            for name, replica_set, interval in items:
+                if elapsed < next_check.get(name, 0.0):
+                    continue
+                next_check[name] = elapsed + interval
+                try:
+                    replica_set.check()
+                except Exception as e:
+                    logger.error(f"Replica check failed for pool '{name}': {e}")
@@ -0,0 +1,23 @@
+"""
+固定连接的会话
+部分方言操作需要在同一个连接上依次执行多条语句（Oracle 的 EXPLAIN PLAN 与读取 PLAN_TABLE、
+SQL Server 的 SET SHOWPLAN_XML 与获取计划），分别调用 execute_single_statement 时每条语句可能借出不同的连接，
+会话设置和写入的临时数据对后续语句不可见。会话在整个操作期间占用一个主库连接，只经过一次准入排队和借出。
+"""
+
+from sqlalchemy.engine import Connection
+
+from connection.connection_pool import SQLAlchemyConnectionPool
+
+
+class PinnedSession:
+    """
+    固定在一个主库连接上的会话，由 MultiDBPoolManager.session() 创建
+
+    会话内执行的语句不自动提交，会话结束时回滚，写入的临时数据（如执行计划）不会残留，也不会被其他会话看到
+    """
+
+    def __init__(self, pool_name: str, pool: SQLAlchemyConnectionPool, connection: Connection):
+        self.pool_name = pool_name
+        self.pool = pool
+        self.connection = connection
@@ -4,4 +4,17 @@ class SQLPermissionError(Exception):
 
 class SQLExecutionError(Exception):
     """SQL 执行错误"""
-    pass
\ No newline at end of file
+    pass
+
+class SQLCancelledError(Exception):
+    """SQL 执行被取消"""
+    pass
+
+
+class AdmissionRejectedError(Exception):
+    """连接池准入被拒绝（排队已满或等待超时）"""
+    pass
+
+class PoolUnavailableError(Exception):
+    """连接池熔断中，数据库暂时不可用"""
+    pass
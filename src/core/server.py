@@ -1,19 +1,26 @@
 import asyncio
 import contextlib
+import logging
 import os
+import signal
+import threading
+import time
+import weakref
+from urllib.parse import urlsplit
 
 from collections.abc import AsyncIterator
-from starlette.responses import Response
+from starlette.responses import JSONResponse, Response
 from starlette.staticfiles import StaticFiles
 
 
+import anyio
 import click
-import uvicorn
 
 from typing import Sequence, Dict, Any
 from mcp.server.sse import SseServerTransport
 
-from mcp.server.lowlevel import Server
+from mcp.server.lowlevel import NotificationOptions, Server
+from mcp.server.session import ServerSession
 from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
 from mcp.types import Tool, TextContent, Prompt, GetPromptResult
 
@@ -22,14 +29,35 @@ from starlette.routing import Route, Mount
 from starlette.types import Scope, Receive, Send
 from starlette.middleware import Middleware
 
+from connection.admission import CallerIdentity, use_lane
 from connection.pool_manager import MultiDBPoolManager
-from tools.base import ToolRegistry
+from connection.query_cancel import QueryCancelToken
+from tools.base import ToolRegistry, ToolsBase
 from config.event_store import InMemoryEventStore
+from utils.metrics import CONTENT_TYPE, REGISTRY, TOOL_CALL_DURATION, start_metrics_server
+from utils.profiling import ToolProfiler
+from utils.request_recorder import RequestRecorder
+from utils.tracing import STATUS_OK, Tracer, use_span
 
 
+logger = logging.getLogger(__name__)
+
+
+class SmartDBServer(Server):
+    """声明 tools.listChanged 能力，运行时注册或移除工具后通知客户端重新获取工具列表"""
+
+    def create_initialization_options(self, notification_options=None, experimental_capabilities=None):
+        return super().create_initialization_options(
+            notification_options or NotificationOptions(tools_changed=True), experimental_capabilities
+        )
+
 
 # 初始化服务器
-app = Server("SmartDB_MCP")
+app = SmartDBServer("SmartDB_MCP")
+
+# 请求过工具列表的会话及其所在的事件循环，工具列表变化时通知这些会话
+_tool_list_sessions: "weakref.WeakSet[ServerSession]" = weakref.WeakSet()
+_tool_list_loop: asyncio.AbstractEventLoop | None = None
 
 
 @app.list_tools()
@@ -37,9 +65,33 @@ async def list_tools() -> list[Tool]:
     """
         列出所有可用的MySQL操作工具
     """
+    global _tool_list_loop
+    _tool_list_loop = asyncio.get_running_loop()
+    _tool_list_sessions.add(app.request_context.session)
     return ToolRegistry.get_all_tools()
 
 
+async def _send_tool_list_changed(session: ServerSession) -> None:
+    try:
+        await session.send_tool_list_changed()
+    except Exception as e:
+        # 会话已关闭
+        logger.debug(f"Failed to send tools/list_changed notification: {e}")
+        _tool_list_sessions.discard(session)
+
+
+def _notify_tool_list_changed() -> None:
+    """工具注册表变化时由注册表调用，可能不在事件循环线程中"""
+    loop = _tool_list_loop
+    if loop is None or loop.is_closed():
+        return
+    for session in list(_tool_list_sessions):
+        asyncio.run_coroutine_threadsafe(_send_tool_list_changed(session), loop)
+
+
+ToolRegistry.add_listener(_notify_tool_list_changed)
+
+
 @app.call_tool()
 async def call_tool(name: str, arguments: Dict[str, Any]) -> Sequence[TextContent]:
     """调用指定的工具执行操作
@@ -56,7 +108,77 @@ async def call_tool(name: str, arguments: Dict[str, Any]) -> Sequence[TextConten
     """
     tool = ToolRegistry.get_tool(name)
 
-    return await tool.run_tool(arguments)
+    # 工具内部是阻塞的数据库调用，放到工作线程中执行，避免阻塞事件循环，
+    # 同时使请求被取消或客户端断开时可以立即返回并终止数据库上的查询
+    cancel_token = QueryCancelToken()
+    caller = _get_caller_identity()
+    # 调用方可以在请求的 _meta 中设置 "profile": true，对本次调用单独开启采样分析
+    profile_requested = bool(getattr(app.request_context.meta, "profile", False))
+    started_at = time.time()
+    start = time.perf_counter()
+    status = "error"
+    root_span = Tracer.start_trace("mcp.call_tool", {"mcp.tool.name": name, "mcp.session.id": caller.session_id})
+    # 工作线程会复制当前上下文，工具内部的数据库操作成为该span的子span
+    with use_span(root_span) as span:
+        try:
+            result = await anyio.to_thread.run_sync(
+                _run_tool_in_thread, tool, arguments, cancel_token, caller, profile_requested,
+                abandon_on_cancel=True
+            )
+            status = "ok"
+            span.set_status(STATUS_OK)
+            return result
+        except anyio.get_cancelled_exc_class():
+            status = "cancelled"
+            with anyio.CancelScope(shield=True):
+                await anyio.to_thread.run_sync(cancel_token.cancel)
+            raise
+        finally:
+            duration = time.perf_counter() - start
+            span.set_attribute("mcp.tool.status", status)
+            TOOL_CALL_DURATION.labels(name, status).observe(duration)
+            RequestRecorder.record(caller.session_id, name, arguments, started_at, duration, status)
+
+
+# 工作线程各自持有的事件循环，线程池复用线程时一并复用，避免每次工具调用都创建和关闭事件循环
+_worker_state = threading.local()
+
+
+def _worker_event_loop() -> asyncio.AbstractEventLoop:
+    """获取当前工作线程的事件循环，首次调用时创建"""
+    loop = getattr(_worker_state, "loop", None)
+    if loop is None or loop.is_closed():
+        loop = asyncio.new_event_loop()
+        _worker_state.loop = loop
+    return loop
+
+
+def _run_tool_in_thread(tool: ToolsBase, arguments: Dict[str, Any], cancel_token: QueryCancelToken,
+                        caller: CallerIdentity, profile_requested: bool) -> Sequence[TextContent]:
+    """在工作线程中执行工具，并将取消令牌和调用方标识绑定到该线程的上下文"""
+    with cancel_token.activate(), caller.activate(), use_lane(tool.pool_lane), \
+            ToolProfiler.profile(tool.name, requested=profile_requested):
+        return _worker_event_loop().run_until_complete(tool.run_tool(arguments))
+
+
+def _get_caller_identity() -> CallerIdentity:
+    """根据当前MCP请求上下文获取调用方的会话与用户标识，用于连接池准入控制"""
+    ctx = app.request_context
+    session_id = None
+    user = None
+
+    request = ctx.request
+    if request is not None:
+        session_id = request.headers.get("mcp-session-id")
+        # 开启OAuth时由 OAuthMiddleware 写入
+        user_info = getattr(request.state, "user", None)
+        if user_info:
+            user = user_info.get("username")
+
+    if session_id is None:
+        session_id = str(id(ctx.session))
+
+    return CallerIdentity(session_id=session_id, user=user)
 
 
 async def run_stdio():
@@ -87,6 +209,9 @@ def run_sse():
     启动一个支持SSE的Web服务器，允许客户端通过HTTP长连接接收服务器推送的消息
     服务器默认监听0.0.0.0:3000
     """
+    # uvicorn 只在 HTTP 模式下使用，stdio 模式启动时不导入
+    import uvicorn
+
     sse = SseServerTransport("/messages/")
 
     async def handle_sse(request):
@@ -110,8 +235,75 @@ def run_sse():
     )
     uvicorn.run(starlette_app, host="0.0.0.0", port=3000)
 
-def run_streamable_http(json_response: bool, oauth: bool):
+async def handle_metrics(request) -> Response:
+    """导出 Prometheus 文本格式的运行指标"""
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
+
+
+# 未开启 OAuth 时只允许本机访问管理接口
+_LOOPBACK_HOSTS = ("127.0.0.1", "::1", "localhost")
+
+
+def _admin_request_error(request) -> str:
+    """
+    检查管理接口请求的来源，允许时返回空字符串
+
+    浏览器跨站提交的请求带有与服务不同源的 Origin，一律拒绝；未开启 OAuth 时只接受本机发起的请求
+    """
+    origin = request.headers.get("origin")
+    if origin and urlsplit(origin).netloc != request.headers.get("host"):
+        return "cross-origin requests are not allowed"
+    if request.app.state.admin_loopback_only:
+        client = request.client.host if request.client else None
+        if client not in _LOOPBACK_HOSTS:
+            return "admin endpoints only accept local requests when OAuth is disabled"
+    return ""
+
+
+async def handle_admin_reload(request) -> Response:
+    """重新加载连接池配置，返回各连接池的处理结果"""
+    error = _admin_request_error(request)
+    if error:
+        logger.warning(f"Rejected admin reload request from {request.client.host if request.client else None}: "
+                       f"{error}")
+        return JSONResponse({"error": error}, status_code=403)
+    try:
+        result = await anyio.to_thread.run_sync(MultiDBPoolManager.reload_from_config)
+    except Exception as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+    return JSONResponse(result, status_code=207 if result["failed"] else 200)
+
+
+def _reload_pools_in_background() -> None:
+    def reload():
+        try:
+            MultiDBPoolManager.reload_from_config()
+        except Exception as e:
+            logger.error(f"Failed to reload pool configuration: {e}")
+
+    threading.Thread(target=reload, name="config-reload", daemon=True).start()
+
+
+def install_reload_signal_handler() -> None:
+    """收到 SIGHUP 时重新加载连接池配置，Windows 没有 SIGHUP"""
+    if not hasattr(signal, "SIGHUP"):
+        return
+    # 信号处理函数在主线程中执行，会阻塞事件循环，重新加载放到后台线程中执行
+    signal.signal(signal.SIGHUP, lambda signum, frame: _reload_pools_in_background())
+
+
+def _collect_event_store_metrics(event_store: InMemoryEventStore):
+    stats = event_store.get_stats()
+    yield "smartdb_event_store_streams", {}, stats["streams"]
+    yield "smartdb_event_store_events", {}, stats["events"]
+    yield "smartdb_event_store_bytes", {}, stats["bytes"]
+
+
+def run_streamable_http(json_response: bool, oauth: bool, metrics_public: bool = False, admin_reload: bool = False):
+    import uvicorn
+
     event_store = InMemoryEventStore()
+    REGISTRY.register_collector("event_store", lambda: _collect_event_store_metrics(event_store))
 
     session_manager = StreamableHTTPSessionManager(
         app=app,
@@ -145,12 +337,20 @@ def run_streamable_http(json_response: bool, oauth: bool):
     if oauth:
         from oauth import OAuthMiddleware, login, login_page
 
+        # /metrics 默认与其他接口一样需要认证，显式开启 --metrics-public 时才允许匿名抓取
+        exclude_paths = ["/login", "/mcp/authorize"]
+        if metrics_public:
+            exclude_paths.append("/metrics")
         middleware.append(
-            Middleware(OAuthMiddleware, exclude_paths=["/login", "/mcp/authorize"])
+            Middleware(OAuthMiddleware, exclude_paths=exclude_paths)
         )
         routes.append(Route("/login", endpoint=login_page, methods=["GET"]))
         routes.append(Route("/mcp/authorize", endpoint=login, methods=["POST"]))
 
+    routes.append(Route("/metrics", endpoint=handle_metrics, methods=["GET"]))
+    # 管理接口默认不开放，显式开启 --admin-reload 时才挂载
+    if admin_reload:
+        routes.append(Route("/admin/reload", endpoint=handle_admin_reload, methods=["POST"]))
     routes.append(Mount("/mcp", app=handle_streamable_http))
 
     if oauth:
@@ -201,6 +401,7 @@ def run_streamable_http(json_response: bool, oauth: bool):
         middleware=middleware,
         lifespan=lifespan
     )
+    starlette_app.state.admin_loopback_only = not oauth
 
     config = uvicorn.Config(
         app=starlette_app,
@@ -216,7 +417,18 @@ def run_streamable_http(json_response: bool, oauth: bool):
 @click.option("--envfile", default=None, help="env file path")
 @click.option("--mode", default="streamable_http", help="mode type")
 @click.option("--oauth", default=False, help="open oauth")
-def main(mode, envfile, oauth):
+@click.option("--metrics-port", default=None, type=int,
+              help="port of the standalone /metrics listener for stdio/sse mode")
+@click.option("--metrics-public", is_flag=True, default=False,
+              help="serve /metrics without OAuth authentication in streamable_http mode")
+@click.option("--admin-reload", is_flag=True, default=False,
+              help="serve POST /admin/reload in streamable_http mode (local requests only unless OAuth is enabled)")
+@click.option("--profile", is_flag=True, default=None,
+              help="sample tool calls and dump profiles for calls slower than the threshold")
+@click.option("--profile-threshold-ms", default=None, type=float, help="latency threshold for dumping profiles")
+@click.option("--record-requests", default=None, help="append every tools/call to this JSON lines file for replay")
+def main(mode, envfile, oauth, metrics_port, metrics_public, admin_reload, profile, profile_threshold_ms,
+         record_requests):
     from dotenv import load_dotenv
 
     # 优先加载指定的env文件
@@ -231,10 +443,19 @@ def main(mode, envfile, oauth):
         env_path = os.path.join(src_dir, "config", ".env")
         load_dotenv(env_path)
 
+    # 命令行参数优先于环境变量
+    ToolProfiler.configure(enabled=profile, threshold_ms=profile_threshold_ms)
+    RequestRecorder.configure(record_requests)
+
     # 启动时初始化全局连接池（单例）
     MultiDBPoolManager.init_from_config()
     print("---pool names-->",MultiDBPoolManager.get_pool_names())
     print(f"\n✓ 成功初始化连接池管理器")
+    install_reload_signal_handler()
+
+    # stdio/SSE 模式没有 /metrics 路由，通过独立端口导出指标
+    if metrics_port and mode in ("stdio", "sse"):
+        start_metrics_server(metrics_port)
 
     # 使用传入的默认模式
     if mode == "stdio":
@@ -242,7 +463,7 @@ def main(mode, envfile, oauth):
     elif mode == "sse":
         run_sse()
     else:
-        run_streamable_http(False,oauth)
+        run_streamable_http(False, oauth, metrics_public, admin_reload)
 
 
 if __name__ == "__main__":
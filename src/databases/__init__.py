@@ -1,20 +1,21 @@
 """Database package init.
 
-This file now handles the registration of all database factory classes
-after they have been imported to prevent circular import issues.
+Dialect factories are registered lazily: a dialect package (and the queries and
+handlers it pulls in) is imported only when a pool of that type is first used,
+see ``FactoryRegistry``. The factory classes remain importable from this package
+for backwards compatibility; accessing one imports its dialect on demand.
 """
 
-# 首先导入基础工厂类
-from .database_factory import DatabaseOperationFactory, register_all_factories
+from importlib import import_module
 
-# 然后导入所有具体工厂实现
-from .mysql.mysql_factory import MySQLFactory
-from .postgresql.postgresql_factory import PostgresqlFactory
-from .oracle.oracle_factory import OracleFactory
-from .mssqlserver.sqlserver_factory import MSSQLServerFactory
-from .dameng.dameng_factory import DamengFactory
+from .database_factory import DatabaseOperationFactory, FactoryRegistry, register_all_factories
 
-# 最后注册所有工厂类
-register_all_factories()
+__all__ = ['DatabaseOperationFactory', 'MySQLFactory', 'PostgresqlFactory', 'OracleFactory', 'MSSQLServerFactory', 'DamengFactory', 'SQLiteFactory']
 
-__all__ = ['DatabaseOperationFactory', 'MySQLFactory', 'PostgresqlFactory', 'OracleFactory', 'MSSQLServerFactory', 'DamengFactory']
\ No newline at end of file
+
+def __getattr__(name: str):
+    # 按需导入方言工厂类，如 from databases import MySQLFactory
+    for module_name, class_name in FactoryRegistry.FACTORY_MODULES.values():
+        if class_name == name:
+            return getattr(import_module(module_name), class_name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,16 +1,89 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from typing import List, Dict, Any, ClassVar, Optional, Tuple
 
+from connection.session import PinnedSession
+
+from core.exceptions import SQLExecutionError
+from databases.base.explain_plan import ExplainPlan
+from databases.base.index_analysis import analyze_indexes, collect_indexes, collect_sizes
+from databases.base.server_version import ServerVersion
+from databases.base.top_sql import TopSqlEntry, TopSqlOrder, TopSqlReport
+from databases.base.what_if import MAX_CANDIDATES, IndexCandidate, WhatIfReport, WhatIfResult, suggest_candidates
+from utils.execute_sql_util import ExecuteSqlUtil, SQLResult
+from utils.tracing import traced
+
+
+class TracedOperation(ABC):
+    """
+    数据库操作接口基类
+    子类实现的接口方法（traced_methods）会自动包装追踪span，便于定位每一步操作的耗时
+    """
+    traced_methods: ClassVar[Tuple[str, ...]] = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for method_name in cls.traced_methods:
+            method = cls.__dict__.get(method_name)
+            if method is not None and not getattr(method, "__isabstractmethod__", False):
+                setattr(cls, method_name, traced(f"{cls.__name__}.{method_name}")(method))
+
+
+def execute_or_raise(pool_name: str, sql: str, session: Optional[PinnedSession] = None,
+                     params: Optional[Dict[str, Any]] = None) -> SQLResult:
+    """
+    执行单条SQL语句，失败时抛出异常而不是返回失败结果
+
+    Args:
+        pool_name: 连接池名称
+        sql: SQL语句
+        session: 固定连接的会话，多步操作的各条语句需要在同一个连接上执行时传入
+        params: 语句中 :name 绑定参数的值
+
+    Raises:
+        SQLExecutionError: 执行失败时抛出，异常信息为失败结果的信息
+    """
+    sql_result = ExecuteSqlUtil.execute_single_statement(pool_name, sql, session, params)
+    if not sql_result.success:
+        raise SQLExecutionError(sql_result.message)
+    return sql_result
+
+
+class DatabaseVersion(TracedOperation):
+    traced_methods = ("get_db_version", "get_server_version")
 
-class DatabaseVersion(ABC):
     @abstractmethod
     def get_db_version(self, pool_name: str) -> str:
         pass
 
-class TableDescription(ABC):
+    @abstractmethod
+    def get_server_version(self, pool_name: str) -> ServerVersion:
+        """
+        查询并解析数据库版本，推导该版本支持的特性
+
+        Args:
+            pool_name: 连接池名称
+
+        Returns:
+            结构化的数据库版本
+
+        Raises:
+            SQLExecutionError: 版本查询失败时抛出
+        """
+        pass
+
+    @staticmethod
+    def _query_version_row(pool_name: str, sql: str) -> Dict[str, Any]:
+        """执行版本查询，返回第一行（列名小写）"""
+        sql_result = execute_or_raise(pool_name, sql)
+        if not sql_result.rows:
+            raise SQLExecutionError("版本查询没有返回结果")
+        return {column.lower(): value for column, value in zip(sql_result.columns, sql_result.rows[0])}
+
+class TableDescription(TracedOperation):
     """
     表描述信息接口
     """
+    traced_methods = ("get_table_description",)
 
     @abstractmethod
     def get_table_description(self, pool_name: str, database: str, schema: str, table_name: str) -> str:
@@ -26,10 +99,11 @@ class TableDescription(ABC):
         """
         pass
 
-class TableName(ABC):
+class TableName(TracedOperation):
     """
     表名称接口
     """
+    traced_methods = ("get_table_name",)
 
     @abstractmethod
     def get_table_name(self, pool_name: str,  database: str, schema: str, text: str) -> str:
@@ -44,10 +118,11 @@ class TableName(ABC):
             表名称
         """
 
-class TableIndex(ABC):
+class TableIndex(TracedOperation):
     """
     表索引接口
     """
+    traced_methods = ("get_table_index",)
 
     @abstractmethod
     def get_table_index(self, pool_name: str, database: str, schema: str, table_name: str) -> str:
@@ -58,10 +133,12 @@ class TableIndex(ABC):
             pool_name: 数据库名称
             table_name: 表名称
         """
-class DatabaseHealth(ABC):
+class DatabaseHealth(TracedOperation):
     """
     数据库健康接口
     """
+    traced_methods = ("get_db_health",)
+
     @abstractmethod
     def get_db_health(self, pool_name: str, health_type: str):
         """
@@ -72,19 +149,132 @@ class DatabaseHealth(ABC):
             health_type: 健康类型
         """
 
-class SqlOptimize(ABC):
+    @staticmethod
+    def analyze_index_catalog(pool_name: str, catalog_sql: str, size_sql: Optional[str] = None) -> str:
+        """
+        按整个库/模式的索引定义分析重复索引、左前缀冗余索引和过宽的组合索引
+
+        Args:
+            pool_name: 连接池名称
+            catalog_sql: 不指定表名的 get_table_index 查询
+            size_sql: 各索引大小的查询，查询失败（如没有 dba_segments 权限）时只是不估算可回收空间
+
+        Returns:
+            分析结果文本，索引定义查询失败时返回失败信息
+        """
+        try:
+            catalog = execute_or_raise(pool_name, catalog_sql)
+        except SQLExecutionError as e:
+            return f"索引结构分析失败: {e}"
+        sizes = None
+        if size_sql:
+            size_result = ExecuteSqlUtil.execute_single_statement(pool_name, size_sql)
+            if size_result.success:
+                sizes = collect_sizes(size_result.columns or [], size_result.rows or [])
+        indexes = collect_indexes(catalog.columns or [], catalog.rows or [], sizes)
+        return analyze_indexes(indexes, sizes_known=sizes is not None).render()
+
+class SqlOptimize(TracedOperation):
     """
     SQL优化接口
     """
+    traced_methods = ("get_explain_plan", "evaluate_indexes", "get_table_size")
+
     @abstractmethod
-    def get_sql_explain(self, pool_name: str, sql: str):
+    def get_explain_plan(self, pool_name: str, sql: str, analyze: bool = False) -> ExplainPlan:
+        """
+        获取结构化的SQL执行计划
+
+        Args:
+            pool_name: 数据库名称
+            sql: SQL语句
+            analyze: 是否实际执行语句获取真实的行数、耗时和IO，语句在事务中执行并总是回滚，
+                超过连接池配置的 explain_analyze_timeout 时终止；不支持的数据库返回预估计划
+
+        Returns:
+            执行计划，无法解析时 raw 为原始执行计划文本
+
+        Raises:
+            SQLExecutionError: 获取执行计划失败时抛出
+        """
+
+    def get_sql_explain(self, pool_name: str, sql: str, analyze: bool = False) -> str:
         """
-        获取SQL执行计划
+        获取SQL执行计划的文本：计划树和本地计算的热点
 
         Args:
             pool_name: 数据库名称
             sql: SQL语句
+            analyze: 是否获取实际执行计划
+
+        Returns:
+            执行计划文本，获取失败时返回失败信息
+        """
+        try:
+            return self.get_explain_plan(pool_name, sql, analyze).render()
+        except SQLExecutionError as e:
+            return str(e)
+
+    def what_if_method(self, pool_name: str) -> Optional[str]:
+        """
+        假设索引评估方式的说明，数据库不支持时返回None
+
+        Args:
+            pool_name: 数据库名称
+        """
+        return None
+
+    def evaluate_indexes(self, pool_name: str, sql: str, candidates: List[IndexCandidate],
+                         suggest: bool = True) -> WhatIfReport:
+        """
+        假设索引评估：逐个创建候选索引（不实际建立），重新获取预估执行计划，与原计划比较总成本
+
+        Args:
+            pool_name: 数据库名称
+            sql: SQL语句
+            candidates: 用户指定的候选索引，与生成的候选合计超过 MAX_CANDIDATES 的部分忽略
+            suggest: 是否根据原计划的全表扫描热点补充候选索引
+
+        Returns:
+            各候选索引的评估结果，单个候选失败时记录失败原因，不影响其他候选
+
+        Raises:
+            SQLExecutionError: 获取原计划失败时抛出
+        """
+        baseline = self.get_explain_plan(pool_name, sql)
+        report = WhatIfReport(self.what_if_method(pool_name) or "不支持", baseline.total_cost)
+        candidates = list(candidates)
+        if suggest:
+            suggested = suggest_candidates(baseline, tables=self._plan_tables(sql))
+            candidates.extend(candidate for candidate in suggested if candidate not in candidates)
+        for candidate in candidates[:MAX_CANDIDATES]:
+            try:
+                plan, index_name = self._explain_with_index(pool_name, sql, candidate)
+                report.results.append(WhatIfResult.compare(candidate, baseline, plan, index_name))
+            except SQLExecutionError as e:
+                report.results.append(WhatIfResult(candidate, error=str(e)))
+        return report
+
+    def _plan_tables(self, sql: str) -> Optional[Dict[str, str]]:
+        """
+        执行计划中的表名到实际表名的映射，计划中就是实际表名时返回None
+
+        Args:
+            sql: SQL语句
+        """
+        return None
+
+    def _explain_with_index(self, pool_name: str, sql: str, candidate: IndexCandidate) -> Tuple[ExplainPlan, str]:
         """
+        创建候选的假设索引后获取预估执行计划，结束时删除假设索引
+
+        Returns:
+            (执行计划, 假设索引在执行计划中的名称)
+
+        Raises:
+            SQLExecutionError: 数据库不支持或评估失败时抛出
+        """
+        raise SQLExecutionError("当前数据库不支持假设索引评估")
 
     @abstractmethod
     def get_table_size(self, pool_name: str, database: str, schema: str, table_name: str):
@@ -96,4 +286,34 @@ class SqlOptimize(ABC):
             database: 数据库名称
             schema: 模式名
             table_name: 表名称
-        """
\ No newline at end of file
+        """
+
+class TopSql(TracedOperation):
+    """
+    Top SQL 接口
+    """
+    traced_methods = ("get_top_sql",)
+
+    @abstractmethod
+    def get_top_sql(self, pool_name: str, order: TopSqlOrder, limit: int) -> TopSqlReport:
+        """
+        读取数据库的语句统计视图，返回按指标排序的消耗最高的语句
+
+        Args:
+            pool_name: 连接池名称
+            order: 排序指标
+            limit: 返回的语句数
+
+        Returns:
+            归一化并合并后的语句统计
+
+        Raises:
+            SQLExecutionError: 统计视图不可用（未开启、未安装扩展、权限不足）或查询失败时抛出
+        """
+
+    @staticmethod
+    def _query_entries(pool_name: str, sql: str) -> List[TopSqlEntry]:
+        """执行统计查询，按统一的列别名转换为语句统计"""
+        sql_result = execute_or_raise(pool_name, sql)
+        columns = [column.lower() for column in sql_result.columns]
+        return [TopSqlEntry.from_row(dict(zip(columns, row))) for row in sql_result.rows or []]
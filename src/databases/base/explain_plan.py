@@ -0,0 +1,294 @@
+"""
+统一的结构化执行计划
+各方言以机器可读的格式获取执行计划（JSON、XML、PLAN_TABLE 行），转换为同一种计划树，
+每个节点包含预估行数/成本、访问方式和使用的索引，热点（大表全表扫描、文件排序、大输入的嵌套循环）在本地计算，
+sql_optimize 的提示词只包含精简的计划树和热点列表，不再附带需要模型自行解析的原始文本。
+实际执行计划（EXPLAIN ANALYZE 等）在节点上额外记录实际行数、循环次数、耗时和缓冲区/IO计数。
+"""
+
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+# 全表扫描的预估行数达到该值视为大表
+LARGE_TABLE_ROWS = 10000
+# 嵌套循环各输入预估行数的乘积达到该值视为大输入
+NESTED_LOOP_ROWS = 100000
+# 实际行数与预估行数相差该倍数以上视为估算偏差
+MISESTIMATE_RATIO = 10
+# 预估和实际行数都小于该值时不检查估算偏差
+MISESTIMATE_MIN_ROWS = 1000
+
+
+class AccessType(str, Enum):
+    """表的访问方式"""
+    FULL_SCAN = 'full_scan'
+    INDEX_FULL_SCAN = 'index_full_scan'
+    INDEX_SCAN = 'index_scan'
+    INDEX_LOOKUP = 'index_lookup'
+
+    @property
+    def label(self) -> str:
+        return _ACCESS_LABELS[self]
+
+
+_ACCESS_LABELS = {
+    AccessType.FULL_SCAN: "全表扫描",
+    AccessType.INDEX_FULL_SCAN: "全索引扫描",
+    AccessType.INDEX_SCAN: "索引扫描",
+    AccessType.INDEX_LOOKUP: "索引等值查找",
+}
+
+
+class PlanFlag(str, Enum):
+    """节点的额外操作"""
+    # 无法利用索引顺序，需要额外排序
+    FILESORT = 'filesort'
+    # 使用临时表（物化、分组、去重）
+    TEMPORARY = 'temporary'
+    NESTED_LOOP = 'nested_loop'
+
+
+class HotSpotKind(str, Enum):
+    """热点类型"""
+    FULL_SCAN = 'full_scan'
+    # 按索引顺序读取整个索引，数据量大时与全表扫描相当
+    INDEX_FULL_SCAN = 'index_full_scan'
+    FILESORT = 'filesort'
+    TEMPORARY = 'temporary'
+    NESTED_LOOP = 'nested_loop'
+    # 实际行数与预估行数偏差过大，统计信息可能过期
+    MISESTIMATE = 'misestimate'
+
+
+# 按行数判断是否为热点的访问方式
+_SCAN_HOT_SPOTS = {
+    AccessType.FULL_SCAN: HotSpotKind.FULL_SCAN,
+    AccessType.INDEX_FULL_SCAN: HotSpotKind.INDEX_FULL_SCAN,
+}
+
+
+@dataclass
+class PlanNode:
+    """
+    执行计划节点
+
+    Attributes:
+        operation: 方言中的操作名，如 Seq Scan、TABLE ACCESS FULL、Clustered Index Scan
+        table: 访问的表
+        index: 使用的索引
+        access: 表的访问方式，非表访问节点为None
+        estimated_rows: 预估行数
+        estimated_cost: 预估成本，各数据库的成本单位不同，只能在同一个计划内比较
+        actual_rows: 实际返回的总行数（各次循环之和），只有实际执行计划才有
+        actual_loops: 实际执行次数
+        actual_time_ms: 单次执行的实际耗时(毫秒)
+        io: 缓冲区/IO计数，如 shared_hit、shared_read、logical_reads、disk_reads
+        flags: 额外操作
+        details: 过滤条件、排序键等补充说明
+        children: 子节点
+    """
+    operation: str
+    table: Optional[str] = None
+    index: Optional[str] = None
+    access: Optional[AccessType] = None
+    estimated_rows: Optional[float] = None
+    estimated_cost: Optional[float] = None
+    actual_rows: Optional[float] = None
+    actual_loops: Optional[float] = None
+    actual_time_ms: Optional[float] = None
+    io: Dict[str, float] = field(default_factory=dict)
+    flags: Set[PlanFlag] = field(default_factory=set)
+    details: List[str] = field(default_factory=list)
+    children: List["PlanNode"] = field(default_factory=list)
+
+    @property
+    def rows(self) -> Optional[float]:
+        """单次执行的行数，有实际值时使用实际值"""
+        if self.actual_rows is not None:
+            return self.actual_rows / max(self.actual_loops or 1, 1)
+        return self.estimated_rows
+
+    def walk(self) -> Iterator["PlanNode"]:
+        """先序遍历以该节点为根的子树"""
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+    def describe(self) -> str:
+        """节点的单行描述"""
+        parts = [self.operation]
+        if self.table:
+            parts.append(self.table)
+        if self.access is not None:
+            parts.append(f"[{self.access.label}" + (f" {self.index}" if self.index else "") + "]")
+        elif self.index:
+            parts.append(f"[索引 {self.index}]")
+        if self.estimated_rows is not None:
+            parts.append(f"rows={format_number(self.estimated_rows)}")
+        if self.estimated_cost is not None:
+            parts.append(f"cost={format_number(self.estimated_cost)}")
+        if self.actual_rows is not None:
+            parts.append(f"actual_rows={format_number(self.actual_rows)}")
+        if self.actual_loops is not None:
+            parts.append(f"loops={format_number(self.actual_loops)}")
+        if self.actual_time_ms is not None:
+            parts.append(f"time={format_number(self.actual_time_ms)}ms")
+        if self.io:
+            parts.append("io(" + ", ".join(f"{key}={format_number(value)}" for key, value in self.io.items()) + ")")
+        if self.flags:
+            parts.append("(" + ", ".join(sorted(flag.value for flag in self.flags)) + ")")
+        line = " ".join(parts)
+        if self.details:
+            line += " | " + "; ".join(self.details)
+        return line
+
+
+@dataclass
+class HotSpot:
+    """执行计划热点"""
+    kind: HotSpotKind
+    node: PlanNode
+    message: str
+
+
+@dataclass
+class ExplainPlan:
+    """
+    结构化执行计划
+
+    Attributes:
+        dialect: 数据库类型
+        nodes: 计划树的根节点，UNION 等语句可能有多个根
+        total_cost: 整个语句的预估成本，数据库未给出时为None
+        raw: 无法解析为计划树时保留的原始执行计划文本
+        analyzed: 是否为实际执行得到的执行计划
+    """
+    dialect: str
+    nodes: List[PlanNode] = field(default_factory=list)
+    total_cost: Optional[float] = None
+    raw: Optional[str] = None
+    analyzed: bool = False
+
+    def walk(self) -> Iterator[PlanNode]:
+        for node in self.nodes:
+            yield from node.walk()
+
+    def hot_spots(self, large_table_rows: float = LARGE_TABLE_ROWS,
+                  nested_loop_rows: float = NESTED_LOOP_ROWS) -> List[HotSpot]:
+        """
+        计算执行计划热点，预估行数未知的全表扫描和全索引扫描也视为热点，有实际行数时按实际行数判断
+
+        Args:
+            large_table_rows: 全表扫描和全索引扫描的预估行数达到该值视为大表
+            nested_loop_rows: 嵌套循环各输入预估行数的乘积达到该值视为大输入
+
+        Returns:
+            热点列表，按计划树的先序排列
+        """
+        spots = []
+        for node in self.walk():
+            rows = node.rows
+            if node.access in _SCAN_HOT_SPOTS and (rows is None or rows >= large_table_rows):
+                kind = _SCAN_HOT_SPOTS[node.access]
+                target = node.table or node.operation
+                if node.access == AccessType.INDEX_FULL_SCAN and node.index:
+                    target += f" 索引 {node.index}"
+                if rows is None:
+                    estimate = "行数未知"
+                else:
+                    estimate = ("实际" if node.actual_rows is not None else "预估") + f" {format_number(rows)} 行"
+                spots.append(HotSpot(kind, node, f"{node.access.label} {target}（{estimate}）"))
+            if PlanFlag.FILESORT in node.flags:
+                spots.append(HotSpot(HotSpotKind.FILESORT, node, f"额外排序: {node.describe()}"))
+            if PlanFlag.TEMPORARY in node.flags:
+                spots.append(HotSpot(HotSpotKind.TEMPORARY, node, f"使用临时表: {node.describe()}"))
+            if PlanFlag.NESTED_LOOP in node.flags:
+                inputs = [child.rows for child in node.children]
+                if len(inputs) >= 2 and all(value is not None for value in inputs):
+                    product = 1.0
+                    for value in inputs:
+                        product *= max(value, 1)
+                    if product >= nested_loop_rows:
+                        sizes = " x ".join(format_number(value) for value in inputs)
+                        spots.append(HotSpot(HotSpotKind.NESTED_LOOP, node,
+                                             f"嵌套循环输入过大: {sizes} = {format_number(product)} 次内层访问"))
+            misestimate = self._misestimate(node)
+            if misestimate:
+                spots.append(HotSpot(HotSpotKind.MISESTIMATE, node, misestimate))
+        return spots
+
+    @staticmethod
+    def _misestimate(node: PlanNode) -> Optional[str]:
+        """实际行数与预估行数偏差过大时返回说明"""
+        if node.actual_rows is None or node.estimated_rows is None:
+            return None
+        estimated = node.estimated_rows * max(node.actual_loops or 1, 1)
+        actual = node.actual_rows
+        if max(estimated, actual) < MISESTIMATE_MIN_ROWS:
+            return None
+        ratio = max(estimated, actual) / max(min(estimated, actual), 1)
+        if ratio < MISESTIMATE_RATIO:
+            return None
+        target = node.table or node.operation
+        return (f"行数估算偏差: {target} 预估 {format_number(estimated)} 行，实际 {format_number(actual)} 行，"
+                f"相差 {format_number(round(ratio, 1))} 倍，统计信息可能过期")
+
+    def render(self) -> str:
+        """用于提示词的文本：缩进的计划树和热点列表"""
+        if not self.nodes:
+            return self.raw or "未获取到执行计划"
+        header = f"执行计划（{self.dialect}，{'实际执行' if self.analyzed else '预估'}）"
+        if self.total_cost is not None:
+            header += f"，总成本 {format_number(self.total_cost)}"
+        lines = [header + ":"]
+        for node in self.nodes:
+            self._render_node(node, 0, lines)
+        spots = self.hot_spots()
+        if spots:
+            lines.append("热点:")
+            lines.extend(f"{index}. {spot.message}" for index, spot in enumerate(spots, start=1))
+        else:
+            lines.append("热点: 无")
+        return "\n".join(lines)
+
+    def _render_node(self, node: PlanNode, depth: int, lines: List[str]) -> None:
+        lines.append("  " * depth + "- " + node.describe())
+        for child in node.children:
+            self._render_node(child, depth + 1, lines)
+
+
+def link_nodes(entries: Iterable[Tuple[Any, Any, PlanNode]]) -> List[PlanNode]:
+    """
+    按 (节点id, 父节点id, 节点) 组装计划树，适用于 PLAN_TABLE、EXPLAIN QUERY PLAN 等按行返回的执行计划
+
+    Returns:
+        根节点列表，父节点不存在的节点视为根节点
+    """
+    entries = list(entries)
+    nodes = {node_id: node for node_id, _, node in entries}
+    roots = []
+    for node_id, parent_id, node in entries:
+        parent = nodes.get(parent_id) if parent_id != node_id else None
+        if parent is None:
+            roots.append(node)
+        else:
+            parent.children.append(node)
+    return roots
+
+
+def to_number(value) -> Optional[float]:
+    """将计划中的数值（可能是字符串或None）转换为float，无法转换时返回None"""
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def format_number(value: float) -> str:
+    """格式化计划中的数值：整数不带小数，小于1保留3位小数，其余保留2位"""
+    if float(value).is_integer():
+        return str(int(value))
+    return f"{value:.3f}" if abs(value) < 1 else f"{value:.2f}"
@@ -0,0 +1,304 @@
+"""
+索引结构分析
+各方言一次查询取出整个库/模式的索引定义（get_table_index 不指定表名），在本地按表分组，
+每张表的索引按列序列排序后只比较相邻的索引，O(n log n) 找出列完全相同的重复索引和
+被其他索引左前缀覆盖的冗余索引，同时标记列数过多的组合索引，结合索引大小估算删除后可回收的空间。
+分析只依赖索引定义，不需要 performance_schema 等运行时统计。
+"""
+
+from dataclasses import dataclass, field
+from enum import Enum
+from itertools import groupby
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from databases.base.explain_plan import format_number, to_number
+
+# 组合索引的列数超过该值视为过宽
+MAX_COMPOSITE_COLUMNS = 5
+
+# 不能按列序列比较覆盖关系的索引类型：全文、空间、哈希、位图、函数/表达式、部分索引、带包含列的索引等
+_UNCOMPARABLE_TYPES = {
+    "FULLTEXT", "SPATIAL", "HASH", "BITMAP", "XML", "COLUMNSTORE", "FUNCTION", "DOMAIN", "LOB", "CLUSTER",
+    "GIN", "GIST", "SPGIST", "BRIN", "BLOOM", "EXPRESSION", "PARTIAL", "FILTERED", "INCLUDE",
+}
+
+
+class IndexIssueKind(str, Enum):
+    """索引问题类型"""
+    # 与另一个索引的列序列完全相同
+    DUPLICATE = 'duplicate'
+    # 列序列是另一个索引的左前缀
+    REDUNDANT_PREFIX = 'redundant_prefix'
+    # 组合索引的列数过多
+    OVERSIZED = 'oversized'
+
+    @property
+    def label(self) -> str:
+        return _ISSUE_LABELS[self]
+
+
+_ISSUE_LABELS = {
+    IndexIssueKind.DUPLICATE: "重复索引",
+    IndexIssueKind.REDUNDANT_PREFIX: "左前缀冗余索引",
+    IndexIssueKind.OVERSIZED: f"过宽的组合索引（超过 {MAX_COMPOSITE_COLUMNS} 列）",
+}
+
+
+@dataclass(frozen=True)
+class IndexDefinition:
+    """
+    索引定义
+
+    Attributes:
+        table: 表名
+        name: 索引名
+        columns: 索引键列，按索引中的顺序，表达式列为None
+        unique: 是否唯一索引
+        primary: 是否主键或聚集索引，重复时优先保留
+        index_type: 数据库给出的索引类型
+        size_bytes: 索引大小(字节)，未知时为None
+    """
+    table: str
+    name: str
+    columns: Tuple[Optional[str], ...]
+    unique: bool = False
+    primary: bool = False
+    index_type: str = ""
+    size_bytes: Optional[float] = None
+
+    @property
+    def key(self) -> Tuple[str, ...]:
+        """用于比较的列序列，列名不区分大小写"""
+        return tuple(column.lower() for column in self.columns if column is not None)
+
+    @property
+    def comparable(self) -> bool:
+        """是否可以按列序列判断覆盖关系，表达式列和特殊类型的索引不参与比较"""
+        if not self.columns or any(column is None for column in self.columns):
+            return False
+        tokens = set(self.index_type.upper().replace("-", " ").replace("_", " ").split())
+        return not tokens & _UNCOMPARABLE_TYPES
+
+    @property
+    def rank(self) -> int:
+        """列序列相同时的保留优先级，主键、唯一索引优先"""
+        return 0 if self.primary else 1 if self.unique else 2
+
+    def describe(self) -> str:
+        columns = ", ".join(column if column is not None else "<表达式>" for column in self.columns)
+        return f"{self.table}.{self.name}({columns})"
+
+
+@dataclass
+class IndexIssue:
+    """
+    索引问题
+
+    Attributes:
+        kind: 问题类型
+        index: 有问题的索引，重复和冗余时为建议删除的索引
+        covered_by: 覆盖该索引的索引，过宽的组合索引为None
+    """
+    kind: IndexIssueKind
+    index: IndexDefinition
+    covered_by: Optional[IndexDefinition] = None
+
+    def describe(self) -> str:
+        if self.kind == IndexIssueKind.DUPLICATE:
+            line = f"{self.index.describe()} 与 {self.covered_by.describe()} 的列完全相同"
+        elif self.kind == IndexIssueKind.REDUNDANT_PREFIX:
+            line = f"{self.index.describe()} 是 {self.covered_by.describe()} 的左前缀"
+        else:
+            line = f"{self.index.describe()} 共 {len(self.index.columns)} 列"
+        if self.index.unique:
+            line += "，唯一索引，删除前确认没有约束或外键依赖"
+        if self.index.size_bytes is not None:
+            line += f"，大小 {format_size(self.index.size_bytes)}"
+        return line
+
+
+@dataclass
+class IndexAnalysis:
+    """
+    索引结构分析结果
+
+    Attributes:
+        index_count: 参与分析的索引数
+        table_count: 有索引的表数
+        issues: 索引问题，按表名、问题类型排列
+        sizes_known: 是否获取到了索引大小
+    """
+    index_count: int
+    table_count: int
+    issues: List[IndexIssue] = field(default_factory=list)
+    sizes_known: bool = False
+
+    @property
+    def removable(self) -> List[IndexDefinition]:
+        """建议删除的重复和冗余索引"""
+        removable = {}
+        for issue in self.issues:
+            if issue.kind != IndexIssueKind.OVERSIZED:
+                removable.setdefault((issue.index.table, issue.index.name), issue.index)
+        return list(removable.values())
+
+    @property
+    def reclaimable_bytes(self) -> float:
+        """删除重复和冗余索引可回收的空间"""
+        return sum(index.size_bytes or 0 for index in self.removable)
+
+    def render(self) -> str:
+        """用于提示词的文本：按问题类型列出索引和可回收空间"""
+        lines = [f"索引结构分析（{self.table_count} 张表，{self.index_count} 个索引）:"]
+        if not self.issues:
+            lines.append("未发现重复、左前缀冗余或过宽的组合索引")
+            return "\n".join(lines)
+        for kind in IndexIssueKind:
+            issues = [issue for issue in self.issues if issue.kind == kind]
+            if issues:
+                lines.append(f"{kind.label}:")
+                lines.extend(f"{index}. {issue.describe()}" for index, issue in enumerate(issues, start=1))
+        removable = self.removable
+        if removable:
+            if self.sizes_known:
+                unknown = sum(1 for index in removable if index.size_bytes is None)
+                line = (f"可回收空间: 删除 {len(removable)} 个重复和冗余索引约可回收 "
+                        f"{format_size(self.reclaimable_bytes)}")
+                if unknown:
+                    line += f"（其中 {unknown} 个索引大小未知）"
+                lines.append(line)
+            else:
+                lines.append(f"可回收空间: 未获取到索引大小，无法估算删除 {len(removable)} 个重复和冗余索引可回收的空间")
+        return "\n".join(lines)
+
+
+def collect_indexes(columns: Sequence[str], rows: Iterable[Sequence[Any]],
+                    sizes: Optional[Dict[Tuple[str, str], float]] = None) -> List[IndexDefinition]:
+    """
+    将 get_table_index 的查询结果（每行一个索引列）组装为索引定义
+
+    各方言的列名（不区分大小写）：table_name、index_name、column_name、seq_in_index，
+    唯一性为 non_unique 或 uniqueness，索引类型为 index_type 或 index_origin，
+    可选的 is_partial（SQLite 部分索引）和 sub_part（MySQL 前缀索引长度）；
+    seq_in_index 为0的行是 SQL Server 的包含列，不属于索引键，带包含列的索引不参与覆盖关系的比较
+
+    Args:
+        columns: 查询结果的列名
+        rows: 查询结果的行
+        sizes: 索引大小，键为小写的 (表名, 索引名)
+
+    Returns:
+        索引定义列表，按查询结果中首次出现的顺序排列
+    """
+    names = [column.lower() for column in columns]
+    grouped: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+    for row in rows:
+        record = dict(zip(names, row))
+        grouped.setdefault((str(record.get("table_name")), str(record.get("index_name"))), []).append(record)
+
+    indexes = []
+    for (table, name), records in grouped.items():
+        first = records[0]
+        keys = sorted((to_number(record.get("seq_in_index")) or 0, _column_name(record)) for record in records
+                      if (to_number(record.get("seq_in_index")) or 0) > 0)
+        index_type = str(first.get("index_type") or first.get("index_origin") or "")
+        if _is_true(first.get("is_partial")):
+            index_type += " PARTIAL"
+        if len(keys) < len(records):
+            index_type += " INCLUDE"
+        if "non_unique" in first:
+            unique = not _is_true(first.get("non_unique"))
+        else:
+            unique = str(first.get("uniqueness") or "").upper() == "UNIQUE"
+        primary = (name.upper() == "PRIMARY" or "PRIMARY" in index_type.upper()
+                   or index_type.upper() in ("CLUSTERED", "IOT - TOP"))
+        size = (sizes or {}).get((table.lower(), name.lower()))
+        indexes.append(IndexDefinition(table, name, tuple(column for _, column in keys), unique or primary,
+                                       primary, index_type, size))
+    return indexes
+
+
+def collect_sizes(columns: Sequence[str], rows: Iterable[Sequence[Any]]) -> Dict[Tuple[str, str], float]:
+    """
+    将索引大小查询的结果（列 table_name、index_name、size_bytes）转换为按小写 (表名, 索引名) 索引的大小，
+    同一索引的多行（分区）累加
+    """
+    names = [column.lower() for column in columns]
+    sizes: Dict[Tuple[str, str], float] = {}
+    for row in rows:
+        record = dict(zip(names, row))
+        size = to_number(record.get("size_bytes"))
+        if size is None:
+            continue
+        key = (str(record.get("table_name")).lower(), str(record.get("index_name")).lower())
+        sizes[key] = sizes.get(key, 0) + size
+    return sizes
+
+
+def analyze_indexes(indexes: Sequence[IndexDefinition], sizes_known: bool = False,
+                    max_columns: int = MAX_COMPOSITE_COLUMNS) -> IndexAnalysis:
+    """
+    找出重复索引、左前缀冗余索引和过宽的组合索引
+
+    每张表的可比较索引按列序列排序，相同列序列的索引相邻，保留优先级最高的一个，其余为重复索引；
+    若某个列序列是另一个索引的左前缀，排序后紧随其后的不同列序列必然也以它为前缀，
+    因此只需与下一组比较，唯一索引承担约束，不作为左前缀冗余
+
+    Args:
+        indexes: 索引定义
+        sizes_known: 是否获取到了索引大小
+        max_columns: 组合索引的列数超过该值视为过宽
+
+    Returns:
+        分析结果
+    """
+    issues: List[IndexIssue] = []
+    tables = {}
+    for index in indexes:
+        tables.setdefault(index.table, []).append(index)
+    for table in sorted(tables):
+        issues.extend(_analyze_table(tables[table], max_columns))
+    return IndexAnalysis(index_count=len(indexes), table_count=len(tables), issues=issues, sizes_known=sizes_known)
+
+
+def format_size(size_bytes: float) -> str:
+    """格式化字节数为 KB/MB/GB"""
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(size_bytes) < 1024 or unit == "GB":
+            return f"{format_number(round(size_bytes, 2))} {unit}"
+        size_bytes /= 1024
+    return f"{format_number(round(size_bytes, 2))} TB"
+
+
+def _analyze_table(indexes: List[IndexDefinition], max_columns: int) -> List[IndexIssue]:
+    comparable = sorted((index for index in indexes if index.comparable),
+                        key=lambda index: (index.key, index.rank, index.name))
+    groups = [list(group) for _, group in groupby(comparable, key=lambda index: index.key)]
+    issues = []
+    for position, group in enumerate(groups):
+        keeper = group[0]
+        issues.extend(IndexIssue(IndexIssueKind.DUPLICATE, duplicate, keeper) for duplicate in group[1:])
+        if keeper.unique or position + 1 >= len(groups):
+            continue
+        following = groups[position + 1][0]
+        if following.key[:len(keeper.key)] == keeper.key:
+            issues.append(IndexIssue(IndexIssueKind.REDUNDANT_PREFIX, keeper, following))
+    issues.extend(IndexIssue(IndexIssueKind.OVERSIZED, index) for index in indexes
+                  if len(index.columns) > max_columns)
+    return issues
+
+
+def _column_name(record: Dict[str, Any]) -> Optional[str]:
+    """索引列名，MySQL 前缀索引附加前缀长度，使其不与完整列的索引视为相同"""
+    column = record.get("column_name")
+    if column is None:
+        return None
+    sub_part = record.get("sub_part")
+    return f"{column}({sub_part})" if sub_part is not None else str(column)
+
+
+def _is_true(value: Any) -> bool:
+    """数据库返回的布尔值，可能是 bool、0/1 或字符串"""
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "t", "yes", "y")
+    return bool(value)
@@ -0,0 +1,93 @@
+"""
+结构化的数据库版本信息
+各方言查询一次版本后解析为厂商、主次版本号、版本类型，并推导出该版本支持的特性，
+工具据此选择方言特定的查询方式，而不是每次调用都查询版本文本。
+"""
+
+import re
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import FrozenSet, Iterable, Optional, Tuple
+
+_VERSION_PATTERN = re.compile(r'(\d+)\.(\d+)(?:\.(\d+))?')
+
+
+class Capability(str, Enum):
+    """数据库特性"""
+    # 实际执行语句获取各步骤的行数、耗时（EXPLAIN ANALYZE、SET STATISTICS XML、STATISTICS_LEVEL=ALL）
+    EXPLAIN_ANALYZE = 'explain_analyze'
+    # JSON 格式的执行计划
+    EXPLAIN_JSON = 'explain_json'
+    # 不可见索引，删除索引前可以先设为不可见观察影响
+    INVISIBLE_INDEXES = 'invisible_indexes'
+    WINDOW_FUNCTIONS = 'window_functions'
+    CTE = 'cte'
+    # OFFSET ... FETCH FIRST n ROWS ONLY 分页
+    FETCH_FIRST = 'fetch_first'
+    # MySQL performance_schema 已开启
+    PERFORMANCE_SCHEMA = 'performance_schema'
+    # MySQL 8.0 起锁信息在 performance_schema.data_locks/data_lock_waits，之前在 information_schema.innodb_locks
+    DATA_LOCKS = 'data_locks'
+    # PostgreSQL 已安装 pg_stat_statements 扩展
+    PG_STAT_STATEMENTS = 'pg_stat_statements'
+    # PostgreSQL 已安装 hypopg 扩展，可以创建假设索引
+    HYPOPG = 'hypopg'
+    # SQL Server 查询存储
+    QUERY_STORE = 'query_store'
+
+
+def parse_version_numbers(text: Optional[str]) -> Tuple[int, int, int]:
+    """从版本文本中解析第一个 主版本.次版本[.修订号]，解析失败时返回 (0, 0, 0)"""
+    match = _VERSION_PATTERN.search(text or "")
+    if not match:
+        return 0, 0, 0
+    major, minor, patch = match.groups()
+    return int(major), int(minor), int(patch or 0)
+
+
+@dataclass(frozen=True)
+class ServerVersion:
+    """
+    数据库版本
+
+    Attributes:
+        vendor: 厂商（mysql、mariadb、postgresql、oracle、mssqlserver、dameng、sqlite）
+        major: 主版本号
+        minor: 次版本号
+        patch: 修订号
+        edition: 版本类型，如 Enterprise Edition、Community，未知时为None
+        raw: 数据库返回的原始版本文本
+        capabilities: 该版本支持的特性
+    """
+    vendor: str
+    major: int
+    minor: int
+    patch: int = 0
+    edition: Optional[str] = None
+    raw: str = ""
+    capabilities: FrozenSet[Capability] = field(default_factory=frozenset)
+
+    @classmethod
+    def create(cls, vendor: str, numbers: Tuple[int, int, int], raw: str, edition: Optional[str] = None,
+               capabilities: Iterable[Capability] = ()) -> "ServerVersion":
+        major, minor, patch = numbers
+        return cls(vendor=vendor, major=major, minor=minor, patch=patch, edition=edition or None,
+                   raw=raw.strip(), capabilities=frozenset(capabilities))
+
+    @property
+    def number(self) -> str:
+        return f"{self.major}.{self.minor}.{self.patch}"
+
+    def at_least(self, major: int, minor: int = 0, patch: int = 0) -> bool:
+        """版本号是否不低于指定版本"""
+        return (self.major, self.minor, self.patch) >= (major, minor, patch)
+
+    def supports(self, capability: Capability) -> bool:
+        return capability in self.capabilities
+
+    def describe(self) -> str:
+        """用于提示词和版本查询结果的文本描述"""
+        lines = [self.raw, f"版本: {self.vendor} {self.number}" + (f" ({self.edition})" if self.edition else "")]
+        if self.capabilities:
+            lines.append("支持的特性: " + ", ".join(sorted(capability.value for capability in self.capabilities)))
+        return "\n".join(lines)
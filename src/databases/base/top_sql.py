@@ -0,0 +1,232 @@
+"""
+统一的 Top SQL 工作负载统计
+各方言从数据库自身的语句统计视图（performance_schema 摘要、pg_stat_statements、dm_exec_query_stats、
+V$SQLAREA 等）读取累计的执行次数、耗时和扫描量，按选定指标在数据库端排序取候选，
+本地将只有字面量不同的语句归一化为同一个摘要后合并、重新排序，优化从真正的热点语句开始。
+"""
+
+import re
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Dict, Iterable, List, Optional
+
+from databases.base.explain_plan import format_number, to_number
+
+# 默认返回的语句数
+DEFAULT_LIMIT = 10
+# 最多返回的语句数
+MAX_LIMIT = 50
+# 数据库端取 limit 的该倍数作为候选，本地合并归一化后相同的语句再截取
+CANDIDATE_FACTOR = 3
+# 输出的摘要文本最大长度
+MAX_DIGEST_LENGTH = 1000
+
+_COMMENT_PATTERN = re.compile(r'/\*.*?\*/|--[^\n]*', re.S)
+_STRING_PATTERN = re.compile(r"N?'(?:[^']|'')*'")
+# 不匹配标识符中的数字和 PostgreSQL 的 $1 占位符
+_NUMBER_PATTERN = re.compile(r'(?<![\w$.])-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?(?![\w.])')
+_IN_LIST_PATTERN = re.compile(r'\bIN\s*\(\s*\?(?:\s*,\s*\?)+\s*\)', re.I)
+_VALUES_PATTERN = re.compile(r'\bVALUES\s*(\([?\s,]*\))(?:\s*,\s*\([?\s,]*\))+', re.I)
+_WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
+class TopSqlOrder(str, Enum):
+    """Top SQL 的排序指标"""
+    TOTAL_TIME = 'total_time'
+    AVG_TIME = 'avg_time'
+    # 扫描量：有扫描行数（MySQL、达梦）时按扫描行数，否则按逻辑读
+    ROWS_EXAMINED = 'rows_examined'
+    EXECUTIONS = 'executions'
+
+    @property
+    def label(self) -> str:
+        return _ORDER_LABELS[self]
+
+
+_ORDER_LABELS = {
+    TopSqlOrder.TOTAL_TIME: "总耗时",
+    TopSqlOrder.AVG_TIME: "平均耗时",
+    TopSqlOrder.ROWS_EXAMINED: "扫描量",
+    TopSqlOrder.EXECUTIONS: "执行次数",
+}
+
+
+@dataclass
+class TopSqlEntry:
+    """
+    一条归一化语句的累计统计
+
+    Attributes:
+        digest: 归一化后的语句文本，字面量替换为 ?
+        executions: 执行次数
+        total_time_ms: 总耗时(毫秒)
+        digest_id: 数据库给出的摘要标识（DIGEST、queryid、query_hash、FORCE_MATCHING_SIGNATURE）
+        schema: 执行语句时的默认库/模式
+        rows_examined: 扫描行数
+        logical_reads: 逻辑读（块/页数）
+        rows_returned: 返回或影响的行数
+        no_index_used: 未使用索引的执行次数
+    """
+    digest: str
+    executions: float
+    total_time_ms: float
+    digest_id: Optional[str] = None
+    schema: Optional[str] = None
+    rows_examined: Optional[float] = None
+    logical_reads: Optional[float] = None
+    rows_returned: Optional[float] = None
+    no_index_used: Optional[float] = None
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> "TopSqlEntry":
+        """
+        由统计查询的一行创建，各方言的查询统一使用以下列别名（小写）：
+        sql_text、executions、total_time_ms、digest_id、schema_name、rows_examined、logical_reads、
+        rows_returned、no_index_used，不提供的列可以省略
+        """
+        digest_id = row.get("digest_id")
+        schema = row.get("schema_name")
+        return cls(
+            digest=str(row.get("sql_text") or ""),
+            executions=to_number(row.get("executions")) or 0,
+            total_time_ms=to_number(row.get("total_time_ms")) or 0,
+            digest_id=str(digest_id) if digest_id is not None else None,
+            schema=str(schema) if schema else None,
+            rows_examined=to_number(row.get("rows_examined")),
+            logical_reads=to_number(row.get("logical_reads")),
+            rows_returned=to_number(row.get("rows_returned")),
+            no_index_used=to_number(row.get("no_index_used")),
+        )
+
+    @property
+    def avg_time_ms(self) -> float:
+        return self.total_time_ms / max(self.executions, 1)
+
+    @property
+    def scanned(self) -> Optional[float]:
+        """扫描量，有扫描行数时使用扫描行数，否则使用逻辑读"""
+        return self.rows_examined if self.rows_examined is not None else self.logical_reads
+
+    def sort_key(self, order: TopSqlOrder) -> float:
+        if order == TopSqlOrder.TOTAL_TIME:
+            return self.total_time_ms
+        if order == TopSqlOrder.AVG_TIME:
+            return self.avg_time_ms
+        if order == TopSqlOrder.EXECUTIONS:
+            return self.executions
+        return self.scanned or 0
+
+    def merge(self, other: "TopSqlEntry") -> None:
+        """合并归一化后相同的另一条语句的统计"""
+        self.executions += other.executions
+        self.total_time_ms += other.total_time_ms
+        self.rows_examined = _add(self.rows_examined, other.rows_examined)
+        self.logical_reads = _add(self.logical_reads, other.logical_reads)
+        self.rows_returned = _add(self.rows_returned, other.rows_returned)
+        self.no_index_used = _add(self.no_index_used, other.no_index_used)
+        self.digest_id = self.digest_id or other.digest_id
+        self.schema = self.schema or other.schema
+
+    def describe(self) -> str:
+        parts = [f"执行 {format_number(self.executions)} 次",
+                 f"总耗时 {format_number(self.total_time_ms)}ms",
+                 f"平均 {format_number(self.avg_time_ms)}ms"]
+        if self.rows_examined is not None:
+            parts.append(f"扫描 {format_number(self.rows_examined)} 行")
+        if self.logical_reads is not None:
+            parts.append(f"逻辑读 {format_number(self.logical_reads)}")
+        if self.rows_returned is not None:
+            parts.append(f"返回 {format_number(self.rows_returned)} 行")
+        if self.no_index_used:
+            parts.append(f"未使用索引 {format_number(self.no_index_used)} 次")
+        if self.schema:
+            parts.append(f"库/模式 {self.schema}")
+        if self.digest_id:
+            parts.append(f"摘要 {self.digest_id}")
+        return "，".join(parts)
+
+
+@dataclass
+class TopSqlReport:
+    """
+    Top SQL 统计结果
+
+    Attributes:
+        dialect: 数据库类型
+        source: 统计来源的视图
+        order: 排序指标
+        entries: 按排序指标降序排列的语句
+        note: 统计范围等补充说明
+    """
+    dialect: str
+    source: str
+    order: TopSqlOrder
+    entries: List[TopSqlEntry]
+    note: Optional[str] = None
+
+    @classmethod
+    def ranked(cls, dialect: str, source: str, order: TopSqlOrder, entries: Iterable[TopSqlEntry],
+               limit: int, note: Optional[str] = None) -> "TopSqlReport":
+        """合并归一化后相同的语句，按排序指标降序取前 limit 条"""
+        return cls(dialect, source, order, rank_entries(entries, order, limit), note)
+
+    def render(self) -> str:
+        """用于提示词的文本：每条语句一行统计和归一化后的语句"""
+        header = f"Top SQL（{self.dialect}，来源 {self.source}，按{self.order.label}排序）"
+        lines = [header + ":"]
+        if self.note:
+            lines.append(self.note)
+        if not self.entries:
+            lines.append("没有语句统计数据")
+        for index, entry in enumerate(self.entries, start=1):
+            lines.append(f"{index}. {entry.describe()}")
+            lines.append(f"   {entry.digest}")
+        return "\n".join(lines)
+
+
+def normalize_sql(sql: str) -> str:
+    """
+    将语句归一化为摘要文本：去掉注释，字符串和数字字面量替换为 ?，IN 列表和多行 VALUES 折叠，合并空白
+
+    已由数据库归一化的文本（MySQL DIGEST_TEXT、pg_stat_statements 的 $n 占位符）归一化后不变
+    """
+    text = _COMMENT_PATTERN.sub(" ", sql or "")
+    text = _STRING_PATTERN.sub("?", text)
+    text = _NUMBER_PATTERN.sub("?", text)
+    text = _IN_LIST_PATTERN.sub("IN (...)", text)
+    text = _VALUES_PATTERN.sub(r"VALUES \1, ...", text)
+    text = _WHITESPACE_PATTERN.sub(" ", text).strip()
+    if len(text) > MAX_DIGEST_LENGTH:
+        text = text[:MAX_DIGEST_LENGTH] + " ..."
+    return text
+
+
+def rank_entries(entries: Iterable[TopSqlEntry], order: TopSqlOrder, limit: int) -> List[TopSqlEntry]:
+    """
+    按归一化文本合并语句统计，按排序指标降序取前 limit 条
+
+    Args:
+        entries: 各方言读取的语句统计，digest 为原始文本或数据库归一化的文本
+        order: 排序指标
+        limit: 返回的语句数
+
+    Returns:
+        合并后排序的语句统计
+    """
+    merged: Dict[str, TopSqlEntry] = {}
+    for entry in entries:
+        entry.digest = normalize_sql(entry.digest)
+        existing = merged.get(entry.digest)
+        if existing is None:
+            merged[entry.digest] = entry
+        else:
+            existing.merge(entry)
+    return sorted(merged.values(), key=lambda entry: entry.sort_key(order), reverse=True)[:limit]
+
+
+def _add(left: Optional[float], right: Optional[float]) -> Optional[float]:
+    if left is None:
+        return right
+    if right is None:
+        return left
+    return left + right
@@ -0,0 +1,272 @@
+"""
+假设索引评估（what-if）
+在不实际建立索引的前提下创建候选索引（PostgreSQL HypoPG 假设索引、Oracle 虚拟索引、SQL Server 假设索引，
+MySQL 使用已创建的不可见索引），重新获取预估执行计划，与原计划比较总成本并检查计划是否使用了该索引，
+sql_optimize 的索引建议据此给出实测的成本变化，而不是只凭经验推测。
+"""
+
+import re
+import uuid
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from databases.base.explain_plan import ExplainPlan, HotSpotKind, format_number
+
+# 每次评估的最大候选索引数，每个候选需要一次建索引和 EXPLAIN
+MAX_CANDIDATES = 5
+# 从执行计划热点自动生成的最大候选索引数
+MAX_SUGGESTED_CANDIDATES = 3
+
+# 标识符：不带引号的名称，或用双引号、反引号、方括号引起的名称（不能包含引号和控制字符）
+_IDENTIFIER = r'(?:[A-Za-z_][\w$#]*|"[^"\'`\[\]\x00-\x1f]+"|`[^"\'`\[\]\x00-\x1f]+`|\[[^"\'`\[\]\x00-\x1f]+\])'
+# 表名，可以带库名/模式名前缀
+_TABLE_NAME = rf'{_IDENTIFIER}(?:\s*\.\s*{_IDENTIFIER}){{0,2}}'
+_TABLE_PATTERN = re.compile(rf'^{_TABLE_NAME}$')
+# 索引列，可以带排序方向
+_COLUMN_PATTERN = re.compile(rf'^{_IDENTIFIER}(?:\s+(?:ASC|DESC))?$', re.I)
+_DIRECTION_PATTERN = re.compile(r'\s+(?:ASC|DESC)$', re.I)
+# 候选索引，如 orders(user_id, created_at)，多个候选以分号或逗号分隔
+_CANDIDATE_PATTERN = re.compile(rf'\s*({_TABLE_NAME})\s*\(([^()]*)\)\s*(?:[;,]|$)')
+# 语句中的 FROM 子句，到 WHERE 等子句、左括号（子查询、函数调用）或语句结束为止，之后的表引用不再解析
+_FROM_CLAUSE_PATTERN = re.compile(
+    r'\bFROM\b(.*?)(?=\bWHERE\b|\bGROUP\b|\bORDER\b|\bHAVING\b|\bLIMIT\b|\bUNION\b|\bWINDOW\b|\bFOR\b|[(;]|$)',
+    re.I | re.S)
+_JOIN_SEPARATOR_PATTERN = re.compile(
+    r',|\b(?:(?:NATURAL\s+)?(?:(?:LEFT|RIGHT|FULL)(?:\s+OUTER)?|INNER|CROSS)\s+)?JOIN\b|\bSTRAIGHT_JOIN\b', re.I)
+# 连接条件和 MySQL 索引提示，不属于表引用
+_JOIN_SUFFIX_PATTERN = re.compile(r'\s(?:ON|USING)\b.*|\s(?:USE|FORCE|IGNORE)\s+(?:INDEX|KEY)\b.*', re.I | re.S)
+_TABLE_REFERENCE_PATTERN = re.compile(rf'^\s*({_TABLE_NAME})(?:\s+(?:AS\s+)?({_IDENTIFIER}))?\s*$', re.I)
+# 计划中可以提取过滤列的条件说明前缀（PostgreSQL、MySQL、Oracle）
+_CONDITION_PREFIXES = ("filter", "index cond", "recheck cond", "条件", "access")
+# PostgreSQL 条件中的类型转换，如 (status)::text
+_CAST_PATTERN = re.compile(r'::"?\w+"?(?:\[\])?')
+# 条件中与其他值比较的列，列名可以带表名前缀和引号
+_PREDICATE_PATTERN = re.compile(
+    r'((?:[`"\[]?\w+[`"\]]?\s*\.\s*)*[`"\[]?[A-Za-z_]\w*[`"\]]?)\)*\s*(<=|>=|<>|!=|=|<|>|\bIN\b|\bLIKE\b|\bBETWEEN\b)',
+    re.I)
+_EQUALITY_OPERATORS = ("=", "IN")
+_RANGE_OPERATORS = ("<", ">", "<=", ">=", "LIKE", "BETWEEN")
+_KEYWORDS = {"and", "or", "not", "null", "true", "false", "any", "all"}
+
+
+@dataclass(frozen=True)
+class IndexCandidate:
+    """
+    候选索引
+
+    Attributes:
+        table: 表名
+        columns: 索引列，按索引中的顺序
+        source: 候选来源（用户指定、执行计划热点）
+    """
+    table: str
+    columns: Tuple[str, ...]
+    source: str = "用户指定"
+
+    def __post_init__(self):
+        # 表名和列名会直接拼接到建索引的 DDL 中，只接受标识符
+        if not _TABLE_PATTERN.match(self.table):
+            raise ValueError(f"候选索引的表名无效: {self.table}")
+        if not self.columns:
+            raise ValueError(f"候选索引 {self.table} 没有指定列")
+        for column in self.columns:
+            if not _COLUMN_PATTERN.match(column):
+                raise ValueError(f"候选索引 {self.table} 的列无效: {column}")
+
+    @property
+    def column_names(self) -> Tuple[str, ...]:
+        """不带引号和排序方向的列名"""
+        return tuple(unquote(_DIRECTION_PATTERN.sub("", column)) for column in self.columns)
+
+    def describe(self) -> str:
+        return f"{self.table}({', '.join(self.columns)})"
+
+
+@dataclass
+class WhatIfResult:
+    """
+    单个候选索引的评估结果
+
+    Attributes:
+        candidate: 候选索引
+        cost_after: 创建假设索引后的预估总成本
+        used: 执行计划是否使用了该索引
+        full_scans_removed: 消除的全表扫描热点数
+        error: 评估失败时的原因
+    """
+    candidate: IndexCandidate
+    cost_after: Optional[float] = None
+    used: bool = False
+    full_scans_removed: int = 0
+    error: Optional[str] = None
+
+    @classmethod
+    def compare(cls, candidate: IndexCandidate, baseline: ExplainPlan, plan: ExplainPlan,
+                index_name: str) -> "WhatIfResult":
+        """比较原计划与创建假设索引后的计划"""
+        used = any(node.index and node.index.lower() == index_name.lower() for node in plan.walk())
+        removed = _count_full_scans(baseline) - _count_full_scans(plan)
+        return cls(candidate, cost_after=plan.total_cost, used=used, full_scans_removed=max(removed, 0))
+
+
+@dataclass
+class WhatIfReport:
+    """
+    假设索引评估结果
+
+    Attributes:
+        method: 评估方式的说明
+        cost_before: 原计划的预估总成本
+        results: 各候选索引的评估结果
+    """
+    method: str
+    cost_before: Optional[float]
+    results: List[WhatIfResult] = field(default_factory=list)
+
+    def render(self) -> str:
+        """用于提示词的文本：每个候选索引的成本变化和是否被使用"""
+        lines = [f"假设索引评估（{self.method}）:"]
+        if self.cost_before is not None:
+            lines.append(f"原计划总成本 {format_number(self.cost_before)}")
+        if not self.results:
+            lines.append("没有候选索引，可以通过 index_candidates 参数指定，如 orders(user_id, created_at)")
+        for index, result in enumerate(self.results, start=1):
+            lines.append(f"{index}. {result.candidate.describe()}（{result.candidate.source}）: {self._describe(result)}")
+        return "\n".join(lines)
+
+    def _describe(self, result: WhatIfResult) -> str:
+        if result.error:
+            return f"评估失败: {result.error}"
+        parts = []
+        if self.cost_before is not None and result.cost_after is not None:
+            change = f"成本 {format_number(self.cost_before)} → {format_number(result.cost_after)}"
+            if self.cost_before:
+                delta = (result.cost_after - self.cost_before) / self.cost_before * 100
+                change += f"（{'+' if delta > 0 else ''}{format_number(round(delta, 1))}%）"
+            parts.append(change)
+        parts.append("执行计划使用了该索引" if result.used else "执行计划未使用该索引")
+        if result.full_scans_removed:
+            parts.append(f"消除 {result.full_scans_removed} 处全表扫描热点")
+        return "，".join(parts)
+
+
+def parse_candidates(text: Optional[str]) -> List[IndexCandidate]:
+    """
+    解析用户指定的候选索引，格式为 表名(列1, 列2)，多个候选以分号或逗号分隔，列可以带 ASC/DESC
+
+    Args:
+        text: 候选索引文本，如 "orders(user_id, created_at); items(order_id)"
+
+    Returns:
+        候选索引列表
+
+    Raises:
+        ValueError: 文本中有无法解析的部分，或表名、列名不是合法的标识符时抛出
+    """
+    text = text or ""
+    candidates = []
+    position = 0
+    while text[position:].strip():
+        match = _CANDIDATE_PATTERN.match(text, position)
+        if not match:
+            raise ValueError(f"无法解析候选索引: {text[position:].strip()}，格式为 表名(列1, 列2)")
+        table, columns = match.groups()
+        candidates.append(IndexCandidate(_join_name(table), tuple(column.strip() for column in columns.split(","))))
+        position = match.end()
+    return candidates
+
+
+def suggest_candidates(plan: ExplainPlan, limit: int = MAX_SUGGESTED_CANDIDATES,
+                       tables: Optional[Dict[str, str]] = None) -> List[IndexCandidate]:
+    """
+    根据执行计划的全表扫描热点生成候选索引：等值条件列在前，最多一个范围条件列在后
+
+    Args:
+        plan: 预估执行计划
+        limit: 最多生成的候选数
+        tables: 计划中的表名（MySQL 为语句中的别名）到实际表名的映射，不为None时跳过无法映射的表
+
+    Returns:
+        候选索引列表，过滤条件中没有可用列的全表扫描不生成候选
+    """
+    candidates: List[IndexCandidate] = []
+    for spot in plan.hot_spots():
+        node = spot.node
+        if spot.kind != HotSpotKind.FULL_SCAN or not node.table:
+            continue
+        table = node.table if tables is None else tables.get(unquote(node.table).lower())
+        columns = _predicate_columns(node.details)
+        if not table or not columns:
+            continue
+        try:
+            candidate = IndexCandidate(table, columns, "全表扫描热点")
+        except ValueError:
+            continue
+        if candidate not in candidates:
+            candidates.append(candidate)
+        if len(candidates) >= limit:
+            break
+    return candidates
+
+
+def table_references(sql: str) -> Dict[str, str]:
+    """
+    解析语句 FROM 子句中的表引用
+
+    Args:
+        sql: SQL语句
+
+    Returns:
+        小写的别名（没有别名时为不带库名的表名）到语句中表名的映射，子查询等无法解析的引用不包含在内
+    """
+    references: Dict[str, str] = {}
+    for clause in _FROM_CLAUSE_PATTERN.findall(sql or ""):
+        for reference in _JOIN_SEPARATOR_PATTERN.split(clause):
+            match = _TABLE_REFERENCE_PATTERN.match(_JOIN_SUFFIX_PATTERN.sub("", reference))
+            if not match:
+                continue
+            table, alias = _join_name(match.group(1)), match.group(2)
+            name = alias or re.findall(_IDENTIFIER, table)[-1]
+            references[unquote(name).lower()] = table
+    return references
+
+
+def _join_name(name: str) -> str:
+    """去掉限定名中点号两侧的空白"""
+    return re.sub(r'\s*\.\s*', '.', name)
+
+
+def unquote(identifier: str) -> str:
+    """去掉标识符的引号"""
+    if len(identifier) >= 2 and identifier[0] + identifier[-1] in ('""', '``', '[]'):
+        return identifier[1:-1]
+    return identifier
+
+
+def hypothetical_index_name() -> str:
+    """假设索引的名称，不超过 Oracle 的30字符限制"""
+    return f"smartdb_wi_{uuid.uuid4().hex[:12]}"
+
+
+def _predicate_columns(details: Sequence[str]) -> Tuple[str, ...]:
+    equality: List[str] = []
+    ranges: List[str] = []
+    for detail in details:
+        prefix, _, condition = detail.partition(":")
+        if not condition or prefix.strip().lower() not in _CONDITION_PREFIXES:
+            continue
+        for name, operator in _PREDICATE_PATTERN.findall(_CAST_PATTERN.sub("", condition)):
+            column = re.split(r'\s*\.\s*', name)[-1].strip('`"[]')
+            if column.lower() in _KEYWORDS:
+                continue
+            operator = operator.upper()
+            if operator in _EQUALITY_OPERATORS and column not in equality:
+                equality.append(column)
+            elif operator in _RANGE_OPERATORS and column not in ranges:
+                ranges.append(column)
+    ranges = [column for column in ranges if column not in equality]
+    return tuple(equality + ranges[:1])
+
+
+def _count_full_scans(plan: ExplainPlan) -> int:
+    return sum(1 for spot in plan.hot_spots() if spot.kind == HotSpotKind.FULL_SCAN)
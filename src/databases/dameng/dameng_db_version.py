@@ -1,4 +1,7 @@
+import re
+
 from databases.base.base import DatabaseVersion
+from databases.base.server_version import Capability, ServerVersion, parse_version_numbers
 from databases.dameng.dameng_queries import DamengQueries
 from utils.execute_sql_util import ExecuteSqlUtil
 
@@ -11,4 +14,16 @@ class DamengDatabaseVersionTool(DatabaseVersion):
 
         sql_result = ExecuteSqlUtil.execute_single_statement(pool_name, sql)
 
-        return ExecuteSqlUtil.format_result(sql_result)
\ No newline at end of file
+        return ExecuteSqlUtil.format_result(sql_result)
+
+    def get_server_version(self, pool_name: str) -> ServerVersion:
+        row = self._query_version_row(pool_name, DamengQueries.get_db_version())
+        # V$INSTANCE.SVR_VERSION 形如 "DM Database Server 64 V8"，具体版本号在 BUILD_VERSION 中
+        raw = str(row.get("svr_version") or "")
+        major = re.search(r'V(\d+)', raw)
+        numbers = parse_version_numbers(str(row.get("build_version") or ""))
+        if major:
+            numbers = (int(major.group(1)),) + numbers[1:]
+
+        return ServerVersion.create("dameng", numbers, raw,
+                                    capabilities=(Capability.WINDOW_FUNCTIONS, Capability.CTE))
@@ -5,10 +5,12 @@ from databases.base.base import (
     TableIndex,
     DatabaseHealth,
     SqlOptimize,
+    TopSql,
 )
 from databases.dameng.dameng_db_version import DamengDatabaseVersionTool
 from databases.dameng.dameng_health import DamengHealth
 from databases.dameng.dameng_optimize import DamengSqlOptimize
+from databases.dameng.dameng_top_sql import DamengTopSql
 from databases.dameng.dameng_table_description import DamengTableDescription
 from databases.dameng.dameng_table_index import DamengTableIndex
 from databases.dameng.dameng_table_name import DamengTableName
@@ -34,4 +36,7 @@ class DamengFactory(DatabaseOperationFactory):
         return DamengHealth()
 
     def create_sql_optimize(self) -> SqlOptimize:
-        return DamengSqlOptimize()
\ No newline at end of file
+        return DamengSqlOptimize()
+
+    def create_top_sql(self) -> TopSql:
+        return DamengTopSql()
@@ -1,4 +1,4 @@
-from config.dbconfig import get_db_config_by_name
+from databases.pool_context import PoolContext
 from databases.base.base import DatabaseHealth
 from typing import Dict, Any
 
@@ -22,10 +22,11 @@ class DamengHealth(DatabaseHealth):
         Returns:
             健康检查结果
         """
-        db_config = get_db_config_by_name(pool_name)
+        db_config = PoolContext.of(pool_name).config
 
         # 定义类型到方法的映射
         health_methods = {
+            "index": self.get_db_index,
             "connection": self.get_db_connection,
             "blocking": self.get_db_blocking,
             "resources": self.get_db_resources
@@ -43,6 +44,21 @@ class DamengHealth(DatabaseHealth):
 
         return result
 
+    def get_db_index(self, pool_name: str, db_config: Dict[str, Any]) -> str:
+        """
+        索引结构分析：重复索引、左前缀冗余索引、过宽的组合索引及可回收空间
+
+        Args:
+            pool_name: 数据库连接池名称
+            db_config: 数据库配置
+
+        Returns:
+            索引结构分析结果
+        """
+        schema = db_config.get("schema")
+        return self.analyze_index_catalog(pool_name, DamengQueries.get_table_index(schema),
+                                          DamengQueries.get_index_size(schema))
+
     def get_db_connection(self, pool_name: str, db_config: Dict[str, Any]) -> str:
         """
         连接情况分析
@@ -1,15 +1,66 @@
-from databases.base.base import SqlOptimize
+import re
+
+from databases.base.base import SqlOptimize, execute_or_raise
+from databases.base.explain_plan import AccessType, ExplainPlan, PlanFlag, PlanNode, to_number
 from databases.dameng.dameng_queries import DamengQueries
 
 from utils.execute_sql_util import ExecuteSqlUtil
 
+# 计划行，如 "3       #CSCN2: [1, 10000, 56]; INDEX33555484(T1)"，缩进表示层级
+_PLAN_LINE_PATTERN = re.compile(r'#([A-Z][A-Z0-9 _]*?)\s*:\s*\[(\d+),\s*(\d+),\s*(\d+)\](?:;\s*(.*))?')
+# 附加信息中的 索引名(表名)，对象名为大写，scan_type(ASC) 等小写的属性不匹配
+_INDEX_PATTERN = re.compile(r'\b([A-Z][A-Z0-9_$#]*)\(([A-Z][A-Z0-9_$#]*)\)')
+
+# 扫描操作符到访问方式的映射
+_ACCESS_TYPES = {
+    "CSCN2": AccessType.FULL_SCAN,
+    "SSCN": AccessType.INDEX_FULL_SCAN,
+    "SSEK2": AccessType.INDEX_SCAN,
+    "CSEK2": AccessType.INDEX_SCAN,
+}
+
 
 class DamengSqlOptimize(SqlOptimize):
-    def get_sql_explain(self, pool_name: str, text: str):
-        sql = "EXPLAIN FOR " + text
-        sql_explain = ExecuteSqlUtil.execute_single_statement(pool_name, sql)
+    def get_explain_plan(self, pool_name: str, text: str, analyze: bool = False) -> ExplainPlan:
+        # 不支持实际执行计划，始终返回预估计划
+        sql_result = execute_or_raise(pool_name, "EXPLAIN FOR " + text)
+        lines = [" ".join("" if value is None else str(value) for value in row) for row in sql_result.rows or []]
+        # 计划文本可能整体在一行中返回，按行拆分后逐行解析
+        lines = [line for text_line in lines for line in text_line.splitlines()]
+
+        roots, stack = [], []
+        for line in lines:
+            match = _PLAN_LINE_PATTERN.search(line)
+            if not match:
+                continue
+            node = self._parse_operator(match)
+            indent = match.start()
+            while stack and stack[-1][0] >= indent:
+                stack.pop()
+            (stack[-1][1].children if stack else roots).append(node)
+            stack.append((indent, node))
+
+        if not roots:
+            return ExplainPlan("dameng", raw="\n".join(lines))
+        return ExplainPlan("dameng", nodes=roots, total_cost=roots[0].estimated_cost)
 
-        return ExecuteSqlUtil.format_result(sql_explain)
+    @staticmethod
+    def _parse_operator(match) -> PlanNode:
+        """解析一行计划，格式为 #操作符: [成本, 行数, 行宽]; 附加信息"""
+        operator, cost, rows, extra = match.group(1).strip(), match.group(2), match.group(3), match.group(5)
+        node = PlanNode(operator, estimated_rows=to_number(rows), estimated_cost=to_number(cost))
+        index = _INDEX_PATTERN.search(extra or "")
+        if operator in _ACCESS_TYPES:
+            node.access = _ACCESS_TYPES[operator]
+            if index:
+                node.index, node.table = index.group(1), index.group(2)
+        if operator.startswith("SORT"):
+            node.flags.add(PlanFlag.FILESORT)
+        elif operator.startswith("NEST LOOP"):
+            node.flags.add(PlanFlag.NESTED_LOOP)
+        if extra:
+            node.details.append(extra.strip())
+        return node
 
     def get_table_size(self, pool_name: str, database: str, schema: str, table_name: str):
         # 将输入的表名按逗号分割成列表
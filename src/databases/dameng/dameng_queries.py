@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 
 
 class DamengQueries:
@@ -71,8 +71,21 @@ class DamengQueries:
         return sql
 
     @staticmethod
-    def get_table_index(schema: str, table_names: List[str]):
-        table_condition = "','".join(table_names)
+    def get_table_index(schema: str, table_names: Optional[List[str]] = None):
+        """
+        获取表索引的SQL查询
+
+        Args:
+            schema: 模式名称
+            table_names: 表名列表，为None时查询整个模式的索引
+
+        Returns:
+            SQL查询语句
+        """
+        table_filter = ""
+        if table_names is not None:
+            table_condition = "','".join(table_names)
+            table_filter = f"AND A.TABLE_NAME IN ('{table_condition}')"
         return f"""
             SELECT 
                 A.TABLE_NAME,
@@ -93,13 +106,42 @@ class DamengQueries:
                 AND A.TABLE_NAME = B.TABLE_NAME
             WHERE 
                 A.INDEX_OWNER = '{schema}'           
-                AND A.TABLE_NAME IN ('{table_condition}')
+                {table_filter}
             ORDER BY 
                 A.TABLE_NAME, 
                 A.INDEX_NAME, 
                 A.COLUMN_POSITION
         """
 
+    @staticmethod
+    def get_index_size(schema: str) -> str:
+        """
+        获取整个模式各索引大小的SQL查询
+
+        Args:
+            schema: 模式名称
+
+        Returns:
+            SQL查询语句
+        """
+        return f"""
+            SELECT 
+                I.TABLE_NAME,
+                I.INDEX_NAME,
+                SUM(S.BYTES) AS SIZE_BYTES
+            FROM 
+                ALL_INDEXES I
+            JOIN 
+                DBA_SEGMENTS S 
+                ON S.OWNER = I.OWNER 
+                AND S.SEGMENT_NAME = I.INDEX_NAME
+                AND S.SEGMENT_TYPE LIKE 'INDEX%'
+            WHERE 
+                I.OWNER = '{schema}'
+            GROUP BY 
+                I.TABLE_NAME, I.INDEX_NAME
+        """
+
     @staticmethod
     def get_current_connections():
         return "SELECT * FROM V$SESSIONS"
@@ -261,4 +303,28 @@ class DamengQueries:
             OWNER, SEGMENT_NAME
         ORDER BY 
             SUM(BYTES) DESC
-        """
\ No newline at end of file
+        """
+
+    @staticmethod
+    def get_top_sql(order_by: str, limit: int) -> str:
+        """
+        从 V$LONG_EXEC_SQLS 获取消耗最高的语句的SQL查询，该视图每行为一次执行时间超过阈值的执行，按语句文本合并
+
+        Args:
+            order_by: 排序表达式（V$LONG_EXEC_SQLS 列的聚合）
+            limit: 返回的语句数
+
+        Returns:
+            SQL查询语句
+        """
+        return f"""
+        SELECT
+            MAX(SQL_ID) AS DIGEST_ID,
+            SQL_TEXT,
+            COUNT(*) AS EXECUTIONS,
+            SUM(EXEC_TIME) AS TOTAL_TIME_MS
+        FROM V$LONG_EXEC_SQLS
+        GROUP BY SQL_TEXT
+        ORDER BY {order_by} DESC
+        LIMIT {limit}
+        """
@@ -1,4 +1,4 @@
-from config.dbconfig import get_db_configs, get_db_config_by_name
+from databases.pool_context import PoolContext
 from databases.base.base import TableDescription
 from databases.dameng.dameng_queries import DamengQueries
 from utils.execute_sql_util import ExecuteSqlUtil
@@ -8,7 +8,7 @@ from utils.execute_sql_util import ExecuteSqlUtil
 class DamengTableDescription(TableDescription):
 
     def get_table_description(self, pool_name: str,database: str, schema: str, table_name: str) -> str:
-        db_config = get_db_config_by_name(pool_name)
+        db_config = PoolContext.of(pool_name).config
 
         if schema is None:
             schema = db_config.get("schema")
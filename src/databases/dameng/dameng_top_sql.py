@@ -0,0 +1,19 @@
+from databases.base.base import TopSql
+from databases.base.top_sql import CANDIDATE_FACTOR, TopSqlOrder, TopSqlReport
+from databases.dameng.dameng_queries import DamengQueries
+
+# 排序指标对应的 V$LONG_EXEC_SQLS 列聚合，视图中没有扫描行数，按扫描量排序时使用总耗时
+_ORDER_COLUMNS = {
+    TopSqlOrder.TOTAL_TIME: "SUM(EXEC_TIME)",
+    TopSqlOrder.AVG_TIME: "SUM(EXEC_TIME) / COUNT(*)",
+    TopSqlOrder.ROWS_EXAMINED: "SUM(EXEC_TIME)",
+    TopSqlOrder.EXECUTIONS: "COUNT(*)",
+}
+
+
+class DamengTopSql(TopSql):
+
+    def get_top_sql(self, pool_name: str, order: TopSqlOrder, limit: int) -> TopSqlReport:
+        sql = DamengQueries.get_top_sql(_ORDER_COLUMNS[order], limit * CANDIDATE_FACTOR)
+        return TopSqlReport.ranked("dameng", "V$LONG_EXEC_SQLS", order, self._query_entries(pool_name, sql), limit,
+                                   note="只包含执行时间超过阈值的语句（需要开启 ENABLE_MONITOR），没有扫描行数")
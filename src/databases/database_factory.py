@@ -1,7 +1,8 @@
 from abc import ABC, abstractmethod
-from typing import ClassVar, Dict, Type
+from importlib import import_module
+from typing import ClassVar, Dict, Tuple, Type
 
-from config.dbconfig import get_db_config_by_name
+from connection.pool_manager import MultiDBPoolManager
 from databases.base.base import (
     TableDescription,
     DatabaseVersion,
@@ -9,6 +10,7 @@ from databases.base.base import (
     TableIndex,
     DatabaseHealth,
     SqlOptimize,
+    TopSql,
 )
 
 # 用于存储需要延迟注册的工厂类
@@ -27,6 +29,15 @@ def register_all_factories():
 
 
 class FactoryRegistry:
+    # 数据库类型 -> (工厂模块, 工厂类名)，方言包在首次使用该类型时才导入
+    FACTORY_MODULES: ClassVar[Dict[str, Tuple[str, str]]] = {
+        "mysql": ("databases.mysql.mysql_factory", "MySQLFactory"),
+        "postgresql": ("databases.postgresql.postgresql_factory", "PostgresqlFactory"),
+        "oracle": ("databases.oracle.oracle_factory", "OracleFactory"),
+        "mssqlserver": ("databases.mssqlserver.sqlserver_factory", "MSSQLServerFactory"),
+        "dameng": ("databases.dameng.dameng_factory", "DamengFactory"),
+        "sqlite": ("databases.sqlite.sqlite_factory", "SQLiteFactory"),
+    }
     # 存储工厂类而不是工厂实例
     _factory_classes: ClassVar[Dict[str, Type['DatabaseOperationFactory']]] = {}
     # 存储已创建的工厂实例
@@ -39,10 +50,19 @@ class FactoryRegistry:
         cls._factory_classes[factory.name] = factory
         return factory_class
 
+    @classmethod
+    def _load(cls, name: str) -> None:
+        """导入数据库类型对应的方言包，模块中的工厂类定义时加入待注册列表"""
+        if name in cls._factory_classes or name not in cls.FACTORY_MODULES:
+            return
+        import_module(cls.FACTORY_MODULES[name][0])
+        register_all_factories()
+
     @classmethod
     def get_factory_by_factory_name(cls, name: str) -> 'DatabaseOperationFactory':
-        # 延迟初始化：只有在需要时才创建实例
+        # 延迟初始化：只有在需要时才导入方言包并创建实例
         if name not in cls._instances:
+            cls._load(name)
             if name not in cls._factory_classes:
                 raise ValueError(f"工厂 {name} 未注册")
             cls._instances[name] = cls._factory_classes[name]()
@@ -50,15 +70,10 @@ class FactoryRegistry:
 
     @classmethod
     def get_factory_by_pool_name(cls, pool_name: str) -> 'DatabaseOperationFactory':
-        db_config = get_db_config_by_name(pool_name)
-        name = db_config.get("type")
-
-        # 延迟初始化：只有在需要时才创建实例
-        if name not in cls._instances:
-            if name not in cls._factory_classes:
-                raise ValueError(f"工厂 {name} 未注册")
-            cls._instances[name] = cls._factory_classes[name]()
-        return cls._instances[name]
+        db_config = MultiDBPoolManager.get_config(pool_name)
+        if db_config is None:
+            raise ValueError(f"Pool '{pool_name}' not found")
+        return cls.get_factory_by_factory_name(db_config.get("type"))
 
 class DatabaseOperationFactory(ABC):
     name: str = ""
@@ -88,6 +103,9 @@ class DatabaseOperationFactory(ABC):
     @abstractmethod
     def create_sql_optimize(self) -> "SqlOptimize":
         pass
+    @abstractmethod
+    def create_top_sql(self) -> "TopSql":
+        pass
 
     @classmethod
     def get_factory_by_pool_name(cls, pool_name: str) -> 'DatabaseOperationFactory':
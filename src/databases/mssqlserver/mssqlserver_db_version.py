@@ -1,4 +1,5 @@
 from databases.base.base import DatabaseVersion
+from databases.base.server_version import Capability, ServerVersion, parse_version_numbers
 from databases.mssqlserver.mssqlserver_queries import MSSQLServerQueries
 from utils.execute_sql_util import ExecuteSqlUtil
 
@@ -9,4 +10,20 @@ class MSSQLServerDatabaseVersion(DatabaseVersion):
 
         sql_result = ExecuteSqlUtil.execute_single_statement(pool_name, sql)
 
-        return ExecuteSqlUtil.format_result(sql_result)
\ No newline at end of file
+        return ExecuteSqlUtil.format_result(sql_result)
+
+    def get_server_version(self, pool_name: str) -> ServerVersion:
+        row = self._query_version_row(pool_name, MSSQLServerQueries.get_server_version())
+        raw = str(row.get("version") or "")
+        # ProductVersion 形如 16.0.1000.6，主版本 11 为 2012，13 为 2016
+        numbers = parse_version_numbers(str(row.get("product_version") or raw))
+
+        # SET STATISTICS XML 从 2005 起可用
+        capabilities = {Capability.WINDOW_FUNCTIONS, Capability.CTE, Capability.EXPLAIN_ANALYZE}
+        if numbers >= (11, 0, 0):
+            capabilities.add(Capability.FETCH_FIRST)
+        if numbers >= (13, 0, 0):
+            capabilities.add(Capability.QUERY_STORE)
+
+        return ServerVersion.create("mssqlserver", numbers, raw, edition=row.get("edition"),
+                                    capabilities=capabilities)
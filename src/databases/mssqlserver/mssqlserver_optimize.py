@@ -1,9 +1,187 @@
+import logging
+import xml.etree.ElementTree as ElementTree
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import text as sql_text
+
 from databases.base.base import SqlOptimize
+from databases.base.explain_plan import AccessType, ExplainPlan, PlanFlag, PlanNode, to_number
+from databases.base.what_if import IndexCandidate, hypothetical_index_name
+from databases.mssqlserver.mssqlserver_queries import MSSQLServerQueries
+from utils.execute_sql_util import ExecuteSqlUtil
+
+logger = logging.getLogger(__name__)
+
+_SHOWPLAN_NS = "{http://schemas.microsoft.com/sqlserver/2004/07/showplan}"
+_RELOP = _SHOWPLAN_NS + "RelOp"
+_OBJECT = _SHOWPLAN_NS + "Object"
+_RUNTIME_COUNTERS = _SHOWPLAN_NS + "RunTimeCountersPerThread"
+# SET STATISTICS XML ON 时实际执行计划所在结果集的列名
+_STATISTICS_XML_COLUMN = "Microsoft SQL Server 2005 XML Showplan"
+# 丢弃语句结果集时每次读取的行数
+_DISCARD_BATCH_SIZE = 1000
+
+# 物理操作符到访问方式的映射
+_ACCESS_TYPES = {
+    "Table Scan": AccessType.FULL_SCAN,
+    "Clustered Index Scan": AccessType.FULL_SCAN,
+    "Index Scan": AccessType.INDEX_FULL_SCAN,
+    "Index Seek": AccessType.INDEX_SCAN,
+    "Clustered Index Seek": AccessType.INDEX_SCAN,
+    "Key Lookup": AccessType.INDEX_LOOKUP,
+    "RID Lookup": AccessType.INDEX_LOOKUP,
+}
 
 
 class MSSQLServerSqlOptimize(SqlOptimize):
-    def get_sql_explain(self, pool_name: str, sql: str):
-        pass
+    def get_explain_plan(self, pool_name: str, sql: str, analyze: bool = False) -> ExplainPlan:
+        if analyze:
+            # SET STATISTICS XML ON 时语句会真正执行，在总是回滚的事务中执行，实际执行计划作为额外的结果集返回
+            ExecuteSqlUtil.check_analyzable(sql)
+            showplan = ExecuteSqlUtil.run_in_rollback(pool_name, [sql], lambda conn: self._run_with_statistics(conn, sql))
+            if not showplan:
+                return ExplainPlan("mssqlserver", raw="未获取到执行计划", analyzed=True)
+            plan = self._parse_showplan(showplan)
+            plan.analyzed = True
+            return plan
+
+        # SET SHOWPLAN_XML 必须单独成批且只对当前连接生效，开启、获取计划、关闭需要在同一个连接上执行
+        showplan = ExecuteSqlUtil.run_in_rollback(pool_name, [sql], lambda conn: self._run_with_showplan(conn, sql))
+        if not showplan:
+            return ExplainPlan("mssqlserver", raw="未获取到执行计划")
+        return self._parse_showplan(showplan)
+
+    def what_if_method(self, pool_name: str) -> Optional[str]:
+        return ("假设索引（WITH STATISTICS_ONLY = -1，只创建统计信息）配合 DBCC AUTOPILOT，在总是回滚的事务中创建，"
+                "需要 CREATE 权限，评估期间持有表的架构修改锁")
+
+    def _explain_with_index(self, pool_name: str, sql: str, candidate: IndexCandidate) -> Tuple[ExplainPlan, str]:
+        index_name = hypothetical_index_name()
+        create = (f"CREATE NONCLUSTERED INDEX {index_name} ON {candidate.table} ({', '.join(candidate.columns)}) "
+                  f"WITH STATISTICS_ONLY = -1")
+
+        def work(conn):
+            # DDL 在 SQL Server 中是事务性的，假设索引随事务回滚删除；
+            # SET AUTOPILOT 与 SET SHOWPLAN_XML 一样必须单独成批，开启后语句不执行，返回考虑了假设索引的预估计划
+            conn.execute(sql_text(create))
+            ids = conn.execute(sql_text(MSSQLServerQueries.get_index_ids(candidate.table, index_name))).one()
+            conn.execute(sql_text(f"DBCC AUTOPILOT(0, {ids[0]}, {ids[1]}, {ids[2]})"))
+            conn.execute(sql_text("SET AUTOPILOT ON"))
+            try:
+                return conn.execute(sql_text(sql)).scalar()
+            finally:
+                if not conn.invalidated:
+                    conn.execute(sql_text("SET AUTOPILOT OFF"))
+
+        showplan = ExecuteSqlUtil.run_in_rollback(pool_name, [sql, create], work)
+        if not showplan:
+            return ExplainPlan("mssqlserver", raw="未获取到执行计划"), index_name
+        return self._parse_showplan(showplan), index_name
+
+    @staticmethod
+    def _run_with_showplan(conn, sql: str) -> Optional[str]:
+        """开启 SHOWPLAN_XML 获取预估执行计划，语句不会执行"""
+        conn.execute(sql_text("SET SHOWPLAN_XML ON"))
+        try:
+            return conn.execute(sql_text(sql)).scalar()
+        finally:
+            if not conn.invalidated:
+                conn.execute(sql_text("SET SHOWPLAN_XML OFF"))
+
+    @staticmethod
+    def _run_with_statistics(conn, sql: str) -> Optional[str]:
+        """开启 STATISTICS XML 执行语句，丢弃语句本身的结果集，返回实际执行计划"""
+        conn.execute(sql_text("SET STATISTICS XML ON"))
+        showplan = None
+        # 语句结果集之后还有执行计划结果集，需要通过 DBAPI 游标逐个读取
+        cursor = conn.connection.cursor()
+        try:
+            cursor.execute(sql)
+            while True:
+                if cursor.description:
+                    if cursor.description[0][0] == _STATISTICS_XML_COLUMN:
+                        showplan = cursor.fetchone()[0]
+                    else:
+                        while cursor.fetchmany(_DISCARD_BATCH_SIZE):
+                            pass
+                if not cursor.nextset():
+                    break
+        finally:
+            cursor.close()
+            # 语句出错时也要关闭，否则连接归还连接池后后续查询仍会附带执行计划结果集
+            if not conn.invalidated:
+                try:
+                    conn.execute(sql_text("SET STATISTICS XML OFF"))
+                except Exception as e:
+                    logger.debug(f"Failed to reset STATISTICS XML: {e}")
+        return showplan
+
+    def _parse_showplan(self, showplan: str) -> ExplainPlan:
+        root = ElementTree.fromstring(showplan)
+        nodes: List[PlanNode] = []
+        total_cost: Optional[float] = None
+        for statement in root.iter(_SHOWPLAN_NS + "StmtSimple"):
+            cost = to_number(statement.get("StatementSubTreeCost"))
+            if cost is not None:
+                total_cost = (total_cost or 0) + cost
+            for query_plan in statement.iter(_SHOWPLAN_NS + "QueryPlan"):
+                nodes.extend(self._parse_relop(relop) for relop in self._child_relops(query_plan))
+                break
+        return ExplainPlan("mssqlserver", nodes=nodes, total_cost=total_cost)
+
+    def _parse_relop(self, relop: ElementTree.Element) -> PlanNode:
+        physical_op = relop.get("PhysicalOp", "")
+        node = PlanNode(
+            physical_op,
+            access=_ACCESS_TYPES.get(physical_op),
+            estimated_rows=to_number(relop.get("EstimateRows")),
+            estimated_cost=to_number(relop.get("EstimatedTotalSubtreeCost")),
+        )
+        own_elements = list(self._own_elements(relop))
+        counters = [element for element in own_elements if element.tag == _RUNTIME_COUNTERS]
+        if counters:
+            # 并行执行时每个线程一组计数，行数和读取次数求和，耗时取最大值
+            node.actual_rows = sum(to_number(counter.get("ActualRows")) or 0 for counter in counters)
+            node.actual_loops = sum(to_number(counter.get("ActualExecutions")) or 0 for counter in counters)
+            elapsed = [to_number(counter.get("ActualElapsedms")) for counter in counters]
+            if any(value is not None for value in elapsed):
+                node.actual_time_ms = max(value for value in elapsed if value is not None)
+            for attribute, name in (("ActualLogicalReads", "logical_reads"), ("ActualPhysicalReads", "physical_reads")):
+                total = sum(to_number(counter.get(attribute)) or 0 for counter in counters)
+                if total:
+                    node.io[name] = total
+        # 当前操作符访问的对象
+        table_object = next((element for element in own_elements if element.tag == _OBJECT), None)
+        if table_object is not None:
+            node.table = (table_object.get("Table") or "").strip("[]") or None
+            node.index = (table_object.get("Index") or "").strip("[]") or None
+        if physical_op == "Sort":
+            node.flags.add(PlanFlag.FILESORT)
+        elif physical_op in ("Table Spool", "Index Spool", "Eager Spool"):
+            node.flags.add(PlanFlag.TEMPORARY)
+        elif physical_op == "Nested Loops":
+            node.flags.add(PlanFlag.NESTED_LOOP)
+        logical_op = relop.get("LogicalOp")
+        if logical_op and logical_op != physical_op:
+            node.details.append(logical_op)
+        node.children = [self._parse_relop(child) for child in self._child_relops(relop)]
+        return node
+
+    def _own_elements(self, element: ElementTree.Element) -> Iterator[ElementTree.Element]:
+        """属于当前操作符的元素（先序），不进入嵌套的 RelOp"""
+        for child in element:
+            if child.tag == _RELOP:
+                continue
+            yield child
+            yield from self._own_elements(child)
+
+    def _child_relops(self, element: ElementTree.Element) -> Iterator[ElementTree.Element]:
+        """下一层的 RelOp，不进入嵌套的 RelOp"""
+        for child in element:
+            if child.tag == _RELOP:
+                yield child
+            else:
+                yield from self._child_relops(child)
 
     def get_table_size(self, pool_name: str, database: str, schema: str, table_name: str):
-        pass
\ No newline at end of file
+        pass
@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 
 
 class MSSQLServerQueries:
@@ -12,6 +12,20 @@ class MSSQLServerQueries:
         """
         return "SELECT @@VERSION;"
 
+    @staticmethod
+    def get_server_version() -> str:
+        """
+        获取解析版本和特性所需信息的SQL查询：版本文本、产品版本号、版本类型
+
+        Returns:
+            SQL查询语句
+        """
+        return """
+            SELECT @@VERSION AS version,
+                   CAST(SERVERPROPERTY('ProductVersion') AS NVARCHAR(128)) AS product_version,
+                   CAST(SERVERPROPERTY('Edition') AS NVARCHAR(128)) AS edition
+        """
+
     @staticmethod
     def get_table_names(database: str, schema: str, text: str) -> str:
         """
@@ -84,10 +98,24 @@ class MSSQLServerQueries:
                        """
 
     @staticmethod
-    def get_table_index(database:str, schema: str, table_names: List[str]) -> str:
+    def get_table_index(database:str, schema: str, table_names: Optional[List[str]] = None) -> str:
+        """
+        获取表索引的SQL查询，包含列的 SEQ_IN_INDEX 为0，筛选索引的类型带 FILTERED 标记
+
+        Args:
+            database: 数据库名称
+            schema: 模式名称
+            table_names: 表名列表，为None时查询整个模式的索引
+
+        Returns:
+            SQL查询语句
+        """
         db_prefix = f"[{database}]."
 
-        table_condition = "','".join(table_names)
+        table_filter = ""
+        if table_names is not None:
+            table_condition = "','".join(table_names)
+            table_filter = f"AND t.name IN ('{table_condition}')"
 
         return f"""
             SELECT 
@@ -96,7 +124,7 @@ class MSSQLServerQueries:
                 c.name AS COLUMN_NAME,
                 ic.key_ordinal AS SEQ_IN_INDEX,
                 CASE WHEN i.is_unique = 0 THEN 1 ELSE 0 END AS NON_UNIQUE,
-                i.type_desc AS INDEX_TYPE
+                i.type_desc + CASE WHEN i.has_filter = 1 THEN ' FILTERED' ELSE '' END AS INDEX_TYPE
             FROM 
                 {db_prefix}sys.indexes i
             INNER JOIN 
@@ -109,12 +137,45 @@ class MSSQLServerQueries:
                 {db_prefix}sys.schemas s ON t.schema_id = s.schema_id
             WHERE 
                 s.name = '{schema}'  
-                AND t.name IN ('{table_condition}') 
+                {table_filter}
                 AND i.type_desc != 'HEAP' 
             ORDER BY 
                 t.name, i.name, ic.key_ordinal;
             """
 
+    @staticmethod
+    def get_index_size(database: str, schema: str) -> str:
+        """
+        获取整个模式各索引大小的SQL查询（已使用页数乘以8KB，各分区累加）
+
+        Args:
+            database: 数据库名称
+            schema: 模式名称
+
+        Returns:
+            SQL查询语句
+        """
+        db_prefix = f"[{database}]."
+        return f"""
+            SELECT 
+                t.name AS TABLE_NAME,
+                i.name AS INDEX_NAME,
+                SUM(ps.used_page_count) * 8192 AS SIZE_BYTES
+            FROM 
+                {db_prefix}sys.dm_db_partition_stats ps
+            INNER JOIN 
+                {db_prefix}sys.indexes i ON ps.object_id = i.object_id AND ps.index_id = i.index_id
+            INNER JOIN 
+                {db_prefix}sys.tables t ON i.object_id = t.object_id
+            INNER JOIN 
+                {db_prefix}sys.schemas s ON t.schema_id = s.schema_id
+            WHERE 
+                s.name = '{schema}'
+                AND i.index_id > 0
+            GROUP BY 
+                t.name, i.name;
+            """
+
     @staticmethod
     def get_max_connections() -> str:
         return """
@@ -302,4 +363,53 @@ class MSSQLServerQueries:
         WHERE object_name LIKE '%Buffer Node%'
           AND counter_name = 'Page life expectancy'
           AND instance_name = '';
-        """
\ No newline at end of file
+        """
+
+    @staticmethod
+    def get_top_sql(order_by: str, limit: int) -> str:
+        """
+        从 sys.dm_exec_query_stats 获取计划缓存中消耗最高的语句的SQL查询
+        按 query_hash 合并只有字面量不同的语句，耗时单位为微秒，转换为毫秒
+
+        Args:
+            order_by: 排序表达式（dm_exec_query_stats 列的聚合）
+            limit: 返回的语句数
+
+        Returns:
+            SQL查询语句
+        """
+        return f"""
+        SELECT TOP {limit}
+            CONVERT(VARCHAR(18), qs.query_hash, 1) AS digest_id,
+            MIN(CAST(SUBSTRING(st.text, qs.statement_start_offset / 2 + 1,
+                (CASE qs.statement_end_offset WHEN -1 THEN DATALENGTH(st.text)
+                      ELSE qs.statement_end_offset END - qs.statement_start_offset) / 2 + 1) AS NVARCHAR(4000))) AS sql_text,
+            MIN(DB_NAME(st.dbid)) AS schema_name,
+            SUM(qs.execution_count) AS executions,
+            SUM(qs.total_elapsed_time) / 1000.0 AS total_time_ms,
+            SUM(qs.total_logical_reads) AS logical_reads,
+            SUM(qs.total_rows) AS rows_returned
+        FROM sys.dm_exec_query_stats qs
+        CROSS APPLY sys.dm_exec_sql_text(qs.sql_handle) st
+        GROUP BY qs.query_hash
+        ORDER BY {order_by} DESC;
+        """
+
+    @staticmethod
+    def get_index_ids(table_name: str, index_name: str) -> str:
+        """
+        获取 DBCC AUTOPILOT 所需的数据库id、表id和索引id的SQL查询
+
+        Args:
+            table_name: 表名，可以带架构名
+            index_name: 索引名
+
+        Returns:
+            SQL查询语句
+        """
+        return f"""
+        SELECT DB_ID() AS database_id, i.object_id, i.index_id
+        FROM sys.indexes i
+        WHERE i.object_id = OBJECT_ID('{table_name}')
+          AND i.name = '{index_name}';
+        """
@@ -1,4 +1,4 @@
-from config.dbconfig import get_db_config_by_name
+from databases.pool_context import PoolContext
 from databases.base.base import TableIndex
 from databases.mssqlserver.mssqlserver_queries import MSSQLServerQueries
 from utils.execute_sql_util import ExecuteSqlUtil
@@ -6,7 +6,7 @@ from utils.execute_sql_util import ExecuteSqlUtil
 
 class MSSQLServerTableIndex(TableIndex):
     def get_table_index(self, pool_name: str, database: str, schema: str, table_name: str) -> str:
-        db_config = get_db_config_by_name(pool_name)
+        db_config = PoolContext.of(pool_name).config
 
         if database is None:
             database = db_config.get("database")
@@ -0,0 +1,20 @@
+from databases.base.base import TopSql
+from databases.base.top_sql import CANDIDATE_FACTOR, TopSqlOrder, TopSqlReport
+from databases.mssqlserver.mssqlserver_queries import MSSQLServerQueries
+
+# 排序指标对应的 dm_exec_query_stats 列聚合
+_ORDER_COLUMNS = {
+    TopSqlOrder.TOTAL_TIME: "SUM(qs.total_elapsed_time)",
+    TopSqlOrder.AVG_TIME: "SUM(qs.total_elapsed_time) / SUM(qs.execution_count)",
+    TopSqlOrder.ROWS_EXAMINED: "SUM(qs.total_logical_reads)",
+    TopSqlOrder.EXECUTIONS: "SUM(qs.execution_count)",
+}
+
+
+class MSSQLServerTopSql(TopSql):
+
+    def get_top_sql(self, pool_name: str, order: TopSqlOrder, limit: int) -> TopSqlReport:
+        sql = MSSQLServerQueries.get_top_sql(_ORDER_COLUMNS[order], limit * CANDIDATE_FACTOR)
+        return TopSqlReport.ranked("mssqlserver", "sys.dm_exec_query_stats", order,
+                                   self._query_entries(pool_name, sql), limit,
+                                   note="统计范围为计划缓存中的语句，计划被淘汰或实例重启后清零，扫描量为逻辑读（页数）")
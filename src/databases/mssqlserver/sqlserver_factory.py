@@ -5,6 +5,7 @@ from databases.base.base import (
     TableIndex,
     DatabaseHealth,
     SqlOptimize,
+    TopSql,
 )
 from databases.database_factory import DatabaseOperationFactory
 from databases.mssqlserver.mssqlserver_db_version import MSSQLServerDatabaseVersion
@@ -12,6 +13,7 @@ from databases.mssqlserver.mssqlserver_health import MSSQLServerHealth
 from databases.mssqlserver.mssqlserver_table_description import MSSQLServerTableDescription
 from databases.mssqlserver.mssqlserver_table_index import MSSQLServerTableIndex
 from databases.mssqlserver.mssqlserver_optimize import MSSQLServerSqlOptimize
+from databases.mssqlserver.mssqlserver_top_sql import MSSQLServerTopSql
 
 
 class MSSQLServerFactory(DatabaseOperationFactory):
@@ -34,4 +36,5 @@ class MSSQLServerFactory(DatabaseOperationFactory):
     def create_sql_optimize(self) -> SqlOptimize:
         return MSSQLServerSqlOptimize()
 
-
+    def create_top_sql(self) -> TopSql:
+        return MSSQLServerTopSql()
@@ -1,4 +1,5 @@
 from databases.base.base import DatabaseVersion
+from databases.base.server_version import Capability, ServerVersion, parse_version_numbers
 from utils.execute_sql_util import ExecuteSqlUtil
 from databases.mysql.mysql_queries import MySQLQueries
 
@@ -10,4 +11,32 @@ class MySQLDatabaseVersionTool(DatabaseVersion):
 
         sql_result = ExecuteSqlUtil.execute_single_statement(pool_name, sql)
 
-        return ExecuteSqlUtil.format_result(sql_result)
\ No newline at end of file
+        return ExecuteSqlUtil.format_result(sql_result)
+
+    def get_server_version(self, pool_name: str) -> ServerVersion:
+        row = self._query_version_row(pool_name, MySQLQueries.get_server_version())
+        raw = str(row.get("version") or "")
+        comment = str(row.get("version_comment") or "")
+        numbers = parse_version_numbers(raw)
+        is_mariadb = "mariadb" in f"{raw} {comment}".lower()
+
+        capabilities = set()
+        if str(row.get("performance_schema")) in ("1", "ON"):
+            capabilities.add(Capability.PERFORMANCE_SCHEMA)
+        if is_mariadb:
+            # MariaDB 的版本号与 MySQL 不对应，10.2 起支持窗口函数和CTE，EXPLAIN FORMAT=JSON 从 10.1 起支持
+            if numbers >= (10, 1, 0):
+                capabilities.add(Capability.EXPLAIN_JSON)
+            if numbers >= (10, 2, 0):
+                capabilities.update((Capability.WINDOW_FUNCTIONS, Capability.CTE))
+        else:
+            if numbers >= (5, 6, 5):
+                capabilities.add(Capability.EXPLAIN_JSON)
+            if numbers >= (8, 0, 0):
+                capabilities.update((Capability.WINDOW_FUNCTIONS, Capability.CTE,
+                                     Capability.INVISIBLE_INDEXES, Capability.DATA_LOCKS))
+            if numbers >= (8, 0, 18):
+                capabilities.add(Capability.EXPLAIN_ANALYZE)
+
+        return ServerVersion.create("mariadb" if is_mariadb else "mysql", numbers, raw,
+                                    edition=comment, capabilities=capabilities)
@@ -5,6 +5,7 @@ from databases.base.base import (
     TableIndex,
     DatabaseHealth,
     SqlOptimize,
+    TopSql,
 )
 from databases.database_factory import DatabaseOperationFactory
 from databases.mysql.mysql_db_version import MySQLDatabaseVersionTool
@@ -13,6 +14,7 @@ from databases.mysql.mysql_table_index import MySQLTableIndex
 from databases.mysql.mysql_table_name import MySQLTableName
 from databases.mysql.mysql_health import MySQLHealth
 from databases.mysql.mysql_optimize import MySQLSqlOptimize
+from databases.mysql.mysql_top_sql import MySQLTopSql
 
 
 class MySQLFactory(DatabaseOperationFactory):
@@ -35,4 +37,7 @@ class MySQLFactory(DatabaseOperationFactory):
         return MySQLHealth()
 
     def create_sql_optimize(self) -> SqlOptimize:
-        return MySQLSqlOptimize()
\ No newline at end of file
+        return MySQLSqlOptimize()
+
+    def create_top_sql(self) -> TopSql:
+        return MySQLTopSql()
@@ -1,5 +1,6 @@
-from config.dbconfig import get_db_config_by_name
+from databases.pool_context import PoolContext
 from databases.base.base import DatabaseHealth
+from databases.base.server_version import Capability
 from typing import Dict, Any, List
 
 from databases.mysql.mysql_queries import MySQLQueries
@@ -9,7 +10,7 @@ from utils.execute_sql_util import ExecuteSqlUtil
 class MySQLHealth(DatabaseHealth):
 
     def get_db_health(self, pool_name: str, health_type: str) -> str:
-        db_config = get_db_config_by_name(pool_name)
+        db_config = PoolContext.of(pool_name).config
         """
         根据健康检查类型执行相应的检查方法
 
@@ -22,7 +23,7 @@ class MySQLHealth(DatabaseHealth):
         """
         # 定义类型到方法的映射
         health_methods = {
-            #"index": self.get_db_index,
+            "index": self.get_db_index,
             "connection": self.get_db_connection,
             "blocking": self.get_db_blocking,
             "resources": self.get_db_resources
@@ -42,7 +43,7 @@ class MySQLHealth(DatabaseHealth):
 
     def get_db_index(self, pool_name: str, db_config: Dict[str, Any]) -> str:
         """
-        索引健康分析
+        索引健康分析：按索引定义分析重复、冗余和过宽的组合索引，再结合 performance_schema 的索引使用统计
 
         Args:
             pool_name: 数据库连接池名称
@@ -50,7 +51,11 @@ class MySQLHealth(DatabaseHealth):
         Returns:
             索引健康分析结果
         """
-        # 获取冗余索引情况
+        database = db_config["database"]
+        structure = self.analyze_index_catalog(pool_name, MySQLQueries.get_table_index(database),
+                                               MySQLQueries.get_index_size(database))
+
+        # 获取未使用的索引情况
         redundant_sql = MySQLQueries.get_db_health_index_redundant(db_config["database"])
         redundant_result = ExecuteSqlUtil.execute_single_statement(pool_name, redundant_sql)
 
@@ -64,7 +69,9 @@ class MySQLHealth(DatabaseHealth):
 
         # 格式化结果
         formatted_results = []
-        formatted_results.append("- 冗余索引情况")
+        formatted_results.append("- 索引结构分析")
+        formatted_results.append(structure)
+        formatted_results.append("\n- 未使用的索引情况（performance_schema 统计中没有任何访问）")
         formatted_results.append(ExecuteSqlUtil.format_result(redundant_result))
         formatted_results.append("\n- 性能较差的索引情况")
         formatted_results.append(ExecuteSqlUtil.format_result(slow_result))
@@ -117,7 +124,7 @@ class MySQLHealth(DatabaseHealth):
         return "\n".join(result_parts)
 
     def get_db_blocking(self, pool_name: str,db_config: Dict[str, Any]) -> str:
-        blocking_sql = MySQLQueries.get_blocking()
+        blocking_sql = MySQLQueries.get_blocking(PoolContext.of(pool_name).supports(Capability.DATA_LOCKS))
         blocking_results = ExecuteSqlUtil.execute_multiple_statements(pool_name, blocking_sql)
         
         # 格式化所有结果
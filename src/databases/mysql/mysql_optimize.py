@@ -1,16 +1,259 @@
-from databases.base.base import SqlOptimize
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import text as sql_text
+
+from core.exceptions import SQLExecutionError
+from databases.base.base import SqlOptimize, execute_or_raise
+from databases.base.explain_plan import AccessType, ExplainPlan, PlanFlag, PlanNode, to_number
+from databases.base.server_version import Capability
+from databases.base.what_if import IndexCandidate, table_references, unquote
 from databases.mysql.mysql_queries import MySQLQueries
+from databases.pool_context import PoolContext
 from utils.execute_sql_util import ExecuteSqlUtil
 
+# EXPLAIN 的 type/access_type 到访问方式的映射
+_ACCESS_TYPES = {
+    "ALL": AccessType.FULL_SCAN,
+    "index": AccessType.INDEX_FULL_SCAN,
+    "range": AccessType.INDEX_SCAN,
+    "index_merge": AccessType.INDEX_SCAN,
+    "ref": AccessType.INDEX_LOOKUP,
+    "ref_or_null": AccessType.INDEX_LOOKUP,
+    "eq_ref": AccessType.INDEX_LOOKUP,
+    "const": AccessType.INDEX_LOOKUP,
+    "system": AccessType.INDEX_LOOKUP,
+    "fulltext": AccessType.INDEX_LOOKUP,
+    "unique_subquery": AccessType.INDEX_LOOKUP,
+    "index_subquery": AccessType.INDEX_LOOKUP,
+}
+
+# EXPLAIN ANALYZE 树形输出的一行，如
+# "    -> Table scan on t1  (cost=1.15 rows=9) (actual time=0.030..0.040 rows=9 loops=1)"
+_ANALYZE_LINE_PATTERN = re.compile(
+    r'^(\s*)-> (.*?)(?:\s+\(cost=(?:[\d.e+]+\.\.)?([\d.e+]+) rows=([\d.e+]+)\))?'
+    r'(?:\s+\(actual time=[\d.e+]+\.\.([\d.e+]+) rows=([\d.e+]+) loops=(\d+)\)|\s+\(never executed\))?\s*$')
+# 表访问，如 "Index range scan on t1 using idx_a over (...)"、"Single-row index lookup on t2 using PRIMARY (id=t1.id)"
+_ANALYZE_ACCESS_PATTERN = re.compile(r'^(.*?(?:scan|lookup)) on (\S+)(?: using (\S+))?')
+
+# 包含下层操作的分组节点
+_GROUP_OPERATIONS = ("ordering_operation", "grouping_operation", "duplicates_removal", "windowing")
+
 
 class MySQLSqlOptimize(SqlOptimize):
 
-    def get_sql_explain(self, pool_name: str, text: str):
-        sql = "EXPLAIN " + text
+    def get_explain_plan(self, pool_name: str, text: str, analyze: bool = False) -> ExplainPlan:
+        context = PoolContext.of(pool_name)
+        if analyze and context.supports(Capability.EXPLAIN_ANALYZE):
+            # EXPLAIN ANALYZE（8.0.18 起）会真正执行语句，在总是回滚的事务中执行，只输出树形文本
+            ExecuteSqlUtil.check_analyzable(text)
+            sql = "EXPLAIN ANALYZE " + text
+            tree = ExecuteSqlUtil.run_in_rollback(pool_name, [sql], lambda conn: conn.execute(sql_text(sql)).scalar())
+            return self._parse_analyze_tree(tree or "")
+
+        # EXPLAIN FORMAT=JSON 从 5.6.5 起支持，更早的版本解析表格格式
+        if not context.supports(Capability.EXPLAIN_JSON):
+            sql_result = execute_or_raise(pool_name, "EXPLAIN " + text)
+            rows = [dict(zip(sql_result.columns, row)) for row in sql_result.rows or []]
+            return ExplainPlan("mysql", nodes=[self._parse_table_row(row) for row in rows])
+
+        sql_result = execute_or_raise(pool_name, "EXPLAIN FORMAT=JSON " + text)
+        if not sql_result.rows:
+            return ExplainPlan("mysql", raw=ExecuteSqlUtil.format_result(sql_result))
+        return self._parse_json(sql_result.rows[0][0])
+
+    def what_if_method(self, pool_name: str) -> Optional[str]:
+        if PoolContext.of(pool_name).supports(Capability.INVISIBLE_INDEXES):
+            return "MySQL 没有假设索引，评估已创建的不可见索引，只在当前连接中启用 use_invisible_indexes"
+        return None
+
+    def _plan_tables(self, sql: str) -> Optional[Dict[str, str]]:
+        # EXPLAIN FORMAT=JSON 的 table_name 是语句中的别名，按 FROM 子句映射到实际表，无法映射的不生成候选
+        return table_references(sql)
+
+    def _explain_with_index(self, pool_name: str, text: str, candidate: IndexCandidate) -> Tuple[ExplainPlan, str]:
+        if not PoolContext.of(pool_name).supports(Capability.INVISIBLE_INDEXES):
+            return super()._explain_with_index(pool_name, text, candidate)
+        index_name = self._find_invisible_index(pool_name, candidate)
+        explain = "EXPLAIN FORMAT=JSON " + text
+
+        def work(conn):
+            # 开启后当前连接可以使用所有不可见索引，通过计划中的索引名判断是否使用了候选索引
+            conn.execute(sql_text("SET SESSION optimizer_switch = 'use_invisible_indexes=on'"))
+            try:
+                return conn.execute(sql_text(explain)).scalar()
+            finally:
+                if not conn.invalidated:
+                    conn.execute(sql_text("SET SESSION optimizer_switch = 'use_invisible_indexes=off'"))
+
+        document = ExecuteSqlUtil.run_in_rollback(pool_name, [explain], work)
+        return self._parse_json(document), index_name
+
+    @staticmethod
+    def _find_invisible_index(pool_name: str, candidate: IndexCandidate) -> str:
+        """
+        查找以候选索引的列开头的不可见索引
+
+        Raises:
+            SQLExecutionError: 没有匹配的不可见索引时抛出，提示先创建不可见索引
+        """
+        database, _, table_name = candidate.table.rpartition(".")
+        sql_result = execute_or_raise(pool_name, MySQLQueries.get_invisible_indexes(unquote(database),
+                                                                                     unquote(table_name)))
+        wanted = [column.lower() for column in candidate.column_names]
+        for index_name, columns in sql_result.rows or []:
+            if str(columns).lower().split(",")[:len(wanted)] == wanted:
+                return index_name
+        raise SQLExecutionError(
+            f"没有匹配的不可见索引，MySQL 需要先创建不可见索引再评估（建立索引会占用IO，但不影响现有执行计划）: "
+            f"ALTER TABLE {candidate.table} ADD INDEX idx_{'_'.join(candidate.column_names)} "
+            f"({', '.join(candidate.columns)}) INVISIBLE")
+
+    def _parse_json(self, text: str) -> ExplainPlan:
+        """解析 EXPLAIN FORMAT=JSON 的输出"""
+        document = json.loads(text)
+        query_block = document.get("query_block", {})
+        total_cost = to_number(query_block.get("cost_info", {}).get("query_cost"))
+        return ExplainPlan("mysql", nodes=self._parse_block(query_block), total_cost=total_cost)
+
+    def _parse_block(self, block: Dict[str, Any]) -> List[PlanNode]:
+        """解析 EXPLAIN FORMAT=JSON 的 query_block 及其中的嵌套操作"""
+        nodes = []
+        for key, value in block.items():
+            if key == "table":
+                nodes.append(self._parse_table(value))
+            elif key == "nested_loop":
+                # 8.0.18 起块嵌套循环被哈希连接取代，EXPLAIN 中仍显示为 nested_loop
+                hash_join = any(item.get("table", {}).get("using_join_buffer") == "hash join" for item in value)
+                node = PlanNode("hash_join") if hash_join else PlanNode("nested_loop", flags={PlanFlag.NESTED_LOOP})
+                for item in value:
+                    node.children.extend(self._parse_block(item))
+                nodes.append(node)
+            elif key in _GROUP_OPERATIONS:
+                node = PlanNode(key, flags=self._flags(value))
+                node.children = self._parse_block(value)
+                nodes.append(node)
+            elif key == "query_block":
+                nodes.extend(self._parse_block(value))
+            elif key == "union_result":
+                node = PlanNode("union_result", table=value.get("table_name"), flags=self._flags(value))
+                for specification in value.get("query_specifications", []):
+                    node.children.extend(self._parse_block(specification))
+                nodes.append(node)
+            elif key in ("attached_subqueries", "optimized_away_subqueries"):
+                for subquery in value:
+                    node = PlanNode("subquery", children=self._parse_block(subquery))
+                    nodes.append(node)
+            elif key == "message":
+                nodes.append(PlanNode("message", details=[str(value)]))
+        return nodes
+
+    def _parse_table(self, table: Dict[str, Any]) -> PlanNode:
+        node = PlanNode(
+            "table",
+            table=table.get("table_name"),
+            index=table.get("key"),
+            access=_ACCESS_TYPES.get(table.get("access_type")),
+            estimated_rows=to_number(table.get("rows_examined_per_scan")),
+            estimated_cost=to_number(table.get("cost_info", {}).get("prefix_cost")),
+            flags=self._flags(table),
+        )
+        if table.get("filtered") not in (None, "100.00"):
+            node.details.append(f"filtered={table['filtered']}%")
+        if table.get("using_index"):
+            node.details.append("覆盖索引")
+        if table.get("using_join_buffer"):
+            node.details.append(f"join buffer ({table['using_join_buffer']})")
+        if table.get("attached_condition"):
+            node.details.append(f"条件: {table['attached_condition']}")
+        materialized = table.get("materialized_from_subquery")
+        if materialized:
+            node.flags.add(PlanFlag.TEMPORARY)
+            node.children.extend(self._parse_block(materialized))
+        for subquery in table.get("attached_subqueries", []):
+            node.children.append(PlanNode("subquery", children=self._parse_block(subquery)))
+        return node
+
+    def _parse_analyze_tree(self, tree: str) -> ExplainPlan:
+        """解析 EXPLAIN ANALYZE 的树形输出，缩进表示层级"""
+        roots: List[PlanNode] = []
+        stack = []
+        for line in tree.splitlines():
+            match = _ANALYZE_LINE_PATTERN.match(line)
+            if not match:
+                continue
+            node = self._parse_analyze_line(match)
+            indent = len(match.group(1))
+            while stack and stack[-1][0] >= indent:
+                stack.pop()
+            (stack[-1][1].children if stack else roots).append(node)
+            stack.append((indent, node))
+        if not roots:
+            return ExplainPlan("mysql", raw=tree, analyzed=True)
+        return ExplainPlan("mysql", nodes=roots, total_cost=roots[0].estimated_cost, analyzed=True)
+
+    @staticmethod
+    def _parse_analyze_line(match) -> PlanNode:
+        description = match.group(2)
+        node = PlanNode(description, estimated_cost=to_number(match.group(3)), estimated_rows=to_number(match.group(4)))
+        loops = to_number(match.group(7))
+        if loops is not None:
+            # rows 为每次循环的平均行数
+            node.actual_loops = loops
+            node.actual_rows = to_number(match.group(6)) * loops
+            node.actual_time_ms = to_number(match.group(5))
+
+        access = _ANALYZE_ACCESS_PATTERN.match(description)
+        if access:
+            kind = access.group(1).lower()
+            node.operation, node.table, node.index = access.group(1), access.group(2), access.group(3)
+            remainder = description[access.end():].strip()
+            if remainder:
+                node.details.append(remainder)
+            if kind.startswith("table scan"):
+                node.access = AccessType.FULL_SCAN
+            elif "range" in kind:
+                node.access = AccessType.INDEX_SCAN
+            elif kind.endswith("lookup"):
+                node.access = AccessType.INDEX_LOOKUP
+            else:
+                node.access = AccessType.INDEX_FULL_SCAN
+        elif description.startswith("Sort"):
+            node.flags.add(PlanFlag.FILESORT)
+        elif description.startswith(("Materialize", "Temporary table")):
+            node.flags.add(PlanFlag.TEMPORARY)
+        elif description.startswith("Nested loop"):
+            node.flags.add(PlanFlag.NESTED_LOOP)
+        return node
 
-        sql_explain = ExecuteSqlUtil.format_result(ExecuteSqlUtil.execute_single_statement(pool_name, sql))
+    @staticmethod
+    def _flags(operation: Dict[str, Any]) -> set:
+        flags = set()
+        if operation.get("using_filesort"):
+            flags.add(PlanFlag.FILESORT)
+        if operation.get("using_temporary_table"):
+            flags.add(PlanFlag.TEMPORARY)
+        return flags
 
-        return sql_explain
+    @staticmethod
+    def _parse_table_row(row: Dict[str, Any]) -> PlanNode:
+        """解析表格格式 EXPLAIN 的一行"""
+        extra = row.get("Extra") or ""
+        flags = set()
+        if "Using filesort" in extra:
+            flags.add(PlanFlag.FILESORT)
+        if "Using temporary" in extra:
+            flags.add(PlanFlag.TEMPORARY)
+        return PlanNode(
+            f"{row.get('select_type')}#{row.get('id')}",
+            table=row.get("table"),
+            index=row.get("key"),
+            access=_ACCESS_TYPES.get(row.get("type")),
+            estimated_rows=to_number(row.get("rows")),
+            flags=flags,
+            details=[extra] if extra else [],
+        )
 
     def get_table_size(self, pool_name: str, database: str, schema: str, table_name: str):
         # 将输入的表名按逗号分割成列表
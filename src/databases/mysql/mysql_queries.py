@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 
 
 class MySQLQueries:
@@ -17,6 +17,16 @@ class MySQLQueries:
         """
         return "SELECT VERSION();"
 
+    @staticmethod
+    def get_server_version() -> str:
+        """
+        获取解析版本和特性所需信息的SQL查询：版本号、版本说明（区分社区版/企业版/MariaDB）、performance_schema 是否开启
+
+        Returns:
+            SQL查询语句
+        """
+        return "SELECT VERSION() AS version, @@version_comment AS version_comment, @@performance_schema AS performance_schema"
+
     @staticmethod
     def get_table_names(database: str, text: str) -> str:
         """
@@ -61,12 +71,44 @@ class MySQLQueries:
             """
 
     @staticmethod
-    def get_table_index(database: str, table_names: List[str]):
-        table_condition = "','".join(table_names)
+    def get_table_index(database: str, table_names: Optional[List[str]] = None):
+        """
+        获取表索引的SQL查询
+
+        Args:
+            database: 数据库名称
+            table_names: 表名列表，为None时查询整个库的索引
+
+        Returns:
+            SQL查询语句
+        """
+        table_filter = ""
+        if table_names is not None:
+            table_condition = "','".join(table_names)
+            table_filter = f"AND TABLE_NAME IN ('{table_condition}')"
         return f"""
-            SELECT TABLE_NAME, INDEX_NAME, COLUMN_NAME, SEQ_IN_INDEX, NON_UNIQUE, INDEX_TYPE 
+            SELECT TABLE_NAME, INDEX_NAME, COLUMN_NAME, SEQ_IN_INDEX, SUB_PART, NON_UNIQUE, INDEX_TYPE 
             FROM information_schema.STATISTICS WHERE TABLE_SCHEMA = '{database}' 
-            AND TABLE_NAME IN ('{table_condition}') ORDER BY TABLE_NAME, INDEX_NAME, SEQ_IN_INDEX;
+            {table_filter} ORDER BY TABLE_NAME, INDEX_NAME, SEQ_IN_INDEX;
+        """
+
+    @staticmethod
+    def get_index_size(database: str) -> str:
+        """
+        获取整个库各索引大小的SQL查询（InnoDB 持久化统计信息中的页数乘以页大小），
+        分区表各分区的统计行表名为 表名#p#分区名，按表名返回后由调用方累加
+
+        Args:
+            database: 数据库名称
+
+        Returns:
+            SQL查询语句
+        """
+        return f"""
+            SELECT SUBSTRING_INDEX(table_name, '#', 1) AS TABLE_NAME, index_name AS INDEX_NAME,
+                stat_value * @@innodb_page_size AS SIZE_BYTES
+            FROM mysql.innodb_index_stats
+            WHERE database_name = '{database}' AND stat_name = 'size';
         """
 
     @staticmethod
@@ -102,6 +144,31 @@ class MySQLQueries:
         SHOW STATUS LIKE 'Threads_running';
         """
 
+    @staticmethod
+    def get_max_connections():
+        return """
+        SELECT @@max_connections AS max_connections
+        """
+
+    @staticmethod
+    def get_thread_status():
+        return """
+        SHOW GLOBAL STATUS WHERE Variable_name IN ('Threads_connected', 'Threads_running')
+        """
+
+    @staticmethod
+    def get_replica_status():
+        """MySQL 8.0.22+ 使用 SHOW REPLICA STATUS，更早的版本使用 get_slave_status"""
+        return """
+        SHOW REPLICA STATUS
+        """
+
+    @staticmethod
+    def get_slave_status():
+        return """
+        SHOW SLAVE STATUS
+        """
+
     @staticmethod
     def get_connection_errors():
         return """
@@ -116,16 +183,31 @@ class MySQLQueries:
         """
 
     @staticmethod
-    def get_blocking():
-        return """
-        SHOW ENGINE INNODB STATUS;
-        SELECT * FROM INFORMATION_SCHEMA.INNODB_TRX;
-        SHOW OPEN TABLES WHERE In_use > 0;
-        select * from information_schema.innodb_locks;
-        select * from information_schema.innodb_lock_waits;
+    def get_blocking(data_locks: bool = True):
+        """
+        获取阻塞信息的SQL查询
+
+        Args:
+            data_locks: MySQL 8.0 起锁信息在 performance_schema.data_locks/data_lock_waits，
+                之前的版本（以及 MariaDB）在 information_schema.innodb_locks/innodb_lock_waits，只查询存在的表
+
+        Returns:
+            SQL查询语句
+        """
+        if data_locks:
+            lock_sql = """
         select * from performance_schema.data_lock_waits;
         select * from performance_schema.data_locks;
         """
+        else:
+            lock_sql = """
+        select * from information_schema.innodb_locks;
+        select * from information_schema.innodb_lock_waits;
+        """
+        return """
+        SHOW ENGINE INNODB STATUS;
+        SELECT * FROM INFORMATION_SCHEMA.INNODB_TRX;
+        SHOW OPEN TABLES WHERE In_use > 0;""" + lock_sql
 
     @staticmethod
     def get_buffer_pool():
@@ -190,4 +272,63 @@ class MySQLQueries:
                 AND table_name in ('{table_condition}')  
             ORDER BY 
                 (data_length + index_length) DESC;
-        """
\ No newline at end of file
+        """
+
+    @staticmethod
+    def get_top_sql(order_by: str, limit: int) -> str:
+        """
+        从 performance_schema 语句摘要表获取消耗最高的语句的SQL查询，计时单位为皮秒，转换为毫秒
+
+        Args:
+            order_by: 排序表达式（摘要表的列）
+            limit: 返回的摘要数
+
+        Returns:
+            SQL查询语句
+        """
+        return f"""
+            SELECT
+                DIGEST AS digest_id,
+                DIGEST_TEXT AS sql_text,
+                SCHEMA_NAME AS schema_name,
+                COUNT_STAR AS executions,
+                SUM_TIMER_WAIT / 1000000000 AS total_time_ms,
+                SUM_ROWS_EXAMINED AS rows_examined,
+                SUM_ROWS_SENT + SUM_ROWS_AFFECTED AS rows_returned,
+                SUM_NO_INDEX_USED AS no_index_used
+            FROM
+                performance_schema.events_statements_summary_by_digest
+            WHERE
+                DIGEST_TEXT IS NOT NULL
+                AND COUNT_STAR > 0
+                AND (SCHEMA_NAME IS NULL OR SCHEMA_NAME NOT IN ('performance_schema', 'information_schema', 'mysql', 'sys'))
+            ORDER BY
+                {order_by} DESC
+            LIMIT {limit};
+        """
+
+    @staticmethod
+    def get_invisible_indexes(database: str, table_name: str) -> str:
+        """
+        获取某个表的不可见索引及其列的SQL查询
+
+        Args:
+            database: 数据库名称，为空时使用当前数据库
+            table_name: 表名
+
+        Returns:
+            SQL查询语句，每行为索引名和按索引顺序以逗号连接的列名
+        """
+        return f"""
+            SELECT
+                INDEX_NAME,
+                GROUP_CONCAT(COLUMN_NAME ORDER BY SEQ_IN_INDEX) AS COLUMNS
+            FROM
+                information_schema.statistics
+            WHERE
+                TABLE_SCHEMA = {f"'{database}'" if database else 'DATABASE()'}
+                AND TABLE_NAME = '{table_name}'
+                AND IS_VISIBLE = 'NO'
+            GROUP BY
+                INDEX_NAME;
+        """
@@ -1,4 +1,4 @@
-from config.dbconfig import get_db_configs, get_db_config_by_name
+from databases.pool_context import PoolContext
 from databases.base.base import TableDescription
 from utils.execute_sql_util import ExecuteSqlUtil
 from databases.mysql.mysql_queries import MySQLQueries
@@ -7,7 +7,7 @@ from databases.mysql.mysql_queries import MySQLQueries
 class MySQLTableDescription(TableDescription):
 
     def get_table_description(self, pool_name: str,database: str, schema: str, table_name: str) -> str:
-        db_config = get_db_config_by_name(pool_name)
+        db_config = PoolContext.of(pool_name).config
 
         if database is None:
             database = db_config.get("database")
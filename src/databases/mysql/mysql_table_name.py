@@ -1,4 +1,4 @@
-from config.dbconfig import get_db_config_by_name
+from databases.pool_context import PoolContext
 from databases.base.base import TableName
 from utils.execute_sql_util import ExecuteSqlUtil
 from databases.mysql.mysql_queries import MySQLQueries
@@ -6,7 +6,7 @@ from databases.mysql.mysql_queries import MySQLQueries
 
 class MySQLTableName(TableName):
     def get_table_name(self, pool_name: str, database: str, schema: str, text: str) -> str:
-        db_config = get_db_config_by_name(pool_name)
+        db_config = PoolContext.of(pool_name).config
 
         if database is None:
             database = db_config.get("database")
@@ -0,0 +1,26 @@
+from core.exceptions import SQLExecutionError
+from databases.base.base import TopSql
+from databases.base.server_version import Capability
+from databases.base.top_sql import CANDIDATE_FACTOR, TopSqlOrder, TopSqlReport
+from databases.mysql.mysql_queries import MySQLQueries
+from databases.pool_context import PoolContext
+
+_SOURCE = "performance_schema.events_statements_summary_by_digest"
+
+# 排序指标对应的摘要表列
+_ORDER_COLUMNS = {
+    TopSqlOrder.TOTAL_TIME: "SUM_TIMER_WAIT",
+    TopSqlOrder.AVG_TIME: "AVG_TIMER_WAIT",
+    TopSqlOrder.ROWS_EXAMINED: "SUM_ROWS_EXAMINED",
+    TopSqlOrder.EXECUTIONS: "COUNT_STAR",
+}
+
+
+class MySQLTopSql(TopSql):
+
+    def get_top_sql(self, pool_name: str, order: TopSqlOrder, limit: int) -> TopSqlReport:
+        if not PoolContext.of(pool_name).supports(Capability.PERFORMANCE_SCHEMA):
+            raise SQLExecutionError("performance_schema 未开启，无法获取语句统计，需要在配置文件中设置 "
+                                    "performance_schema=ON 并重启数据库")
+        sql = MySQLQueries.get_top_sql(_ORDER_COLUMNS[order], limit * CANDIDATE_FACTOR)
+        return TopSqlReport.ranked("mysql", _SOURCE, order, self._query_entries(pool_name, sql), limit)
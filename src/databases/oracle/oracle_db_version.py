@@ -1,4 +1,8 @@
+import re
+
+from core.exceptions import SQLExecutionError
 from databases.base.base import DatabaseVersion
+from databases.base.server_version import Capability, ServerVersion, parse_version_numbers
 from databases.oracle.oracle_queries import OracleQueries
 from utils.execute_sql_util import ExecuteSqlUtil
 
@@ -8,4 +12,24 @@ class OracleDatabaseVersionTool(DatabaseVersion):
 
         sql_result = ExecuteSqlUtil.execute_single_statement(pool_name, OracleQueries.get_db_version())
 
-        return ExecuteSqlUtil.format_result(sql_result)
\ No newline at end of file
+        return ExecuteSqlUtil.format_result(sql_result)
+
+    def get_server_version(self, pool_name: str) -> ServerVersion:
+        sql_result = ExecuteSqlUtil.execute_single_statement(pool_name, OracleQueries.get_db_version())
+        if not sql_result.success:
+            raise SQLExecutionError(sql_result.message)
+        # v$version 每行一个组件，第一行是数据库本身，如 "Oracle Database 19c Enterprise Edition Release 19.0.0.0.0 - Production"
+        banner = str(sql_result.rows[0][0]) if sql_result.rows else ""
+        release = re.search(r'Release\s+(\d+(?:\.\d+)*)', banner)
+        numbers = parse_version_numbers(release.group(1) if release else banner)
+        edition = re.search(r'(\w+ Edition)', banner)
+
+        # STATISTICS_LEVEL=ALL 与 V$SQL_PLAN_STATISTICS_ALL 从 10g 起可用
+        capabilities = {Capability.WINDOW_FUNCTIONS, Capability.CTE, Capability.EXPLAIN_ANALYZE}
+        if numbers >= (11, 0, 0):
+            capabilities.add(Capability.INVISIBLE_INDEXES)
+        if numbers >= (12, 0, 0):
+            capabilities.add(Capability.FETCH_FIRST)
+
+        return ServerVersion.create("oracle", numbers, banner, edition=edition.group(1) if edition else None,
+                                    capabilities=capabilities)
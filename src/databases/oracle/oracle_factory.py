@@ -5,6 +5,7 @@ from databases.base.base import (
     TableIndex,
     DatabaseHealth,
     SqlOptimize,
+    TopSql,
 )
 from databases.database_factory import DatabaseOperationFactory
 from databases.oracle.oracle_db_version import OracleDatabaseVersionTool
@@ -13,6 +14,7 @@ from databases.oracle.oracle_table_description import OracleTableDescription
 from databases.oracle.oracle_table_index import OracleTableIndex
 from databases.oracle.oracle_table_name import OracleTableName
 from databases.oracle.oracle_optimize import OracleSqlOptimize
+from databases.oracle.oracle_top_sql import OracleTopSql
 
 
 class OracleFactory(DatabaseOperationFactory):
@@ -33,4 +35,7 @@ class OracleFactory(DatabaseOperationFactory):
         return OracleHealth()
 
     def create_sql_optimize(self) -> SqlOptimize:
-        return OracleSqlOptimize()
\ No newline at end of file
+        return OracleSqlOptimize()
+
+    def create_top_sql(self) -> TopSql:
+        return OracleTopSql()
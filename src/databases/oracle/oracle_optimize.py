@@ -1,17 +1,149 @@
-from databases.base.base import SqlOptimize
+import logging
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import text as sql_text
+
+from connection.pool_manager import MultiDBPoolManager
+from databases.base.base import SqlOptimize, execute_or_raise
+from databases.base.explain_plan import AccessType, ExplainPlan, PlanFlag, PlanNode, link_nodes, to_number
+from databases.base.what_if import IndexCandidate, hypothetical_index_name
 from databases.oracle.oracle_queries import OracleQueries
 from utils.execute_sql_util import ExecuteSqlUtil
 
+logger = logging.getLogger(__name__)
+
+# 丢弃语句结果集时每次读取的行数
+_DISCARD_BATCH_SIZE = 1000
+
+# INDEX 操作的选项到访问方式的映射
+_INDEX_ACCESS_TYPES = {
+    "FULL SCAN": AccessType.INDEX_FULL_SCAN,
+    "FAST FULL SCAN": AccessType.INDEX_FULL_SCAN,
+    "FULL SCAN (MIN/MAX)": AccessType.INDEX_LOOKUP,
+    "UNIQUE SCAN": AccessType.INDEX_LOOKUP,
+}
+
 
 class OracleSqlOptimize(SqlOptimize):
-    def get_sql_explain(self, pool_name: str, text: str):
-        sql = "EXPLAIN PLAN FOR " + text
-        sql_explain = ExecuteSqlUtil.execute_single_statement(pool_name, sql)
+    def get_explain_plan(self, pool_name: str, text: str, analyze: bool = False) -> ExplainPlan:
+        if analyze:
+            # 语句在总是回滚的事务中真正执行，执行统计从 V$SQL_PLAN_STATISTICS_ALL 读取
+            ExecuteSqlUtil.check_analyzable(text)
+            columns, plan_rows = ExecuteSqlUtil.run_in_rollback(pool_name, [text],
+                                                                lambda conn: self._run_with_statistics(conn, text))
+        else:
+            # 写入 PLAN_TABLE 和读取需要在同一个连接上执行，会话结束时回滚，计划行不会被其他会话看到
+            statement_id = self._statement_id()
+            with MultiDBPoolManager.get_instance().session(pool_name) as session:
+                execute_or_raise(pool_name, f"EXPLAIN PLAN SET STATEMENT_ID = '{statement_id}' FOR " + text, session)
+                sql_result = execute_or_raise(pool_name, OracleQueries.get_plan_table(), session,
+                                              {"statement_id": statement_id})
+            columns, plan_rows = sql_result.columns, sql_result.rows or []
+
+        return self._build_plan(columns, plan_rows, analyze)
+
+    def what_if_method(self, pool_name: str) -> Optional[str]:
+        return "虚拟索引（NOSEGMENT），只在当前会话启用 _use_nosegment_indexes，评估后立即删除，需要 CREATE/DROP 权限"
+
+    def _explain_with_index(self, pool_name: str, text: str, candidate: IndexCandidate) -> Tuple[ExplainPlan, str]:
+        index_name = hypothetical_index_name().upper()
+        create = f"CREATE INDEX {index_name} ON {candidate.table} ({', '.join(candidate.columns)}) NOSEGMENT"
+        drop = f"DROP INDEX {index_name}"
+        statement_id = self._statement_id()
+
+        def work(conn):
+            # 虚拟索引没有段，不占用空间，只有开启 _use_nosegment_indexes 的会话的优化器会考虑它；
+            # DDL 会隐式提交，计划行读取后先删除，再由删除索引的 DDL 提交
+            conn.execute(sql_text('ALTER SESSION SET "_use_nosegment_indexes" = TRUE'))
+            conn.execute(sql_text(create))
+            try:
+                conn.execute(sql_text(f"EXPLAIN PLAN SET STATEMENT_ID = '{statement_id}' FOR " + text))
+                result = conn.execute(sql_text(OracleQueries.get_plan_table()), {"statement_id": statement_id})
+                plan = list(result.keys()), result.fetchall()
+                conn.execute(sql_text(OracleQueries.delete_plan_table()), {"statement_id": statement_id})
+                return plan
+            finally:
+                if not conn.invalidated:
+                    conn.execute(sql_text(drop))
+                    conn.execute(sql_text('ALTER SESSION SET "_use_nosegment_indexes" = FALSE'))
+
+        columns, plan_rows = ExecuteSqlUtil.run_in_rollback(pool_name, [text, create, drop], work)
+        return self._build_plan(columns, plan_rows, False), index_name
+
+    @staticmethod
+    def _statement_id() -> str:
+        # STATEMENT_ID 唯一，不会读到同一会话中其他语句的计划（长度不能超过30）
+        return f"smartdb_{uuid.uuid4().hex[:20]}"
+
+    def _build_plan(self, columns: List[str], plan_rows: List[Any], analyze: bool) -> ExplainPlan:
+        rows = [{column.lower(): value for column, value in zip(columns, row)} for row in plan_rows]
+        nodes = link_nodes((row["id"], row["parent_id"], self._parse_row(row)) for row in rows)
+        total_cost = to_number(rows[0]["cost"]) if rows else None
+        return ExplainPlan("oracle", nodes=nodes, total_cost=total_cost, analyzed=analyze)
+
+    @staticmethod
+    def _run_with_statistics(conn, text: str) -> Tuple[List[str], List[Any]]:
+        """
+        以 STATISTICS_LEVEL=ALL 执行语句并读取实际执行统计
+        效果与 GATHER_PLAN_STATISTICS 提示相同，但不需要改写用户的SQL
+        """
+        conn.execute(sql_text("ALTER SESSION SET STATISTICS_LEVEL = ALL"))
+        try:
+            result = conn.execute(sql_text(text))
+            # 统计信息在取完所有行后才完整
+            if result.returns_rows:
+                while result.fetchmany(_DISCARD_BATCH_SIZE):
+                    pass
+            plan = conn.execute(sql_text(OracleQueries.get_actual_plan()))
+            return list(plan.keys()), plan.fetchall()
+        finally:
+            if not conn.invalidated:
+                try:
+                    conn.execute(sql_text("ALTER SESSION SET STATISTICS_LEVEL = TYPICAL"))
+                except Exception as e:
+                    logger.debug(f"Failed to reset STATISTICS_LEVEL: {e}")
 
-        sql = "SELECT * FROM TABLE(DBMS_XPLAN.DISPLAY)"
-        sql_explain_result = ExecuteSqlUtil.execute_single_statement(pool_name, sql)
+    @staticmethod
+    def _parse_row(row: Dict[str, Any]) -> PlanNode:
+        operation = row["operation"] or ""
+        options = row["options"] or ""
+        node = PlanNode(
+            f"{operation} {options}".strip(),
+            estimated_rows=to_number(row["cardinality"]),
+            estimated_cost=to_number(row["cost"]),
+        )
+        starts = to_number(row.get("last_starts"))
+        if starts is not None:
+            node.actual_loops = starts
+            node.actual_rows = to_number(row.get("last_output_rows"))
+            elapsed = to_number(row.get("last_elapsed_time"))
+            # LAST_ELAPSED_TIME 为所有执行的累计微秒数
+            node.actual_time_ms = elapsed / 1000 / max(starts, 1) if elapsed is not None else None
+            for key, name in (("last_cr_buffer_gets", "buffer_gets"), ("last_disk_reads", "disk_reads")):
+                if row.get(key):
+                    node.io[name] = row[key]
+        if operation == "TABLE ACCESS":
+            node.table = row["object_name"]
+            if options == "FULL":
+                node.access = AccessType.FULL_SCAN
+        elif operation == "INDEX":
+            node.index = row["object_name"]
+            node.access = _INDEX_ACCESS_TYPES.get(options, AccessType.INDEX_SCAN)
+        elif row["object_name"]:
+            node.table = row["object_name"]
 
-        return ExecuteSqlUtil.format_result(sql_explain_result)
+        if operation == "SORT" and options in ("ORDER BY", "GROUP BY", "UNIQUE"):
+            node.flags.add(PlanFlag.FILESORT)
+        elif operation in ("TEMP TABLE TRANSFORMATION", "LOAD AS SELECT", "BUFFER"):
+            node.flags.add(PlanFlag.TEMPORARY)
+        elif operation == "NESTED LOOPS":
+            node.flags.add(PlanFlag.NESTED_LOOP)
+        if row["access_predicates"]:
+            node.details.append(f"access: {row['access_predicates']}")
+        if row["filter_predicates"]:
+            node.details.append(f"filter: {row['filter_predicates']}")
+        return node
 
     def get_table_size(self, pool_name: str, database: str, schema: str, table_name: str):
         # 将输入的表名按逗号分割成列表
@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 
 
 class OracleQueries:
@@ -12,6 +12,51 @@ class OracleQueries:
         """
         return "SELECT * FROM v$version"
 
+    @staticmethod
+    def get_plan_table() -> str:
+        """
+        读取 PLAN_TABLE 中指定 STATEMENT_ID 的 EXPLAIN PLAN 结果的SQL查询，
+        STATEMENT_ID 通过绑定参数 :statement_id 传入
+
+        Returns:
+            SQL查询语句
+        """
+        return """
+            SELECT id, parent_id, operation, options, object_name, cost, cardinality,
+                   access_predicates, filter_predicates
+            FROM plan_table
+            WHERE statement_id = :statement_id
+            ORDER BY id
+        """
+
+    @staticmethod
+    def delete_plan_table() -> str:
+        """
+        删除 PLAN_TABLE 中指定 STATEMENT_ID 的执行计划的SQL语句，STATEMENT_ID 通过绑定参数 :statement_id 传入
+
+        Returns:
+            SQL语句
+        """
+        return "DELETE FROM plan_table WHERE statement_id = :statement_id"
+
+    @staticmethod
+    def get_actual_plan() -> str:
+        """
+        读取当前会话上一条语句实际执行统计的SQL查询，需要语句执行时 STATISTICS_LEVEL 为 ALL
+
+        Returns:
+            SQL查询语句
+        """
+        return """
+            SELECT p.id, p.parent_id, p.operation, p.options, p.object_name, p.cost, p.cardinality,
+                   p.last_output_rows, p.last_starts, p.last_elapsed_time, p.last_cr_buffer_gets, p.last_disk_reads,
+                   p.access_predicates, p.filter_predicates
+            FROM v$sql_plan_statistics_all p
+            JOIN v$session s ON p.sql_id = s.prev_sql_id AND p.child_number = s.prev_child_number
+            WHERE s.sid = SYS_CONTEXT('USERENV', 'SID')
+            ORDER BY p.id
+        """
+
     @staticmethod
     def get_table_names(database: str, text: str) -> str:
         """
@@ -75,8 +120,21 @@ class OracleQueries:
                     col.table_name, col.column_id
                """
     @staticmethod
-    def get_table_index(database: str, table_names: List[str]):
-        table_condition = "','".join(table_names)
+    def get_table_index(database: str, table_names: Optional[List[str]] = None):
+        """
+        获取表索引的SQL查询
+
+        Args:
+            database: 表的所有者
+            table_names: 表名列表，为None时查询该所有者全部表的索引
+
+        Returns:
+            SQL查询语句
+        """
+        table_filter = ""
+        if table_names is not None:
+            table_condition = "','".join(table_names)
+            table_filter = f"AND i.table_name IN ('{table_condition}')"
         return f"""
             SELECT
                 i.table_name AS TABLE_NAME,
@@ -94,11 +152,40 @@ class OracleQueries:
                     AND i.table_name = c.table_name
             WHERE
                 i.table_owner = '{database}'  
-              AND i.table_name IN ('{table_condition}') 
+              {table_filter}
             ORDER BY
                 i.table_name, i.index_name, c.column_position
         """
 
+    @staticmethod
+    def get_index_size(database: str) -> str:
+        """
+        获取某个所有者全部表的各索引大小的SQL查询（分区索引的各段累加）
+
+        Args:
+            database: 表的所有者
+
+        Returns:
+            SQL查询语句
+        """
+        return f"""
+        SELECT
+            i.table_name AS TABLE_NAME,
+            i.index_name AS INDEX_NAME,
+            SUM(s.bytes) AS SIZE_BYTES
+        FROM
+            all_indexes i
+                JOIN
+            dba_segments s
+            ON s.owner = i.owner
+                AND s.segment_name = i.index_name
+                AND s.segment_type LIKE 'INDEX%'
+        WHERE
+            i.table_owner = '{database}'
+        GROUP BY
+            i.table_name, i.index_name
+        """
+
     @staticmethod
     def get_max_connections():
         return """
@@ -397,3 +484,41 @@ class OracleQueries:
         ORDER BY
             3 DESC;
         """
+
+    @staticmethod
+    def get_top_sql(order_by: str, limit: int) -> str:
+        """
+        从 V$SQLAREA 获取消耗最高的语句的SQL查询
+        按 FORCE_MATCHING_SIGNATURE 合并只有字面量不同的游标（为0时按 SQL_ID），耗时单位为微秒，转换为毫秒
+
+        Args:
+            order_by: 排序表达式（V$SQLAREA 列的聚合）
+            limit: 返回的语句数
+
+        Returns:
+            SQL查询语句
+        """
+        return f"""
+        SELECT * FROM (
+            SELECT
+                CASE WHEN force_matching_signature = 0 THEN sql_id
+                     ELSE TO_CHAR(force_matching_signature) END AS digest_id,
+                MIN(sql_text) AS sql_text,
+                MIN(parsing_schema_name) AS schema_name,
+                SUM(executions) AS executions,
+                SUM(elapsed_time) / 1000 AS total_time_ms,
+                SUM(buffer_gets) AS logical_reads,
+                SUM(rows_processed) AS rows_returned
+            FROM
+                v$sqlarea
+            WHERE
+                executions > 0
+                AND parsing_schema_name NOT IN ('SYS', 'SYSTEM')
+            GROUP BY
+                CASE WHEN force_matching_signature = 0 THEN sql_id
+                     ELSE TO_CHAR(force_matching_signature) END
+            ORDER BY
+                {order_by} DESC
+        )
+        WHERE ROWNUM <= {limit}
+        """
@@ -0,0 +1,19 @@
+from databases.base.base import TopSql
+from databases.base.top_sql import CANDIDATE_FACTOR, TopSqlOrder, TopSqlReport
+from databases.oracle.oracle_queries import OracleQueries
+
+# 排序指标对应的 V$SQLAREA 列聚合
+_ORDER_COLUMNS = {
+    TopSqlOrder.TOTAL_TIME: "SUM(elapsed_time)",
+    TopSqlOrder.AVG_TIME: "SUM(elapsed_time) / GREATEST(SUM(executions), 1)",
+    TopSqlOrder.ROWS_EXAMINED: "SUM(buffer_gets)",
+    TopSqlOrder.EXECUTIONS: "SUM(executions)",
+}
+
+
+class OracleTopSql(TopSql):
+
+    def get_top_sql(self, pool_name: str, order: TopSqlOrder, limit: int) -> TopSqlReport:
+        sql = OracleQueries.get_top_sql(_ORDER_COLUMNS[order], limit * CANDIDATE_FACTOR)
+        return TopSqlReport.ranked("oracle", "V$SQLAREA", order, self._query_entries(pool_name, sql), limit,
+                                   note="统计范围为共享池中的游标，扫描量为逻辑读（buffer gets）")
@@ -0,0 +1,126 @@
+"""
+连接池绑定的方言上下文
+连接池创建时构建一次，保存校验后的配置、方言工厂、各类处理器实例、数据库版本以及默认的数据库/模式，
+工具层和方言处理器通过一次字典查找获得，不再在每次调用时读取配置文件、创建处理器对象。
+"""
+
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from connection.pool_manager import MultiDBPoolManager
+from core.exceptions import SQLExecutionError
+from databases.base.base import (
+    DatabaseHealth,
+    DatabaseVersion,
+    SqlOptimize,
+    TableDescription,
+    TableIndex,
+    TableName,
+    TopSql,
+)
+from databases.base.server_version import Capability, ServerVersion
+from databases.database_factory import DatabaseOperationFactory, FactoryRegistry
+
+logger = logging.getLogger(__name__)
+
+
+class PoolContext:
+    """
+    单个连接池的方言上下文
+
+    处理器不保存调用状态，同一连接池的所有调用共享一组实例
+    """
+
+    def __init__(self, pool_name: str, config: Dict[str, Any], engine: Optional[Engine] = None):
+        """
+        Args:
+            pool_name: 连接池名称
+            config: 校验后的连接池配置
+            engine: 连接池的引擎，连接失效（数据库重启、升级）时清除缓存的版本，重新连接后再次查询
+        """
+        self.pool_name = pool_name
+        self.db_type: str = config["type"]
+        self.update_config(config)
+
+        self.factory: DatabaseOperationFactory = FactoryRegistry.get_factory_by_factory_name(self.db_type)
+        self.db_version: DatabaseVersion = self.factory.create_db_version()
+        self.table_name: TableName = self.factory.create_table_name()
+        self.table_description: TableDescription = self.factory.create_table_description()
+        self.table_index: TableIndex = self.factory.create_table_index()
+        self.db_health: DatabaseHealth = self.factory.create_db_health()
+        self.sql_optimize: SqlOptimize = self.factory.create_sql_optimize()
+        self.top_sql: TopSql = self.factory.create_top_sql()
+
+        self._server_version: Optional[ServerVersion] = None
+        self._lock = threading.Lock()
+        if engine is not None:
+            event.listen(engine, "invalidate", self._on_invalidate)
+
+    @classmethod
+    def of(cls, pool_name: str) -> "PoolContext":
+        """
+        获取连接池的方言上下文
+
+        Raises:
+            ValueError: 连接池不存在时抛出
+        """
+        context = MultiDBPoolManager.get_context(pool_name)
+        if context is None:
+            raise ValueError(f"Pool '{pool_name}' not found")
+        return context
+
+    def update_config(self, config: Dict[str, Any]) -> None:
+        """热更新配置时替换配置项，数据库类型和连接信息不变，处理器和缓存的版本继续使用"""
+        self.config = config
+        self.role: str = config.get("role") or "readonly"
+        self.default_database: Optional[str] = config.get("database")
+        self.default_schema: Optional[str] = config.get("schema")
+
+    def get_server_version(self) -> ServerVersion:
+        """
+        获取结构化的数据库版本，首次查询成功后缓存，连接失效后重新查询
+
+        Returns:
+            数据库版本
+
+        Raises:
+            SQLExecutionError: 版本查询失败时抛出，失败结果不缓存
+        """
+        version = self._server_version
+        if version is not None:
+            return version
+        with self._lock:
+            if self._server_version is None:
+                self._server_version = self.db_version.get_server_version(self.pool_name)
+                logger.info(f"Pool '{self.pool_name}' server version: {self._server_version.vendor} "
+                            f"{self._server_version.number}")
+            return self._server_version
+
+    def describe_server_version(self) -> str:
+        """
+        获取数据库版本的文本描述，用于提示词和版本查询结果
+
+        Returns:
+            版本描述，查询失败时返回失败信息
+        """
+        try:
+            return self.get_server_version().describe()
+        except SQLExecutionError as e:
+            return str(e)
+
+    def supports(self, capability: Capability) -> bool:
+        """数据库是否支持指定特性，版本查询失败时视为不支持"""
+        try:
+            return self.get_server_version().supports(capability)
+        except SQLExecutionError:
+            return False
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception) -> None:
+        # 连接失效通常意味着数据库重启或切换，版本可能已变化
+        if self._server_version is not None:
+            self._server_version = None
+            logger.info(f"Pool '{self.pool_name}' connection invalidated, server version will be re-read")
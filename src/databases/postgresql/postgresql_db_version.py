@@ -1,4 +1,5 @@
 from databases.base.base import DatabaseVersion
+from databases.base.server_version import Capability, ServerVersion, parse_version_numbers
 from databases.postgresql.postgresql_queries import PostgresqlQueries
 from utils.execute_sql_util import ExecuteSqlUtil
 
@@ -12,3 +13,27 @@ class PostgresqlDatabaseVersionTool(DatabaseVersion):
         sql_result = ExecuteSqlUtil.execute_single_statement(pool_name, sql)
 
         return ExecuteSqlUtil.format_result(sql_result)
+
+    def get_server_version(self, pool_name: str) -> ServerVersion:
+        row = self._query_version_row(pool_name, PostgresqlQueries.get_server_version())
+        raw = str(row.get("version") or "")
+        numbers = parse_version_numbers(raw)
+        # server_version_num 形如 160002（10 起）或 90624（10 之前），比文本更可靠
+        version_num = int(row.get("version_num") or 0)
+        if version_num >= 100000:
+            numbers = (version_num // 10000, version_num % 10000, 0)
+        elif version_num:
+            numbers = (version_num // 10000, version_num // 100 % 100, version_num % 100)
+        extensions = set(filter(None, str(row.get("extensions") or "").split(",")))
+
+        capabilities = {Capability.EXPLAIN_ANALYZE}
+        if numbers >= (8, 4, 0):
+            capabilities.update((Capability.WINDOW_FUNCTIONS, Capability.CTE, Capability.FETCH_FIRST))
+        if numbers >= (9, 0, 0):
+            capabilities.add(Capability.EXPLAIN_JSON)
+        if "pg_stat_statements" in extensions:
+            capabilities.add(Capability.PG_STAT_STATEMENTS)
+        if "hypopg" in extensions:
+            capabilities.add(Capability.HYPOPG)
+
+        return ServerVersion.create("postgresql", numbers, raw, capabilities=capabilities)
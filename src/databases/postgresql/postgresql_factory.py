@@ -5,6 +5,7 @@ from databases.base.base import (
     TableIndex,
     DatabaseHealth,
     SqlOptimize,
+    TopSql,
 )
 from databases.database_factory import DatabaseOperationFactory
 from databases.postgresql.postgresql_health import PostgresqlHealth
@@ -13,6 +14,7 @@ from databases.postgresql.postgresql_table_name import PostgresqlTableName
 from databases.postgresql.postgresql_db_version import PostgresqlDatabaseVersionTool
 from databases.postgresql.postgresql_table_description import PostgresqlTableDescription
 from databases.postgresql.postgresql_optimize import PostgresqlSqlOptimize
+from databases.postgresql.postgresql_top_sql import PostgresqlTopSql
 
 
 class PostgresqlFactory(DatabaseOperationFactory):
@@ -35,4 +37,7 @@ class PostgresqlFactory(DatabaseOperationFactory):
         return PostgresqlHealth()
 
     def create_sql_optimize(self) -> SqlOptimize:
-        return PostgresqlSqlOptimize()
\ No newline at end of file
+        return PostgresqlSqlOptimize()
+
+    def create_top_sql(self) -> TopSql:
+        return PostgresqlTopSql()
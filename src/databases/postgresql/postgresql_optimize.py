@@ -1,15 +1,115 @@
-from databases.base.base import SqlOptimize
+import json
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import text as sql_text
+
+from databases.base.base import SqlOptimize, execute_or_raise
+from databases.base.explain_plan import AccessType, ExplainPlan, PlanFlag, PlanNode, to_number
+from databases.base.server_version import Capability
+from databases.base.what_if import IndexCandidate
+from databases.pool_context import PoolContext
 from databases.postgresql.postgresql_queries import PostgresqlQueries
 from utils.execute_sql_util import ExecuteSqlUtil
 
+# 计划节点类型到访问方式的映射
+_ACCESS_TYPES = {
+    "Seq Scan": AccessType.FULL_SCAN,
+    "Index Scan": AccessType.INDEX_SCAN,
+    "Index Only Scan": AccessType.INDEX_SCAN,
+    "Bitmap Index Scan": AccessType.INDEX_SCAN,
+    "Bitmap Heap Scan": AccessType.INDEX_SCAN,
+}
+
+# 作为补充说明输出的节点属性
+_DETAIL_KEYS = ("Join Type", "Sort Key", "Sort Method", "Sort Space Type", "Group Key", "Index Cond", "Recheck Cond",
+                "Hash Cond", "Merge Cond", "Join Filter", "Filter", "Rows Removed by Filter")
+
+# BUFFERS 输出的计数，只记录非0值
+_IO_KEYS = {
+    "Shared Hit Blocks": "shared_hit",
+    "Shared Read Blocks": "shared_read",
+    "Temp Read Blocks": "temp_read",
+    "Temp Written Blocks": "temp_written",
+}
+
 
 class PostgresqlSqlOptimize(SqlOptimize):
-    def get_sql_explain(self, pool_name: str, text: str):
-        sql = "EXPLAIN ANALYZE " + text
+    def get_explain_plan(self, pool_name: str, text: str, analyze: bool = False) -> ExplainPlan:
+        if analyze:
+            # EXPLAIN ANALYZE 会真正执行语句，在总是回滚的事务中执行
+            ExecuteSqlUtil.check_analyzable(text)
+            sql = "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + text
+            document = ExecuteSqlUtil.run_in_rollback(pool_name, [sql],
+                                                      lambda conn: conn.execute(sql_text(sql)).scalar())
+        else:
+            sql_result = execute_or_raise(pool_name, "EXPLAIN (FORMAT JSON) " + text)
+            if not sql_result.rows:
+                return ExplainPlan("postgresql", raw=ExecuteSqlUtil.format_result(sql_result))
+            document = sql_result.rows[0][0]
+        return self._parse_document(document, analyze)
+
+    def what_if_method(self, pool_name: str) -> Optional[str]:
+        if PoolContext.of(pool_name).supports(Capability.HYPOPG):
+            return "HypoPG 假设索引，只在当前连接中可见，不会实际建立"
+        return None
+
+    def _explain_with_index(self, pool_name: str, sql: str, candidate: IndexCandidate) -> Tuple[ExplainPlan, str]:
+        if not PoolContext.of(pool_name).supports(Capability.HYPOPG):
+            return super()._explain_with_index(pool_name, sql, candidate)
+        ddl = f"CREATE INDEX ON {candidate.table} ({', '.join(candidate.columns)})"
+        explain = "EXPLAIN (FORMAT JSON) " + sql
+
+        def work(conn):
+            # 假设索引保存在当前后端进程的内存中，创建和 EXPLAIN 需要在同一个连接上执行，结束时清除
+            index_name = conn.execute(sql_text(PostgresqlQueries.create_hypothetical_index()), {"ddl": ddl}).scalar()
+            try:
+                return index_name, conn.execute(sql_text(explain)).scalar()
+            finally:
+                if not conn.invalidated:
+                    conn.execute(sql_text(PostgresqlQueries.reset_hypothetical_indexes()))
+
+        index_name, document = ExecuteSqlUtil.run_in_rollback(pool_name, [explain], work)
+        return self._parse_document(document, False), index_name
 
-        sql_explain = ExecuteSqlUtil.format_result(ExecuteSqlUtil.execute_single_statement(pool_name, sql))
+    def _parse_document(self, document, analyze: bool) -> ExplainPlan:
+        # psycopg2 会将 json 列解析为 Python 对象，其他驱动可能返回字符串
+        if isinstance(document, str):
+            document = json.loads(document)
+        root = document[0]["Plan"]
+        return ExplainPlan("postgresql", nodes=[self._parse_node(root)], total_cost=to_number(root.get("Total Cost")),
+                           analyzed=analyze)
 
-        return sql_explain
+    def _parse_node(self, plan: Dict[str, Any]) -> PlanNode:
+        node_type = plan.get("Node Type", "")
+        node = PlanNode(
+            node_type,
+            table=plan.get("Relation Name"),
+            index=plan.get("Index Name"),
+            access=_ACCESS_TYPES.get(node_type),
+            estimated_rows=to_number(plan.get("Plan Rows")),
+            estimated_cost=to_number(plan.get("Total Cost")),
+        )
+        loops = to_number(plan.get("Actual Loops"))
+        if loops is not None:
+            # Actual Rows 为每次循环的平均行数
+            node.actual_loops = loops
+            node.actual_rows = to_number(plan.get("Actual Rows")) * loops
+            node.actual_time_ms = to_number(plan.get("Actual Total Time"))
+        for key, name in _IO_KEYS.items():
+            if plan.get(key):
+                node.io[name] = plan[key]
+        if node_type in ("Sort", "Incremental Sort"):
+            node.flags.add(PlanFlag.FILESORT)
+        elif node_type in ("Materialize", "CTE Scan"):
+            node.flags.add(PlanFlag.TEMPORARY)
+        elif node_type == "Nested Loop":
+            node.flags.add(PlanFlag.NESTED_LOOP)
+        for key in _DETAIL_KEYS:
+            value = plan.get(key)
+            if value:
+                node.details.append(f"{key}: {', '.join(value) if isinstance(value, list) else value}")
+        node.children = [self._parse_node(child) for child in plan.get("Plans", [])]
+        return node
 
     def get_table_size(self, pool_name: str, database: str, schema: str, table_name: str):
         # 将输入的表名按逗号分割成列表
@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 
 
 class PostgresqlQueries:
@@ -12,6 +12,21 @@ class PostgresqlQueries:
         """
         return "SELECT version();"
 
+    @staticmethod
+    def get_server_version() -> str:
+        """
+        获取解析版本和特性所需信息的SQL查询：版本文本、数值版本号、已安装的相关扩展
+
+        Returns:
+            SQL查询语句
+        """
+        return """
+            SELECT version() AS version,
+                   current_setting('server_version_num') AS version_num,
+                   (SELECT string_agg(extname, ',') FROM pg_extension
+                    WHERE extname IN ('pg_stat_statements', 'hypopg')) AS extensions
+        """
+
     @staticmethod
     def get_table_names(schema: str, text: str) -> str:
         """
@@ -82,18 +97,40 @@ class PostgresqlQueries:
                    """
 
     @staticmethod
-    def get_table_index(schema: str, table_names: List[str]) -> str:
-        table_condition = "','".join(table_names)
+    def get_table_index(schema: str, table_names: Optional[List[str]] = None, include_columns: bool = True) -> str:
+        """
+        获取表索引的SQL查询，非 btree 索引的类型为访问方法名，表达式索引和部分索引单独标记
+        （表达式列没有对应的 pg_attribute，不出现在结果中）。INCLUDE 包含列的序号为0，与 SQL Server 一致
+
+        Args:
+            schema: 模式名称
+            table_names: 表名列表，为None时查询整个模式的索引
+            include_columns: 服务端是否支持 INCLUDE 包含列（11 起 pg_index 才有 indnkeyatts 列）
+
+        Returns:
+            SQL查询语句
+        """
+        table_filter = ""
+        if table_names is not None:
+            table_condition = "','".join(table_names)
+            table_filter = f"AND t.relname IN ('{table_condition}')"
+
+        seq_in_index = "idx_positions.ordinality"
+        if include_columns:
+            seq_in_index = f"CASE WHEN {seq_in_index} > ix.indnkeyatts THEN 0 ELSE {seq_in_index} END"
 
         return f"""
             SELECT
                 t.relname AS TABLE_NAME,
                 i.relname AS INDEX_NAME,
                 a.attname AS COLUMN_NAME,
-                (idx_positions.ordinality) AS SEQ_IN_INDEX,
+                {seq_in_index} AS SEQ_IN_INDEX,
                 NOT ix.indisunique AS NON_UNIQUE,
                 CASE
                     WHEN ix.indisprimary THEN 'PRIMARY'
+                    WHEN am.amname <> 'btree' THEN UPPER(am.amname)
+                    WHEN ix.indpred IS NOT NULL THEN 'PARTIAL'
+                    WHEN ix.indexprs IS NOT NULL THEN 'EXPRESSION'
                     WHEN ix.indisunique THEN 'UNIQUE'
                     ELSE 'NORMAL'
                     END AS INDEX_TYPE
@@ -104,6 +141,8 @@ class PostgresqlQueries:
                     JOIN
                 pg_class i ON i.oid = ix.indexrelid
                     JOIN
+                pg_am am ON am.oid = i.relam
+                    JOIN
                 pg_namespace n ON n.oid = t.relnamespace
                     JOIN
                 LATERAL (
@@ -115,12 +154,41 @@ class PostgresqlQueries:
                 pg_attribute a ON a.attrelid = t.oid AND a.attnum = idx_positions.attnum
             WHERE
                 n.nspname = '{schema}'  
-              AND t.relname IN ('{table_condition}') 
+              {table_filter}
               AND t.relkind = 'r'   
             ORDER BY
                 t.relname, i.relname, idx_positions.ordinality;
         """
 
+    @staticmethod
+    def get_index_size(schema: str) -> str:
+        """
+        获取整个模式各索引大小的SQL查询
+
+        Args:
+            schema: 模式名称
+
+        Returns:
+            SQL查询语句
+        """
+        return f"""
+            SELECT
+                t.relname AS TABLE_NAME,
+                i.relname AS INDEX_NAME,
+                pg_relation_size(i.oid) AS SIZE_BYTES
+            FROM
+                pg_index ix
+                    JOIN
+                pg_class t ON t.oid = ix.indrelid
+                    JOIN
+                pg_class i ON i.oid = ix.indexrelid
+                    JOIN
+                pg_namespace n ON n.oid = t.relnamespace
+            WHERE
+                n.nspname = '{schema}'
+              AND t.relkind = 'r';
+        """
+
     @staticmethod
     def get_max_connections() :
         return """
@@ -132,6 +200,27 @@ class PostgresqlQueries:
             name = 'max_connections';
         """
 
+    @staticmethod
+    def get_connection_counts() :
+        return """
+            SELECT
+              count(*) AS connections,
+              count(*) FILTER (WHERE state = 'active') AS running
+          FROM pg_stat_activity;
+        """
+
+    @staticmethod
+    def get_replication_lag() :
+        """备库已接收的WAL全部回放完成时延迟为0，避免主库空闲时误判为延迟（PostgreSQL 10+）"""
+        return """
+            SELECT
+              CASE
+                WHEN NOT pg_is_in_recovery() THEN 0
+                WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+                ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+              END AS lag_seconds;
+        """
+
     @staticmethod
     def get_current_connections(database: str) :
         return f"""
@@ -314,4 +403,56 @@ class PostgresqlQueries:
           AND tablename IN ('{table_condition}')
         ORDER BY
             pg_total_relation_size(quote_ident(tablename)) DESC;
-        """
\ No newline at end of file
+        """
+
+    @staticmethod
+    def get_top_sql(order_by: str, limit: int, exec_time: bool = True) -> str:
+        """
+        从 pg_stat_statements 获取当前数据库中消耗最高的语句的SQL查询
+
+        Args:
+            order_by: 排序表达式（pg_stat_statements 的列）
+            limit: 返回的语句数
+            exec_time: 耗时列是否为 13 起的 total_exec_time，之前的版本为 total_time
+
+        Returns:
+            SQL查询语句
+        """
+        total_time = "total_exec_time" if exec_time else "total_time"
+        return f"""
+        SELECT
+            s.queryid::text AS digest_id,
+            s.query AS sql_text,
+            s.calls AS executions,
+            s.{total_time} AS total_time_ms,
+            s.shared_blks_hit + s.shared_blks_read AS logical_reads,
+            s.rows AS rows_returned
+        FROM
+            pg_stat_statements s
+        WHERE
+            s.dbid = (SELECT oid FROM pg_database WHERE datname = current_database())
+            AND s.calls > 0
+        ORDER BY
+            {order_by} DESC
+        LIMIT {limit};
+        """
+
+    @staticmethod
+    def create_hypothetical_index() -> str:
+        """
+        创建 HypoPG 假设索引的SQL查询，参数 ddl 为 CREATE INDEX 语句
+
+        Returns:
+            SQL查询语句，返回假设索引的名称
+        """
+        return "SELECT indexname FROM hypopg_create_index(:ddl)"
+
+    @staticmethod
+    def reset_hypothetical_indexes() -> str:
+        """
+        清除当前连接中所有 HypoPG 假设索引的SQL查询
+
+        Returns:
+            SQL查询语句
+        """
+        return "SELECT hypopg_reset()"
@@ -1,4 +1,4 @@
-from config.dbconfig import get_db_config_by_name
+from databases.pool_context import PoolContext
 from databases.base.base import TableIndex
 from databases.postgresql.postgresql_queries import PostgresqlQueries
 from utils.execute_sql_util import ExecuteSqlUtil
@@ -6,7 +6,7 @@ from utils.execute_sql_util import ExecuteSqlUtil
 
 class PostgresqlTableIndex(TableIndex):
     def get_table_index(self, pool_name: str, database: str, schema: str, table_name: str) -> str:
-        db_config = get_db_config_by_name(pool_name)
+        db_config = PoolContext.of(pool_name).config
 
         database = db_config.get("database") if database is None else database
 
@@ -19,7 +19,9 @@ class PostgresqlTableIndex(TableIndex):
         # 将输入的表名按逗号分割成列表
         table_names = [name.strip() for name in table_name.split(',')]
 
-        sql = PostgresqlQueries.get_table_index(schema, table_names)
+        # 11 起支持 INCLUDE 包含列
+        include_columns = PoolContext.of(pool_name).get_server_version().at_least(11)
+        sql = PostgresqlQueries.get_table_index(schema, table_names, include_columns)
 
         sql_result = ExecuteSqlUtil.execute_single_statement(pool_name, sql)
 
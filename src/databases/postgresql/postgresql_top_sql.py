@@ -0,0 +1,31 @@
+from core.exceptions import SQLExecutionError
+from databases.base.base import TopSql
+from databases.base.server_version import Capability
+from databases.base.top_sql import CANDIDATE_FACTOR, TopSqlOrder, TopSqlReport
+from databases.pool_context import PoolContext
+from databases.postgresql.postgresql_queries import PostgresqlQueries
+
+
+class PostgresqlTopSql(TopSql):
+
+    def get_top_sql(self, pool_name: str, order: TopSqlOrder, limit: int) -> TopSqlReport:
+        context = PoolContext.of(pool_name)
+        if not context.supports(Capability.PG_STAT_STATEMENTS):
+            raise SQLExecutionError("未安装 pg_stat_statements 扩展，无法获取语句统计，需要将其加入 "
+                                    "shared_preload_libraries 并执行 CREATE EXTENSION pg_stat_statements")
+        # 13 起耗时列改名为 total_exec_time/mean_exec_time
+        exec_time = context.get_server_version().at_least(13)
+        sql = PostgresqlQueries.get_top_sql(self._order_column(order, exec_time), limit * CANDIDATE_FACTOR, exec_time)
+        return TopSqlReport.ranked("postgresql", "pg_stat_statements", order, self._query_entries(pool_name, sql),
+                                   limit, note="扫描量为共享缓冲区命中和读取的块数")
+
+    @staticmethod
+    def _order_column(order: TopSqlOrder, exec_time: bool) -> str:
+        infix = "exec_" if exec_time else ""
+        if order == TopSqlOrder.TOTAL_TIME:
+            return f"s.total_{infix}time"
+        if order == TopSqlOrder.AVG_TIME:
+            return f"s.mean_{infix}time"
+        if order == TopSqlOrder.ROWS_EXAMINED:
+            return "s.shared_blks_hit + s.shared_blks_read"
+        return "s.calls"
@@ -0,0 +1,27 @@
+from databases.base.base import DatabaseVersion
+from databases.base.server_version import Capability, ServerVersion, parse_version_numbers
+from utils.execute_sql_util import ExecuteSqlUtil
+from databases.sqlite.sqlite_queries import SQLiteQueries
+
+
+class SQLiteDatabaseVersion(DatabaseVersion):
+
+    def get_db_version(self, pool_name: str) -> str:
+        sql = SQLiteQueries.get_db_version()
+
+        sql_result = ExecuteSqlUtil.execute_single_statement(pool_name, sql)
+
+        return ExecuteSqlUtil.format_result(sql_result)
+
+    def get_server_version(self, pool_name: str) -> ServerVersion:
+        row = self._query_version_row(pool_name, SQLiteQueries.get_server_version())
+        raw = str(row.get("version") or "")
+        numbers = parse_version_numbers(raw)
+
+        capabilities = set()
+        if numbers >= (3, 8, 3):
+            capabilities.add(Capability.CTE)
+        if numbers >= (3, 25, 0):
+            capabilities.add(Capability.WINDOW_FUNCTIONS)
+
+        return ServerVersion.create("sqlite", numbers, f"SQLite {raw}", capabilities=capabilities)
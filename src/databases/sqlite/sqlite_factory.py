@@ -0,0 +1,43 @@
+from databases.base.base import (
+    DatabaseVersion,
+    TableDescription,
+    TableName,
+    TableIndex,
+    DatabaseHealth,
+    SqlOptimize,
+    TopSql,
+)
+from databases.database_factory import DatabaseOperationFactory
+from databases.sqlite.sqlite_db_version import SQLiteDatabaseVersion
+from databases.sqlite.sqlite_table_description import SQLiteTableDescription
+from databases.sqlite.sqlite_table_index import SQLiteTableIndex
+from databases.sqlite.sqlite_table_name import SQLiteTableName
+from databases.sqlite.sqlite_health import SQLiteHealth
+from databases.sqlite.sqlite_optimize import SQLiteSqlOptimize
+from databases.sqlite.sqlite_top_sql import SQLiteTopSql
+
+
+class SQLiteFactory(DatabaseOperationFactory):
+
+    name: str = "sqlite"
+
+    def create_db_version(self) -> DatabaseVersion:
+        return SQLiteDatabaseVersion()
+
+    def create_table_description(self) -> TableDescription:
+        return SQLiteTableDescription()
+
+    def create_table_name(self) -> TableName:
+        return SQLiteTableName()
+
+    def create_table_index(self) -> TableIndex:
+        return SQLiteTableIndex()
+
+    def create_db_health(self) -> DatabaseHealth:
+        return SQLiteHealth()
+
+    def create_sql_optimize(self) -> SqlOptimize:
+        return SQLiteSqlOptimize()
+
+    def create_top_sql(self) -> TopSql:
+        return SQLiteTopSql()
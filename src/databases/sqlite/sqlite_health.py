@@ -0,0 +1,97 @@
+from typing import Dict, Any
+
+from databases.pool_context import PoolContext
+from connection.pool_manager import MultiDBPoolManager
+from databases.base.base import DatabaseHealth
+from databases.sqlite.sqlite_queries import SQLiteQueries
+from utils.execute_sql_util import ExecuteSqlUtil
+
+
+class SQLiteHealth(DatabaseHealth):
+
+    def get_db_health(self, pool_name: str, health_type: str) -> str:
+        """
+        根据健康检查类型执行相应的检查方法
+
+        Args:
+            pool_name: 数据库连接池名称
+            health_type: 健康检查类型
+
+        Returns:
+            健康检查结果
+        """
+        db_config = PoolContext.of(pool_name).config
+
+        # 定义类型到方法的映射
+        health_methods = {
+            "index": self.get_db_index,
+            "connection": self.get_db_connection,
+            "blocking": self.get_db_blocking,
+            "resources": self.get_db_resources
+        }
+
+        if health_type == "all":
+            return "\n".join(method(pool_name, db_config) for method in health_methods.values())
+        elif health_type in health_methods:
+            return health_methods[health_type](pool_name, db_config)
+        else:
+            raise ValueError(f"无效的健康检查类型: {health_type}")
+
+    def get_db_index(self, pool_name: str, db_config: Dict[str, Any]) -> str:
+        """
+        索引情况分析：索引列表，以及重复、冗余和过宽的组合索引
+        """
+        index_result = ExecuteSqlUtil.execute_single_statement(pool_name, SQLiteQueries.get_index_overview())
+        structure = self.analyze_index_catalog(pool_name, SQLiteQueries.get_table_index("main"),
+                                               SQLiteQueries.get_index_size("main"))
+
+        result_parts = []
+        result_parts.append("- 索引列表")
+        result_parts.append(ExecuteSqlUtil.format_result(index_result))
+        result_parts.append("\n- 索引结构分析")
+        result_parts.append(structure)
+        return "\n".join(result_parts)
+
+    def get_db_connection(self, pool_name: str, db_config: Dict[str, Any]) -> str:
+        """
+        连接情况分析，SQLite 为进程内数据库，连接情况即连接池状态
+        """
+        database_result = ExecuteSqlUtil.execute_single_statement(pool_name, SQLiteQueries.get_database_list())
+        stats = MultiDBPoolManager.get_instance().get_stats(pool_name) or {}
+
+        result_parts = []
+        result_parts.append("- 已连接的数据库文件")
+        result_parts.append(ExecuteSqlUtil.format_result(database_result))
+        result_parts.append("\n- 连接池状态")
+        result_parts.append(",".join(["pool_size", "max_overflow", "checked_out_connections", "available_connections"]))
+        result_parts.append(",".join(str(stats.get(key)) for key in
+                                     ["pool_size", "max_overflow", "checked_out_connections", "available_connections"]))
+        return "\n".join(result_parts)
+
+    def get_db_blocking(self, pool_name: str, db_config: Dict[str, Any]) -> str:
+        """
+        锁情况分析，SQLite 没有锁等待视图，输出影响并发的日志模式与锁设置
+        """
+        locking_result = ExecuteSqlUtil.execute_single_statement(pool_name, SQLiteQueries.get_locking_settings())
+
+        result_parts = []
+        result_parts.append("- 日志模式与锁设置（非WAL模式下写操作会阻塞所有读操作）")
+        result_parts.append(ExecuteSqlUtil.format_result(locking_result))
+        return "\n".join(result_parts)
+
+    def get_db_resources(self, pool_name: str, db_config: Dict[str, Any]) -> str:
+        """
+        资源情况分析
+        """
+        storage_result = ExecuteSqlUtil.execute_single_statement(pool_name, SQLiteQueries.get_storage())
+        cache_result = ExecuteSqlUtil.execute_single_statement(pool_name, SQLiteQueries.get_cache_settings())
+        integrity_result = ExecuteSqlUtil.execute_single_statement(pool_name, SQLiteQueries.get_integrity_check())
+
+        result_parts = []
+        result_parts.append("- 存储空间与碎片情况")
+        result_parts.append(ExecuteSqlUtil.format_result(storage_result))
+        result_parts.append("\n- 缓存与同步设置")
+        result_parts.append(ExecuteSqlUtil.format_result(cache_result))
+        result_parts.append("\n- 快速完整性检查")
+        result_parts.append(ExecuteSqlUtil.format_result(integrity_result))
+        return "\n".join(result_parts)
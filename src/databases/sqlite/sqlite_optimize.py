@@ -0,0 +1,59 @@
+import re
+
+from databases.base.base import SqlOptimize, execute_or_raise
+from databases.base.explain_plan import AccessType, ExplainPlan, PlanFlag, PlanNode, link_nodes
+from databases.sqlite.sqlite_queries import SQLiteQueries
+from databases.sqlite.sqlite_schema import resolve_schema
+from utils.execute_sql_util import ExecuteSqlUtil
+
+# 表访问，如 "SCAN t"、"SCAN TABLE t"（3.36 之前）、"SEARCH t USING INDEX idx_a (a=?)"
+_SCAN_PATTERN = re.compile(r'(SCAN|SEARCH)\s+(?:TABLE\s+)?(?!CONSTANT ROW|SUBQUERY|\()(\S+)')
+_INDEX_PATTERN = re.compile(r'USING (?:COVERING |AUTOMATIC (?:PARTIAL )?COVERING )?INDEX (\S+)|USING (INTEGER PRIMARY KEY)')
+
+
+class SQLiteSqlOptimize(SqlOptimize):
+
+    def get_explain_plan(self, pool_name: str, text: str, analyze: bool = False) -> ExplainPlan:
+        # 不支持实际执行计划，始终返回预估计划
+        sql_result = execute_or_raise(pool_name, "EXPLAIN QUERY PLAN " + text)
+        # 每行为 (id, parent, notused, detail)，SQLite 不提供预估行数和成本
+        nodes = link_nodes((row[0], row[1], self._parse_detail(row[3])) for row in sql_result.rows or [])
+        return ExplainPlan("sqlite", nodes=nodes)
+
+    @staticmethod
+    def _parse_detail(detail: str) -> PlanNode:
+        match = _SCAN_PATTERN.match(detail)
+        if not match:
+            node = PlanNode(detail)
+            if detail.startswith("USE TEMP B-TREE FOR ORDER BY"):
+                node.flags.add(PlanFlag.FILESORT)
+            elif detail.startswith(("USE TEMP B-TREE", "MATERIALIZE")):
+                node.flags.add(PlanFlag.TEMPORARY)
+            return node
+
+        operation, table = match.group(1), match.group(2)
+        index = _INDEX_PATTERN.search(detail)
+        index_name = (index.group(1) or index.group(2)) if index else None
+        remainder = detail[match.end():].strip()
+        node = PlanNode(operation, table=table, index=index_name, details=[remainder] if remainder else [])
+        if operation == "SEARCH":
+            node.access = AccessType.INDEX_SCAN
+        elif index_name:
+            node.access = AccessType.INDEX_FULL_SCAN
+        else:
+            node.access = AccessType.FULL_SCAN
+        return node
+
+    def get_table_size(self, pool_name: str, database: str, schema: str, table_name: str):
+        # 将输入的表名按逗号分割成列表
+        table_names = [name.strip() for name in table_name.split(',')]
+        schema = resolve_schema(database, schema)
+
+        size_result = ExecuteSqlUtil.execute_single_statement(pool_name, SQLiteQueries.get_table_size(schema, table_names))
+        rows_result = ExecuteSqlUtil.execute_single_statement(pool_name, SQLiteQueries.get_table_rows(table_names, schema))
+
+        # dbstat 虚拟表不可用时只返回行数
+        if not size_result.success:
+            return ExecuteSqlUtil.format_result(rows_result)
+
+        return "\n".join([ExecuteSqlUtil.format_result(size_result), ExecuteSqlUtil.format_result(rows_result)])
@@ -0,0 +1,240 @@
+from typing import List, Optional
+
+
+def _quote(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _in_list(names: List[str]) -> str:
+    return ", ".join(_quote(name) for name in names)
+
+
+class SQLiteQueries:
+    """
+    SQLite数据库查询语句集合
+    SQLite 没有 information_schema，元数据通过 sqlite_master 和 pragma 表值函数查询，
+    schema 对应 ATTACH 的数据库名称，默认为 main
+    """
+
+    @staticmethod
+    def get_db_version() -> str:
+        """
+        获取数据库版本的SQL查询
+
+        Returns:
+            SQL查询语句
+        """
+        return "SELECT 'SQLite ' || sqlite_version() AS version"
+
+    @staticmethod
+    def get_server_version() -> str:
+        """
+        获取解析版本所需信息的SQL查询
+
+        Returns:
+            SQL查询语句
+        """
+        return "SELECT sqlite_version() AS version"
+
+    @staticmethod
+    def get_table_names(schema: str, text: str) -> str:
+        """
+        根据表名关键词获取表名的SQL查询（SQLite 不支持表注释）
+
+        Args:
+            schema: 数据库名称(main/temp/ATTACH的名称)
+            text: 表名关键词
+
+        Returns:
+            SQL查询语句
+        """
+        sql = f"""
+        SELECT '{schema}' AS table_schema, name AS table_name, type AS table_type
+          FROM "{schema}".sqlite_master
+         WHERE type IN ('table', 'view') AND name NOT LIKE 'sqlite_%'
+        """
+
+        if "SEARCH_ALL_TABLES" != text:
+            sql += f" AND name LIKE {_quote('%' + text + '%')}"
+
+        return sql
+
+    @staticmethod
+    def get_table_description(schema: str, table_names: List[str]) -> str:
+        """
+        获取表结构的SQL查询
+
+        Args:
+            schema: 数据库名称
+            table_names: 表名列表
+
+        Returns:
+            SQL查询语句
+        """
+        return f"""
+        SELECT m.name AS table_name, p.cid AS ordinal_position, p.name AS column_name, p.type AS data_type,
+               CASE WHEN p."notnull" = 1 THEN 'NO' ELSE 'YES' END AS is_nullable,
+               p.dflt_value AS column_default, p.pk AS primary_key_position
+          FROM "{schema}".sqlite_master m, pragma_table_info(m.name, '{schema}') p
+         WHERE m.type IN ('table', 'view') AND m.name IN ({_in_list(table_names)})
+         ORDER BY m.name, p.cid
+        """
+
+    @staticmethod
+    def get_table_index(schema: str, table_names: Optional[List[str]] = None) -> str:
+        """
+        获取表索引的SQL查询
+
+        Args:
+            schema: 数据库名称
+            table_names: 表名列表，为None时查询整个数据库的索引
+
+        Returns:
+            SQL查询语句
+        """
+        table_filter = f" AND m.name IN ({_in_list(table_names)})" if table_names is not None else ""
+        return f"""
+        SELECT m.name AS table_name, il.name AS index_name,
+               CASE WHEN il."unique" = 1 THEN 'UNIQUE' ELSE 'NON_UNIQUE' END AS uniqueness,
+               CASE il.origin WHEN 'pk' THEN 'PRIMARY KEY' WHEN 'u' THEN 'UNIQUE CONSTRAINT' ELSE 'INDEX' END
+                   AS index_origin,
+               il.partial AS is_partial, ii.seqno + 1 AS seq_in_index, ii.name AS column_name
+          FROM "{schema}".sqlite_master m, pragma_index_list(m.name, '{schema}') il,
+               pragma_index_info(il.name, '{schema}') ii
+         WHERE m.type = 'table'{table_filter}
+         ORDER BY m.name, il.name, ii.seqno
+        """
+
+    @staticmethod
+    def get_index_size(schema: str) -> str:
+        """
+        获取各索引大小的SQL查询（依赖 dbstat 虚拟表，需要 SQLite 编译时开启 SQLITE_ENABLE_DBSTAT_VTAB）
+
+        Args:
+            schema: 数据库名称
+
+        Returns:
+            SQL查询语句
+        """
+        return f"""
+        SELECT m.tbl_name AS table_name, m.name AS index_name, SUM(s.pgsize) AS size_bytes
+          FROM "{schema}".sqlite_master m JOIN dbstat('{schema}') s ON s.name = m.name
+         WHERE m.type = 'index'
+         GROUP BY m.tbl_name, m.name
+        """
+
+    @staticmethod
+    def get_table_size(schema: str, table_names: List[str]) -> str:
+        """
+        获取表大小的SQL查询（依赖 dbstat 虚拟表，需要 SQLite 编译时开启 SQLITE_ENABLE_DBSTAT_VTAB）
+
+        Args:
+            schema: 数据库名称
+            table_names: 表名列表
+
+        Returns:
+            SQL查询语句
+        """
+        return f"""
+        SELECT m.tbl_name AS table_name,
+               SUM(CASE WHEN m.type = 'table' THEN s.pgsize ELSE 0 END) AS data_bytes,
+               SUM(CASE WHEN m.type = 'index' THEN s.pgsize ELSE 0 END) AS index_bytes,
+               SUM(s.pgsize) AS total_bytes
+          FROM "{schema}".sqlite_master m JOIN dbstat('{schema}') s ON s.name = m.name
+         WHERE m.tbl_name IN ({_in_list(table_names)})
+         GROUP BY m.tbl_name
+        """
+
+    @staticmethod
+    def get_table_rows(table_names: List[str], schema: str) -> str:
+        """
+        获取表行数的SQL查询（dbstat 不可用时使用）
+
+        Args:
+            table_names: 表名列表
+            schema: 数据库名称
+
+        Returns:
+            SQL查询语句
+        """
+        return " UNION ALL ".join(
+            f"SELECT {_quote(name)} AS table_name, COUNT(*) AS table_rows FROM \"{schema}\".\"{name}\""
+            for name in table_names
+        )
+
+    @staticmethod
+    def get_storage() -> str:
+        """
+        获取存储空间使用情况的SQL查询
+
+        Returns:
+            SQL查询语句
+        """
+        return """
+        SELECT p.page_count, s.page_size, p.page_count * s.page_size AS database_bytes,
+               f.freelist_count, ROUND(100.0 * f.freelist_count / MAX(p.page_count, 1), 2) AS freelist_pct,
+               a.auto_vacuum
+          FROM pragma_page_count() p, pragma_page_size() s, pragma_freelist_count() f, pragma_auto_vacuum() a
+        """
+
+    @staticmethod
+    def get_cache_settings() -> str:
+        """
+        获取缓存与同步设置的SQL查询
+
+        Returns:
+            SQL查询语句
+        """
+        return """
+        SELECT c.cache_size, sy.synchronous, t.temp_store
+          FROM pragma_cache_size() c, pragma_synchronous() sy, pragma_temp_store() t
+        """
+
+    @staticmethod
+    def get_locking_settings() -> str:
+        """
+        获取日志模式与锁设置的SQL查询
+
+        Returns:
+            SQL查询语句
+        """
+        return """
+        SELECT j.journal_mode, l.locking_mode, b.timeout AS busy_timeout_ms
+          FROM pragma_journal_mode() j, pragma_locking_mode() l, pragma_busy_timeout() b
+        """
+
+    @staticmethod
+    def get_database_list() -> str:
+        """
+        获取已连接数据库文件的SQL查询
+
+        Returns:
+            SQL查询语句
+        """
+        return "SELECT seq, name, file FROM pragma_database_list()"
+
+    @staticmethod
+    def get_index_overview() -> str:
+        """
+        获取全部索引及其统计信息状态的SQL查询
+
+        Returns:
+            SQL查询语句
+        """
+        return """
+        SELECT m.tbl_name AS table_name, m.name AS index_name,
+               (SELECT GROUP_CONCAT(ii.name, ',') FROM pragma_index_info(m.name) ii) AS columns
+          FROM sqlite_master m
+         WHERE m.type = 'index'
+         ORDER BY m.tbl_name, m.name
+        """
+
+    @staticmethod
+    def get_integrity_check() -> str:
+        """
+        获取快速完整性检查的SQL查询
+
+        Returns:
+            SQL查询语句
+        """
+        return "SELECT * FROM pragma_quick_check()"
@@ -0,0 +1,12 @@
+from typing import Optional
+
+
+def resolve_schema(database: Optional[str], schema: Optional[str]) -> str:
+    """
+    SQLite 中 database 和 schema 都对应 ATTACH 的数据库名称，未指定时使用 main
+    （配置中的 database 是数据库文件路径，不能作为名称使用）
+    """
+    for name in (schema, database):
+        if name and name != "default":
+            return name.replace('"', '')
+    return "main"
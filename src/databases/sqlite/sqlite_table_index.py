@@ -0,0 +1,16 @@
+from databases.base.base import TableIndex
+from databases.sqlite.sqlite_queries import SQLiteQueries
+from databases.sqlite.sqlite_schema import resolve_schema
+from utils.execute_sql_util import ExecuteSqlUtil
+
+
+class SQLiteTableIndex(TableIndex):
+    def get_table_index(self, pool_name: str, database: str, schema: str, table_name: str) -> str:
+        # 将输入的表名按逗号分割成列表
+        table_names = [name.strip() for name in table_name.split(',')]
+
+        sql = SQLiteQueries.get_table_index(resolve_schema(database, schema), table_names)
+
+        sql_result = ExecuteSqlUtil.execute_single_statement(pool_name, sql)
+
+        return ExecuteSqlUtil.format_result(sql_result)
@@ -0,0 +1,13 @@
+from databases.base.base import TableName
+from utils.execute_sql_util import ExecuteSqlUtil
+from databases.sqlite.sqlite_queries import SQLiteQueries
+from databases.sqlite.sqlite_schema import resolve_schema
+
+
+class SQLiteTableName(TableName):
+    def get_table_name(self, pool_name: str, database: str, schema: str, text: str) -> str:
+        sql = SQLiteQueries.get_table_names(resolve_schema(database, schema), text)
+
+        sql_result = ExecuteSqlUtil.execute_single_statement(pool_name, sql)
+
+        return ExecuteSqlUtil.format_result(sql_result)
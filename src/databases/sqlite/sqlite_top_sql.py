@@ -0,0 +1,9 @@
+from core.exceptions import SQLExecutionError
+from databases.base.base import TopSql
+from databases.base.top_sql import TopSqlOrder, TopSqlReport
+
+
+class SQLiteTopSql(TopSql):
+
+    def get_top_sql(self, pool_name: str, order: TopSqlOrder, limit: int) -> TopSqlReport:
+        raise SQLExecutionError("SQLite 没有语句级的执行统计，无法获取 Top SQL")
@@ -1,14 +1,19 @@
 from typing import Optional
 
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
 from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
 from oauth.token_handler import TokenHandler
 
 
-class OAuthMiddleware(BaseHTTPMiddleware):
+class OAuthMiddleware:
+    """
+    OAuth 认证中间件
 
-    def __init__(self, app, exclude_paths: Optional[list[str]] = None):
+    直接实现 ASGI 接口而不是继承 BaseHTTPMiddleware，避免每个请求额外创建任务和
+    包装响应体，流式响应（SSE / streamable HTTP）可以原样透传
+    """
+
+    def __init__(self, app: ASGIApp, exclude_paths: Optional[list[str]] = None):
         """
         初始化中间件
 
@@ -16,13 +21,14 @@ class OAuthMiddleware(BaseHTTPMiddleware):
             app: Starlette应用实例
             exclude_paths: 不需要认证的路径列表
         """
-        super().__init__(app)
+        self.app = app
         # 默认排除路径：登录相关页面和资源
         default_exclude_paths = [
             "/login",  # 登录页面
             "/mcp/authorize",  # 登录API
         ]
         self.exclude_paths = exclude_paths or default_exclude_paths
+        self._exclude_prefixes = tuple(f"{excluded}/" for excluded in self.exclude_paths)
         #self.login_url = os.getenv("MCP_LOGIN_URL", "http://localhost:3000/login")
 
     def _is_excluded_path(self, path: str) -> bool:
@@ -35,60 +41,72 @@ class OAuthMiddleware(BaseHTTPMiddleware):
         Returns:
             bool: 是否排除认证
         """
-        return any(
-            path == excluded or path.startswith(f"{excluded}/")
-            for excluded in self.exclude_paths
-        )
-    async def dispatch(self, request: Request, call_next):
+        return path in self.exclude_paths or path.startswith(self._exclude_prefixes)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """
         处理请求
 
         Args:
-            request: 请求对象
-            call_next: 下一个处理函数
+            scope: ASGI 连接信息
+            receive: ASGI 接收消息的函数
+            send: ASGI 发送消息的函数
         """
-        # 检查是否需要跳过认证
-        if self._is_excluded_path(request.url.path):
-            return await call_next(request)
+        # 只对HTTP请求认证，lifespan等其他类型直接放行；检查是否需要跳过认证
+        if scope["type"] != "http" or self._is_excluded_path(scope["path"]):
+            await self.app(scope, receive, send)
+            return
 
         # 获取认证头
-        auth_header = request.headers.get("Authorization")
+        auth_header = None
+        for key, value in scope["headers"]:
+            if key == b"authorization":
+                auth_header = value.decode("latin-1")
+                break
+
         if not auth_header:
             # 只在需要时弹出登录框，并且不是API请求时
-            return JSONResponse(
-                {"error": "invalid_request", "error_description": "Missing authorization header"},
-                status_code=401
-            )
+            await self._unauthorized(scope, receive, send, "invalid_request", "Missing authorization header")
+            return
 
         # 验证token格式
         parts = auth_header.split()
         if len(parts) != 2 or parts[0].lower() != "bearer":
-            return JSONResponse(
-                {"error": "invalid_request", "error_description": "Invalid authorization header format"},
-                status_code=401
-            )
+            await self._unauthorized(scope, receive, send, "invalid_request", "Invalid authorization header format")
+            return
 
         token = parts[1]
 
         # 验证token
         payload = TokenHandler.verify_token(token)
         if not payload:
-            return JSONResponse(
-                {"error": "invalid_token", "error_description": "Token is invalid or expired"},
-                status_code=401
-            )
+            await self._unauthorized(scope, receive, send, "invalid_token", "Token is invalid or expired")
+            return
 
         # 检查token类型
         if payload.get("type") != "access_token":
-            return JSONResponse(
-                {"error": "invalid_token", "error_description": "Invalid token type"},
-                status_code=401
-            )
+            await self._unauthorized(scope, receive, send, "invalid_token", "Invalid token type")
+            return
 
-        # 将用户信息添加到请求对象
-        request.state.user = {
+        # 将用户信息添加到请求对象（request.state.user）
+        scope.setdefault("state", {})["user"] = {
             "id": payload["sub"],
             "username": payload["username"]
         }
 
-        return await call_next(request)
\ No newline at end of file
+        await self.app(scope, receive, send)
+
+    @staticmethod
+    async def _unauthorized(scope: Scope, receive: Receive, send: Send, error: str, description: str) -> None:
+        """
+        返回401认证失败响应
+
+        Args:
+            error: OAuth错误码
+            description: 错误描述
+        """
+        response = JSONResponse(
+            {"error": error, "error_description": description},
+            status_code=401
+        )
+        await response(scope, receive, send)
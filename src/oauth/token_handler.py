@@ -1,10 +1,43 @@
 import os
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
 import jwt
-from typing import Dict, Optional, Tuple
+from typing import ClassVar, Dict, Optional, Tuple
 from oauth.oauth_config import OAuthConfig
 
 class TokenHandler:
+    # 令牌密钥，首次使用时从环境变量加载一次
+    _secret_key: ClassVar[Optional[str]] = None
+    # 已验证令牌的LRU缓存: token -> (payload, 过期时间戳)
+    _verified_cache: ClassVar["OrderedDict[str, Tuple[Dict, float]]"] = OrderedDict()
+    _cache_lock: ClassVar[threading.Lock] = threading.Lock()
+    _cache_size: ClassVar[Optional[int]] = None
+
+    @classmethod
+    def _get_secret_key(cls) -> Optional[str]:
+        """获取令牌密钥（只在首次调用时读取环境变量）"""
+        if cls._secret_key is None:
+            cls._secret_key = os.getenv("TOKEN_SECRET_KEY")
+        return cls._secret_key
+
+    @classmethod
+    def _get_cache_size(cls) -> int:
+        if cls._cache_size is None:
+            cls._cache_size = int(os.getenv("TOKEN_CACHE_SIZE", 1024))
+        return cls._cache_size
+
+    @classmethod
+    def reload_secrets(cls) -> None:
+        """
+        重新加载令牌密钥并清空验证缓存，密钥轮换后调用
+        """
+        with cls._cache_lock:
+            cls._secret_key = None
+            cls._cache_size = None
+            cls._verified_cache.clear()
+
     @staticmethod
     def create_tokens(user_id: str, username: str) -> Tuple[str, str, datetime, datetime]:
         """
@@ -42,22 +75,23 @@ class TokenHandler:
         # 生成令牌
         access_token = jwt.encode(
             access_token_data,
-            os.getenv("TOKEN_SECRET_KEY"),
+            TokenHandler._get_secret_key(),
             algorithm=OAuthConfig.TOKEN_ALGORITHM
         )
         
         refresh_token = jwt.encode(
             refresh_token_data,
-            os.getenv("TOKEN_SECRET_KEY"),
+            TokenHandler._get_secret_key(),
             algorithm=OAuthConfig.TOKEN_ALGORITHM
         )
         
         return access_token, refresh_token, access_token_expires, refresh_token_expires
     
-    @staticmethod
-    def verify_token(token: str) -> Optional[Dict]:
+    @classmethod
+    def verify_token(cls, token: str) -> Optional[Dict]:
         """
         验证令牌
+        已验证的令牌会缓存到其过期时间(exp)为止，重复请求无需再次解码和验签
         
         Args:
             token: JWT令牌
@@ -65,15 +99,36 @@ class TokenHandler:
         Returns:
             Optional[Dict]: 令牌payload，无效则返回None
         """
+        now = time.time()
+        with cls._cache_lock:
+            cached = cls._verified_cache.get(token)
+            if cached is not None:
+                payload, expires_at = cached
+                if expires_at > now:
+                    cls._verified_cache.move_to_end(token)
+                    return payload
+                del cls._verified_cache[token]
+
         try:
             payload = jwt.decode(
                 token,
-                os.getenv("TOKEN_SECRET_KEY"),
+                cls._get_secret_key(),
                 algorithms=[OAuthConfig.TOKEN_ALGORITHM]
             )
-            return payload
         except jwt.InvalidTokenError:
             return None
+
+        # 只缓存带过期时间的令牌，避免永不过期的令牌常驻缓存
+        expires_at = payload.get("exp")
+        cache_size = cls._get_cache_size()
+        if isinstance(expires_at, (int, float)) and cache_size > 0:
+            with cls._cache_lock:
+                cls._verified_cache[token] = (payload, float(expires_at))
+                cls._verified_cache.move_to_end(token)
+                while len(cls._verified_cache) > cache_size:
+                    cls._verified_cache.popitem(last=False)
+
+        return payload
     
     @staticmethod
     def create_token_response(
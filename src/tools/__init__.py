@@ -1,40 +1,30 @@
-import os
-import glob
+import pkgutil
 from importlib import import_module
 
 
 
-# 自动导入该目录下其他模块中的所有类
-# 获取当前目录下的所有Python文件
-current_dir = os.path.dirname(__file__)
-module_files = glob.glob(os.path.join(current_dir, "*.py"))
-
-# 需要排除的文件
-exclude_files = ['__init__.py', 'base.py']
-exclude_classes = {}
+# 导入各工具模块，工具类定义时自动注册到 ToolRegistry
+# 使用 pkgutil 枚举包内模块：按模块名排序、只列出模块不导入，打包成zip后也能正常枚举
+# 新增工具模块时放到本目录即可，无需额外登记
+EXCLUDE_MODULES = {'base'}
 
 # 存储已导入的类名，避免重复导入
 imported_classes = set()
 
-# 遍历所有模块文件
-for file_path in module_files:
-    file_name = os.path.basename(file_path)
-    module_name = os.path.splitext(file_name)[0]
-    
-    # 排除特定文件
-    if file_name in exclude_files:
+# 遍历所有工具模块
+for module_info in pkgutil.iter_modules(__path__):
+    module_name = module_info.name
+    if module_info.ispkg or module_name in EXCLUDE_MODULES:
         continue
-    
     # 动态导入模块
     try:
         module = import_module(f'.{module_name}', package='tools')
-        # 导入模块中所有类（除了已手动导入的）
+        # 导入模块中所有类
         for attr_name in dir(module):
             attr = getattr(module, attr_name)
             # 检查是否为类，且未被导入过，且类名以Tool结尾
-            if (isinstance(attr, type) and 
-                attr_name not in imported_classes and 
-                attr_name not in exclude_classes and
+            if (isinstance(attr, type) and
+                attr_name not in imported_classes and
                 attr_name.endswith('Tool')):
                 # 将类添加到当前模块的命名空间
                 globals()[attr_name] = attr
@@ -44,5 +34,4 @@ for file_path in module_files:
         pass
 
 # 清理临时变量
-del os, glob, import_module, current_dir, module_files, exclude_files
-del exclude_classes, imported_classes, file_path, file_name, module_name
\ No newline at end of file
+del pkgutil, import_module, imported_classes, module_info, module_name
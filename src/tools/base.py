@@ -1,10 +1,20 @@
-from typing import Sequence, Any, Dict, Type, ClassVar
+import threading
+from typing import Sequence, Any, Dict, Type, ClassVar, Callable, List, Optional
 from mcp import Tool
 from mcp.types import TextContent
 
+from connection.admission import PoolLane
+
 class ToolRegistry:
-    """工具注册表，用于管理所有工具实例"""
+    """工具注册表，用于管理所有工具实例
+
+    工具描述（中英文说明和参数模式）是静态的，工具列表只在首次请求时构建一次并缓存，
+    注册或移除工具时清除缓存并通知监听者（服务端据此发送 notifications/tools/list_changed）
+    """
     _tools: ClassVar[Dict[str, 'ToolsBase']] = {}
+    _catalog: ClassVar[Optional[List[Tool]]] = None
+    _listeners: ClassVar[List[Callable[[], None]]] = []
+    _lock: ClassVar[threading.Lock] = threading.Lock()
 
     @classmethod
     def register(cls, tool_class: Type['ToolsBase']) -> Type['ToolsBase']:
@@ -17,9 +27,39 @@ class ToolRegistry:
             返回注册的工具类，方便作为装饰器使用
         """
         tool = tool_class()
-        cls._tools[tool.name] = tool
+        with cls._lock:
+            cls._tools[tool.name] = tool
+            cls._catalog = None
+        cls._notify_changed()
         return tool_class
 
+    @classmethod
+    def unregister(cls, name: str) -> bool:
+        """移除工具
+
+        Args:
+            name: 工具名称
+
+        Returns:
+            是否移除成功
+        """
+        with cls._lock:
+            if cls._tools.pop(name, None) is None:
+                return False
+            cls._catalog = None
+        cls._notify_changed()
+        return True
+
+    @classmethod
+    def add_listener(cls, listener: Callable[[], None]) -> None:
+        """添加工具列表变化的监听者，监听者可能在任意线程中被调用"""
+        cls._listeners.append(listener)
+
+    @classmethod
+    def _notify_changed(cls) -> None:
+        for listener in list(cls._listeners):
+            listener()
+
     @classmethod
     def get_tool(cls, name: str) -> 'ToolsBase':
         """获取工具实例
@@ -45,12 +85,21 @@ class ToolRegistry:
         Returns:
             所有工具的描述列表
         """
-        return [tool.get_tool_description() for tool in cls._tools.values()]
+        catalog = cls._catalog
+        if catalog is None:
+            with cls._lock:
+                if cls._catalog is None:
+                    cls._catalog = [tool.get_tool_description() for tool in cls._tools.values()]
+                catalog = cls._catalog
+        # 返回副本，调用方修改列表不影响缓存
+        return list(catalog)
 
 class ToolsBase:
     """工具基类"""
     name: str = ""
     description: str = ""
+    # 工具查询使用的连接池通道，元数据/健康检查类工具使用 PoolLane.METADATA 以获得预留连接
+    pool_lane: PoolLane = PoolLane.USER
 
     def __init_subclass__(cls, **kwargs):
         """子类初始化时自动注册到工具注册表"""
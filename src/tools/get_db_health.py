@@ -2,9 +2,9 @@ from typing import Dict, Sequence, Any, List
 
 from mcp.types import TextContent, Tool
 
-from config.dbconfig import get_db_config_by_name
+from connection.admission import PoolLane
 from core.exceptions import SQLExecutionError
-from databases.database_factory import DatabaseOperationFactory
+from databases.pool_context import PoolContext
 from tools.base import ToolsBase
 
 
@@ -12,6 +12,8 @@ class DatabaseHealth(ToolsBase):
     """数据库健康检查工具"""
 
     name = "get_db_health"
+    # 元数据查询使用预留的连接池通道
+    pool_lane = PoolLane.METADATA
     description = "获取数据库健康状态 / Get database health status"
 
     def get_tool_description(self) -> Tool:
@@ -54,15 +56,12 @@ class DatabaseHealth(ToolsBase):
         health_type = arguments.get("health_type", "all")
 
         try:
-            # 获取数据库配置
-            db_config = get_db_config_by_name(pool_name)
+            # 获取连接池绑定的方言上下文
+            context = PoolContext.of(pool_name)
             # 获取数据库版本号
-            factory = DatabaseOperationFactory.get_factory_by_pool_name(pool_name)
-            db_version = factory.create_db_version().get_db_version(pool_name)
-            # 获取数据库工厂类
-            factory = DatabaseOperationFactory.get_factory_by_pool_name(pool_name)
+            db_version = context.describe_server_version()
             # 获取健康状态实例
-            handler = factory.create_db_health()
+            handler = context.db_health
             # 获取健康状态
             results = handler.get_db_health(pool_name, health_type)
 
@@ -78,7 +77,7 @@ class DatabaseHealth(ToolsBase):
             
             # 背景
             - 数据库类型
-            {db_config["type"]}
+            {context.db_type}
             
             - 数据库版本号
             {db_version}
@@ -102,6 +101,7 @@ class DatabaseHealth(ToolsBase):
             - **连接问题**：连接数、失败连接、空闲连接过多等
             - **事务问题**：长事务、未提交事务、事务隔离级别
             - **锁与阻塞**：锁等待、死锁、表锁/行锁争用
+            - **索引问题**：重复索引、左前缀冗余索引、过宽的组合索引，给出删除语句和可回收空间，唯一索引需确认约束依赖
             - **资源使用**：缓冲池命中率、临时表使用、磁盘 I/O、死元组、事务 ID 年龄、SGA内存、PGA内存使用情况等，根据数据返回的内容进行扩展分析
             
             ### 4. 【根因分析】
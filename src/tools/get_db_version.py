@@ -2,8 +2,9 @@ from typing import Dict, Sequence, Any
 
 from mcp.types import TextContent, Tool
 
+from connection.admission import PoolLane
 from core.exceptions import SQLExecutionError
-from databases.database_factory import DatabaseOperationFactory
+from databases.pool_context import PoolContext
 from tools.base import ToolsBase
 
 
@@ -16,6 +17,8 @@ class DatabaseVersion(ToolsBase):
 
     # 工具名称
     name = "get_db_version"
+    # 元数据查询使用预留的连接池通道
+    pool_lane = PoolLane.METADATA
     # 工具描述
     description = "查询某个连接池连接的数据库版本号 / Query the database version number of a connection pool connection"
 
@@ -68,14 +71,8 @@ class DatabaseVersion(ToolsBase):
         pool_name = arguments["pool_name"]
 
         try:
-            # 根据连接池名称获取对应的数据库工厂实例
-            factory = DatabaseOperationFactory.get_factory_by_pool_name(pool_name)
-
-            # 创建数据库版本查询处理器实例
-            handler = factory.create_db_version()
-
-            # 执行数据库版本查询操作
-            sql_results = handler.get_db_version(pool_name)
+            # 数据库版本由连接池上下文缓存，连接失效后重新查询
+            sql_results = PoolContext.of(pool_name).describe_server_version()
 
             # 将查询结果转换为文本内容并返回
             return [TextContent(type="text", text="".join(sql_results))]
@@ -2,7 +2,8 @@ from typing import Dict, Sequence, Any
 
 from mcp.types import TextContent, Tool
 
-from databases.database_factory import DatabaseOperationFactory
+from connection.admission import PoolLane
+from databases.pool_context import PoolContext
 from tools.base import ToolsBase
 
 class GetTableDesc(ToolsBase):
@@ -14,6 +15,8 @@ class GetTableDesc(ToolsBase):
     
     # 工具名称
     name = "get_table_desc"
+    # 元数据查询使用预留的连接池通道
+    pool_lane = PoolLane.METADATA
     # 工具描述，包含中英文说明和使用注意事项
     description = (
         "数据库表结构查询工具。仅在用户明确要求查看一个或多个具体数据表的详细结构信息（包括列名、列注释等）时使用此工具。"
@@ -101,11 +104,8 @@ class GetTableDesc(ToolsBase):
             # 如果模式名称为"default"，则设置为None
             schema = schema if schema != "default" else None
 
-            # 根据连接池名称获取对应的数据库工厂实例
-            factory = DatabaseOperationFactory.get_factory_by_pool_name(pool_name)
-
-            # 创建表结构查询处理器实例
-            handler = factory.create_table_description()
+            # 获取连接池绑定的处理器实例
+            handler = PoolContext.of(pool_name).table_description
 
             # 执行表结构查询操作
             sql_result = handler.get_table_description(pool_name,database,schema,text)
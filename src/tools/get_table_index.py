@@ -2,7 +2,8 @@ from typing import Dict, Sequence, Any
 
 from mcp.types import TextContent, Tool
 
-from databases.database_factory import DatabaseOperationFactory
+from connection.admission import PoolLane
+from databases.pool_context import PoolContext
 from tools.base import ToolsBase
 
 class GetTableIndex(ToolsBase):
@@ -14,6 +15,8 @@ class GetTableIndex(ToolsBase):
     
     # 工具名称
     name = "get_table_index"
+    # 元数据查询使用预留的连接池通道
+    pool_lane = PoolLane.METADATA
     # 工具描述，包含中英文说明
     description = (
         "根据表名搜索数据库中对应的表索引,支持多表查询(Search for table indexes in the database based on table names, supporting multi-table queries)"
@@ -97,11 +100,8 @@ class GetTableIndex(ToolsBase):
             # 如果模式名称为"default"，则设置为None
             schema = schema if schema != "default" else None
 
-            # 根据连接池名称获取对应的数据库工厂实例
-            factory = DatabaseOperationFactory.get_factory_by_pool_name(pool_name)
-
-            # 创建表索引查询处理器实例
-            handler = factory.create_table_index()
+            # 获取连接池绑定的处理器实例
+            handler = PoolContext.of(pool_name).table_index
 
             # 执行表索引查询操作
             sql_result = handler.get_table_index(pool_name,database, schema, text)
@@ -2,7 +2,8 @@ from typing import Dict, Sequence, Any
 
 from mcp.types import TextContent, Tool
 
-from databases.database_factory import DatabaseOperationFactory
+from connection.admission import PoolLane
+from databases.pool_context import PoolContext
 from tools.base import ToolsBase
 
 class GetTableName(ToolsBase):
@@ -14,6 +15,8 @@ class GetTableName(ToolsBase):
     
     # 工具名称
     name = "get_table_name"
+    # 元数据查询使用预留的连接池通道
+    pool_lane = PoolLane.METADATA
     # 工具描述，包含中英文说明和使用场景说明
     description = (
         "数据库表名查询工具。用于查询数据库中的所有表名或将根据表的中文名称或表描述搜索数据库中对应的表名。"
@@ -100,11 +103,8 @@ class GetTableName(ToolsBase):
             # 如果模式名称为"default"，则设置为None
             schema = schema if schema != "default" else None
 
-            # 根据连接池名称获取对应的数据库工厂实例
-            factory = DatabaseOperationFactory.get_factory_by_pool_name(pool_name)
-
-            # 创建表名查询处理器实例
-            handler = factory.create_table_name()
+            # 获取连接池绑定的处理器实例
+            handler = PoolContext.of(pool_name).table_name
 
             # 执行表名查询操作
             sql_result = handler.get_table_name(pool_name,database, schema, text)
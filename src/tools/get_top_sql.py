@@ -0,0 +1,108 @@
+from typing import Dict, Sequence, Any
+
+from mcp.types import TextContent, Tool
+
+from connection.admission import PoolLane
+from core.exceptions import SQLExecutionError
+from databases.base.top_sql import DEFAULT_LIMIT, MAX_LIMIT, TopSqlOrder
+from databases.pool_context import PoolContext
+from tools.base import ToolsBase
+
+
+class TopSql(ToolsBase):
+    """Top SQL 工作负载分析工具"""
+
+    name = "get_top_sql"
+    # 统计视图查询使用预留的连接池通道
+    pool_lane = PoolLane.METADATA
+    description = ("获取数据库中消耗最高的SQL（按总耗时、平均耗时、扫描量或执行次数排序），"
+                   "数据来自数据库自身的语句统计，语句已归一化 / "
+                   "Get the most expensive normalized SQL statements from the database's statement statistics")
+
+    def get_tool_description(self) -> Tool:
+        """获取工具描述"""
+        return Tool(
+            name=self.name,
+            description=self.description,
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "pool_name": {
+                        "type": "string",
+                        "description": "线程池名称,若没有指定默认是default"
+                    },
+                    "order_by": {
+                        "type": "string",
+                        "enum": [order.value for order in TopSqlOrder],
+                        "description": ("排序指标，总耗时：total_time，平均耗时：avg_time，扫描量：rows_examined，"
+                                        "执行次数：executions，若没有指定默认是total_time")
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": f"返回的语句数，默认{DEFAULT_LIMIT}，最大{MAX_LIMIT}"
+                    }
+                },
+                "required": ["pool_name"]
+            }
+        )
+
+    async def run_tool(self, arguments: Dict[str, Any]) -> Sequence[TextContent]:
+        """执行 Top SQL 工具
+
+        Args:
+            arguments: 包含执行参数的字典
+                - pool_name (str): 数据库连接池名称
+                - order_by (str, optional): 排序指标，默认为total_time
+                - limit (int, optional): 返回的语句数，默认为10
+
+        Returns:
+            执行结果文本序列
+        """
+        if "pool_name" not in arguments:
+            return [TextContent(type="text", text="错误: 缺少线程池名称")]
+
+        pool_name = arguments["pool_name"]
+        try:
+            order = TopSqlOrder(arguments.get("order_by") or TopSqlOrder.TOTAL_TIME)
+        except ValueError:
+            return [TextContent(type="text", text=f"错误: 无效的排序指标: {arguments.get('order_by')}")]
+        try:
+            limit = min(max(int(arguments.get("limit") or DEFAULT_LIMIT), 1), MAX_LIMIT)
+        except (TypeError, ValueError):
+            return [TextContent(type="text", text=f"错误: 无效的语句数: {arguments.get('limit')}")]
+
+        try:
+            context = PoolContext.of(pool_name)
+            db_version = context.describe_server_version()
+            report = context.top_sql.get_top_sql(pool_name, order, limit)
+
+            prompt = f"""
+            # 角色
+            你是一位精通各大主流数据库的性能专家，负责根据数据库自身的语句统计找出真正消耗资源的SQL。
+
+            # 背景
+            - 数据库类型
+            {context.db_type}
+
+            - 数据库版本号
+            {db_version}
+
+            {report.render()}
+
+            # 任务
+            - 按排序指标说明每条语句的消耗（总耗时占比、平均耗时、扫描量与返回行数之比、执行频率）
+            - 找出最值得优化的语句：高频的中等耗时语句与低频的慢语句分别说明
+            - 扫描量远大于返回行数、存在未使用索引执行的语句，指出可能缺少的索引
+            - 对需要优化的语句，建议使用 sql_optimize 工具结合执行计划进一步分析
+
+            ## 输出要求
+            - 使用清晰的 Markdown 结构
+            - 所有结论必须基于输入的统计数据，避免臆测
+            """
+
+            return [TextContent(type="text", text=prompt)]
+
+        except SQLExecutionError as e:
+            return [TextContent(type="text", text=f"数据库执行错误: {str(e)}")]
+        except Exception as e:
+            return [TextContent(type="text", text=f"执行过程中发生错误: {str(e)}")]
@@ -3,8 +3,8 @@ from typing import Dict, Any, Sequence
 from mcp import Tool
 from mcp.types import TextContent
 
-from config.dbconfig import get_db_config_by_name
-from databases.database_factory import DatabaseOperationFactory
+from connection.admission import PoolLane
+from databases.pool_context import PoolContext
 from tools.base import ToolsBase
 
 
@@ -19,6 +19,8 @@ class SqlCreator(ToolsBase):
     
     # 工具名称
     name = "sql_creator"
+    # 元数据查询使用预留的连接池通道
+    pool_lane = PoolLane.METADATA
     # 工具描述，包含中英文说明和使用规范
     description = ("专业的 SQL 语句生成工具。该工具是生成任何可执行 SQL 语句（包括查询、插入、更新、删除、DDL、配置查询等）的唯一推荐方式。"
                    "当用户提出任何涉及数据库操作的需求时，必须优先调用此工具生成正确的 SQL 语句。"
@@ -99,19 +101,18 @@ class SqlCreator(ToolsBase):
         # 获取数据库模式名称，默认为"default"
         schema = arguments.get("schema", "default")
 
-        # 获取数据库配置
-        db_config = get_db_config_by_name(pool_name)
+        # 获取连接池绑定的方言上下文
+        context = PoolContext.of(pool_name)
 
         # 如果数据库名称为"default"，则使用配置中的数据库名
         if database == "default":
-            database = db_config.get("database")
+            database = context.default_database
         # 如果模式名称为"default"，则使用配置中的模式名（如果存在）
         if schema == "default":
-            schema = db_config.get("schema", None)
+            schema = context.default_schema
 
         # 获取数据库版本号
-        factory = DatabaseOperationFactory.get_factory_by_pool_name(pool_name)
-        db_version = factory.create_db_version().get_db_version(pool_name)
+        db_version = context.describe_server_version()
 
         # 构建结果文本，包含角色定义、核心原则、工具能力、执行流程等信息
         results = f"""
@@ -159,7 +160,7 @@ class SqlCreator(ToolsBase):
         
         #本次任务信息
         - 数据库类型与版本号:
-        {db_config["type"]}
+        {context.db_type}
         {db_version}
         
         - 所需连接的数据库名：
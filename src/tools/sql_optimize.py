@@ -3,7 +3,10 @@ from typing import Dict, Any, Sequence
 from mcp import Tool
 from mcp.types import TextContent
 
-from databases.database_factory import DatabaseOperationFactory
+from core.exceptions import SQLExecutionError
+from databases.base.server_version import Capability
+from databases.base.what_if import parse_candidates
+from databases.pool_context import PoolContext
 from tools.base import ToolsBase
 
 class SqlOptimize(ToolsBase):
@@ -42,6 +45,22 @@ class SqlOptimize(ToolsBase):
                     "tables": {
                         "type": "string",
                         "description": "需要优化sql中的所有表，若sql含有数据库名，需要一同传入，例如数据库.表名，以,分割。"
+                    },
+                    "analyze": {
+                        "type": "boolean",
+                        "description": "是否实际执行sql获取真实的执行计划（实际行数、循环次数、耗时、IO），"
+                                       "sql在事务中执行并总是回滚，超时后终止，只支持单条 SELECT/WITH/INSERT/UPDATE/DELETE/MERGE 语句。"
+                                       "默认false，只获取预估执行计划"
+                    },
+                    "what_if": {
+                        "type": "boolean",
+                        "description": "是否进行假设索引评估：创建候选索引（不实际建立）后重新获取执行计划，比较成本变化。"
+                                       "候选索引根据执行计划的全表扫描热点生成，默认false"
+                    },
+                    "index_candidates": {
+                        "type": "string",
+                        "description": "需要评估的候选索引，格式为 表名(列1, 列2)，表名和列名只能是标识符，列可以带 ASC/DESC，多个以分号分隔，"
+                                       "例如 orders(user_id, created_at); items(order_id)。指定后自动进行假设索引评估"
                     }
 
                 },
@@ -60,6 +79,9 @@ class SqlOptimize(ToolsBase):
                 - pool_name (str, optional): 数据库连接池名称，默认为"default"
                 - database (str, optional): 数据库名称，默认为"default"
                 - schema (str, optional): 数据库模式名称，默认为"default"
+                - analyze (bool, optional): 是否获取实际执行计划，默认为False
+                - what_if (bool, optional): 是否进行假设索引评估，默认为False
+                - index_candidates (str, optional): 需要评估的候选索引
 
         Returns:
             Sequence[TextContent]: 包含生成的SQL语句和相关说明的文本内容序列
@@ -79,9 +101,9 @@ class SqlOptimize(ToolsBase):
 
         tables_group = self._parse_tables(arguments.get("tables"))
 
-        factory = DatabaseOperationFactory.get_factory_by_pool_name(pool_name)
+        context = PoolContext.of(pool_name)
         # 获取数据库版本
-        db_version = factory.create_db_version().get_db_version(pool_name)
+        db_version = context.describe_server_version()
 
         # 获取表索引
         index_info:str = ""
@@ -93,19 +115,30 @@ class SqlOptimize(ToolsBase):
         table_size_info:str = ""
 
         for table_info in tables_group:
-            index_info += factory.create_table_index().get_table_index(pool_name,table_info.get("database"),
+            index_info += context.table_index.get_table_index(pool_name,table_info.get("database"),
                                                                         table_info.get("schema"), table_info.get("table_name")) + "\n"
 
-            table_desc_info += factory.create_table_description().get_table_description(pool_name,table_info.get("database"),
+            table_desc_info += context.table_description.get_table_description(pool_name,table_info.get("database"),
                                                                         table_info.get("schema"), table_info.get("table_name")) + "\n"
 
-            table_size_info += factory.create_sql_optimize().get_table_size(pool_name,table_info.get("database"),
+            table_size_info += context.sql_optimize.get_table_size(pool_name,table_info.get("database"),
                                                                             table_info.get("schema"), table_info.get("table_name")) + "\n"
 
         print(text)
 
-        # 获取sql执行计划
-        sql_explain = factory.create_sql_optimize().get_sql_explain(pool_name, text)
+        # 获取sql执行计划，实际执行计划需要数据库支持，不支持时使用预估计划
+        analyze = bool(arguments.get("analyze", False))
+        if analyze and not context.supports(Capability.EXPLAIN_ANALYZE):
+            sql_explain = ("当前数据库版本不支持获取实际执行计划，以下为预估执行计划\n" +
+                           context.sql_optimize.get_sql_explain(pool_name, text))
+        else:
+            sql_explain = context.sql_optimize.get_sql_explain(pool_name, text, analyze)
+
+        # 假设索引评估，候选为用户指定的索引和根据执行计划热点生成的索引
+        candidates = parse_candidates(arguments.get("index_candidates"))
+        what_if_info = "未进行假设索引评估"
+        if arguments.get("what_if") or candidates:
+            what_if_info = self._evaluate_indexes(context, pool_name, text, candidates)
 
         result = f"""
                 # 角色设定
@@ -126,8 +159,10 @@ class SqlOptimize(ToolsBase):
                 {index_info}
                 5. 表的数据大小
                 {table_size_info}
-                6. 执行计划（EXPLAIN 或执行计划文本）
+                6. 执行计划（计划树及本地计算的热点，热点为全表扫描、额外排序、临时表和大输入的嵌套循环）
                 {sql_explain}
+                7. 假设索引评估（候选索引的预估成本变化，索引未实际建立）
+                {what_if_info}
                 
                 ## 第二步：执行计划深度解析
                 请逐行分析执行计划，回答以下问题：
@@ -154,7 +189,7 @@ class SqlOptimize(ToolsBase):
             
                 ## 第四步：索引优化建议
                 请基于前三步分析，提出索引优化方案：
-                1. 现有索引是否被有效使用？未使用的索引建议删除。
+                1. 现有索引是否被有效使用？未使用的索引建议删除。若有假设索引评估结果，优先建议成本下降明显且被执行计划使用的候选索引。
                 2. 是否需要创建复合索引？请给出**最优字段顺序**（区分度高在前）。
                 3. 是否可使用**覆盖索引**避免回表？
                 4. 对于大表分页，是否可使用“延迟关联”或“书签法”？
@@ -209,6 +244,16 @@ class SqlOptimize(ToolsBase):
         # 返回结果文本内容
         return [TextContent(type="text", text="".join(result))]
 
+    @staticmethod
+    def _evaluate_indexes(context: PoolContext, pool_name: str, text: str, candidates: list) -> str:
+        """假设索引评估的文本，数据库不支持或获取原计划失败时返回原因"""
+        if context.sql_optimize.what_if_method(pool_name) is None:
+            return "当前数据库版本不支持假设索引评估"
+        try:
+            return context.sql_optimize.evaluate_indexes(pool_name, text, candidates).render()
+        except SQLExecutionError as e:
+            return str(e)
+
     def _parse_tables(self, tables_str: str) -> list:
         """
         解析表名字符串，返回包含database、schema、tablename的字典列表
@@ -4,20 +4,29 @@ SQL执行工具类，使用数据库连接池执行SQL语句
 
 import logging
 import re
+import threading
+import time
 from enum import Enum
-from typing import List, Tuple, Optional, Dict, Any, Set
+from typing import List, Tuple, Optional, Dict, Any, Set, Callable, Sequence, TypeVar
 from dataclasses import dataclass
 from contextlib import contextmanager
 
-from pymysql import MySQLError
 from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
 
-from config.dbconfig import get_db_config, get_role_permissions
+from config.dbconfig import get_role_permissions
 from connection.pool_manager import MultiDBPoolManager
-from core.exceptions import SQLPermissionError
+from connection.query_cancel import QueryCancelToken, current_cancel_token
+from connection.replica import pin_primary
+from connection.session import PinnedSession
+from core.exceptions import (SQLPermissionError, SQLCancelledError, SQLExecutionError, AdmissionRejectedError,
+                             PoolUnavailableError)
+from utils.metrics import SQL_STATEMENT_DURATION
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
 class SQLOperation(str, Enum):
     """SQL 操作类型枚举"""
     SELECT = 'SELECT'
@@ -63,79 +72,110 @@ class SQLResult:
 class ExecuteSqlUtil:
     """使用数据库连接池的SQL执行工具类"""
 
+    # 执行时连接断开的重试次数，只对查询类语句生效
+    DISCONNECT_RETRIES = 1
+
+    # 可以路由到只读副本的操作类型
+    READ_ONLY_OPERATIONS = frozenset({SQLOperation.SELECT, SQLOperation.SHOW, SQLOperation.DESCRIBE,
+                                      SQLOperation.EXPLAIN})
+    # 加锁读取或 SELECT INTO 等需要在主库执行的查询
+    PRIMARY_ONLY_PATTERN = re.compile(r'\bFOR\s+UPDATE\b|\bFOR\s+SHARE\b|\bLOCK\s+IN\s+SHARE\s+MODE\b|\bINTO\b')
+
+    # 实际执行计划只允许执行后能完整回滚的数据查询和 DML，DDL 在 Oracle、MySQL 中会隐式提交
+    ANALYZABLE_KEYWORDS = ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE', 'MERGE')
+    ANALYZABLE_OPERATIONS = frozenset({SQLOperation.SELECT, SQLOperation.INSERT, SQLOperation.UPDATE,
+                                       SQLOperation.DELETE})
+    # 事务控制、匿名块和过程调用，其中的 COMMIT 会提交事务，执行后无法保证回滚
+    NON_ROLLBACK_PATTERN = re.compile(r'\b(?:COMMIT|ROLLBACK|SAVEPOINT|BEGIN|DECLARE|CALL|EXEC|EXECUTE|GRANT|REVOKE)\b')
+
     # SQL操作正则模式
     SQL_COMMENT_PATTERN = re.compile(r'--.*$|/\*.*?\*/', re.MULTILINE | re.DOTALL)
 
     @classmethod
-    def execute_single_statement(cls, pool_name: str, statement: str) -> SQLResult:
+    def execute_single_statement(cls, pool_name: str, statement: str,
+                                 session: Optional[PinnedSession] = None,
+                                 params: Optional[Dict[str, Any]] = None) -> SQLResult:
         """执行单条SQL语句
         
         Args:
             statement: SQL语句
             pool_name: 线程池名称
+            session: 固定连接的会话，指定时在会话的连接上执行且不自动提交，否则从连接池借出一个连接
+            params: 语句中 :name 绑定参数的值
         Returns:
             SQL执行结果
             
         Raises:
             Exception: 当执行出错时
         """
+        cancel_token = current_cancel_token()
+        if cancel_token is not None:
+            cancel_token.raise_if_cancelled()
+
         try:
 
             # 检查权限
             operations = ExecuteSqlUtil.extract_operations(statement)
 
-            ExecuteSqlUtil.check_permissions(operations)
+            db_config = MultiDBPoolManager.get_config(pool_name) or {}
+            ExecuteSqlUtil.check_permissions(operations, db_config.get("role") or "readonly")
 
             pool = MultiDBPoolManager.get_pool(pool_name)
 
-            with pool.connection() as conn:
+            # 清理SQL语句并转为大写进行分析
+            cleaned_statement = ExecuteSqlUtil.clean_sql(statement)
+            upper_statement = cleaned_statement.upper().strip()
 
-                # 清理SQL语句并转为大写进行分析
-                cleaned_statement = ExecuteSqlUtil.clean_sql(statement)
-                upper_statement = cleaned_statement.upper().strip()
-                
-                # 判断语句类型
-                is_select = (upper_statement.startswith('SELECT') or 
-                           upper_statement.startswith('WITH'))
-                
-                is_show = upper_statement.startswith('SHOW')
-                is_explain = upper_statement.startswith('EXPLAIN') and not upper_statement.startswith('EXPLAIN PLAN FOR ')
-                is_describe = (upper_statement.startswith('DESCRIBE') or 
-                             upper_statement.startswith('DESC '))
-                
-                # 特殊语句类型（通常返回结果集）
-                is_query_type = is_select or is_show or is_explain or is_describe
+            # 判断语句类型，查询类语句返回结果集
+            is_query_type = cls.is_query_statement(upper_statement)
 
+            # 只读语句可以路由到只读副本
+            read_only = (is_query_type and operations <= cls.READ_ONLY_OPERATIONS and
+                         not cls.PRIMARY_ONLY_PATTERN.search(upper_statement))
+
+            operation = cls._operation_label(upper_statement)
+            attempt = 0
+            while True:
                 try:
-                    # 执行SQL语句
-                    result = conn.execute(text(statement))
-                    
-                    # 根据语句类型处理结果
-                    if is_query_type:
-                        # 查询类语句（SELECT, SHOW, EXPLAIN, DESCRIBE等）
-                        columns = list(result.keys())
-                        rows = result.fetchall()
-                        return SQLResult(
-                            success=True,
-                            message="查询执行成功",
-                            columns=columns,
-                            rows=rows
-                        )
+                    if session is not None:
+                        sql_result = cls._execute_statement(pool_name, pool, session.connection, statement,
+                                                            operation, is_query_type, cancel_token, autocommit=False,
+                                                            params=params)
                     else:
-                        # 非查询语句（INSERT, UPDATE, DELETE等）
-                        conn.commit()
-                        return SQLResult(
-                            success=True,
-                            message="执行成功",
-                            affected_rows=result.rowcount
-                        )
-                except Exception as e:
-                    # 如果是非查询语句且执行失败，回滚事务
-                    if not is_query_type:
-                        conn.rollback()
-                    raise
-                        
-        except MySQLError as e:
+                        sql_result = cls._execute_on_connection(pool_name, pool, statement, operation,
+                                                                is_query_type, read_only, cancel_token, params)
+                    if not read_only:
+                        # 本次工具调用后续的读取固定在主库，保证能读到刚写入的数据
+                        pin_primary()
+                    return sql_result
+                except DBAPIError as e:
+                    # 连接借出时不一定校验过，断线时连接已被废弃，查询类语句换一个连接重试
+                    # 会话中的语句依赖同一个连接上的状态，不能换连接重试
+                    if not (e.connection_invalidated and is_query_type and session is None and
+                            attempt < cls.DISCONNECT_RETRIES):
+                        raise
+                    attempt += 1
+                    if pool is not None and pool.validator is not None:
+                        pool.validator.record_disconnect_retry()
+                    logger.warning(f"Connection lost during execution on pool '{pool_name}', retrying: {e}")
+
+        except SQLCancelledError:
+            logger.info(f"SQL执行已取消, SQL: {statement}")
+            raise
+        except AdmissionRejectedError as e:
+            logger.warning(f"连接池准入被拒绝: {e}, SQL: {statement}")
+            return SQLResult(
+                success=False,
+                message=f"执行失败: {str(e)}"
+            )
+        except PoolUnavailableError as e:
+            logger.warning(f"连接池熔断中: {e}, SQL: {statement}")
+            return SQLResult(
+                success=False,
+                message=f"执行失败: {str(e)}"
+            )
+        except DBAPIError as e:
+            # 各驱动的异常都由 SQLAlchemy 包装为 DBAPIError，无需导入具体驱动
             logger.error(f"SQL执行错误: {e}, SQL: {statement}")
             return SQLResult(
                 success=False,
@@ -148,6 +188,64 @@ class ExecuteSqlUtil:
                 message=f"执行失败: {str(e)}"
             )
     @classmethod
+    def _execute_on_connection(cls, pool_name: str, pool, statement: str, operation: str,
+                               is_query_type: bool, read_only: bool, cancel_token,
+                               params: Optional[Dict[str, Any]] = None) -> SQLResult:
+        """从连接池获取一个连接并执行单条SQL语句，只读语句优先使用只读副本"""
+        with MultiDBPoolManager.get_instance().connection(pool_name, read_only=read_only) as conn:
+            return cls._execute_statement(pool_name, pool, conn, statement, operation, is_query_type, cancel_token,
+                                          params=params)
+
+    @classmethod
+    def _execute_statement(cls, pool_name: str, pool, conn, statement: str, operation: str, is_query_type: bool,
+                           cancel_token, autocommit: bool = True,
+                           params: Optional[Dict[str, Any]] = None) -> SQLResult:
+        """在指定连接上执行单条SQL语句，autocommit 为False时非查询语句不提交，由调用方决定提交或回滚"""
+        start = time.perf_counter()
+        try:
+            # 执行期间登记连接，请求取消时可终止该连接上的查询
+            with cls._track_cancellation(cancel_token, pool, conn):
+                # 执行SQL语句
+                result = conn.execute(text(statement), params or {})
+
+                # 根据语句类型处理结果
+                if is_query_type:
+                    # 查询类语句（SELECT, SHOW, EXPLAIN, DESCRIBE等）
+                    columns = list(result.keys())
+                    rows = result.fetchall()
+                    sql_result = SQLResult(
+                        success=True,
+                        message="查询执行成功",
+                        columns=columns,
+                        rows=rows
+                    )
+                else:
+                    # 非查询语句（INSERT, UPDATE, DELETE等）
+                    if autocommit:
+                        conn.commit()
+                    sql_result = SQLResult(
+                        success=True,
+                        message="执行成功",
+                        affected_rows=result.rowcount
+                    )
+            SQL_STATEMENT_DURATION.labels(pool_name, operation, "ok").observe(time.perf_counter() - start)
+            return sql_result
+        except SQLCancelledError:
+            raise
+        except Exception as e:
+            cancelled = cancel_token is not None and cancel_token.cancelled
+            SQL_STATEMENT_DURATION.labels(pool_name, operation, "cancelled" if cancelled else "error").observe(
+                time.perf_counter() - start)
+            if cancelled:
+                # 被取消的连接状态不确定，直接废弃而不是归还连接池复用
+                conn.invalidate()
+                raise SQLCancelledError(f"请求已取消，SQL执行被终止: {e}") from e
+            # 如果是非查询语句且执行失败，回滚事务（连接已断开时无需回滚，会话中的事务由会话结束时回滚）
+            if autocommit and not is_query_type and not conn.invalidated:
+                conn.rollback()
+            raise
+
+    @classmethod
     def execute_multiple_statements(cls,pool_name: str, query: str) -> List[SQLResult]:
         """执行多条SQL语句
         
@@ -165,6 +263,8 @@ class ExecuteSqlUtil:
             try:
                 result = ExecuteSqlUtil.execute_single_statement(pool_name,statement)
                 results.append(result)
+            except SQLCancelledError:
+                raise
             except Exception as e:
                 logger.warning(f"SQL执行警告: {e}, SQL: {statement}")
                 results.append(SQLResult(
@@ -174,6 +274,117 @@ class ExecuteSqlUtil:
                 
         return results
     @classmethod
+    def run_in_rollback(cls, pool_name: str, statements: Sequence[str], work: Callable[[Any], T],
+                        timeout: Optional[float] = None) -> T:
+        """在固定连接的会话中执行多步操作（如 EXPLAIN ANALYZE、SET SHOWPLAN_XML 后获取计划），结束后总是回滚
+
+        操作的各条语句在同一个主库连接的事务中执行，无论成功与否都回滚，不会留下任何修改；
+        超过超时时间时按方言终止正在执行的语句，被终止的连接直接废弃。
+
+        Args:
+            pool_name: 连接池名称
+            statements: work 中会执行的用户语句，按连接池角色检查权限
+            work: 在连接上执行的操作，参数为 SQLAlchemy 连接
+            timeout: 超时时间(秒)，默认为连接池配置的 explain_analyze_timeout
+
+        Returns:
+            work 的返回值
+
+        Raises:
+            SQLExecutionError: 权限不足、执行失败或超时时抛出，信息以"执行失败"开头
+            SQLCancelledError: 请求被取消时抛出
+        """
+        cancel_token = current_cancel_token()
+        if cancel_token is not None:
+            cancel_token.raise_if_cancelled()
+
+        db_config = MultiDBPoolManager.get_config(pool_name) or {}
+        if timeout is None:
+            timeout = float(db_config.get("explain_analyze_timeout") or 10)
+        watchdog = QueryCancelToken()
+        timer = threading.Timer(timeout, watchdog.cancel)
+        timer.daemon = True
+        try:
+            for statement in statements:
+                cls.check_permissions(cls.extract_operations(statement), db_config.get("role") or "readonly")
+            with MultiDBPoolManager.get_instance().session(pool_name) as session:
+                conn = session.connection
+                try:
+                    with watchdog.track(session.pool, conn), cls._track_cancellation(cancel_token, session.pool, conn):
+                        timer.start()
+                        return work(conn)
+                except Exception:
+                    # 被终止的连接状态不确定，直接废弃
+                    if watchdog.cancelled or (cancel_token is not None and cancel_token.cancelled):
+                        conn.invalidate()
+                    raise
+                finally:
+                    timer.cancel()
+        except SQLCancelledError:
+            raise
+        except Exception as e:
+            if cancel_token is not None and cancel_token.cancelled:
+                raise SQLCancelledError(f"请求已取消，SQL执行被终止: {e}") from e
+            if watchdog.cancelled:
+                logger.warning(f"Statement on pool '{pool_name}' exceeded {timeout}s and was cancelled")
+                raise SQLExecutionError(f"执行失败: 执行超过 {timeout:g} 秒，已终止并回滚") from e
+            logger.error(f"SQL执行错误: {e}, SQL: {'; '.join(statements)}")
+            raise SQLExecutionError(f"执行失败: {str(e)}") from e
+
+    @classmethod
+    def check_analyzable(cls, statement: str) -> None:
+        """
+        检查语句能否以实际执行计划的方式执行：语句会真正执行，只有单条 SELECT/WITH/INSERT/UPDATE/DELETE/MERGE
+        语句能在事务中执行后完整回滚，DDL、事务控制和过程调用会隐式提交或无法回滚
+
+        Args:
+            statement: 用户的SQL语句
+
+        Raises:
+            SQLExecutionError: 语句不能在执行后回滚时抛出
+        """
+        upper_statement = cls.clean_sql(statement).upper().strip().rstrip(';').strip()
+        if (not upper_statement.startswith(cls.ANALYZABLE_KEYWORDS) or ';' in upper_statement or
+                not cls.extract_operations(upper_statement) <= cls.ANALYZABLE_OPERATIONS or
+                cls.NON_ROLLBACK_PATTERN.search(upper_statement)):
+            raise SQLExecutionError("执行失败: 实际执行计划只支持单条 SELECT/WITH/INSERT/UPDATE/DELETE/MERGE 语句，"
+                                    "DDL、事务控制和过程调用会隐式提交或无法回滚，请使用预估执行计划")
+
+    @staticmethod
+    def is_query_statement(upper_statement: str) -> bool:
+        """
+        判断语句是否返回结果集（SELECT/WITH/SHOW/DESCRIBE/EXPLAIN）
+
+        Oracle 的 EXPLAIN PLAN [SET STATEMENT_ID = ...] [INTO ...] FOR 只把计划写入 PLAN_TABLE，不返回结果集
+
+        Args:
+            upper_statement: 经过 clean_sql 清理并转为大写的语句
+        """
+        if upper_statement.startswith(('SELECT', 'WITH', 'SHOW', 'DESCRIBE', 'DESC ')):
+            return True
+        return upper_statement.startswith('EXPLAIN') and not upper_statement.startswith('EXPLAIN PLAN ')
+
+    @staticmethod
+    def _operation_label(upper_statement: str) -> str:
+        """取语句的首个关键字作为指标的操作类型，未知类型统一归为OTHER以限制标签数量"""
+        keyword = upper_statement.split(" ", 1)[0] if upper_statement else ""
+        if keyword == "WITH":
+            return SQLOperation.SELECT.value
+        if keyword == "DESC":
+            return SQLOperation.DESCRIBE.value
+        return keyword if keyword in SQLOperation.__members__ else "OTHER"
+
+    @staticmethod
+    @contextmanager
+    def _track_cancellation(cancel_token, pool, conn):
+        """在存在取消令牌时登记连接，否则不做任何处理"""
+        if cancel_token is None:
+            yield
+        else:
+            with cancel_token.track(pool, conn):
+                yield
+
+    @classmethod
     def format_result(cls, result: SQLResult) -> str:
         """格式化SQL执行结果
 
@@ -228,11 +439,12 @@ class ExecuteSqlUtil:
         }
 
     @staticmethod
-    def check_permissions(operations: Set[SQLOperation]) -> bool:
+    def check_permissions(operations: Set[SQLOperation], role: str = "readonly") -> bool:
         """检查操作权限
 
         Args:
             operations: 操作类型集合
+            role: 连接池配置的角色
 
         Returns:
             是否有权限执行所有操作
@@ -240,8 +452,6 @@ class ExecuteSqlUtil:
         Raises:
             SQLPermissionError: 当权限不足时
         """
-        config = get_db_config()
-        role = config.get("role", "readonly")  # 默认为只读角色
         allowed = {SQLOperation.from_str(op) for op in get_role_permissions(role)}
         unauthorized = operations - allowed
 
@@ -0,0 +1,320 @@
+"""
+Prometheus 格式的运行指标
+提供预分配桶的直方图、计数器以及抓取时计算的指标采集函数，
+通过 /metrics 路由（或独立的 sidecar 监听端口）以文本格式导出
+"""
+
+import logging
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 默认耗时桶(秒)，覆盖 1ms ~ 60s
+DEFAULT_LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _format_labels(label_names: Sequence[str], label_values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(label_names, label_values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """
+    单个标签组合的直方图
+
+    桶计数在创建时预分配，observe 只做一次二分查找和几次列表/属性自增，不加锁。
+    依赖 GIL 保证单次自增的原子性，极端并发下可能丢失个别计数，对监控用途可以接受。
+    """
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        # 最后一个位置对应 +Inf 桶
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Counter:
+    """单个标签组合的计数器"""
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+
+class _MetricFamily:
+    """按标签值划分子指标的指标族"""
+
+    metric_type = ""
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *label_values):
+        """
+        获取指定标签值的子指标，不存在时创建
+
+        已存在的子指标只做一次无锁的字典查找，只有首次创建时才加锁；
+        连接池、通道等已知的标签组合在创建连接池时预分配，请求路径上不会进入加锁分支
+        """
+        child = self._children.get(label_values)
+        if child is None:
+            with self._lock:
+                child = self._children.get(label_values)
+                if child is None:
+                    child = self._new_child()
+                    self._children[label_values] = child
+        return child
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class HistogramFamily(_MetricFamily):
+    metric_type = "histogram"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> Histogram:
+        return Histogram(self.buckets)
+
+    def render(self) -> List[str]:
+        lines = []
+        for label_values, child in list(self._children.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), list(child.counts)):
+                cumulative += count
+                labels = _format_labels(self.label_names, label_values, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.label_names, label_values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(child.sum)}")
+            lines.append(f"{self.name}_count{labels} {child.count}")
+        return lines
+
+
+class CounterFamily(_MetricFamily):
+    metric_type = "counter"
+
+    def _new_child(self) -> Counter:
+        return Counter()
+
+    def render(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.label_names, label_values)} {_format_value(child.value)}"
+            for label_values, child in list(self._children.items())
+        ]
+
+
+# 采集函数返回 (指标名, 标签字典, 值) 序列，在抓取时调用
+Collector = Callable[[], Iterable[Tuple[str, Dict[str, str], float]]]
+
+
+class MetricsRegistry:
+    """指标注册表"""
+
+    def __init__(self):
+        self._families: Dict[str, _MetricFamily] = {}
+        # 指标名 -> (类型, 说明)
+        self._gauge_docs: Dict[str, Tuple[str, str]] = {}
+        self._collectors: Dict[str, Collector] = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name: str, documentation: str, label_names: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS) -> HistogramFamily:
+        return self._register(HistogramFamily(name, documentation, label_names, buckets))
+
+    def counter(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> CounterFamily:
+        return self._register(CounterFamily(name, documentation, label_names))
+
+    def _register(self, family):
+        with self._lock:
+            existing = self._families.get(family.name)
+            if existing is not None:
+                return existing
+            self._families[family.name] = family
+            return family
+
+    def describe_gauge(self, name: str, documentation: str, metric_type: str = "gauge") -> None:
+        """声明由采集函数产出的指标的类型和说明"""
+        self._gauge_docs[name] = (metric_type, documentation)
+
+    def register_collector(self, key: str, collector: Collector) -> None:
+        """注册采集函数，相同key会覆盖之前的采集函数"""
+        with self._lock:
+            self._collectors[key] = collector
+
+    def unregister_collector(self, key: str) -> None:
+        with self._lock:
+            self._collectors.pop(key, None)
+
+    def render(self) -> str:
+        """生成 Prometheus 文本格式的全部指标"""
+        lines = []
+        for family in list(self._families.values()):
+            lines.append(f"# HELP {family.name} {family.documentation}")
+            lines.append(f"# TYPE {family.name} {family.metric_type}")
+            lines.extend(family.render())
+
+        samples: Dict[str, List[str]] = {}
+        for key, collector in list(self._collectors.items()):
+            try:
+                for name, labels, value in collector():
+                    label_names = tuple(labels.keys())
+                    samples.setdefault(name, []).append(
+                        f"{name}{_format_labels(label_names, tuple(labels.values()))} {_format_value(value)}"
+                    )
+            except Exception as e:
+                logger.warning(f"Metrics collector '{key}' failed: {e}")
+
+        for name, sample_lines in samples.items():
+            metric_type, documentation = self._gauge_docs.get(name, ("gauge", name))
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            lines.extend(sample_lines)
+
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+TOOL_CALL_DURATION = REGISTRY.histogram(
+    "smartdb_tool_call_duration_seconds", "MCP tool call latency", ("tool", "status"))
+SQL_STATEMENT_DURATION = REGISTRY.histogram(
+    "smartdb_sql_statement_duration_seconds", "SQL statement latency including result fetch",
+    ("pool", "operation", "status"))
+POOL_CHECKOUT_WAIT = REGISTRY.histogram(
+    "smartdb_pool_checkout_wait_seconds", "Time spent waiting for a connection from the SQLAlchemy pool", ("pool",))
+ADMISSION_QUEUE_WAIT = REGISTRY.histogram(
+    "smartdb_admission_queue_wait_seconds", "Time queued requests spent waiting in pool admission control",
+    ("pool", "lane"))
+POOL_EVENTS = REGISTRY.counter(
+    "smartdb_pool_events_total", "SQLAlchemy pool events (connect, checkout, checkin, invalidate, ...)",
+    ("pool", "event"))
+
+# 抓取时由采集函数产出的指标
+for _name, _doc in (
+        ("smartdb_pool_size", "Configured pool size"),
+        ("smartdb_pool_max_overflow", "Configured maximum overflow connections"),
+        ("smartdb_pool_checked_out_connections", "Connections currently checked out of the pool"),
+        ("smartdb_pool_available_connections", "Idle connections available in the pool"),
+        ("smartdb_pool_overflow_connections", "Current overflow connection count reported by the pool"),
+        ("smartdb_pool_saturation_ratio", "Checked out connections divided by pool_size + max_overflow"),
+        ("smartdb_admission_active_requests", "Requests holding an admission slot"),
+        ("smartdb_admission_queued_requests", "Requests waiting in the admission queue"),
+        ("smartdb_pool_circuit_state", "Circuit breaker state of the pool: 0 closed, 1 half-open, 2 open"),
+        ("smartdb_replica_healthy", "Whether the read replica is in rotation (1) or excluded (0)"),
+        ("smartdb_replica_lag_seconds", "Replication lag of the read replica at the last check"),
+        ("smartdb_replica_outstanding_requests", "Requests currently routed to the read replica"),
+        ("smartdb_event_store_streams", "Streams held by the in-memory event store"),
+        ("smartdb_event_store_events", "Events held by the in-memory event store"),
+        ("smartdb_event_store_bytes", "Approximate serialized size of events held by the in-memory event store"),
+):
+    REGISTRY.describe_gauge(_name, _doc)
+REGISTRY.describe_gauge("smartdb_admission_rejected_total", "Requests rejected because the admission queue was full",
+                        "counter")
+REGISTRY.describe_gauge("smartdb_admission_timeout_total", "Requests that timed out in the admission queue", "counter")
+REGISTRY.describe_gauge("smartdb_pool_circuit_opened_total", "Times the pool circuit breaker opened", "counter")
+REGISTRY.describe_gauge("smartdb_pool_circuit_rejected_total",
+                        "Requests failed immediately because the pool circuit breaker was open", "counter")
+REGISTRY.describe_gauge("smartdb_replica_routed_total", "Read requests routed to the read replica", "counter")
+REGISTRY.describe_gauge("smartdb_pool_validation_pings_total",
+                        "Connections pinged at checkout because they were idle longer than the threshold", "counter")
+REGISTRY.describe_gauge("smartdb_pool_validation_pings_saved_total",
+                        "Checkouts that skipped the ping because the connection was recently used", "counter")
+REGISTRY.describe_gauge("smartdb_pool_disconnect_retries_total",
+                        "Statements retried on a new connection after a disconnect", "counter")
+
+
+def instrument_pool(pool_name: str, engine) -> None:
+    """
+    为 SQLAlchemy 引擎注册连接池事件计数，并预分配该连接池的指标子项
+
+    Args:
+        pool_name: 连接池名称
+        engine: SQLAlchemy 引擎
+    """
+    from sqlalchemy import event
+
+    # 预分配等待连接耗时的子指标，请求路径上只做无锁查找
+    POOL_CHECKOUT_WAIT.labels(pool_name)
+    for event_name in ("connect", "checkout", "checkin", "invalidate", "soft_invalidate", "reset", "close"):
+        counter = POOL_EVENTS.labels(pool_name, event_name)
+
+        def _listener(*args, _counter=counter, **kwargs):
+            _counter.inc()
+
+        event.listen(engine, event_name, _listener)
+
+
+class _MetricsRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = REGISTRY.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug("metrics: " + format % args)
+
+
+def start_metrics_server(port: int, host: str = "0.0.0.0") -> Optional[ThreadingHTTPServer]:
+    """
+    启动独立的指标监听端口（stdio/SSE 模式使用的 sidecar）
+
+    Args:
+        port: 监听端口
+        host: 监听地址
+
+    Returns:
+        HTTP服务实例，启动失败时返回None
+    """
+    try:
+        server = ThreadingHTTPServer((host, port), _MetricsRequestHandler)
+    except OSError as e:
+        logger.error(f"Failed to start metrics listener on {host}:{port}: {e}")
+        return None
+    thread = threading.Thread(target=server.serve_forever, name="smartdb-metrics", daemon=True)
+    thread.start()
+    logger.info(f"Metrics listener started on {host}:{port}/metrics")
+    return server
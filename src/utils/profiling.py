@@ -0,0 +1,201 @@
+"""
+工具调用的按需采样分析
+在工具执行期间由后台线程定期采集执行线程的调用栈，调用耗时超过阈值时
+输出 collapsed stack（可用于 flamegraph.pl）和 speedscope 格式的分析文件。
+
+配置（环境变量，命令行参数 --profile / --profile-threshold-ms 优先）:
+    PROFILE_ENABLED: 是否对所有工具调用开启采样，默认false
+    PROFILE_THRESHOLD_MS: 超过该耗时的调用才输出分析文件，默认1000
+    PROFILE_INTERVAL_MS: 采样间隔，默认5
+    PROFILE_OUTPUT_DIR: 分析文件输出目录，默认 profiles
+"""
+
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 单个调用栈最多记录的帧数
+_MAX_STACK_DEPTH = 128
+
+
+def _frame_label(code) -> str:
+    parts = code.co_filename.replace("\\", "/").rsplit("/", 2)
+    filename = "/".join(parts[-2:])
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """
+    对指定线程进行定时栈采样的分析器
+    """
+
+    def __init__(self, thread_id: int, interval: float):
+        """
+        Args:
+            thread_id: 被采样线程的标识（threading.get_ident()）
+            interval: 采样间隔(秒)
+        """
+        self.thread_id = thread_id
+        self.interval = interval
+        # 调用栈(从外到内的帧名称元组) -> 采样次数
+        self.samples: Counter[Tuple[str, ...]] = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="smartdb-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None and len(stack) < _MAX_STACK_DEPTH:
+                stack.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            # 采集时从内到外，输出需要从外到内
+            stack.reverse()
+            self.samples[tuple(stack)] += 1
+
+    def to_collapsed(self) -> str:
+        """输出 collapsed stack 格式，每行为 “帧;帧;帧 次数”"""
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in self.samples.most_common())
+
+    def to_speedscope(self, name: str) -> dict:
+        """输出 speedscope 的 sampled 格式"""
+        frames = []
+        frame_index = {}
+        samples = []
+        weights = []
+        for stack, count in self.samples.items():
+            indexes = []
+            for label in stack:
+                index = frame_index.get(label)
+                if index is None:
+                    index = frame_index[label] = len(frames)
+                    frames.append({"name": label})
+                indexes.append(index)
+            samples.append(indexes)
+            weights.append(round(count * self.interval, 6))
+
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": name,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": round(sum(weights), 6),
+                "samples": samples,
+                "weights": weights,
+            }],
+            "name": name,
+            "activeProfileIndex": 0,
+            "exporter": "smartdb",
+        }
+
+
+class ToolProfiler:
+    """
+    工具调用分析配置与入口
+    """
+    _configured: bool = False
+    _enabled: bool = False
+    _threshold_ms: float = 1000.0
+    _interval_ms: float = 5.0
+    _output_dir: str = "profiles"
+
+    @classmethod
+    def configure(cls, enabled: Optional[bool] = None, threshold_ms: Optional[float] = None,
+                  interval_ms: Optional[float] = None, output_dir: Optional[str] = None) -> None:
+        """
+        配置分析器，未指定的参数从环境变量读取
+
+        Args:
+            enabled: 是否对所有工具调用开启采样
+            threshold_ms: 输出分析文件的耗时阈值(毫秒)
+            interval_ms: 采样间隔(毫秒)
+            output_dir: 分析文件输出目录
+        """
+        if enabled is None:
+            enabled = os.getenv("PROFILE_ENABLED", "false").lower() == "true"
+        if threshold_ms is None:
+            threshold_ms = float(os.getenv("PROFILE_THRESHOLD_MS", "1000"))
+        if interval_ms is None:
+            interval_ms = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+        if output_dir is None:
+            output_dir = os.getenv("PROFILE_OUTPUT_DIR", "profiles")
+
+        cls._enabled = enabled
+        cls._threshold_ms = max(threshold_ms, 0.0)
+        cls._interval_ms = max(interval_ms, 0.5)
+        cls._output_dir = output_dir
+        cls._configured = True
+
+        if enabled:
+            logger.info(f"Tool profiling enabled (threshold: {cls._threshold_ms}ms, "
+                        f"interval: {cls._interval_ms}ms, output: {output_dir})")
+
+    @classmethod
+    @contextmanager
+    def profile(cls, tool_name: str, requested: bool = False):
+        """
+        在当前线程执行期间进行采样，耗时超过阈值时输出分析文件
+
+        Args:
+            tool_name: 工具名称
+            requested: 调用方是否显式要求本次调用进行分析（忽略阈值，总是输出）
+        """
+        if not cls._configured:
+            cls.configure()
+        if not (cls._enabled or requested):
+            yield
+            return
+
+        profiler = SamplingProfiler(threading.get_ident(), cls._interval_ms / 1000)
+        start = time.perf_counter()
+        profiler.start()
+        try:
+            yield
+        finally:
+            profiler.stop()
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            if requested or elapsed_ms >= cls._threshold_ms:
+                cls._dump(tool_name, elapsed_ms, profiler)
+
+    @classmethod
+    def _dump(cls, tool_name: str, elapsed_ms: float, profiler: SamplingProfiler) -> None:
+        if not profiler.samples:
+            logger.info(f"Tool '{tool_name}' took {elapsed_ms:.1f}ms but no profile samples were collected")
+            return
+        safe_name = re.sub(r"[^A-Za-z0-9_.-]", "_", tool_name)
+        base_name = f"{time.strftime('%Y%m%d-%H%M%S')}-{int(time.time_ns() % 1_000_000_000):09d}-{safe_name}"
+        try:
+            os.makedirs(cls._output_dir, exist_ok=True)
+            collapsed_path = os.path.join(cls._output_dir, f"{base_name}.collapsed")
+            with open(collapsed_path, "w", encoding="utf-8") as f:
+                f.write(profiler.to_collapsed())
+            speedscope_path = os.path.join(cls._output_dir, f"{base_name}.speedscope.json")
+            with open(speedscope_path, "w", encoding="utf-8") as f:
+                json.dump(profiler.to_speedscope(f"{tool_name} ({elapsed_ms:.1f}ms)"), f)
+        except OSError as e:
+            logger.warning(f"Failed to write profile for tool '{tool_name}': {e}")
+            return
+        logger.info(f"Tool '{tool_name}' took {elapsed_ms:.1f}ms, profile written to {speedscope_path}")
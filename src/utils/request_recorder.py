@@ -0,0 +1,84 @@
+"""
+工具调用记录器
+开启后将每次 tools/call 的会话、工具名称、参数、耗时和结果状态逐行写入 JSON 文件，
+用于流量回放（benchmarks/load_generator.py --replay）。
+
+配置（环境变量，命令行参数 --record-requests 优先）:
+    REQUEST_RECORD_FILE: 记录文件路径，为空时不记录
+"""
+
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class RequestRecorder:
+    """
+    工具调用记录器
+    """
+    _configured: bool = False
+    _file = None
+    _path: Optional[str] = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def configure(cls, path: Optional[str] = None) -> None:
+        """
+        配置记录文件，未指定时从环境变量 REQUEST_RECORD_FILE 读取
+
+        Args:
+            path: 记录文件路径
+        """
+        if path is None:
+            path = os.getenv("REQUEST_RECORD_FILE") or None
+        with cls._lock:
+            if cls._file is not None:
+                cls._file.close()
+                cls._file = None
+            cls._path = path
+            if path:
+                # 行缓冲，进程异常退出时已记录的调用不会丢失
+                cls._file = open(path, "a", encoding="utf-8", buffering=1)
+                logger.info(f"Recording tool calls to {path}")
+            cls._configured = True
+
+    @classmethod
+    def is_enabled(cls) -> bool:
+        if not cls._configured:
+            cls.configure()
+        return cls._file is not None
+
+    @classmethod
+    def record(cls, session_id: str, tool_name: str, arguments: Dict[str, Any],
+               started_at: float, duration: float, status: str) -> None:
+        """
+        记录一次工具调用
+
+        Args:
+            session_id: 调用方会话标识
+            tool_name: 工具名称
+            arguments: 工具参数
+            started_at: 开始时间(unix时间戳，秒)
+            duration: 耗时(秒)
+            status: 调用结果状态（ok/error/cancelled）
+        """
+        if not cls.is_enabled():
+            return
+        line = json.dumps({
+            "timestamp": round(started_at, 6),
+            "session_id": session_id,
+            "tool": tool_name,
+            "arguments": arguments,
+            "duration_ms": round(duration * 1000, 3),
+            "status": status,
+        }, ensure_ascii=False, default=str)
+        with cls._lock:
+            if cls._file is not None:
+                try:
+                    cls._file.write(line + "\n")
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Failed to record tool call to {cls._path}: {e}")
@@ -0,0 +1,349 @@
+"""
+轻量级调用链追踪
+Span 模型与 OpenTelemetry 一致（trace_id / span_id / parent_span_id / 属性 / 状态），
+不依赖网络导出器，按 OTLP JSON 的字段格式逐行写入本地文件，便于离线分析或导入其他工具。
+
+采样控制（环境变量）:
+    TRACE_SAMPLE_RATIO: 头部采样比例，0~1，默认0（关闭）
+    TRACE_SLOW_THRESHOLD_MS: 大于0时，未被采样的调用只要耗时超过阈值或出错也会导出
+    TRACE_EXPORT_FILE: 导出文件路径，默认 smartdb_traces.jsonl
+    TRACE_RECORD_STATEMENTS: 是否在span中记录SQL文本，默认true
+"""
+
+import functools
+import json
+import logging
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# 单个调用链最多保留的span数量，避免异常情况下无限增长
+_MAX_SPANS_PER_TRACE = 1000
+# 记录到span中的SQL最大长度
+_MAX_STATEMENT_LENGTH = 2048
+
+STATUS_UNSET = "STATUS_CODE_UNSET"
+STATUS_OK = "STATUS_CODE_OK"
+STATUS_ERROR = "STATUS_CODE_ERROR"
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("trace_current_span", default=None)
+
+
+class _TraceState:
+    """同一调用链中所有span共享的状态"""
+    __slots__ = ("trace_id", "sampled", "spans", "lock")
+
+    def __init__(self, trace_id: str, sampled: bool):
+        self.trace_id = trace_id
+        self.sampled = sampled
+        self.spans: List["Span"] = []
+        self.lock = threading.Lock()
+
+
+class Span:
+    """调用链中的一个操作"""
+    __slots__ = ("name", "span_id", "parent_span_id", "start_ns", "end_ns", "attributes", "status",
+                 "status_message", "events", "_trace")
+
+    def __init__(self, name: str, trace: _TraceState, parent_span_id: Optional[str] = None,
+                 attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_span_id = parent_span_id
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes: Dict[str, Any] = dict(attributes) if attributes else {}
+        self.status = STATUS_UNSET
+        self.status_message = ""
+        self.events: List[Dict[str, Any]] = []
+        self._trace = trace
+
+    @property
+    def trace_id(self) -> str:
+        return self._trace.trace_id
+
+    @property
+    def is_recording(self) -> bool:
+        return True
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_status(self, status: str, message: str = "") -> None:
+        self.status = status
+        self.status_message = message
+
+    def record_exception(self, exc: BaseException) -> None:
+        self.events.append({
+            "name": "exception",
+            "timeUnixNano": str(time.time_ns()),
+            "attributes": _to_otlp_attributes({
+                "exception.type": type(exc).__name__,
+                "exception.message": str(exc),
+            }),
+        })
+        self.set_status(STATUS_ERROR, str(exc))
+
+    def end(self) -> None:
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.time_ns()
+        trace = self._trace
+        with trace.lock:
+            if len(trace.spans) < _MAX_SPANS_PER_TRACE:
+                trace.spans.append(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为 OTLP JSON 格式的 span"""
+        data = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": "SPAN_KIND_INTERNAL",
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": _to_otlp_attributes(self.attributes),
+            "status": {"code": self.status, "message": self.status_message},
+        }
+        if self.parent_span_id:
+            data["parentSpanId"] = self.parent_span_id
+        if self.events:
+            data["events"] = self.events
+        return data
+
+
+class _NonRecordingSpan:
+    """未开启追踪或当前不在调用链中时使用的空span"""
+    __slots__ = ()
+
+    is_recording = False
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_status(self, status: str, message: str = "") -> None:
+        pass
+
+    def record_exception(self, exc: BaseException) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+
+NON_RECORDING_SPAN = _NonRecordingSpan()
+
+
+def _to_otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    result = []
+    for key, value in attributes.items():
+        if isinstance(value, bool):
+            typed = {"boolValue": value}
+        elif isinstance(value, int):
+            typed = {"intValue": str(value)}
+        elif isinstance(value, float):
+            typed = {"doubleValue": value}
+        else:
+            typed = {"stringValue": str(value)}
+        result.append({"key": key, "value": typed})
+    return result
+
+
+class JsonFileSpanExporter:
+    """将span按OTLP JSON格式逐行追加写入文件"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans: List[Span]) -> None:
+        lines = "".join(json.dumps(span.to_dict(), ensure_ascii=False) + "\n" for span in spans)
+        try:
+            with self._lock:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(lines)
+        except OSError as e:
+            logger.warning(f"Failed to export trace spans to {self.path}: {e}")
+
+
+class Tracer:
+    """
+    追踪器，首次使用时从环境变量读取采样配置
+    """
+    _configured: bool = False
+    _enabled: bool = False
+    _sample_ratio: float = 0.0
+    _slow_threshold_ns: int = 0
+    _record_statements: bool = True
+    _exporter: Optional[JsonFileSpanExporter] = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def configure(cls, sample_ratio: Optional[float] = None, slow_threshold_ms: Optional[float] = None,
+                  export_file: Optional[str] = None, record_statements: Optional[bool] = None) -> None:
+        """
+        配置追踪器，未指定的参数从环境变量读取
+
+        Args:
+            sample_ratio: 头部采样比例
+            slow_threshold_ms: 慢调用阈值(毫秒)，超过阈值或出错的调用即使未被采样也会导出
+            export_file: 导出文件路径
+            record_statements: 是否记录SQL文本
+        """
+        with cls._lock:
+            if sample_ratio is None:
+                sample_ratio = float(os.getenv("TRACE_SAMPLE_RATIO", "0"))
+            if slow_threshold_ms is None:
+                slow_threshold_ms = float(os.getenv("TRACE_SLOW_THRESHOLD_MS", "0"))
+            if export_file is None:
+                export_file = os.getenv("TRACE_EXPORT_FILE", "smartdb_traces.jsonl")
+            if record_statements is None:
+                record_statements = os.getenv("TRACE_RECORD_STATEMENTS", "true").lower() == "true"
+
+            cls._sample_ratio = min(max(sample_ratio, 0.0), 1.0)
+            cls._slow_threshold_ns = int(max(slow_threshold_ms, 0.0) * 1_000_000)
+            cls._record_statements = record_statements
+            cls._enabled = cls._sample_ratio > 0 or cls._slow_threshold_ns > 0
+            cls._exporter = JsonFileSpanExporter(export_file) if cls._enabled else None
+            cls._configured = True
+
+        if cls._enabled:
+            logger.info(f"Tracing enabled (sample ratio: {cls._sample_ratio}, "
+                        f"slow threshold: {cls._slow_threshold_ns / 1_000_000}ms, file: {export_file})")
+
+    @classmethod
+    def is_enabled(cls) -> bool:
+        if not cls._configured:
+            cls.configure()
+        return cls._enabled
+
+    @classmethod
+    def record_statements(cls) -> bool:
+        return cls._record_statements
+
+    @classmethod
+    def start_trace(cls, name: str, attributes: Optional[Dict[str, Any]] = None):
+        """
+        开始一个新的调用链并返回根span，未开启追踪时返回空span
+        """
+        if not cls.is_enabled():
+            return NON_RECORDING_SPAN
+        sampled = cls._sample_ratio >= 1.0 or random.random() < cls._sample_ratio
+        if not sampled and cls._slow_threshold_ns <= 0:
+            return NON_RECORDING_SPAN
+        trace = _TraceState(f"{random.getrandbits(128):032x}", sampled)
+        return Span(name, trace, attributes=attributes)
+
+    @classmethod
+    def start_span(cls, name: str, attributes: Optional[Dict[str, Any]] = None):
+        """
+        在当前调用链中开始一个子span，当前不在调用链中时返回空span
+        """
+        parent = _current_span.get()
+        if parent is None:
+            return NON_RECORDING_SPAN
+        return Span(name, parent._trace, parent_span_id=parent.span_id, attributes=attributes)
+
+    @classmethod
+    def finish_trace(cls, root: Span) -> None:
+        """结束根span，并根据采样结果决定是否导出整条调用链"""
+        root.end()
+        trace = root._trace
+        exporter = cls._exporter
+        if exporter is None:
+            return
+        if not (trace.sampled or root.status == STATUS_ERROR
+                or root.end_ns - root.start_ns >= cls._slow_threshold_ns):
+            return
+        with trace.lock:
+            spans = list(trace.spans)
+        exporter.export(spans)
+
+
+@contextmanager
+def use_span(span):
+    """
+    将span设置为当前上下文的span，退出时记录异常并结束span
+    """
+    if not span.is_recording:
+        yield span
+        return
+    reset_token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.record_exception(e)
+        raise
+    finally:
+        _current_span.reset(reset_token)
+        if span.parent_span_id is None:
+            Tracer.finish_trace(span)
+        else:
+            span.end()
+
+
+@contextmanager
+def start_as_current_span(name: str, attributes: Optional[Dict[str, Any]] = None):
+    """在当前调用链中开始子span并设置为当前span"""
+    with use_span(Tracer.start_span(name, attributes)) as span:
+        yield span
+
+
+def current_span():
+    """获取当前span，不在调用链中时返回空span"""
+    return _current_span.get() or NON_RECORDING_SPAN
+
+
+def traced(name: str):
+    """
+    为函数添加追踪span的装饰器，函数第一个字符串参数作为连接池名称记录
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            if _current_span.get() is None:
+                return func(self, *args, **kwargs)
+            pool_name = kwargs.get("pool_name", args[0] if args else None)
+            attributes = {"db.pool": pool_name} if isinstance(pool_name, str) else None
+            with start_as_current_span(name, attributes):
+                return func(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def instrument_engine(engine) -> None:
+    """
+    通过 SQLAlchemy 游标执行事件为每条语句创建span
+    """
+    from sqlalchemy import event
+
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if _current_span.get() is None:
+            return
+        attributes = {"db.system": conn.dialect.name}
+        if Tracer.record_statements():
+            attributes["db.statement"] = statement[:_MAX_STATEMENT_LENGTH]
+        context._trace_span = Tracer.start_span("db.execute", attributes)
+
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        span = getattr(context, "_trace_span", None)
+        if span is not None:
+            if cursor.rowcount is not None and cursor.rowcount >= 0:
+                span.set_attribute("db.rowcount", cursor.rowcount)
+            span.end()
+
+    def _handle_error(exception_context):
+        span = getattr(exception_context.execution_context, "_trace_span", None)
+        if span is not None:
+            span.record_exception(exception_context.original_exception)
+            span.end()
+
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
@@ -0,0 +1,106 @@
+"""连接池准入控制：公平调度顺序、通道优先级、拒绝与超时不占用虚拟时间、流完成时间清理"""
+
+import threading
+import time
+
+import pytest
+
+from connection.admission import AdmissionController, CallerIdentity, PoolLane
+from core.exceptions import AdmissionRejectedError
+
+ALICE = CallerIdentity(session_id="s1", user="alice")
+BOB = CallerIdentity(session_id="s2", user="bob")
+CAROL = CallerIdentity(session_id="s3", user="carol")
+
+
+def _controller(**overrides):
+    options = {"pool_name": "admission_test", "max_concurrency": 1, "session_max_concurrency": 10,
+               "max_queue_size": 10, "queue_timeout": 5, "reserved_connections": 0}
+    options.update(overrides)
+    return AdmissionController(**options)
+
+
+def _enqueue(controller, caller, lane, order):
+    """在后台线程中申请准入，获得许可后记录调用方并立即释放"""
+
+    def run():
+        with controller.admit(caller, lane):
+            order.append(caller.user)
+
+    queued = controller.get_stats()["queued_requests"]
+    thread = threading.Thread(target=run)
+    thread.start()
+    deadline = time.monotonic() + 2
+    while controller.get_stats()["queued_requests"] <= queued and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return thread
+
+
+def test_waiters_are_dispatched_by_start_tag():
+    controller = _controller()
+    order = []
+    with controller.admit(CAROL, PoolLane.USER):
+        threads = [_enqueue(controller, ALICE, PoolLane.USER, order),
+                   _enqueue(controller, ALICE, PoolLane.USER, order),
+                   _enqueue(controller, BOB, PoolLane.USER, order)]
+    for thread in threads:
+        thread.join(2)
+
+    # alice 的第二个请求开始标签晚于 bob 的第一个请求
+    assert order == ["alice", "bob", "alice"]
+
+
+def test_metadata_lane_is_dispatched_before_user_lane():
+    controller = _controller()
+    order = []
+    with controller.admit(CAROL, PoolLane.USER):
+        threads = [_enqueue(controller, ALICE, PoolLane.USER, order),
+                   _enqueue(controller, BOB, PoolLane.METADATA, order)]
+    for thread in threads:
+        thread.join(2)
+
+    assert order == ["bob", "alice"]
+
+
+def test_user_lane_cannot_use_reserved_connections():
+    controller = _controller(max_concurrency=2, reserved_connections=1, queue_timeout=0.2)
+    with controller.admit(ALICE, PoolLane.USER):
+        with pytest.raises(AdmissionRejectedError):
+            with controller.admit(BOB, PoolLane.USER):
+                pass
+        with controller.admit(BOB, PoolLane.METADATA):
+            assert controller.get_stats()["active_requests"] == 2
+
+
+def test_rejected_request_does_not_consume_virtual_time():
+    controller = _controller(max_queue_size=0)
+    with controller.admit(CAROL, PoolLane.USER):
+        finish_before = controller._flow_finish.get(ALICE.flow_key)
+        with pytest.raises(AdmissionRejectedError):
+            with controller.admit(ALICE, PoolLane.USER):
+                pass
+        assert controller._flow_finish.get(ALICE.flow_key) == finish_before
+        assert controller.get_stats()["rejected_total"] == 1
+
+
+def test_timed_out_request_withdraws_its_start_tag():
+    controller = _controller(queue_timeout=0.2)
+    with controller.admit(CAROL, PoolLane.USER):
+        with pytest.raises(AdmissionRejectedError):
+            with controller.admit(ALICE, PoolLane.USER):
+                pass
+        assert controller._flow_finish[ALICE.flow_key] <= controller._virtual_time
+        assert controller.get_stats()["timeout_total"] == 1
+
+
+def test_finished_flows_are_pruned_while_busy():
+    controller = _controller(max_concurrency=2)
+    with controller.admit(CAROL, PoolLane.USER):
+        with controller.admit(ALICE, PoolLane.USER):
+            pass
+        # carol 仍持有连接，控制器未空闲，alice 的完成时间已不超过全局虚拟时间
+        controller._virtual_time = controller._flow_finish[ALICE.flow_key]
+        with controller.admit(BOB, PoolLane.USER):
+            pass
+        assert ALICE.flow_key not in controller._flow_finish
+    assert controller._flow_finish == {}
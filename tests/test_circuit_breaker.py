@@ -0,0 +1,100 @@
+"""连接池熔断器：连续失败后打开、退避后半开只放行一个探测、探测失败时退避时间加倍"""
+
+import pytest
+
+from connection import circuit_breaker
+from connection.circuit_breaker import CircuitBreaker, CircuitState
+from core.exceptions import PoolUnavailableError
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", clock.monotonic)
+    return clock
+
+
+def _fail(breaker, times=1):
+    for _ in range(times):
+        breaker.before_request()
+        breaker.record_failure(OSError("connection refused\ndetails"))
+
+
+def test_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker("cb_test", failure_threshold=3, reset_timeout=5)
+    _fail(breaker, 2)
+    breaker.before_request()
+    breaker.record_success()
+    _fail(breaker, 2)
+    assert breaker.state == CircuitState.CLOSED
+
+    _fail(breaker)
+    assert breaker.state == CircuitState.OPEN
+    with pytest.raises(PoolUnavailableError, match="connection refused"):
+        breaker.before_request()
+    stats = breaker.get_stats()
+    assert (stats["opened_total"], stats["rejected_total"], stats["retry_in_seconds"]) == (1, 1, 5)
+    assert stats["last_error"] == "connection refused"
+
+
+def test_half_open_allows_a_single_probe(clock):
+    breaker = CircuitBreaker("cb_test", failure_threshold=1, reset_timeout=5)
+    _fail(breaker)
+    clock.now += 5
+
+    breaker.before_request()
+    assert breaker.state == CircuitState.HALF_OPEN
+    with pytest.raises(PoolUnavailableError):
+        breaker.before_request()
+
+    breaker.record_success()
+    assert breaker.state == CircuitState.CLOSED
+    breaker.before_request()
+
+
+def test_failed_probe_doubles_backoff_up_to_limit(clock):
+    breaker = CircuitBreaker("cb_test", failure_threshold=1, reset_timeout=5, max_reset_timeout=12)
+    _fail(breaker)
+    for expected in (10, 12, 12):
+        clock.now += 60
+        _fail(breaker)
+        assert breaker.state == CircuitState.OPEN
+        assert breaker.get_stats()["retry_in_seconds"] == expected
+
+    clock.now += 12
+    breaker.before_request()
+    breaker.record_success()
+    _fail(breaker)
+    # 关闭后重新打开时退避时间恢复初始值
+    assert breaker.get_stats()["retry_in_seconds"] == 5
+
+
+def test_aborted_probe_lets_the_next_request_probe(clock):
+    breaker = CircuitBreaker("cb_test", failure_threshold=1, reset_timeout=5)
+    _fail(breaker)
+    clock.now += 5
+    breaker.before_request()
+    breaker.record_abort()
+    breaker.before_request()
+    assert breaker.state == CircuitState.HALF_OPEN
+
+
+@pytest.mark.parametrize("config, expected", [
+    ({}, (5, 5.0, 300.0)),
+    ({"circuit_failure_threshold": 2, "circuit_reset_timeout": 1, "circuit_max_reset_timeout": 10}, (2, 1.0, 10.0)),
+])
+def test_from_config(config, expected):
+    breaker = CircuitBreaker.from_config("cb_test", config)
+    assert (breaker.failure_threshold, breaker.reset_timeout, breaker.max_reset_timeout) == expected
+
+
+def test_from_config_disabled():
+    assert CircuitBreaker.from_config("cb_test", {"circuit_failure_threshold": 0}) is None
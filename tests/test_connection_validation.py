@@ -0,0 +1,114 @@
+"""按空闲时长校验连接：空闲未超过阈值不 ping、超过阈值 ping、ping 失败重建连接，执行时断线的查询只重试一次"""
+
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+from connection import connection_pool
+from connection.connection_pool import SQLAlchemyConnectionPool
+from connection.pool_manager import MultiDBPoolManager
+from utils.execute_sql_util import ExecuteSqlUtil
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(connection_pool.time, "monotonic", clock.monotonic)
+    return clock
+
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = SQLAlchemyConnectionPool(f"sqlite:///{tmp_path / 'validation.db'}", pool_size=1, max_overflow=0,
+                                    validation_idle_seconds=30)
+    yield pool
+    pool.close_all_connections()
+
+
+def _use(pool):
+    """借出一个连接执行查询后归还，返回底层 DBAPI 连接"""
+    with pool.engine.connect() as conn:
+        assert conn.execute(text("SELECT 1")).scalar() == 1
+        return conn.connection.dbapi_connection
+
+
+def test_connections_idle_below_threshold_are_not_pinged(pool, clock):
+    first = _use(pool)
+    clock.now += 29
+    assert _use(pool) is first
+    stats = pool.validator.get_stats()
+    assert (stats["pings"], stats["pings_saved"]) == (0, 1)
+
+
+def test_connections_idle_over_threshold_are_pinged(pool, clock):
+    first = _use(pool)
+    clock.now += 30
+    assert _use(pool) is first
+    stats = pool.validator.get_stats()
+    assert (stats["pings"], stats["ping_failures"]) == (1, 0)
+
+
+def test_failed_ping_reconnects(pool, clock, monkeypatch):
+    first = _use(pool)
+
+    def failing_ping(dbapi_connection):
+        raise OSError("server closed the connection")
+
+    monkeypatch.setattr(pool.validator, "_dialect", SimpleNamespace(do_ping=failing_ping))
+    clock.now += 60
+    # 连接池丢弃失效的连接并重新建立，新连接无需校验
+    assert _use(pool) is not first
+    stats = pool.validator.get_stats()
+    assert (stats["pings"], stats["ping_failures"]) == (1, 1)
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = MultiDBPoolManager.get_instance()
+    manager.add_pool_from_config("validation_test", {
+        "type": "sqlite", "database": str(tmp_path / "retry.db"), "host": "", "port": 0, "user": "",
+        "password": "", "role": "writer"})
+    yield manager
+    manager.remove_pool("validation_test")
+
+
+def _flaky_execution(monkeypatch, failures):
+    """前 failures 次执行时连接已断开"""
+    calls = []
+    execute_on_connection = ExecuteSqlUtil._execute_on_connection
+
+    def flaky(*args, **kwargs):
+        calls.append(args[2])
+        if len(calls) <= failures:
+            raise DBAPIError(args[2], {}, Exception("server has gone away"), connection_invalidated=True)
+        return execute_on_connection(*args, **kwargs)
+
+    monkeypatch.setattr(ExecuteSqlUtil, "_execute_on_connection", flaky)
+    return calls
+
+
+@pytest.mark.parametrize("failures, success", [(1, True), (2, False)])
+def test_invalidated_query_is_retried_once(manager, monkeypatch, failures, success):
+    calls = _flaky_execution(monkeypatch, failures)
+    result = ExecuteSqlUtil.execute_single_statement("validation_test", "SELECT 1")
+
+    assert result.success == success and len(calls) == 2
+    assert manager.get_pool("validation_test").validator.get_stats()["disconnect_retries"] == 1
+
+
+def test_invalidated_write_is_not_retried(manager, monkeypatch):
+    calls = _flaky_execution(monkeypatch, 1)
+    result = ExecuteSqlUtil.execute_single_statement("validation_test", "DELETE FROM t")
+
+    assert not result.success and len(calls) == 1
+    assert manager.get_pool("validation_test").validator.get_stats()["disconnect_retries"] == 0
@@ -0,0 +1,239 @@
+"""结构化执行计划：各方言机器可读执行计划的解析与热点计算"""
+
+import json
+
+from databases.base.explain_plan import (AccessType, ExplainPlan, HotSpotKind, PlanFlag, PlanNode, format_number,
+                                         link_nodes, to_number)
+from databases.mssqlserver.mssqlserver_optimize import MSSQLServerSqlOptimize
+from databases.mysql.mysql_optimize import MySQLSqlOptimize
+from databases.oracle.oracle_optimize import OracleSqlOptimize
+from databases.postgresql.postgresql_optimize import PostgresqlSqlOptimize
+from databases.sqlite.sqlite_optimize import SQLiteSqlOptimize
+
+
+def _kinds(plan):
+    return [spot.kind for spot in plan.hot_spots()]
+
+
+def test_hot_spots_for_full_scan_filesort_and_nested_loop():
+    outer = PlanNode("scan", table="orders", access=AccessType.FULL_SCAN, estimated_rows=50000)
+    inner = PlanNode("lookup", table="users", access=AccessType.INDEX_LOOKUP, estimated_rows=5)
+    loop = PlanNode("loop", flags={PlanFlag.NESTED_LOOP}, children=[outer, inner])
+    sort = PlanNode("sort", flags={PlanFlag.FILESORT}, children=[loop])
+    small = PlanNode("scan", table="dict", access=AccessType.FULL_SCAN, estimated_rows=10)
+
+    plan = ExplainPlan("test", nodes=[sort, small])
+
+    assert _kinds(plan) == [HotSpotKind.FILESORT, HotSpotKind.NESTED_LOOP, HotSpotKind.FULL_SCAN]
+    assert "50000 x 5" in plan.hot_spots()[1].message
+
+
+def test_full_scan_with_unknown_rows_is_a_hot_spot():
+    plan = ExplainPlan("test", nodes=[PlanNode("SCAN", table="t", access=AccessType.FULL_SCAN)])
+    assert plan.hot_spots()[0].message == "全表扫描 t（行数未知）"
+
+
+def test_large_or_unknown_index_full_scans_are_hot_spots():
+    unknown = SQLiteSqlOptimize._parse_detail("SCAN orders USING INDEX idx_created")
+    large = PlanNode("Index Scan", table="items", index="ix_items", access=AccessType.INDEX_FULL_SCAN,
+                     estimated_rows=100000)
+    small = PlanNode("Index Scan", table="dict", access=AccessType.INDEX_FULL_SCAN, estimated_rows=10)
+    plan = ExplainPlan("test", nodes=[unknown, large, small])
+
+    assert _kinds(plan) == [HotSpotKind.INDEX_FULL_SCAN, HotSpotKind.INDEX_FULL_SCAN]
+    assert [spot.message for spot in plan.hot_spots()] == [
+        "全索引扫描 orders 索引 idx_created（行数未知）", "全索引扫描 items 索引 ix_items（预估 100000 行）"]
+
+
+def test_actual_rows_drive_hot_spots_and_misestimates():
+    # 预估只有10行，实际每次循环 20000 行
+    node = PlanNode("scan", table="t", access=AccessType.FULL_SCAN, estimated_rows=10,
+                    actual_rows=40000, actual_loops=2)
+    plan = ExplainPlan("test", nodes=[node], analyzed=True)
+
+    assert _kinds(plan) == [HotSpotKind.FULL_SCAN, HotSpotKind.MISESTIMATE]
+    assert "实际 20000 行" in plan.hot_spots()[0].message
+
+
+def test_render_without_nodes_returns_raw_text():
+    assert ExplainPlan("test", raw="raw plan").render() == "raw plan"
+    assert ExplainPlan("test").render() == "未获取到执行计划"
+
+
+def test_link_nodes_builds_tree_from_rows():
+    root, child, grandchild = PlanNode("a"), PlanNode("b"), PlanNode("c")
+    roots = link_nodes([(0, None, root), (1, 0, child), (2, 1, grandchild)])
+    assert roots == [root]
+    assert root.children == [child] and child.children == [grandchild]
+
+
+def test_number_helpers():
+    assert to_number("12.5") == 12.5
+    assert to_number("") is None and to_number("n/a") is None
+    assert [format_number(value) for value in (3.0, 0.1234, 12.345)] == ["3", "0.123", "12.35"]
+
+
+def test_mysql_json_plan():
+    document = {
+        "query_block": {
+            "cost_info": {"query_cost": "1234.50"},
+            "ordering_operation": {
+                "using_filesort": True,
+                "nested_loop": [
+                    {"table": {"table_name": "o", "access_type": "ALL", "rows_examined_per_scan": 20000,
+                               "filtered": "10.00", "attached_condition": "(o.status = 'paid')"}},
+                    {"table": {"table_name": "u", "access_type": "eq_ref", "key": "PRIMARY",
+                               "rows_examined_per_scan": 1}},
+                ],
+            },
+        }
+    }
+    plan = MySQLSqlOptimize()._parse_json(json.dumps(document))
+
+    assert plan.total_cost == 1234.5
+    ordering = plan.nodes[0]
+    assert ordering.operation == "ordering_operation" and PlanFlag.FILESORT in ordering.flags
+    loop = ordering.children[0]
+    assert PlanFlag.NESTED_LOOP in loop.flags
+    scan, lookup = loop.children
+    assert (scan.table, scan.access, scan.estimated_rows) == ("o", AccessType.FULL_SCAN, 20000)
+    assert "filtered=10.00%" in scan.details
+    assert (lookup.index, lookup.access) == ("PRIMARY", AccessType.INDEX_LOOKUP)
+    assert _kinds(plan) == [HotSpotKind.FILESORT, HotSpotKind.FULL_SCAN]
+
+
+def test_mysql_hash_join_is_not_a_nested_loop():
+    document = {"query_block": {"nested_loop": [
+        {"table": {"table_name": "a", "access_type": "ALL", "rows_examined_per_scan": 10}},
+        {"table": {"table_name": "b", "access_type": "ALL", "rows_examined_per_scan": 10,
+                   "using_join_buffer": "hash join"}},
+    ]}}
+    plan = MySQLSqlOptimize()._parse_json(json.dumps(document))
+    assert plan.nodes[0].operation == "hash_join" and not plan.nodes[0].flags
+
+
+def test_mysql_analyze_tree():
+    tree = (
+        "-> Nested loop inner join  (cost=4.5 rows=9) (actual time=0.05..0.2 rows=9 loops=1)\n"
+        "    -> Table scan on t1  (cost=1.15 rows=9) (actual time=0.030..0.040 rows=9 loops=1)\n"
+        "    -> Single-row index lookup on t2 using PRIMARY (id=t1.id)  (cost=0.26 rows=1) "
+        "(actual time=0.01..0.01 rows=1 loops=9)\n"
+    )
+    plan = MySQLSqlOptimize()._parse_analyze_tree(tree)
+
+    assert plan.analyzed and plan.total_cost == 4.5
+    join = plan.nodes[0]
+    assert PlanFlag.NESTED_LOOP in join.flags
+    scan, lookup = join.children
+    assert (scan.table, scan.access, scan.actual_rows) == ("t1", AccessType.FULL_SCAN, 9)
+    assert (lookup.table, lookup.index, lookup.access) == ("t2", "PRIMARY", AccessType.INDEX_LOOKUP)
+    # 每次循环 1 行，共 9 次循环
+    assert (lookup.actual_rows, lookup.actual_loops, lookup.rows) == (9, 9, 1)
+    assert lookup.details == ["(id=t1.id)"]
+
+
+def test_mysql_analyze_tree_without_plan_lines_keeps_raw_text():
+    plan = MySQLSqlOptimize()._parse_analyze_tree("unexpected output")
+    assert plan.nodes == [] and plan.raw == "unexpected output"
+
+
+def test_postgresql_json_plan_with_actuals():
+    document = [{"Plan": {
+        "Node Type": "Sort", "Total Cost": 250.5, "Plan Rows": 100, "Sort Key": ["created_at"],
+        "Actual Loops": 1, "Actual Rows": 100, "Actual Total Time": 3.2,
+        "Plans": [{
+            "Node Type": "Seq Scan", "Relation Name": "orders", "Total Cost": 200, "Plan Rows": 100,
+            "Filter": "(status = 'paid')", "Actual Loops": 1, "Actual Rows": 60000, "Actual Total Time": 2.5,
+            "Shared Hit Blocks": 12, "Shared Read Blocks": 0,
+        }],
+    }}]
+    plan = PostgresqlSqlOptimize()._parse_document(json.dumps(document), True)
+
+    assert plan.analyzed and plan.total_cost == 250.5
+    sort = plan.nodes[0]
+    assert PlanFlag.FILESORT in sort.flags and "Sort Key: created_at" in sort.details
+    scan = sort.children[0]
+    assert (scan.table, scan.access, scan.actual_rows) == ("orders", AccessType.FULL_SCAN, 60000)
+    assert scan.io == {"shared_hit": 12}
+    assert _kinds(plan) == [HotSpotKind.FILESORT, HotSpotKind.FULL_SCAN, HotSpotKind.MISESTIMATE]
+
+
+_SHOWPLAN = """<ShowPlanXML xmlns="http://schemas.microsoft.com/sqlserver/2004/07/showplan">
+  <BatchSequence><Batch><Statements>
+    <StmtSimple StatementSubTreeCost="1.5">
+      <QueryPlan>
+        <RelOp PhysicalOp="Nested Loops" LogicalOp="Inner Join" EstimateRows="100"
+               EstimatedTotalSubtreeCost="1.5">
+          <RunTimeInformation>
+            <RunTimeCountersPerThread Thread="0" ActualRows="80" ActualExecutions="1" ActualElapsedms="4"/>
+          </RunTimeInformation>
+          <NestedLoops>
+            <RelOp PhysicalOp="Clustered Index Scan" LogicalOp="Clustered Index Scan" EstimateRows="50000"
+                   EstimatedTotalSubtreeCost="1.2">
+              <RunTimeInformation>
+                <RunTimeCountersPerThread Thread="1" ActualRows="30000" ActualExecutions="1"
+                                          ActualLogicalReads="100"/>
+                <RunTimeCountersPerThread Thread="2" ActualRows="20000" ActualExecutions="1"
+                                          ActualLogicalReads="50"/>
+              </RunTimeInformation>
+              <IndexScan><Object Table="[orders]" Index="[PK_orders]"/></IndexScan>
+            </RelOp>
+            <RelOp PhysicalOp="Index Seek" LogicalOp="Index Seek" EstimateRows="1"
+                   EstimatedTotalSubtreeCost="0.003">
+              <IndexScan><Object Table="[users]" Index="[IX_users_id]"/></IndexScan>
+            </RelOp>
+          </NestedLoops>
+        </RelOp>
+      </QueryPlan>
+    </StmtSimple>
+  </Statements></Batch></BatchSequence>
+</ShowPlanXML>"""
+
+
+def test_mssqlserver_showplan():
+    plan = MSSQLServerSqlOptimize()._parse_showplan(_SHOWPLAN)
+
+    assert plan.total_cost == 1.5
+    join = plan.nodes[0]
+    assert PlanFlag.NESTED_LOOP in join.flags and join.details == ["Inner Join"]
+    # 嵌套 RelOp 的对象和运行时计数不计入上层操作符
+    assert join.table is None and join.actual_rows == 80
+    scan, seek = join.children
+    assert (scan.table, scan.index, scan.access) == ("orders", "PK_orders", AccessType.FULL_SCAN)
+    assert scan.actual_rows == 50000 and scan.io == {"logical_reads": 150}
+    assert (seek.table, seek.index, seek.access) == ("users", "IX_users_id", AccessType.INDEX_SCAN)
+
+
+def test_oracle_plan_rows():
+    columns = ["ID", "PARENT_ID", "OPERATION", "OPTIONS", "OBJECT_NAME", "COST", "CARDINALITY",
+               "ACCESS_PREDICATES", "FILTER_PREDICATES"]
+    rows = [
+        (0, None, "SELECT STATEMENT", None, None, 30, 10, None, None),
+        (1, 0, "SORT", "ORDER BY", None, 30, 10, None, None),
+        (2, 1, "TABLE ACCESS", "BY INDEX ROWID", "ORDERS", 20, 10, None, None),
+        (3, 2, "INDEX", "RANGE SCAN", "IDX_ORDERS_USER", 3, 10, '"USER_ID"=42', None),
+    ]
+    plan = OracleSqlOptimize()._build_plan(columns, rows, False)
+
+    assert plan.total_cost == 30
+    sort = plan.nodes[0].children[0]
+    assert sort.operation == "SORT ORDER BY" and PlanFlag.FILESORT in sort.flags
+    table_access = sort.children[0]
+    assert table_access.table == "ORDERS" and table_access.access is None
+    index = table_access.children[0]
+    assert (index.index, index.access) == ("IDX_ORDERS_USER", AccessType.INDEX_SCAN)
+    assert index.details == ['access: "USER_ID"=42']
+
+
+def test_sqlite_plan_details():
+    parse = SQLiteSqlOptimize._parse_detail
+
+    scan = parse("SCAN orders")
+    assert (scan.table, scan.access) == ("orders", AccessType.FULL_SCAN)
+    legacy = parse("SCAN TABLE orders USING COVERING INDEX idx_status")
+    assert (legacy.table, legacy.index, legacy.access) == ("orders", "idx_status", AccessType.INDEX_FULL_SCAN)
+    search = parse("SEARCH users USING INTEGER PRIMARY KEY (rowid=?)")
+    assert (search.index, search.access) == ("INTEGER PRIMARY KEY", AccessType.INDEX_SCAN)
+    assert PlanFlag.FILESORT in parse("USE TEMP B-TREE FOR ORDER BY").flags
+    assert PlanFlag.TEMPORARY in parse("MATERIALIZE sub").flags
+    assert parse("SCAN CONSTANT ROW").access is None
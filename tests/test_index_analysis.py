@@ -0,0 +1,126 @@
+"""索引结构分析：查询结果组装为索引定义，找出重复、左前缀冗余和过宽的组合索引"""
+
+from databases.base.index_analysis import (IndexDefinition, IndexIssueKind, analyze_indexes, collect_indexes,
+                                           collect_sizes, format_size)
+from databases.postgresql.postgresql_queries import PostgresqlQueries
+
+MYSQL_COLUMNS = ["TABLE_NAME", "INDEX_NAME", "COLUMN_NAME", "SEQ_IN_INDEX", "NON_UNIQUE", "INDEX_TYPE", "SUB_PART"]
+
+
+def _index(name, *columns, table="orders", **options):
+    return IndexDefinition(table, name, tuple(columns), **options)
+
+
+def _issues(analysis):
+    return [(issue.kind, issue.index.name, issue.covered_by.name if issue.covered_by else None)
+            for issue in analysis.issues]
+
+
+def test_collect_indexes_from_mysql_rows():
+    rows = [
+        ("orders", "PRIMARY", "id", 1, 0, "BTREE", None),
+        ("orders", "idx_user_status", "status", 2, 1, "BTREE", None),
+        ("orders", "idx_user_status", "user_id", 1, 1, "BTREE", None),
+        ("orders", "idx_note", "note", 1, 1, "BTREE", 10),
+        ("orders", "ft_note", "note", 1, 1, "FULLTEXT", None),
+    ]
+    sizes = collect_sizes(["table_name", "index_name", "size_bytes"],
+                          [("ORDERS", "idx_user_status", 1024), ("orders", "idx_user_status", "1024")])
+    indexes = {index.name: index for index in collect_indexes(MYSQL_COLUMNS, rows, sizes)}
+
+    assert indexes["PRIMARY"].primary and indexes["PRIMARY"].unique
+    user_status = indexes["idx_user_status"]
+    assert user_status.columns == ("user_id", "status") and not user_status.unique
+    assert user_status.size_bytes == 2048
+    # 前缀索引的列附加前缀长度
+    assert indexes["idx_note"].columns == ("note(10)",)
+    assert not indexes["ft_note"].comparable
+
+
+def test_collect_indexes_marks_included_columns_and_partial_indexes():
+    columns = ["table_name", "index_name", "column_name", "seq_in_index", "uniqueness", "index_type", "is_partial"]
+    rows = [
+        ("t", "ix_a", "a", 1, "NONUNIQUE", "NONCLUSTERED", 0),
+        ("t", "ix_a", "b", 0, "NONUNIQUE", "NONCLUSTERED", 0),
+        ("t", "ix_p", "a", 1, "UNIQUE", "", 1),
+    ]
+    indexes = {index.name: index for index in collect_indexes(columns, rows)}
+
+    assert indexes["ix_a"].columns == ("a",) and not indexes["ix_a"].comparable
+    assert indexes["ix_p"].unique and not indexes["ix_p"].comparable
+
+
+def test_postgresql_include_columns_are_not_index_keys():
+    columns = ["table_name", "index_name", "column_name", "seq_in_index", "non_unique", "index_type"]
+    # i1 ON t(a) INCLUDE (b)：包含列的序号为0，不能视为 i2 ON t(a, b) 的重复索引
+    rows = [
+        ("t", "i1", "a", 1, True, "NORMAL"),
+        ("t", "i1", "b", 0, True, "NORMAL"),
+        ("t", "i2", "a", 1, True, "NORMAL"),
+        ("t", "i2", "b", 2, True, "NORMAL"),
+    ]
+    indexes = collect_indexes(columns, rows)
+    assert [(index.name, index.columns, index.comparable) for index in indexes] == [
+        ("i1", ("a",), False), ("i2", ("a", "b"), True)]
+    assert analyze_indexes(indexes).issues == []
+
+    assert "ix.indnkeyatts THEN 0" in PostgresqlQueries.get_table_index("public")
+    assert "indnkeyatts" not in PostgresqlQueries.get_table_index("public", ["t"], include_columns=False)
+
+
+def test_duplicate_keeps_primary_then_unique():
+    analysis = analyze_indexes([
+        _index("idx_dup", "ID"),
+        _index("uk_id", "id", unique=True),
+        _index("PRIMARY", "id", unique=True, primary=True),
+    ])
+    assert _issues(analysis) == [
+        (IndexIssueKind.DUPLICATE, "uk_id", "PRIMARY"),
+        (IndexIssueKind.DUPLICATE, "idx_dup", "PRIMARY"),
+    ]
+
+
+def test_left_prefix_is_redundant_unless_unique():
+    analysis = analyze_indexes([
+        _index("idx_a", "a"),
+        _index("idx_a_b", "a", "b"),
+        _index("idx_a_c", "a", "c"),
+        _index("uk_x", "x", unique=True),
+        _index("idx_x_y", "x", "y"),
+        _index("idx_b", "b"),
+    ])
+    assert _issues(analysis) == [(IndexIssueKind.REDUNDANT_PREFIX, "idx_a", "idx_a_b")]
+
+
+def test_uncomparable_indexes_are_skipped_and_wide_indexes_flagged():
+    analysis = analyze_indexes([
+        _index("idx_a", "a"),
+        _index("ft_a", "a", index_type="FULLTEXT"),
+        _index("idx_expr", None),
+        _index("idx_wide", "c1", "c2", "c3", "c4", "c5", "c6"),
+    ], max_columns=5)
+    assert _issues(analysis) == [(IndexIssueKind.OVERSIZED, "idx_wide", None)]
+
+
+def test_tables_are_analyzed_separately():
+    analysis = analyze_indexes([_index("idx_a", "a", table="t1"), _index("idx_a", "a", table="t2")])
+    assert analysis.table_count == 2 and analysis.issues == []
+    assert analysis.render().endswith("未发现重复、左前缀冗余或过宽的组合索引")
+
+
+def test_reclaimable_space():
+    analysis = analyze_indexes([
+        _index("idx_a", "a", size_bytes=1024 * 1024),
+        _index("idx_a2", "a", size_bytes=512 * 1024),
+        _index("idx_a_b", "a", "b"),
+    ], sizes_known=True)
+
+    assert [index.name for index in analysis.removable] == ["idx_a2", "idx_a"]
+    assert analysis.reclaimable_bytes == 1.5 * 1024 * 1024
+    assert analysis.render().splitlines()[-1] == "可回收空间: 删除 2 个重复和冗余索引约可回收 1.50 MB"
+    assert "无法估算" in analyze_indexes(analysis.removable + [_index("idx_a_b", "a", "b")]).render()
+
+
+def test_format_size():
+    assert [format_size(value) for value in (512, 2048, 3 * 1024 ** 3, 5 * 1024 ** 4)] == \
+        ["512 B", "2 KB", "3 GB", "5120 GB"]
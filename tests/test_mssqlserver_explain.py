@@ -0,0 +1,37 @@
+"""SQL Server 实际执行计划：STATISTICS XML 在语句出错时也要关闭，连接已失效时不再执行"""
+
+import pytest
+
+from databases.mssqlserver.mssqlserver_optimize import MSSQLServerSqlOptimize
+
+
+class _FailingCursor:
+    def execute(self, sql):
+        raise RuntimeError("Invalid object name 'orders'")
+
+    def close(self):
+        pass
+
+
+class _FakeConnection:
+    def __init__(self, invalidated=False):
+        self.statements = []
+        self.invalidated = invalidated
+        self.connection = self
+
+    def cursor(self):
+        return _FailingCursor()
+
+    def execute(self, clause):
+        self.statements.append(str(clause))
+
+
+@pytest.mark.parametrize("invalidated, statements", [
+    (False, ["SET STATISTICS XML ON", "SET STATISTICS XML OFF"]),
+    (True, ["SET STATISTICS XML ON"]),
+])
+def test_statistics_xml_is_reset_when_the_statement_fails(invalidated, statements):
+    conn = _FakeConnection(invalidated)
+    with pytest.raises(RuntimeError):
+        MSSQLServerSqlOptimize._run_with_statistics(conn, "SELECT * FROM orders")
+    assert conn.statements == statements
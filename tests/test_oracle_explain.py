@@ -0,0 +1,96 @@
+"""Oracle 预估执行计划：EXPLAIN PLAN 写入 PLAN_TABLE 后在同一会话中按 STATEMENT_ID 读取"""
+
+import re
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy.exc import ResourceClosedError
+
+from connection.pool_manager import MultiDBPoolManager
+from connection.session import PinnedSession
+from databases.base.explain_plan import AccessType
+from databases.oracle.oracle_optimize import OracleSqlOptimize
+
+POOL = "oracle_test"
+
+_EXPLAIN_PATTERN = re.compile(r"^EXPLAIN PLAN SET STATEMENT_ID = '(\w+)' FOR (.+)$", re.S)
+
+
+class _FakeResult:
+    def __init__(self, columns=None, rows=None):
+        self.returns_rows = columns is not None
+        self._columns = columns or []
+        self._rows = rows or []
+        self.rowcount = len(self._rows)
+
+    def _check(self):
+        # 与 SQLAlchemy 一致：不返回结果集的语句读取结果时抛出 ResourceClosedError
+        if not self.returns_rows:
+            raise ResourceClosedError("This result object does not return rows. It has been closed automatically.")
+
+    def keys(self):
+        self._check()
+        return list(self._columns)
+
+    def fetchall(self):
+        self._check()
+        return list(self._rows)
+
+
+class _FakeOracleConnection:
+    """模拟 Oracle 会话：EXPLAIN PLAN 按 STATEMENT_ID 写入 PLAN_TABLE，查询时按绑定参数过滤"""
+
+    columns = ["ID", "PARENT_ID", "OPERATION", "OPTIONS", "OBJECT_NAME", "COST", "CARDINALITY",
+               "ACCESS_PREDICATES", "FILTER_PREDICATES"]
+
+    def __init__(self):
+        self.plan_table = {}
+        self.invalidated = False
+
+    def execute(self, clause, params=None):
+        statement = str(clause).strip()
+        match = _EXPLAIN_PATTERN.match(statement)
+        if match:
+            self.plan_table[match.group(1)] = [
+                (0, None, "SELECT STATEMENT", None, None, 12, 50000, None, None),
+                (1, 0, "TABLE ACCESS", "FULL", "ORDERS", 12, 50000, None, '"USER_ID"=42'),
+            ]
+            return _FakeResult()
+        if "FROM plan_table" in statement:
+            statement_id = (params or {}).get("statement_id")
+            return _FakeResult(self.columns, self.plan_table.get(statement_id, []))
+        raise AssertionError(f"unexpected statement: {statement}")
+
+    def rollback(self):
+        self.plan_table.clear()
+
+
+@pytest.fixture
+def oracle_session(monkeypatch):
+    connection = _FakeOracleConnection()
+    manager = MultiDBPoolManager.get_instance()
+
+    @contextmanager
+    def session(pool_name):
+        try:
+            yield PinnedSession(pool_name, None, connection)
+        finally:
+            connection.rollback()
+
+    monkeypatch.setattr(manager, "session", session)
+    monkeypatch.setitem(manager._configs, POOL, {"type": "oracle", "role": "readonly"})
+    return connection
+
+
+def test_estimated_plan_reads_rows_of_its_statement_id(oracle_session):
+    plan = OracleSqlOptimize().get_explain_plan(POOL, "SELECT * FROM orders WHERE user_id = 42")
+
+    assert not plan.analyzed
+    assert plan.total_cost == 12
+    nodes = list(plan.walk())
+    assert [node.operation for node in nodes] == ["SELECT STATEMENT", "TABLE ACCESS FULL"]
+    assert nodes[1].table == "ORDERS"
+    assert nodes[1].access == AccessType.FULL_SCAN
+    assert nodes[1].details == ['filter: "USER_ID"=42']
+    # 会话结束时回滚，计划行不会残留
+    assert oracle_session.plan_table == {}
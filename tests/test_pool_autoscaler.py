@@ -0,0 +1,107 @@
+"""连接池自适应容量控制：等待超标且占满时扩容、受服务端负载约束、需求持续偏低时缩容"""
+
+import itertools
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import pytest
+
+from connection import pool_autoscaler
+from connection.pool_autoscaler import PoolAutoscaler, ServerLoad
+from utils.metrics import POOL_CHECKOUT_WAIT
+
+_names = itertools.count()
+
+
+class _FakePool:
+    def __init__(self, pool_size=4, max_overflow=4, dialect="sqlite"):
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.checked_out = 0
+        self.trimmed = []
+        self.engine = SimpleNamespace(dialect=SimpleNamespace(name=dialect),
+                                      pool=SimpleNamespace(checkedout=lambda: self.checked_out))
+
+    def resize(self, max_overflow):
+        self.max_overflow = max_overflow
+
+    def trim_idle(self, keep):
+        self.trimmed.append(keep)
+        return 0
+
+    @contextmanager
+    def control_connection(self):
+        yield None
+
+
+def _autoscaler(pool, server_load=None, **options):
+    options.setdefault("max_connections", 16)
+    autoscaler = PoolAutoscaler(f"autoscale_test_{next(_names)}", pool, None, **options)
+    if server_load is not None:
+        autoscaler._probe = lambda conn: server_load
+    return autoscaler
+
+
+def _interval(autoscaler, pool, in_use, wait_ms=0.0):
+    """模拟一个调整周期：采样已借出连接数，记录一次获取连接等待后调整"""
+    pool.checked_out = in_use
+    autoscaler.sample()
+    if wait_ms:
+        POOL_CHECKOUT_WAIT.labels(autoscaler.pool_name).observe(wait_ms / 1000)
+    autoscaler.adjust()
+
+
+def test_grows_when_waits_exceed_target_and_pool_is_saturated():
+    pool = _FakePool()
+    autoscaler = _autoscaler(pool, target_wait_ms=50)
+
+    _interval(autoscaler, pool, in_use=8, wait_ms=200)
+    assert autoscaler.capacity == 10
+    assert autoscaler.get_stats()["grow_total"] == 1
+
+    for _ in range(5):
+        _interval(autoscaler, pool, in_use=autoscaler.capacity, wait_ms=200)
+    assert autoscaler.capacity == 16
+    assert autoscaler.get_stats()["last_decision"] == "hold: at limit"
+
+
+def test_waits_without_saturation_do_not_grow():
+    pool = _FakePool()
+    autoscaler = _autoscaler(pool, target_wait_ms=50)
+    _interval(autoscaler, pool, in_use=5, wait_ms=200)
+    assert autoscaler.capacity == 8
+
+
+@pytest.mark.parametrize("load, expected_capacity, decision", [
+    (ServerLoad(max_connections=100, connections=10, running=90), 8, "hold: server busy"),
+    (ServerLoad(max_connections=100, connections=79, running=5), 9, "grow"),
+])
+def test_growth_is_limited_by_server_load(load, expected_capacity, decision):
+    pool = _FakePool(dialect="mysql")
+    autoscaler = _autoscaler(pool, server_load=load, server_ratio=0.8)
+    _interval(autoscaler, pool, in_use=8, wait_ms=200)
+    assert autoscaler.capacity == expected_capacity
+    assert autoscaler.get_stats()["last_decision"].startswith(decision)
+
+
+def test_shrinks_after_sustained_low_demand_but_not_below_pool_size():
+    pool = _FakePool(pool_size=4, max_overflow=12)
+    autoscaler = _autoscaler(pool)
+
+    for _ in range(pool_autoscaler._SHRINK_AFTER_INTERVALS - 1):
+        _interval(autoscaler, pool, in_use=1)
+    assert autoscaler.capacity == 16
+    _interval(autoscaler, pool, in_use=1)
+    assert autoscaler.capacity == 12
+    assert pool.trimmed == [1]
+
+    for _ in range(pool_autoscaler._SHRINK_AFTER_INTERVALS * 4):
+        _interval(autoscaler, pool, in_use=0)
+    assert autoscaler.capacity == 4
+
+
+def test_shrinks_when_server_is_over_its_connection_budget():
+    pool = _FakePool(pool_size=4, max_overflow=12, dialect="postgresql")
+    autoscaler = _autoscaler(pool, server_load=ServerLoad(max_connections=100, connections=82))
+    _interval(autoscaler, pool, in_use=10)
+    assert autoscaler.capacity == 14
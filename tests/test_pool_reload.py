@@ -0,0 +1,84 @@
+"""重新加载配置时重建连接池：新连接池创建完成后才切换路由，创建失败时旧连接池不受影响"""
+
+import pytest
+from sqlalchemy import text
+
+from connection.pool_manager import MultiDBPoolManager
+
+
+def _config(path, **overrides):
+    config = {"type": "sqlite", "database": str(path), "host": "", "port": 0, "user": "", "password": "",
+              "role": "readonly", "drain_timeout": 1}
+    config.update(overrides)
+    return config
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = MultiDBPoolManager.get_instance()
+    config = _config(tmp_path / "a.db")
+    manager.add_pool_from_config("reload_test", config)
+    yield manager
+    manager.remove_pool("reload_test")
+
+
+def test_recreate_swaps_only_after_new_pool_is_ready(manager, tmp_path, monkeypatch):
+    old_pool = manager.get_pool("reload_test")
+    old_admission = manager._admission["reload_test"]
+    seen_during_build = []
+    create_context = manager._create_context
+
+    def observing_create_context(pool_name, config, engine):
+        # 新连接池的上下文创建期间，路由仍指向旧连接池和旧的准入控制
+        seen_during_build.append((manager.get_pool(pool_name), manager._admission.get(pool_name)))
+        return create_context(pool_name, config, engine)
+
+    monkeypatch.setattr(manager, "_create_context", observing_create_context)
+    new_config = _config(tmp_path / "b.db")
+    result = manager.reload({"reload_test": new_config})
+
+    assert result["recreated"] == ["reload_test"]
+    assert seen_during_build == [(old_pool, old_admission)]
+    assert manager.get_pool("reload_test") is not old_pool
+    assert manager.get_config("reload_test") == new_config
+    assert manager.get_context("reload_test") is not None
+    with manager.connection("reload_test") as conn:
+        assert conn.execute(text("SELECT 1")).scalar() == 1
+
+
+def test_failed_recreate_keeps_old_pool(manager, tmp_path):
+    old_pool = manager.get_pool("reload_test")
+    old_config = manager.get_config("reload_test")
+    old_context = manager.get_context("reload_test")
+    old_admission = manager._admission["reload_test"]
+
+    result = manager.reload({"reload_test": _config(tmp_path / "b.db", type="no_such_database")})
+
+    assert "reload_test" in result["failed"]
+    assert manager.get_pool("reload_test") is old_pool
+    assert manager.get_config("reload_test") is old_config
+    assert manager.get_context("reload_test") is old_context
+    assert manager._admission["reload_test"] is old_admission
+    with manager.connection("reload_test") as conn:
+        assert conn.execute(text("SELECT 1")).scalar() == 1
+
+
+def test_reload_classifies_changes(manager, tmp_path):
+    old_pool = manager.get_pool("reload_test")
+    old_admission = manager._admission["reload_test"]
+    current = manager.get_config("reload_test")
+
+    assert manager.reload({"reload_test": dict(current)})["unchanged"] == ["reload_test"]
+
+    # 只有容量和准入控制配置变化时原地调整，不重建连接池
+    online = dict(current, pool_size=3, max_overflow=1, session_max_concurrency=1)
+    result = manager.reload({"reload_test": online, "reload_added": _config(tmp_path / "c.db")})
+    assert result["reconfigured"] == ["reload_test"] and result["added"] == ["reload_added"]
+    assert manager.get_pool("reload_test") is old_pool
+    assert manager._admission["reload_test"] is old_admission
+    assert (old_pool.pool_size, old_pool.max_overflow) == (3, 1)
+    assert (old_admission.max_concurrency, old_admission.session_max_concurrency) == (4, 1)
+
+    result = manager.reload({"reload_test": online})
+    assert result["removed"] == ["reload_added"]
+    assert manager.get_pool("reload_added") is None
@@ -0,0 +1,151 @@
+"""只读副本路由：按最少未完成请求选择副本、复制延迟超限时排除、写入后固定主库、副本繁忙时回退主库"""
+
+import contextvars
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from connection import replica as replica_module
+from connection.pool_manager import MultiDBPoolManager
+from connection.replica import Replica, ReplicaSet, primary_pinned, use_primary
+from core.exceptions import AdmissionRejectedError
+from utils.execute_sql_util import ExecuteSqlUtil
+
+
+class _FakePool:
+    def __init__(self, lag=0.0):
+        self.lag = lag
+        self.engine = SimpleNamespace(dialect=SimpleNamespace(name="fake"))
+
+    @contextmanager
+    def control_connection(self):
+        if isinstance(self.lag, Exception):
+            raise self.lag
+        yield self
+
+
+def _replica_set(*lags, max_lag_seconds=30.0):
+    replicas = [Replica(f"r{index}", None, _FakePool(lag), None) for index, lag in enumerate(lags, start=1)]
+    return ReplicaSet("replica_test", replicas, max_lag_seconds)
+
+
+def test_acquire_picks_least_outstanding_then_least_routed():
+    replica_set = _replica_set(0, 0, 0)
+    first, second, third = (replica_set.acquire() for _ in range(3))
+    assert [first.name, second.name, third.name] == ["r1", "r2", "r3"]
+
+    # r2 先完成，未完成请求最少
+    replica_set.release(second)
+    assert replica_set.acquire().name == "r2"
+
+    # 未完成请求数相同时选择累计路由次数最少的副本
+    for replica in (first, second, third):
+        replica_set.release(replica)
+    assert [replica.routed for replica in replica_set.replicas] == [1, 2, 1]
+    assert replica_set.acquire().name == "r1"
+
+
+def test_acquire_skips_unhealthy_replicas_and_counts_fallbacks():
+    replica_set = _replica_set(0, 0)
+    replica_set.mark_down(replica_set.replicas[0], OSError("connection refused"))
+    assert replica_set.acquire().name == "r2"
+
+    replica_set.replicas[1].healthy = False
+    assert replica_set.acquire() is None
+    assert replica_set.fallbacks == 2
+
+
+def test_check_excludes_lagging_and_unreachable_replicas(monkeypatch):
+    monkeypatch.setitem(replica_module._REPLICATION_LAG_PROBES, "fake", lambda conn: conn.lag)
+    replica_set = _replica_set(5.0, 60.0, None, OSError("connection refused"))
+    replica_set.check()
+
+    assert [(replica.healthy, replica.lag_seconds) for replica in replica_set.replicas] == [
+        (True, 5.0), (False, 60.0), (False, None), (False, None)]
+    assert [replica.last_error for replica in replica_set.replicas] == [
+        None, "replication lag 60.0s exceeds 30.0s", "replication is not running", "connection refused"]
+
+    # 延迟恢复后重新参与路由
+    replica_set.replicas[1].pool.lag = 1.0
+    replica_set.check()
+    assert replica_set.replicas[1].healthy
+
+
+@pytest.mark.parametrize("statement, primary_only", [
+    ("SELECT * FROM t", False),
+    ("SELECT * FROM t FOR UPDATE", True),
+    ("SELECT * FROM t FOR SHARE", True),
+    ("SELECT * FROM t LOCK IN SHARE MODE", True),
+    ("SELECT * INTO backup FROM t", True),
+    ("SELECT update_time FROM t", False),
+])
+def test_primary_only_pattern(statement, primary_only):
+    assert bool(ExecuteSqlUtil.PRIMARY_ONLY_PATTERN.search(statement.upper())) == primary_only
+
+
+@pytest.fixture
+def routed_pool(tmp_path):
+    """主库和副本是两个 SQLite 文件，各自的 marker 表记录数据来源"""
+    for name in ("primary", "replica"):
+        database = str(tmp_path / f"{name}.db")
+        engine_config = {"type": "sqlite", "database": database, "host": "", "port": 0, "user": "", "password": ""}
+        MultiDBPoolManager.get_instance().add_pool_from_config(f"replica_seed_{name}", engine_config)
+        with MultiDBPoolManager.get_instance().connection(f"replica_seed_{name}") as conn:
+            conn.execute(text("CREATE TABLE marker (source TEXT)"))
+            conn.execute(text("INSERT INTO marker VALUES (:source)"), {"source": name})
+            conn.commit()
+        MultiDBPoolManager.get_instance().remove_pool(f"replica_seed_{name}")
+
+    manager = MultiDBPoolManager.get_instance()
+    manager.add_pool_from_config("replica_test", {
+        "type": "sqlite", "database": str(tmp_path / "primary.db"), "host": "", "port": 0, "user": "",
+        "password": "", "role": "writer", "replicas": [{"database": str(tmp_path / "replica.db")}],
+        "replica_check_interval": 3600})
+    yield manager
+    manager.remove_pool("replica_test")
+
+
+def _source(manager, read_only=True):
+    with manager.connection("replica_test", read_only=read_only) as conn:
+        return conn.execute(text("SELECT source FROM marker")).scalar()
+
+
+def test_reads_use_replica_until_a_write_pins_the_primary(routed_pool):
+    def tool_call():
+        sources = [ExecuteSqlUtil.execute_single_statement("replica_test", "SELECT source FROM marker").rows[0][0]]
+        assert not primary_pinned()
+        assert ExecuteSqlUtil.execute_single_statement("replica_test", "UPDATE marker SET source = 'written'").success
+        assert primary_pinned()
+        sources.append(ExecuteSqlUtil.execute_single_statement("replica_test", "SELECT source FROM marker").rows[0][0])
+        return sources
+
+    def next_call():
+        # 固定只在上一次工具调用的上下文内生效
+        assert not primary_pinned()
+        sources = [_source(routed_pool), _source(routed_pool, read_only=False)]
+        with use_primary():
+            sources.append(_source(routed_pool))
+        return sources
+
+    # 每次工具调用在独立的上下文中执行
+    assert contextvars.Context().run(tool_call) == ["replica", "written"]
+    assert contextvars.Context().run(next_call) == ["replica", "written", "written"]
+
+
+@pytest.mark.parametrize("error", [AdmissionRejectedError("busy"), PoolTimeoutError("QueuePool limit reached")])
+def test_busy_replica_falls_back_to_primary_without_leaving_rotation(routed_pool, error):
+    replica_set = routed_pool._replicas.get("replica_test")
+    replica = replica_set.replicas[0]
+
+    @contextmanager
+    def rejecting_admit(cancel_token=None):
+        raise error
+        yield
+
+    replica.admission = SimpleNamespace(admit=rejecting_admit)
+    assert contextvars.Context().run(_source, routed_pool) == "primary"
+    assert replica.healthy and replica.outstanding == 0
+    assert replica_set.get_stats()["primary_fallbacks_total"] == 1
@@ -0,0 +1,90 @@
+"""语句分类：是否返回结果集、包含的操作类型"""
+
+import pytest
+
+from core.exceptions import SQLExecutionError
+from utils.execute_sql_util import ExecuteSqlUtil, SQLOperation
+
+
+def _is_query(sql: str) -> bool:
+    return ExecuteSqlUtil.is_query_statement(ExecuteSqlUtil.clean_sql(sql).upper().strip())
+
+
+@pytest.mark.parametrize("sql", [
+    "SELECT 1",
+    "  select * from t",
+    "WITH x AS (SELECT 1) SELECT * FROM x",
+    "SHOW TABLES",
+    "DESCRIBE t",
+    "desc t",
+    "EXPLAIN SELECT 1",
+    "EXPLAIN FORMAT=JSON SELECT 1",
+    "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) SELECT 1",
+    "EXPLAIN QUERY PLAN SELECT 1",
+    "/* hint */ SELECT 1",
+])
+def test_row_returning_statements(sql):
+    assert _is_query(sql)
+
+
+@pytest.mark.parametrize("sql", [
+    "EXPLAIN PLAN FOR SELECT 1 FROM dual",
+    "EXPLAIN PLAN SET STATEMENT_ID = 'smartdb_1' FOR SELECT 1 FROM dual",
+    "explain plan set statement_id = 'x' into my_plan_table for select 1 from dual",
+    "INSERT INTO t VALUES (1)",
+    "UPDATE t SET a = 1",
+    "DELETE FROM t",
+    "CREATE TABLE t (a INT)",
+    "DESCRIPTION",
+])
+def test_statements_without_result_set(sql):
+    assert not _is_query(sql)
+
+
+@pytest.mark.parametrize("sql, expected", [
+    ("SELECT * FROM t", {SQLOperation.SELECT}),
+    ("select * from t where a in (select a from u)", {SQLOperation.SELECT}),
+    ("INSERT INTO t SELECT * FROM u", {SQLOperation.INSERT, SQLOperation.SELECT}),
+    ("EXPLAIN PLAN SET STATEMENT_ID = 'x' FOR DELETE FROM t",
+     {SQLOperation.EXPLAIN, SQLOperation.DELETE}),
+    ("WITH x AS (SELECT 1) UPDATE t SET a = 1", {SQLOperation.SELECT, SQLOperation.UPDATE}),
+    ("DROP TABLE t", {SQLOperation.DROP}),
+    ("SELECT updated_at, created_by FROM t", {SQLOperation.SELECT}),
+    ("SELECT 1 -- DELETE FROM t", {SQLOperation.SELECT}),
+    ("SELECT 1 /* DROP TABLE t */", {SQLOperation.SELECT}),
+])
+def test_extract_operations(sql, expected):
+    assert ExecuteSqlUtil.extract_operations(sql) == expected
+
+
+@pytest.mark.parametrize("sql", [
+    "SELECT * FROM t WHERE a = 1",
+    "with x as (select 1 as a) select * from x",
+    "INSERT INTO t (a) SELECT a FROM u",
+    "UPDATE t SET a = 1 WHERE id = 2;",
+    "DELETE FROM t WHERE created_at < '2024-01-01'",
+    "MERGE INTO t USING u ON (t.id = u.id) WHEN MATCHED THEN UPDATE SET t.a = u.a",
+    "SELECT begin_time, committed FROM t",
+])
+def test_analyzable_statements(sql):
+    ExecuteSqlUtil.check_analyzable(sql)
+
+
+@pytest.mark.parametrize("sql", [
+    "CREATE TABLE t (a INT)",
+    "ALTER TABLE t ADD b INT",
+    "TRUNCATE TABLE t",
+    "DROP INDEX i",
+    "SELECT 1; DROP TABLE t",
+    "INSERT INTO t VALUES (1); COMMIT",
+    "BEGIN DELETE FROM t; COMMIT; END;",
+    "DECLARE x INT; BEGIN NULL; END;",
+    "EXEC sp_who",
+    "CALL refresh_stats()",
+    "SHOW TABLES",
+    "EXPLAIN SELECT 1",
+    "WITH x AS (SELECT 1) SELECT * FROM x; COMMIT",
+])
+def test_statements_rejected_for_analyze(sql):
+    with pytest.raises(SQLExecutionError, match="实际执行计划只支持"):
+        ExecuteSqlUtil.check_analyzable(sql)
@@ -0,0 +1,53 @@
+"""工具在工作线程中执行：复用线程的事件循环，取消令牌、调用方和通道绑定到工具的上下文"""
+
+import asyncio
+import threading
+
+from connection.admission import CallerIdentity, PoolLane, current_caller, current_lane
+from connection.query_cancel import QueryCancelToken, current_cancel_token
+from core.server import _run_tool_in_thread
+
+
+class _RecordingTool:
+    name = "recording_tool"
+    pool_lane = PoolLane.METADATA
+
+    def __init__(self):
+        self.calls = []
+
+    async def run_tool(self, arguments):
+        self.calls.append((asyncio.get_running_loop(), current_caller(), current_lane(), current_cancel_token()))
+        return arguments["value"]
+
+
+def _run(tool, value, caller):
+    return _run_tool_in_thread(tool, {"value": value}, QueryCancelToken(), caller, False)
+
+
+def test_worker_thread_reuses_its_event_loop():
+    tool = _RecordingTool()
+    caller = CallerIdentity(session_id="s1", user="alice")
+    results = []
+    worker = threading.Thread(target=lambda: results.extend([_run(tool, 1, caller), _run(tool, 2, caller)]))
+    worker.start()
+    worker.join(5)
+    other = threading.Thread(target=lambda: results.append(_run(tool, 3, caller)))
+    other.start()
+    other.join(5)
+
+    assert results == [1, 2, 3]
+    loops = [loop for loop, *_ in tool.calls]
+    assert loops[0] is loops[1]
+    assert loops[2] is not loops[0]
+
+
+def test_tool_context_is_bound_per_call():
+    tool = _RecordingTool()
+    first, second = CallerIdentity(session_id="s1"), CallerIdentity(session_id="s2", user="bob")
+    worker = threading.Thread(target=lambda: (_run(tool, 1, first), _run(tool, 2, second)))
+    worker.start()
+    worker.join(5)
+
+    assert [(caller, lane) for _, caller, lane, _ in tool.calls] == [(first, PoolLane.METADATA),
+                                                                     (second, PoolLane.METADATA)]
+    assert tool.calls[0][3] is not tool.calls[1][3]
@@ -0,0 +1,78 @@
+"""Top SQL：语句归一化、按摘要合并统计和按指标排序"""
+
+import pytest
+
+from databases.base.top_sql import MAX_DIGEST_LENGTH, TopSqlEntry, TopSqlOrder, TopSqlReport, normalize_sql, rank_entries
+
+
+@pytest.mark.parametrize("sql, expected", [
+    ("SELECT * FROM t WHERE id = 42", "SELECT * FROM t WHERE id = ?"),
+    ("select  *\n from t where name = 'it''s' and n = -1.5e3", "select * from t where name = ? and n = ?"),
+    ("SELECT * FROM t WHERE name = N'abc'", "SELECT * FROM t WHERE name = ?"),
+    ("SELECT * FROM t WHERE id IN (1, 2, 3)", "SELECT * FROM t WHERE id IN (...)"),
+    ("INSERT INTO t VALUES (1, 'a'), (2, 'b'), (3, 'c')", "INSERT INTO t VALUES (?, ?), ..."),
+    ("SELECT /* hint */ a FROM t -- trailing\nWHERE b = 1", "SELECT a FROM t WHERE b = ?"),
+    # 标识符中的数字、PostgreSQL 占位符和限定名不替换
+    ("SELECT col1 FROM t2 WHERE a = $1 AND s.t3 = 1", "SELECT col1 FROM t2 WHERE a = $1 AND s.t3 = ?"),
+])
+def test_normalize_sql(sql, expected):
+    assert normalize_sql(sql) == expected
+
+
+def test_normalize_sql_is_idempotent_and_truncates():
+    digest = "SELECT * FROM `t` WHERE `id` = ? AND `name` IN (...)"
+    assert normalize_sql(digest) == digest
+    assert normalize_sql(None) == ""
+    long_text = normalize_sql("SELECT " + "a, " * MAX_DIGEST_LENGTH + "b FROM t")
+    assert len(long_text) == MAX_DIGEST_LENGTH + 4 and long_text.endswith(" ...")
+
+
+def test_from_row_reads_aliases():
+    entry = TopSqlEntry.from_row({"sql_text": "SELECT 1", "executions": "4", "total_time_ms": 10, "digest_id": 123,
+                                  "schema_name": "", "logical_reads": "7"})
+    assert (entry.executions, entry.total_time_ms, entry.digest_id, entry.schema) == (4, 10, "123", None)
+    assert entry.rows_examined is None and entry.scanned == 7
+    assert entry.avg_time_ms == 2.5
+
+
+def test_rank_entries_merges_statements_differing_only_in_literals():
+    entries = [
+        TopSqlEntry("SELECT * FROM t WHERE id = 1", executions=1, total_time_ms=100, rows_examined=10),
+        TopSqlEntry("SELECT * FROM t WHERE id = 2", executions=3, total_time_ms=20, logical_reads=5,
+                    schema="app"),
+        TopSqlEntry("SELECT * FROM u", executions=100, total_time_ms=50, rows_examined=1000),
+    ]
+    ranked = rank_entries(entries, TopSqlOrder.TOTAL_TIME, 10)
+
+    assert [entry.digest for entry in ranked] == ["SELECT * FROM t WHERE id = ?", "SELECT * FROM u"]
+    merged = ranked[0]
+    assert (merged.executions, merged.total_time_ms) == (4, 120)
+    assert (merged.rows_examined, merged.logical_reads, merged.schema) == (10, 5, "app")
+
+
+@pytest.mark.parametrize("order, expected", [
+    (TopSqlOrder.TOTAL_TIME, ["slow", "scan", "hot"]),
+    (TopSqlOrder.AVG_TIME, ["slow", "scan", "hot"]),
+    (TopSqlOrder.EXECUTIONS, ["hot", "scan", "slow"]),
+    (TopSqlOrder.ROWS_EXAMINED, ["scan", "hot", "slow"]),
+])
+def test_rank_entries_orders_by_metric(order, expected):
+    entries = [
+        TopSqlEntry("SELECT slow", executions=2, total_time_ms=1000),
+        TopSqlEntry("SELECT hot", executions=500, total_time_ms=100, rows_examined=500),
+        TopSqlEntry("SELECT scan", executions=10, total_time_ms=500, logical_reads=90000),
+    ]
+    ranked = rank_entries(entries, order, 3)
+    assert [entry.digest.split()[1] for entry in ranked] == expected
+
+
+def test_report_limits_and_renders():
+    entries = [TopSqlEntry(f"SELECT * FROM t{index}", executions=1, total_time_ms=index) for index in range(5)]
+    report = TopSqlReport.ranked("mysql", "performance_schema", TopSqlOrder.TOTAL_TIME, entries, 2, note="范围说明")
+
+    assert [entry.digest for entry in report.entries] == ["SELECT * FROM t4", "SELECT * FROM t3"]
+    lines = report.render().splitlines()
+    assert lines[0] == "Top SQL（mysql，来源 performance_schema，按总耗时排序）:"
+    assert lines[1] == "范围说明"
+    assert lines[3] == "   SELECT * FROM t4"
+    assert "没有语句统计数据" in TopSqlReport("mysql", "x", TopSqlOrder.TOTAL_TIME, []).render()
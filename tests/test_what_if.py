@@ -0,0 +1,135 @@
+"""假设索引评估：候选索引解析与校验、根据执行计划热点生成候选、成本变化比较和评估结果文本"""
+
+import json
+
+import pytest
+
+from databases.base.explain_plan import AccessType, ExplainPlan, PlanNode
+from databases.base.what_if import (IndexCandidate, WhatIfReport, WhatIfResult, _predicate_columns, parse_candidates,
+                                    suggest_candidates, table_references)
+from databases.mysql.mysql_optimize import MySQLSqlOptimize
+from databases.postgresql.postgresql_optimize import PostgresqlSqlOptimize
+
+
+def _mysql_plan(table_name, condition, rows=50000, cost="5000.00"):
+    document = {"query_block": {"cost_info": {"query_cost": cost}, "table": {
+        "table_name": table_name, "access_type": "ALL", "rows_examined_per_scan": rows,
+        "attached_condition": condition}}}
+    return MySQLSqlOptimize()._parse_json(json.dumps(document))
+
+
+def _postgresql_plan(node_type="Seq Scan", index_name=None, cost=1000.0):
+    plan = {"Node Type": node_type, "Relation Name": "orders", "Total Cost": cost, "Plan Rows": 50000,
+            "Filter": "((status)::text = 'paid'::text) AND (created_at > '2024-01-01'::date) AND (user_id = 42)"}
+    if index_name:
+        plan["Index Name"] = index_name
+    return PostgresqlSqlOptimize()._parse_document([{"Plan": plan}], False)
+
+
+def test_parse_candidates():
+    candidates = parse_candidates('orders(user_id, created_at DESC); app.items(order_id), "Order Lines"([line no])')
+    assert [(candidate.table, candidate.columns) for candidate in candidates] == [
+        ("orders", ("user_id", "created_at DESC")),
+        ("app.items", ("order_id",)),
+        ('"Order Lines"', ("[line no]",)),
+    ]
+    assert candidates[0].column_names == ("user_id", "created_at")
+    assert candidates[2].column_names == ("line no",)
+    assert parse_candidates(None) == [] and parse_candidates("  ") == []
+
+
+@pytest.mark.parametrize("text", [
+    "t(a /* x */, b)",
+    "t(a b)",
+    "t(a; DROP TABLE t)",
+    "t(a), DROP TABLE t",
+    "t(a) DROP TABLE t",
+    "t()",
+    "t(a,)",
+    "t(\"a'\")",
+    "t(`a``b`)",
+    "t(a + b)",
+    "t a(b)",
+    "orders",
+])
+def test_parse_candidates_rejects_malformed_text(text):
+    with pytest.raises(ValueError):
+        parse_candidates(text)
+
+
+def test_candidate_rejects_invalid_identifiers():
+    with pytest.raises(ValueError):
+        IndexCandidate("t; DROP TABLE t", ("a",))
+    with pytest.raises(ValueError):
+        IndexCandidate("t", ())
+
+
+def test_predicate_columns_put_equality_before_one_range_column():
+    details = ["Filter: ((status)::text = 'paid'::text) AND (created_at > '2024-01-01'::date) AND "
+               "(amount < 10) AND (user_id = ANY ('{1,2}'::integer[]))",
+               "Sort Key: created_at"]
+    assert _predicate_columns(details) == ("status", "user_id", "created_at")
+    assert _predicate_columns(["条件: ((`o`.`user_id` = 42) and (`o`.`status` in ('a','b')))"]) == ("user_id", "status")
+    assert _predicate_columns(["access: \"USER_ID\"=42"]) == ("USER_ID",)
+    assert _predicate_columns(["Sort Key: a"]) == ()
+
+
+def test_suggest_candidates_from_postgresql_plan():
+    candidates = suggest_candidates(_postgresql_plan())
+    assert candidates == [IndexCandidate("orders", ("status", "user_id", "created_at"), "全表扫描热点")]
+
+
+def test_suggest_candidates_skips_small_scans_and_scans_without_predicates():
+    small = ExplainPlan("test", nodes=[PlanNode("scan", table="t", access=AccessType.FULL_SCAN, estimated_rows=10,
+                                                details=["Filter: (a = 1)"])])
+    no_filter = ExplainPlan("test", nodes=[PlanNode("scan", table="t", access=AccessType.FULL_SCAN)])
+    assert suggest_candidates(small) == [] and suggest_candidates(no_filter) == []
+
+
+def test_table_references():
+    sql = ("SELECT * FROM shop.orders o JOIN users AS u ON u.id = o.user_id "
+           "LEFT OUTER JOIN items ON items.order_id = o.id, dict d FORCE INDEX (idx) WHERE o.user_id = 1")
+    assert table_references(sql) == {"o": "shop.orders", "u": "users", "items": "items", "d": "dict"}
+    # 子查询只解析内部的表引用
+    assert table_references("SELECT * FROM (SELECT * FROM t x WHERE a = 1) d WHERE d.a = 2") == {"x": "t"}
+
+
+def test_mysql_suggestions_map_aliases_to_tables():
+    optimize = MySQLSqlOptimize()
+    plan = _mysql_plan("o", "(`o`.`user_id` = 42)")
+
+    sql = "SELECT * FROM orders o WHERE o.user_id = 42"
+    assert suggest_candidates(plan, tables=optimize._plan_tables(sql)) == [
+        IndexCandidate("orders", ("user_id",), "全表扫描热点")]
+    # 派生表等无法映射到实际表的别名不生成候选
+    derived = "SELECT * FROM (SELECT * FROM orders) o WHERE o.user_id = 42"
+    assert suggest_candidates(plan, tables=optimize._plan_tables(derived)) == []
+
+
+def test_compare_records_cost_usage_and_removed_full_scans():
+    baseline = _postgresql_plan(cost=1000.0)
+    plan = _postgresql_plan("Index Scan", index_name="<13542>btree_orders_user_id", cost=12.5)
+    candidate = IndexCandidate("orders", ("user_id",))
+
+    result = WhatIfResult.compare(candidate, baseline, plan, "<13542>btree_orders_user_id")
+    assert (result.cost_after, result.used, result.full_scans_removed) == (12.5, True, 1)
+
+    unused = WhatIfResult.compare(candidate, baseline, baseline, "other_index")
+    assert (unused.used, unused.full_scans_removed) == (False, 0)
+
+
+def test_report_render():
+    candidate = IndexCandidate("orders", ("user_id",), "全表扫描热点")
+    report = WhatIfReport("HypoPG", 1000.0, [
+        WhatIfResult(candidate, cost_after=12.5, used=True, full_scans_removed=1),
+        WhatIfResult(IndexCandidate("orders", ("status",)), cost_after=1000.0),
+        WhatIfResult(IndexCandidate("items", ("id",)), error="权限不足"),
+    ])
+    assert report.render().splitlines() == [
+        "假设索引评估（HypoPG）:",
+        "原计划总成本 1000",
+        "1. orders(user_id)（全表扫描热点）: 成本 1000 → 12.50（-98.80%），执行计划使用了该索引，消除 1 处全表扫描热点",
+        "2. orders(status)（用户指定）: 成本 1000 → 1000（0%），执行计划未使用该索引",
+        "3. items(id)（用户指定）: 评估失败: 权限不足",
+    ]
+    assert "index_candidates" in WhatIfReport("HypoPG", None).render()